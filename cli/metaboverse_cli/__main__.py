@@ -41,6 +41,7 @@ import sys
 import os
 import json
 import zipfile
+import multiprocessing
 from pathlib import Path
 # Includes all imports used throughout metaboverse-cli to ensure packaging by pyinstaller
 
@@ -63,6 +64,7 @@ try:
         write_database_json,
         prepare_output
     )
+    from metaboverse_cli.profiler import start_profiler, write_profile_report
 except ImportError:
     try:
         # Then try relative imports
@@ -82,6 +84,7 @@ except ImportError:
             write_database_json,
             prepare_output
         )
+        from profiler import start_profiler, write_profile_report
     except ImportError:
         try:
             # Finally try direct imports with frozen path handling
@@ -143,6 +146,10 @@ except ImportError:
             write_database_json = utils.write_database_json
             prepare_output = utils.prepare_output
 
+            profiler = load_module("profiler", os.path.join(base_path, "profiler.py"))
+            start_profiler = profiler.start_profiler
+            write_profile_report = profiler.write_profile_report
+
         except Exception as e:
             print(f"Error during module loading: {str(e)}")
             raise
@@ -261,20 +268,26 @@ def decide_curation_path(args_dict, reference_url):
 def main(args=None):
     """Run metaboverse-cli."""
     args, args_dict = parse_arguments(args, __version__)
+    start_profiler(args_dict)
     progress_feed(args_dict, "graph", 2)
 
-    if args_dict['cmd'] == 'metaboliteMapper':
-        # For metaboliteMapper, we don't need organism-specific files
-        print('Generating metabolite mapper...')
-        metaboliteMapper(args_dict)
-    else:
-        # For other commands that need organism-specific files
-        reference_url = construct_reference_url(args_dict)
-        decide_curation_path(args_dict, reference_url)
+    try:
+        if args_dict['cmd'] == 'metaboliteMapper':
+            # For metaboliteMapper, we don't need organism-specific files
+            print('Generating metabolite mapper...')
+            metaboliteMapper(args_dict)
+        else:
+            # For other commands that need organism-specific files
+            reference_url = construct_reference_url(args_dict)
+            decide_curation_path(args_dict, reference_url)
+    finally:
+        # Report the stages that ran, even if a later one failed
+        write_profile_report(args_dict)
 
     # Finalize session
     args_dict = update_session_vars(args_dict)
     progress_feed(args_dict, "graph", 50)
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()
     sys.exit(main() or 0)
\ No newline at end of file
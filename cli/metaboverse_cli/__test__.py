@@ -38,6 +38,7 @@ import json
 try:
     from metaboverse_cli.utils import update_session, \
         progress_feed, \
+        flush_progress, \
         check_directories, \
         check_files, \
         check_curate, \
@@ -46,6 +47,7 @@ try:
 except:
     from utils import update_session, \
         progress_feed, \
+        flush_progress, \
         check_directories, \
         check_files, \
         check_curate, \
@@ -83,6 +85,7 @@ progress_feed(
     args_dict=args_dict,
     process="tester",
     amount=1)
+flush_progress(args_dict)
 with open(progress_file) as json_file:
     data = json.load(json_file)
     assert data['tester'] == 1, 'progress_feed() failed'
@@ -91,6 +94,7 @@ progress_feed(
     args_dict=args_dict,
     process="tester",
     amount=-1)
+flush_progress(args_dict)
 with open(progress_file) as json_file:
     data = json.load(json_file)
     assert data['tester'] == 0, 'progress_feed() failed'
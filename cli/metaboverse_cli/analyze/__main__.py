@@ -28,8 +28,10 @@ SOFTWARE.
 
 """
 from __future__ import print_function
+from scipy import sparse
 import networkx as nx
 import pandas as pd
+import numpy as np
 from datetime import date
 import requests
 import json
@@ -61,15 +63,21 @@ try:
     # First try normal package imports
     from metaboverse_cli import __version__, SOURCE_URL
     from metaboverse_cli.analyze.utils import remove_defective_reactions
+    from metaboverse_cli.analyze.neighbors_db import read_neighbors_dictionary, \
+        build_neighbors_index
     from metaboverse_cli.utils import progress_feed, track_progress, read_network, \
         get_metaboverse_cli_version, write_database, safestr, update_session_vars
+    from metaboverse_cli.profiler import profile_stage
 except ImportError:
     try:
         # Then try relative imports
         from __init__ import __version__, SOURCE_URL
         from analyze.utils import remove_defective_reactions
+        from analyze.neighbors_db import read_neighbors_dictionary, \
+            build_neighbors_index
         from utils import progress_feed, track_progress, read_network, \
             get_metaboverse_cli_version, write_database, safestr, update_session_vars
+        from profiler import profile_stage
     except ImportError:
         try:
             # Finally try direct imports
@@ -91,6 +99,10 @@ except ImportError:
             utils_analyze = load_module("utils_analyze", os.path.join(base_path, "utils.py"))
             remove_defective_reactions = utils_analyze.remove_defective_reactions
 
+            neighbors_db = load_module("neighbors_db", os.path.join(base_path, "neighbors_db.py"))
+            read_neighbors_dictionary = neighbors_db.read_neighbors_dictionary
+            build_neighbors_index = neighbors_db.build_neighbors_index
+
             utils = load_module("utils", os.path.join(base_path, "..", "utils.py"))
             progress_feed = utils.progress_feed
             track_progress = utils.track_progress
@@ -100,6 +112,9 @@ except ImportError:
             safestr = utils.safestr
             update_session_vars = utils.update_session_vars
 
+            profiler = load_module("profiler", os.path.join(base_path, "..", "profiler.py"))
+            profile_stage = profiler.profile_stage
+
         except ImportError as e:
             print(f"Error importing dependencies: {e}")
             print(f"Current sys.path: {sys.path}")
@@ -264,7 +279,8 @@ def read_template(
         uniprot=network['uniprot_synonyms'],
         chebi=network['chebi_mapper'],
         uniprot_metabolites=network['uniprot_metabolites'])
-    metabolite_mapper = load_metabolite_synonym_dictionary()
+    with profile_stage(args_dict, 'load_metabolite_synonym_dictionary'):
+        metabolite_mapper = load_metabolite_synonym_dictionary()
 
     args_dict["curation_version"] = network["metaboverse-curate_version"]
     args_dict["curation_date"] = network["curation_date"]
@@ -301,15 +317,62 @@ def download_neighbors_dictionary(
     else:
         file = url
 
-    neighbors_dictionary = read_network(
-        file_path=args_dict['output'],
-        network_url=file)
+    neighbors_dictionary = read_neighbors_dictionary(
+        path=os.path.join(args_dict['output'], file))
 
     neighbors_dictionary['nbdb-Metaboverse-url'] = file
 
     return neighbors_dictionary
 
 
+def build_reaction_neighbors(
+        graph,
+        reaction_ids,
+        block_size=1024):
+    """Find the reactions within two hops of each reaction in the graph
+    - Encode the graph as a sparse reaction x node incidence matrix (edges
+    taken in both directions)
+    - Reaction-reaction adjacency is the product of the incidence matrix with
+    its transpose, computed block_size reactions at a time to limit memory
+    """
+
+    nodes = list(graph.nodes())
+    node_index = {n: i for i, n in enumerate(nodes)}
+
+    edges = list(graph.edges())
+    sources = np.fromiter(
+        (node_index[e[0]] for e in edges), dtype=np.int64, count=len(edges))
+    targets = np.fromiter(
+        (node_index[e[1]] for e in edges), dtype=np.int64, count=len(edges))
+    adjacency = sparse.csr_matrix(
+        (np.ones(2 * len(edges), dtype=np.int32),
+        (np.concatenate([sources, targets]),
+        np.concatenate([targets, sources]))),
+        shape=(len(nodes), len(nodes)))
+
+    # Only reactions with at least one edge get an entry
+    degrees = np.diff(adjacency.indptr)
+    reactions = [
+        i for i, n in enumerate(nodes)
+        if n in reaction_ids and degrees[i] > 0]
+    reaction_names = np.empty(len(reactions), dtype=object)
+    reaction_names[:] = [nodes[i] for i in reactions]
+
+    incidence = adjacency[reactions, :]
+    incidence_t = incidence.T.tocsr()
+
+    reaction_neighbors_dictionary = {}
+    for block in range(0, len(reactions), block_size):
+        reaction_adjacency = incidence[block:block + block_size] @ incidence_t
+        neighbor_names = reaction_names[reaction_adjacency.indices].tolist()
+        indptr = reaction_adjacency.indptr.tolist()
+        for row in range(len(indptr) - 1):
+            reaction_neighbors_dictionary[reaction_names[block + row]] = \
+                neighbor_names[indptr[row]:indptr[row + 1]]
+
+    return reaction_neighbors_dictionary
+
+
 def make_neighbors_dictionary(
         args_dict,
         graph,
@@ -319,42 +382,10 @@ def make_neighbors_dictionary(
     reaction_ids = set(reaction_dictionary.keys())
 
     print('Generating Metaboverse neighbors dictionary for organism...')
-
-    counter = 0
-    edges = list(graph.edges)
-    edge_len = len(edges)
-    neighbors_dictionary = {}
-    for e in edges:
-        one = e[0]
-        two = e[1]
-        if one in neighbors_dictionary.keys():
-            neighbors_dictionary[one].add(two)
-        else:
-            neighbors_dictionary[one] = set()
-            neighbors_dictionary[one].add(two)
-        if two in neighbors_dictionary.keys():
-            neighbors_dictionary[two].add(one)
-        else:
-            neighbors_dictionary[two] = set()
-            neighbors_dictionary[two].add(one)
-        counter = track_progress(args_dict, counter, edge_len, 3)
-
-    print('Tuning neighbors dictionary...')
-    reaction_neighbors_dictionary = {}
-    counter = 0
-    neighbors = list(neighbors_dictionary.keys())
-    neighbors_number = len(neighbors)
-    for neighbor in neighbors:
-        if neighbor in reaction_ids:
-            components = neighbors_dictionary[neighbor]
-            connected_reactions = set()
-            for _c in components:
-                for _c_ in neighbors_dictionary[_c]:
-                    if _c_ in reaction_ids:
-                        connected_reactions.add(_c_)
-            connected_reactions = list(connected_reactions)
-            reaction_neighbors_dictionary[neighbor] = connected_reactions
-        counter = track_progress(args_dict, counter, neighbors_number, 3)
+    reaction_neighbors_dictionary = build_reaction_neighbors(
+        graph=graph,
+        reaction_ids=reaction_ids)
+    progress_feed(args_dict, "graph", 6)
 
     reaction_neighbors_dictionary['nbdb-Metaboverse-version'] = get_metaboverse_cli_version()
     reaction_neighbors_dictionary['nbdb-Metaboverse-date'] = date.today().strftime('%Y-%m-%d')
@@ -365,6 +396,13 @@ def make_neighbors_dictionary(
         output=args_dict['output'],
         file=args_dict['organism_id'] + '.nbdb',
         database=reaction_neighbors_dictionary)
+    try:
+        build_neighbors_index(
+            input_file=os.path.join(
+                args_dict['output'], args_dict['organism_id'] + '.nbdb'),
+            neighbors_dictionary=reaction_neighbors_dictionary)
+    except OSError as e:
+        print('Unable to write neighbors index: ' + str(e))
 
     return reaction_neighbors_dictionary
 
@@ -481,25 +519,30 @@ def __main__(
         progress_feed(args_dict, "graph", 6)
                 
 
-    # Overlay data on graph and collapse as able
-    print("Modeling data onto network...")
-    graph_name = __model__(
-        graph=graph,
-        args_dict=args_dict,
-        network=network,
-        data=data,
-        stats=stats,
-        species_id=args_dict['organism_id'],
-        output_file=args_dict['output_file'],
-        neighbors_dictionary=neighbors_dictionary,
-        name_reference=name_reference,
-        degree_dictionary=degree_dictionary,
-        chebi_dictionary=chebi_dictionary,
-        uniprot_mapper=uniprot_mapper,
-        metabolite_mapper=metabolite_mapper,
-        super_pathways=super_pathways,
-        unmapped=unmapped,
-        flag_data=flag_data)
+    try:
+        # Overlay data on graph and collapse as able
+        print("Modeling data onto network...")
+        graph_name = __model__(
+            graph=graph,
+            args_dict=args_dict,
+            network=network,
+            data=data,
+            stats=stats,
+            species_id=args_dict['organism_id'],
+            output_file=args_dict['output_file'],
+            neighbors_dictionary=neighbors_dictionary,
+            name_reference=name_reference,
+            degree_dictionary=degree_dictionary,
+            chebi_dictionary=chebi_dictionary,
+            uniprot_mapper=uniprot_mapper,
+            metabolite_mapper=metabolite_mapper,
+            super_pathways=super_pathways,
+            unmapped=unmapped,
+            flag_data=flag_data)
+    finally:
+        # An indexed mapper store keeps its SQLite connection open
+        if hasattr(metabolite_mapper, 'close'):
+            metabolite_mapper.close()
 
     args_dict = update_session_vars(args_dict)
 
@@ -224,9 +224,6 @@ extract_value = model.extract_value
 output_graph = model.output_graph
 compile_pathway_degree = model.compile_pathway_degree
 compile_node_degrees = model.compile_node_degrees
-remove_nulls = model.remove_nulls
-infer_protein_values = model.infer_protein_values
-infer_protein_stats = model.infer_protein_stats
 broadcast_values = model.broadcast_values
 make_motif_reaction_dictionary = model.make_motif_reaction_dictionary
 load_metabolite_synonym_dictionary = model.load_metabolite_synonym_dictionary
@@ -607,23 +604,6 @@ if os.path.exists(test_args['output_file']):
 else:
     raise Exception('output_graph() failed')
 
-# remove_nulls()
-print("Testing remove_nulls()")
-vals1 = [[None, 1, 6, None]]
-assert remove_nulls(vals1) == [], 'remove_nulls() failed'
-vals2 = [[None, 1, 6, None], [1, 2, 3]]
-assert remove_nulls(vals2) == [[1, 2, 3]], 'remove_nulls() failed'
-
-# infer_protein_values()
-print("Testing infer_protein_values()")
-vals = [[1], [2], [3], [3], [4]]
-length = 1
-assert infer_protein_values(vals, length) == [3], 'infer_protein_values() failed'
-
-# infer_protein_stats()
-print("Testing infer_protein_stats()")
-assert infer_protein_stats(vals, length) == [1.0], 'infer_protein_stats() failed'
-
 # broadcast_values()
 print("Testing broadcast_values()")
 G_update = G.copy()
@@ -98,7 +98,9 @@ def find_values(
         collapse_with_modifiers,
         degree_dictionary,
         collapse_threshold,
-        degree_threshold):
+        degree_threshold,
+        current_signature=None,
+        neighbor_signature=None):
     """Are there any values for either side of the reaction?
     - There can only be one side with values for this situation to be valid in
     this context
@@ -115,7 +117,10 @@ def find_values(
         degree_dictionary=degree_dictionary,
         collapse_with_modifiers=collapse_with_modifiers,
         collapse_threshold=collapse_threshold,
-        degree_threshold=degree_threshold)
+        degree_threshold=degree_threshold,
+        side1_signature=current_signature,
+        side2_signature=None if neighbor_signature == None
+            else neighbor_signature['hub_reactants'])
     if pass_match == True:
         side_key = 'products'
         if collapse_with_modifiers == True or collapse_with_modifiers == "True":
@@ -256,28 +261,102 @@ def get_unity_lists(
     return _proportion
 
 
+def get_unity_sides(
+        reaction_side,
+        neighbor_side):
+    """get_unity_lists() for precomputed (species set, list length) sides
+    """
+
+    _max = max(reaction_side[1], neighbor_side[1])
+    if _max <= 0:
+        _max = 1
+
+    return len(reaction_side[0] & neighbor_side[0]) / _max
+
+
+def filter_side(
+        side,
+        degree_dictionary,
+        degree_threshold,
+        blocklist=()):
+    """Remove hubs and blocklisted species from a reaction side
+    """
+
+    return [
+        x for x in side
+        if degree_dictionary[x] <= degree_threshold and x not in blocklist]
+
+
+def make_side_signature(
+        reactants,
+        products,
+        degree_dictionary,
+        blocklist,
+        degree_threshold):
+    """Get the hub-filtered sides of a reaction used for neighbor matching
+    - short sides also drop blocklisted species and are used by
+    check_neighbors()
+    - hub sides only drop hubs and are used by get_instructions()
+    """
+
+    short_reactants = filter_side(
+        reactants, degree_dictionary, degree_threshold, blocklist)
+    short_products = filter_side(
+        products, degree_dictionary, degree_threshold, blocklist)
+    hub_reactants = filter_side(
+        reactants, degree_dictionary, degree_threshold)
+    hub_products = filter_side(
+        products, degree_dictionary, degree_threshold)
+
+    return {
+        'short': short_reactants + short_products,
+        'short_reactants': (frozenset(short_reactants), len(short_reactants)),
+        'short_products': (frozenset(short_products), len(short_products)),
+        'hub_reactants': (frozenset(hub_reactants), len(hub_reactants)),
+        'hub_products': (frozenset(hub_products), len(hub_products))
+    }
+
+
+def build_side_signatures(
+        reaction_dictionary,
+        degree_dictionary,
+        blocklist,
+        degree_threshold):
+    """Precompute side signatures for all reactions once per collapse
+    """
+
+    return {
+        k: make_side_signature(
+            reactants=v['reactants'],
+            products=v['products'],
+            degree_dictionary=degree_dictionary,
+            blocklist=blocklist,
+            degree_threshold=degree_threshold)
+        for k, v in reaction_dictionary.items()}
+
+
 def get_instructions(
         side1,
         side2,
         degree_dictionary,
         collapse_with_modifiers,
         collapse_threshold,
-        degree_threshold):
+        degree_threshold,
+        side1_signature=None,
+        side2_signature=None):
     """See which sides were matching for collapse
     """
 
     # Find side that doesn't match the current reaction outputs
-    short_side1 = []
-    short_side2 = []
-    for r in side1:
-        if degree_dictionary[r] <= degree_threshold:
-            short_side1.append(r)
-    for p in side2:
-        if degree_dictionary[p] <= degree_threshold:
-            short_side2.append(p)
-    unity_proportion = get_unity_lists(
-        reaction_list=short_side1,
-        neighbor_list=short_side2)
+    if side1_signature == None:
+        short_side1 = filter_side(side1, degree_dictionary, degree_threshold)
+        side1_signature = (frozenset(short_side1), len(short_side1))
+    if side2_signature == None:
+        short_side2 = filter_side(side2, degree_dictionary, degree_threshold)
+        side2_signature = (frozenset(short_side2), len(short_side2))
+    unity_proportion = get_unity_sides(
+        reaction_side=side1_signature,
+        neighbor_side=side2_signature)
 
     if unity_proportion >= collapse_threshold:
         pass_match = True
@@ -299,7 +378,9 @@ def check_neighbors(
         output_neighbors,
         blocklist,
         collapse_threshold,
-        degree_threshold):
+        degree_threshold,
+        signature=None,
+        neighbor_signature=None):
 
     # Parse potential bridge inputs and outputs
     neighbor_reactants = neighbor['reactants']
@@ -331,72 +412,134 @@ def check_neighbors(
         output_neighbors.append(neighbor_key)
 
     # Check for partial matches with hubs removed from consideration
-    short_reactants = []
-    short_products = []
-    short_neighbor_reactants = []
-    short_neighbor_products = []
-
-    for r in real_reactants:
-        if degree_dictionary[r] <= degree_threshold and r not in blocklist:
-            short_reactants.append(r)
-    for p in real_products:
-        if degree_dictionary[p] <= degree_threshold and p not in blocklist:
-            short_products.append(p)
-    for rr in neighbor_reactants:
-        if degree_dictionary[rr] <= degree_threshold and rr not in blocklist:
-            short_neighbor_reactants.append(rr)
-    for pp in neighbor_products:
-        if degree_dictionary[pp] <= degree_threshold and pp not in blocklist:
-            short_neighbor_products.append(pp)
-
-    unity_reactants_nnReactants = get_unity_lists(
-        reaction_list=short_reactants,
-        neighbor_list=short_neighbor_reactants)
-    unity_reactants_nnProducts = get_unity_lists(
-        reaction_list=short_reactants,
-        neighbor_list=short_neighbor_products)
-    unity_products_nnReactants = get_unity_lists(
-        reaction_list=short_products,
-        neighbor_list=short_neighbor_reactants)
-    unity_products_nnProducts = get_unity_lists(
-        reaction_list=short_products,
-        neighbor_list=short_neighbor_products)
+    if signature == None:
+        signature = make_side_signature(
+            reactants=real_reactants,
+            products=real_products,
+            degree_dictionary=degree_dictionary,
+            blocklist=blocklist,
+            degree_threshold=degree_threshold)
+    if neighbor_signature == None:
+        neighbor_signature = make_side_signature(
+            reactants=neighbor_reactants,
+            products=neighbor_products,
+            degree_dictionary=degree_dictionary,
+            blocklist=blocklist,
+            degree_threshold=degree_threshold)
 
     # Check if short lists match and the length of the unity / shortest short
     # list meets threshold
-    if short_reactants + short_products != \
-            short_neighbor_reactants + short_neighbor_products \
-    and real_modifiers != neighbor_modifiers \
-    and neighbor_key != key \
-    and unity_reactants_nnReactants >= collapse_threshold:
+    if signature['short'] == neighbor_signature['short'] \
+    or real_modifiers == neighbor_modifiers \
+    or neighbor_key == key:
+        return input_neighbors, output_neighbors
+
+    unity_reactants_nnReactants = get_unity_sides(
+        reaction_side=signature['short_reactants'],
+        neighbor_side=neighbor_signature['short_reactants'])
+    unity_reactants_nnProducts = get_unity_sides(
+        reaction_side=signature['short_reactants'],
+        neighbor_side=neighbor_signature['short_products'])
+    unity_products_nnReactants = get_unity_sides(
+        reaction_side=signature['short_products'],
+        neighbor_side=neighbor_signature['short_reactants'])
+    unity_products_nnProducts = get_unity_sides(
+        reaction_side=signature['short_products'],
+        neighbor_side=neighbor_signature['short_products'])
+
+    if unity_reactants_nnReactants >= collapse_threshold:
         input_neighbors.append(neighbor_key)
-    if short_reactants + short_products != \
-            short_neighbor_reactants + short_neighbor_products \
-    and real_modifiers != neighbor_modifiers \
-    and neighbor_key != key \
-    and unity_reactants_nnProducts >= collapse_threshold:
+    if unity_reactants_nnProducts >= collapse_threshold:
         input_neighbors.append(neighbor_key)
 
-    if short_reactants + short_products != \
-            short_neighbor_reactants + short_neighbor_products \
-    and real_modifiers != neighbor_modifiers \
-    and neighbor_key != key \
-    and unity_products_nnReactants >= collapse_threshold:
+    if unity_products_nnReactants >= collapse_threshold:
         output_neighbors.append(neighbor_key)
-    if short_reactants + short_products != \
-            short_neighbor_reactants + short_neighbor_products \
-    and real_modifiers != neighbor_modifiers \
-    and neighbor_key != key \
-    and unity_products_nnProducts >= collapse_threshold:
+    if unity_products_nnProducts >= collapse_threshold:
         output_neighbors.append(neighbor_key)
 
-    # Remove duplicates
-    input_neighbors_unique = list(set(input_neighbors))
-    output_neighbors_unique = list(set(output_neighbors))
-
     return input_neighbors, output_neighbors
 
 
+def build_neighbor_index(
+        reaction_dictionary):
+    """Index reactions by the species and the exact sides they contain
+    """
+
+    positions = {}
+    species_index = {}
+    side_index = {}
+    for position, (key, reaction) in enumerate(reaction_dictionary.items()):
+        positions[key] = position
+        for s in set(reaction['reactants'] + reaction['products']):
+            species_index.setdefault(s, []).append(key)
+        for side in set([
+                tuple(reaction['reactants']),
+                tuple(reaction['products'])]):
+            side_index.setdefault(side, []).append(key)
+
+    return {
+        'positions': positions,
+        'species': species_index,
+        'sides': side_index
+    }
+
+
+def get_indexed_candidates(
+        key,
+        real_reactants,
+        real_products,
+        neighbor_index,
+        degree_dictionary,
+        blocklist,
+        degree_threshold):
+    """Get the set of reactions sharing an identical side or a non-hub species
+    with a reaction
+    """
+
+    candidates = set()
+    for side in [tuple(real_reactants), tuple(real_products)]:
+        candidates.update(neighbor_index['sides'].get(side, []))
+    for s in real_reactants + real_products:
+        if degree_dictionary[s] <= degree_threshold and s not in blocklist:
+            candidates.update(neighbor_index['species'].get(s, []))
+    candidates.discard(key)
+
+    return candidates
+
+
+def find_neighbor_candidates(
+        key,
+        real_reactants,
+        real_products,
+        reaction_dictionary,
+        neighbor_index,
+        degree_dictionary,
+        blocklist,
+        collapse_threshold,
+        degree_threshold):
+    """Get the reactions that check_neighbors() could match against a reaction
+    missing from the neighbors dictionary
+    - A complete match needs an identical side
+    - A partial match needs a shared non-hub species, unless the collapse
+    threshold is 0 or less
+    Candidates are returned in reaction_dictionary order
+    """
+
+    if collapse_threshold <= 0:
+        return [k for k in reaction_dictionary.keys() if k != key]
+
+    candidates = get_indexed_candidates(
+        key=key,
+        real_reactants=real_reactants,
+        real_products=real_products,
+        neighbor_index=neighbor_index,
+        degree_dictionary=degree_dictionary,
+        blocklist=blocklist,
+        degree_threshold=degree_threshold)
+
+    return sorted(candidates, key=neighbor_index['positions'].__getitem__)
+
+
 def collapse_nodes(
         args_dict,
         graph,
@@ -429,10 +572,19 @@ def collapse_nodes(
     updated_reactions = {}  # Collapsed reaction dictionary for plotting
     changed_reactions = {}  # For mapping collapsed reactions post-processing
     # This makes sure that collapsed reactions are not added twice
-    collapsed_options = []
+    collapsed_options = set()
     removed_reaction = set()  # for reactions that are collapsed, make sure the
     # original reactions are removed from the final reaction dictionary
 
+    blocklist = set(blocklist)
+    neighbor_index = build_neighbor_index(
+        reaction_dictionary=reaction_dictionary)
+    signatures = build_side_signatures(
+        reaction_dictionary=reaction_dictionary,
+        degree_dictionary=degree_dictionary,
+        blocklist=blocklist,
+        degree_threshold=degree_threshold)
+
     counter = 0
     reaction_number = len(list(reaction_dictionary.keys()))
 
@@ -519,39 +671,52 @@ def collapse_nodes(
 
             # Check for reactions with complete and partial matching sides
             if key in neighbors_dictionary.keys():
-                # all components connected to that reaction
-                for neighbor_key in neighbors_dictionary[key]:
-                    if key != neighbor_key \
-                    and neighbor_key in reaction_dictionary.keys():
-                        input_neighbors, output_neighbors = check_neighbors(
-                            key=key,
-                            real_reactants=real_reactants,
-                            real_products=real_products,
-                            real_modifiers=real_modifiers,
-                            neighbor_key=neighbor_key,
-                            neighbor=reaction_dictionary[neighbor_key],
-                            degree_dictionary=degree_dictionary,
-                            input_neighbors=input_neighbors,
-                            output_neighbors=output_neighbors,
-                            blocklist=blocklist,
-                            collapse_threshold=collapse_threshold,
-                            degree_threshold=degree_threshold)
+                # all components connected to that reaction, skipping those
+                # that cannot match
+                if collapse_threshold <= 0:
+                    neighbor_keys = neighbors_dictionary[key]
+                else:
+                    candidates = get_indexed_candidates(
+                        key=key,
+                        real_reactants=real_reactants,
+                        real_products=real_products,
+                        neighbor_index=neighbor_index,
+                        degree_dictionary=degree_dictionary,
+                        blocklist=blocklist,
+                        degree_threshold=degree_threshold)
+                    neighbor_keys = [
+                        n for n in neighbors_dictionary[key]
+                        if n in candidates]
             else:
-                for neighbor_key in reaction_dictionary.keys():
-                    if key != neighbor_key:
-                        input_neighbors, output_neighbors = check_neighbors(
-                            key=key,
-                            real_reactants=real_reactants,
-                            real_products=real_products,
-                            real_modifiers=real_modifiers,
-                            neighbor_key=neighbor_key,
-                            neighbor=reaction_dictionary[neighbor_key],
-                            degree_dictionary=degree_dictionary,
-                            input_neighbors=input_neighbors,
-                            output_neighbors=output_neighbors,
-                            blocklist=blocklist,
-                            collapse_threshold=collapse_threshold,
-                            degree_threshold=degree_threshold)
+                # Build the missing neighbor entry from the species index
+                neighbor_keys = find_neighbor_candidates(
+                    key=key,
+                    real_reactants=real_reactants,
+                    real_products=real_products,
+                    reaction_dictionary=reaction_dictionary,
+                    neighbor_index=neighbor_index,
+                    degree_dictionary=degree_dictionary,
+                    blocklist=blocklist,
+                    collapse_threshold=collapse_threshold,
+                    degree_threshold=degree_threshold)
+
+            for neighbor_key in neighbor_keys:
+                if key != neighbor_key:
+                    input_neighbors, output_neighbors = check_neighbors(
+                        key=key,
+                        real_reactants=real_reactants,
+                        real_products=real_products,
+                        real_modifiers=real_modifiers,
+                        neighbor_key=neighbor_key,
+                        neighbor=reaction_dictionary[neighbor_key],
+                        degree_dictionary=degree_dictionary,
+                        input_neighbors=input_neighbors,
+                        output_neighbors=output_neighbors,
+                        blocklist=blocklist,
+                        collapse_threshold=collapse_threshold,
+                        degree_threshold=degree_threshold,
+                        signature=signatures[key],
+                        neighbor_signature=signatures[neighbor_key])
 
             # Run one-sided bridging for reactions where inputs exist and
             # outputs have neighbors (could be with the neighbor's reactants
@@ -566,7 +731,9 @@ def collapse_nodes(
                         degree_dictionary=degree_dictionary,
                         collapse_with_modifiers=collapse_with_modifiers,
                         collapse_threshold=collapse_threshold,
-                        degree_threshold=degree_threshold)
+                        degree_threshold=degree_threshold,
+                        side1_signature=signatures[key]['hub_products'],
+                        side2_signature=signatures[o]['hub_reactants'])
                     if pass_match == True:
                         side_key = 'products'
                         if collapse_with_modifiers == True or collapse_with_modifiers == "True":
@@ -595,8 +762,8 @@ def collapse_nodes(
                     # reaction
                     if any([False if y is None else True for y in outputs]):
 
-                        if set([rxn, o]) not in collapsed_options:
-                            collapsed_options.append(set([rxn, o]))
+                        if frozenset([rxn, o]) not in collapsed_options:
+                            collapsed_options.add(frozenset([rxn, o]))
                             add = id + '_' + reaction_dictionary[o]['id']
                             changed_reactions[(rxn, o)] = add
                             removed_reaction.add(id)
@@ -656,7 +823,9 @@ def collapse_nodes(
                         degree_dictionary=degree_dictionary,
                         collapse_with_modifiers=collapse_with_modifiers,
                         collapse_threshold=collapse_threshold,
-                        degree_threshold=degree_threshold)
+                        degree_threshold=degree_threshold,
+                        side1_signature=signatures[key]['hub_reactants'],
+                        side2_signature=signatures[i]['hub_reactants'])
                     if pass_match == True:
                         side_key = 'products'
                         if collapse_with_modifiers == True or collapse_with_modifiers == "True":
@@ -685,8 +854,8 @@ def collapse_nodes(
                     # If a neighbor has output values, create compressed
                     if any([False if z is None else True for z in inputs]):
 
-                        if set([rxn, i]) not in collapsed_options:
-                            collapsed_options.append(set([rxn, i]))
+                        if frozenset([rxn, i]) not in collapsed_options:
+                            collapsed_options.add(frozenset([rxn, i]))
                             add = id + '_' + reaction_dictionary[i]['id']
                             changed_reactions[(rxn, i)] = add
                             removed_reaction.add(id)
@@ -739,11 +908,11 @@ def collapse_nodes(
             else:
                 # If both neighbors can connect, do so
                 if len(input_neighbors) != 0 and len(output_neighbors) != 0:
-                    # Cycle through all possible combinations of input and
-                    # output neighbors and get their components
+                    # Get the components of each input and output neighbor
+                    input_values = {}
                     for i in input_neighbors:
-                        for j in output_neighbors:
-                            eval_i = find_values(
+                        if i not in input_values:
+                            input_values[i] = find_values(
                                 graph=graph,
                                 reaction_dictionary=reaction_dictionary,
                                 neighbor=i,
@@ -751,8 +920,13 @@ def collapse_nodes(
                                 collapse_with_modifiers=collapse_with_modifiers,
                                 degree_dictionary=degree_dictionary,
                                 collapse_threshold=collapse_threshold,
-                                degree_threshold=degree_threshold)
-                            eval_j = find_values(
+                                degree_threshold=degree_threshold,
+                                current_signature=signatures[key]['hub_reactants'],
+                                neighbor_signature=signatures[i])
+                    output_values = {}
+                    for j in output_neighbors:
+                        if j not in output_values:
+                            output_values[j] = find_values(
                                 graph=graph,
                                 reaction_dictionary=reaction_dictionary,
                                 neighbor=j,
@@ -760,7 +934,16 @@ def collapse_nodes(
                                 collapse_with_modifiers=collapse_with_modifiers,
                                 degree_dictionary=degree_dictionary,
                                 collapse_threshold=collapse_threshold,
-                                degree_threshold=degree_threshold)
+                                degree_threshold=degree_threshold,
+                                current_signature=signatures[key]['hub_products'],
+                                neighbor_signature=signatures[j])
+
+                    # Cycle through all possible combinations of input and
+                    # output neighbors
+                    for i in input_neighbors:
+                        for j in output_neighbors:
+                            eval_i = input_values[i]
+                            eval_j = output_values[j]
 
                             # If both neighbor reactions have values and the
                             # the collapsed reaction is not already in the
@@ -768,9 +951,9 @@ def collapse_nodes(
                             # reaction
                             if len(eval_i) > 0 and len(eval_j) > 0 \
                                     and (
-                                    set([rxn, i, j]) not in collapsed_options):
+                                    frozenset([rxn, i, j]) not in collapsed_options):
 
-                                collapsed_options.append(set([rxn, i, j]))
+                                collapsed_options.add(frozenset([rxn, i, j]))
                                 add = i + '_' + rxn + '_' + j
                                 changed_reactions[(rxn, i, j)] = add
                                 removed_reaction.add(rxn)
@@ -31,7 +31,7 @@ from __future__ import print_function
 from networkx.readwrite import json_graph
 from collections import Counter
 from datetime import date
-from scipy.stats import gmean
+from scipy import sparse
 import networkx as nx
 import pandas as pd
 import numpy as np
@@ -66,18 +66,26 @@ if str(project_root.parent) not in sys.path:
 try:
     # First try normal package imports
     from metaboverse_cli.analyze.collapse import collapse_nodes, generate_updated_dictionary
-    from metaboverse_cli.analyze.mpl_colormaps import get_mpl_colormap
+    from metaboverse_cli.analyze.mpl_colormaps import get_mpl_colormap, get_mpl_colormap_table
     from metaboverse_cli.analyze.utils import convert_rgba, remove_defective_reactions
     from metaboverse_cli.utils import progress_feed, track_progress, get_metaboverse_cli_version
-    from metaboverse_cli.mapper.special_pairs import REDOX_PAIRS
+    from metaboverse_cli.mapper.special_pairs import REDOX_PAIRS, get_redox_index, normalize_string
+    from metaboverse_cli.analyze.synonym_cache import cached_file_checksum, get_synonym_cache_file, open_synonym_cache
+    from metaboverse_cli.mapper.mapper_store import MapperStore, MAPPER_STORE_FILE, \
+        is_store_current
+    from metaboverse_cli.profiler import profile_stage
 except ImportError:
     try:
         # Then try relative imports
         from analyze.collapse import collapse_nodes, generate_updated_dictionary
-        from analyze.mpl_colormaps import get_mpl_colormap
+        from analyze.mpl_colormaps import get_mpl_colormap, get_mpl_colormap_table
         from analyze.utils import convert_rgba, remove_defective_reactions
         from utils import progress_feed, track_progress, get_metaboverse_cli_version
-        from mapper.special_pairs import REDOX_PAIRS
+        from mapper.special_pairs import REDOX_PAIRS, get_redox_index, normalize_string
+        from analyze.synonym_cache import cached_file_checksum, get_synonym_cache_file, open_synonym_cache
+        from mapper.mapper_store import MapperStore, MAPPER_STORE_FILE, \
+            is_store_current
+        from profiler import profile_stage
     except ImportError:
         try:
             # Finally try direct imports
@@ -97,6 +105,7 @@ except ImportError:
 
             mpl_colormaps = load_module("mpl_colormaps", os.path.join(base_path, "analyze", "mpl_colormaps.py"))
             get_mpl_colormap = mpl_colormaps.get_mpl_colormap
+            get_mpl_colormap_table = mpl_colormaps.get_mpl_colormap_table
 
             utils_analyze = load_module("utils_analyze", os.path.join(base_path, "analyze", "utils.py"))
             convert_rgba = utils_analyze.convert_rgba
@@ -109,6 +118,21 @@ except ImportError:
             
             special_pairs = load_module("special_pairs", os.path.join(base_path, "mapper", "special_pairs.py"))
             REDOX_PAIRS = special_pairs.REDOX_PAIRS
+            get_redox_index = special_pairs.get_redox_index
+            normalize_string = special_pairs.normalize_string
+
+            synonym_cache_module = load_module("synonym_cache", os.path.join(base_path, "analyze", "synonym_cache.py"))
+            cached_file_checksum = synonym_cache_module.cached_file_checksum
+            get_synonym_cache_file = synonym_cache_module.get_synonym_cache_file
+            open_synonym_cache = synonym_cache_module.open_synonym_cache
+
+            mapper_store = load_module("mapper_store", os.path.join(base_path, "mapper", "mapper_store.py"))
+            MapperStore = mapper_store.MapperStore
+            MAPPER_STORE_FILE = mapper_store.MAPPER_STORE_FILE
+            is_store_current = mapper_store.is_store_current
+
+            profiler = load_module("profiler", os.path.join(base_path, "profiler.py"))
+            profile_stage = profiler.profile_stage
         except ImportError as e:
             print(f"Error importing dependencies: {e}")
             print(f"Current sys.path: {sys.path}")
@@ -117,16 +141,11 @@ except ImportError:
             raise
 
 CMAP = get_mpl_colormap('seismic')
+CMAP_TABLE = get_mpl_colormap_table('seismic')
 REACTION_COLOR = (0.75, 0.75, 0.75, 1)
 MISSING_COLOR = (1, 1, 1, 1)
 
 
-def median(lst):
-    n = len(lst)
-    s = sorted(lst)
-    return (sum(s[n//2-1:n//2+1])/2.0, s[n//2])[n % 2] if n else None
-
-
 def name_graph(
         output_file,
         species_id,
@@ -146,6 +165,58 @@ def name_graph(
     return graph_name
 
 
+class GraphRecords():
+    """Accumulate node and edge attributes for a graph before it is built
+
+    Supports the subset of the networkx.DiGraph API used while processing
+    reactions, so that attributes are collected in plain dictionaries and
+    committed to the graph in bulk. Insertion order and attribute overwrite
+    behavior match adding the same nodes and edges to a DiGraph directly.
+    """
+
+    def __init__(self):
+        self._nodes = {}
+        self._edges = {}
+
+    def add_node(self, node_for_adding, **attrs):
+        self._nodes.setdefault(node_for_adding, {}).update(attrs)
+
+    def add_edge(self, u_of_edge, v_of_edge, **attrs):
+        self._nodes.setdefault(u_of_edge, {})
+        self._nodes.setdefault(v_of_edge, {})
+        self._edges.setdefault((u_of_edge, v_of_edge), {}).update(attrs)
+
+    def nodes(self):
+        return self._nodes
+
+    def edges(self):
+        return self._edges
+
+    def commit(self, graph):
+        """Add all collected nodes and edges to graph
+        """
+
+        graph.add_nodes_from(self._nodes.items())
+        graph.add_edges_from(
+            (source, target, attrs)
+            for (source, target), attrs in self._edges.items())
+
+        return graph
+
+
+def make_bidirectional(
+        reference):
+    """Return a copy of reference with each value also mapped back to its key
+    """
+
+    bidirectional = {}
+    for k, v in reference.items():
+        bidirectional[k] = v
+        bidirectional[v] = k
+
+    return bidirectional
+
+
 def build_graph(
         args_dict,
         network,
@@ -164,10 +235,16 @@ def build_graph(
     - Add nodes and edges
     - Map names to objects in the graph for display
     - Calculate degree for each node
+
+    Node and edge attributes are first collected for all reactions, then
+    added to the graph in a single pass.
     """
 
-    # Initialize graph object
-    G = nx.DiGraph()
+    # Build lookup tables once for all reactions
+    prot_ref = make_bidirectional(uniprot_reference)
+    flipped_ensembl = make_bidirectional(gene_reference)
+
+    records = GraphRecords()
     key_hash = set()
     remove_keys = []
 
@@ -175,8 +252,8 @@ def build_graph(
     reaction_number = len(list(network.keys()))
     for reactome_id in network.keys():
         counter = track_progress(args_dict, counter, reaction_number, 5)
-        G, network, key_hash, remove_keys = process_reactions(
-            graph=G,
+        records, network, key_hash, remove_keys = process_reactions(
+            graph=records,
             reactome_id=reactome_id,
             network=network,
             species_reference=species_reference,
@@ -190,7 +267,13 @@ def build_graph(
             compartment_reference=compartment_reference,
             component_database=component_database,
             key_hash=key_hash,
-            remove_keys=remove_keys)
+            remove_keys=remove_keys,
+            prot_ref=prot_ref,
+            flipped_ensembl=flipped_ensembl)
+
+    # Initialize graph object
+    G = nx.DiGraph()
+    G = records.commit(G)
 
     # Clean up duplicate reactions by ID
     for k in remove_keys:
@@ -222,8 +305,13 @@ def process_reactions(
         compartment_reference,
         component_database,
         key_hash,
-        remove_keys):
-    """
+        remove_keys,
+        prot_ref=None,
+        flipped_ensembl=None):
+    """Add a reaction and its components to the graph
+
+    prot_ref and flipped_ensembl are the bidirectional forms of
+    uniprot_reference and gene_reference; they are built here if not provided.
     """
     new_components = []
 
@@ -250,28 +338,25 @@ def process_reactions(
             # for non-Reactome models where reactions do not have a compartment annotation
             compartment_name = ''
 
-        prot_ref = {}
-        for k, v in uniprot_reference.items():
-            prot_ref[k] = v
-            prot_ref[v] = k
+        if prot_ref == None:
+            prot_ref = make_bidirectional(uniprot_reference)
         uniprot_reference = prot_ref
 
-        flipped_ensembl = {}
-        for k, v in gene_reference.items():
-            flipped_ensembl[k] = v
-            flipped_ensembl[v] = k
+        if flipped_ensembl == None:
+            flipped_ensembl = make_bidirectional(gene_reference)
 
         # Add reaction node
-        graph.add_node(reaction_id)
-        graph.nodes()[reaction_id]['id'] = reactome_id
-        graph.nodes()[reaction_id]['map_id'] = 'none'
-        graph.nodes()[reaction_id]['name'] = reaction_name
-        graph.nodes()[reaction_id]['reversible'] = reaction_rev
-        graph.nodes()[reaction_id]['notes'] = reaction_notes
-        graph.nodes()[reaction_id]['type'] = 'reaction'
-        graph.nodes()[reaction_id]['sub_type'] = 'reaction'
-        graph.nodes()[reaction_id]['compartment'] = compartment_id
-        graph.nodes()[reaction_id]['compartment_display'] = compartment_name
+        graph.add_node(
+            reaction_id,
+            id=reactome_id,
+            map_id='none',
+            name=reaction_name,
+            reversible=reaction_rev,
+            notes=reaction_notes,
+            type='reaction',
+            sub_type='reaction',
+            compartment=compartment_id,
+            compartment_display=compartment_name)
 
         # Add vanilla element nodes and their edges
         for reactant in reactants:
@@ -506,50 +591,41 @@ def add_node_edge(
     """Add node and edge information to graph
     """
 
-    graph.add_node(id)
-    graph.nodes()[id]['id'] = id
-    graph.nodes()[id]['map_id'] = map_id
-    graph.nodes()[id]['name'] = name
-    graph.nodes()[id]['type'] = type
-    graph.nodes()[id]['sub_type'] = sub_type
-    graph.nodes()[id]['inferred'] = 'false'
     try:
-        graph.nodes()[id]['compartment'] = compartment
-        graph.nodes()[
-            id]['compartment_display'] = compartment_reference[compartment]
+        compartment_display = compartment_reference[compartment]
     except:
-        graph.nodes()[id]['compartment'] = 'none'
-        graph.nodes()[id]['compartment_display'] = 'none'
+        compartment = compartment_display = 'none'
+
+    graph.add_node(
+        id,
+        id=id,
+        map_id=map_id,
+        name=name,
+        type=type,
+        sub_type=sub_type,
+        inferred='false',
+        compartment=compartment,
+        compartment_display=compartment_display)
 
     if type == 'reactant':
-        graph.add_edges_from([
-            (id, reaction_membership)])
-        graph.edges()[(id, reaction_membership)]['type'] = type
-        graph.edges()[(id, reaction_membership)]['sub_type'] = sub_type
+        graph.add_edge(
+            id, reaction_membership, type=type, sub_type=sub_type)
 
         if reversible == 'true':
-            graph.add_edges_from([
-                (reaction_membership, id)])
-            graph.edges()[(reaction_membership, id)]['type'] = type
-            graph.edges()[(reaction_membership, id)]['sub_type'] = sub_type
+            graph.add_edge(
+                reaction_membership, id, type=type, sub_type=sub_type)
 
     elif type == 'product':
-        graph.add_edges_from([
-            (reaction_membership, id)])
-        graph.edges()[(reaction_membership, id)]['type'] = type
-        graph.edges()[(reaction_membership, id)]['sub_type'] = sub_type
+        graph.add_edge(
+            reaction_membership, id, type=type, sub_type=sub_type)
 
         if reversible == 'true':
-            graph.add_edges_from([
-                (id, reaction_membership)])
-            graph.edges()[(id, reaction_membership)]['type'] = type
-            graph.edges()[(id, reaction_membership)]['sub_type'] = sub_type
+            graph.add_edge(
+                id, reaction_membership, type=type, sub_type=sub_type)
 
     else:
-        graph.add_edges_from([
-            (id, reaction_membership)])
-        graph.edges()[(id, reaction_membership)]['type'] = type
-        graph.edges()[(id, reaction_membership)]['sub_type'] = sub_type
+        graph.add_edge(
+            id, reaction_membership, type=type, sub_type=sub_type)
 
     return graph
 
@@ -732,35 +808,6 @@ def reindex_data(
     return data_renamed, stats_renamed
 
 
-def normalize_string(s):
-    """Normalize a string for consistent matching:
-    - Convert to lowercase
-    - Remove whitespace
-    - Remove common punctuation
-    
-    Args:
-        s (str): String to normalize
-        
-    Returns:
-        str: Normalized string
-    """
-    if not s:
-        return ""
-    
-    s = str(s)
-    s = s.lower() 
-    s = s.replace(" ", "") 
-    
-    # Keep only alphanumeric characters
-    s = ''.join(c for c in s if c.isalnum())
-    
-    # Remove common punctuation that might vary between representations
-    for char in ['-', '_', ',', '.', '(', ')', '[', ']', '{', '}', ':', ';', '\'', '=', '"', '`']:
-        s = s.replace(char, "")
-        
-    return s
-
-
 def get_redox_state(name, synonyms):
     """Determine the redox state of a metabolite based on its name or synonyms
     
@@ -771,74 +818,8 @@ def get_redox_state(name, synonyms):
     Returns:
         tuple: (redox_pair, redox_state) or (None, None) if not part of a redox pair
     """
-    name_normalized = normalize_string(name)
-    
-    # Create multiple normalized forms for lookup
-    redox_lookup = {}
-    
-    # Track base forms for ambiguous cases (like "nad" without "+" or "h")
-    base_forms = {}
-    
-    for pair_name, forms in REDOX_PAIRS.items():
-        # Process oxidized forms
-        for term in forms['oxidized']:
-            # Standard normalized form
-            key = normalize_string(term)
-            redox_lookup[key] = (pair_name, 'oxidized')
-            
-            # Special case for NAD+, NADP+, etc. - try without the +
-            if '+' in term:
-                key_without_plus = normalize_string(term).replace('+', '')
-                redox_lookup[key_without_plus] = (pair_name, 'oxidized')
-                
-                # Store base form for ambiguous matching later
-                base_form = key_without_plus
-                if base_form not in base_forms:
-                    base_forms[base_form] = (pair_name, 'oxidized')  # Default to oxidized for ambiguous cases
-                
-                # Also handle potential space before the + (e.g., "NAD +")
-                key_with_space = normalize_string(term).replace('+', ' +')
-                redox_lookup[key_with_space] = (pair_name, 'oxidized')
-        
-        # Process reduced forms
-        for term in forms['reduced']:
-            # Standard normalized form
-            key = normalize_string(term)
-            redox_lookup[key] = (pair_name, 'reduced')
-            
-            # Special case for NADH, NADPH, etc. - try without the H
-            if term.lower().endswith('h'):
-                key_without_h = normalize_string(term)[:-1]
-                # Don't override oxidized form default for base forms
-                if key_without_h not in redox_lookup:
-                    redox_lookup[key_without_h] = (pair_name, 'reduced')
-                
-                # Store base form (but don't override existing)
-                base_form = key_without_h
-                if base_form not in base_forms:
-                    base_forms[base_form] = (pair_name, 'reduced')
-                
-                # Also handle potential space before the H (e.g., "NAD H")
-                key_with_space = normalize_string(term)[:-1] + ' H'
-                redox_lookup[key_with_space] = (pair_name, 'reduced')
-    
-    # Add default mappings for base forms (prefer oxidized state for ambiguous cases)
-    for base_form, (pair, state) in base_forms.items():
-        if base_form not in redox_lookup:
-            redox_lookup[base_form] = (pair, state)
-    
-    # Check if normalized name matches any normalized redox pair term
-    if name_normalized in redox_lookup:
-        return redox_lookup[name_normalized]
-    
-    # Check all normalized synonyms
-    for syn in synonyms:
-        syn_normalized = normalize_string(syn)
-        if syn_normalized in redox_lookup:
-            return redox_lookup[syn_normalized]
-            
-    # Not part of any redox pair that we could detect
-    return None, None
+
+    return get_redox_index().classify(name, synonyms)
 
 
 def gather_synonyms(
@@ -915,23 +896,20 @@ def gather_synonyms(
 
     # Filter synonyms based on redox state
     if REDOX_PAIRS:
-        # First determine the intended redox state from the primary name
-        primary_name = parsed_syns_list[0] if parsed_syns_list else None
-        primary_redox_pair, primary_redox_state = get_redox_state(primary_name, [])
-        
-        # If we couldn't determine from primary name, try all synonyms
-        if not primary_redox_pair:
-            for syn in parsed_syns_list:
-                pair, state = get_redox_state(syn, [])
-                if pair:
-                    primary_redox_pair, primary_redox_state = pair, state
-                    break
+        redox_states = get_redox_index().classify_many(parsed_syns_list)
+
+        # First determine the intended redox state from the primary name,
+        # or if we couldn't determine from primary name, try all synonyms
+        primary_redox_pair, primary_redox_state = None, None
+        for pair, state in redox_states:
+            if pair:
+                primary_redox_pair, primary_redox_state = pair, state
+                break
         
         # If we found a redox pair, filter out synonyms of the opposite state
         if primary_redox_pair and primary_redox_state:
             filtered_syns = []
-            for syn in parsed_syns_list:
-                syn_pair, syn_state = get_redox_state(syn, [])
+            for syn, (syn_pair, syn_state) in zip(parsed_syns_list, redox_states):
                 
                 # Keep if:
                 # 1. Not part of a redox pair
@@ -945,6 +923,48 @@ def gather_synonyms(
     return mapper_id, parsed_syns_list
 
 
+def cached_gather_synonyms(
+        synonym_cache,
+        map_id,
+        init_syns,
+        metabolite_mapper,
+        uniprot_mapper,
+        ignore_enantiomers):
+    """Run gather_synonyms(), consulting the synonym cache first if provided
+    """
+
+    if synonym_cache == None:
+        return gather_synonyms(
+            map_id,
+            init_syns,
+            metabolite_mapper,
+            uniprot_mapper,
+            ignore_enantiomers)
+
+    uniprot_name = uniprot_mapper.get(map_id)
+    key = synonym_cache.make_key(
+        map_id, init_syns, uniprot_name, ignore_enantiomers)
+    cached = synonym_cache.get(key)
+    if cached == None:
+        mapper_id, parsed_syns_list = gather_synonyms(
+            map_id,
+            init_syns,
+            metabolite_mapper,
+            uniprot_mapper,
+            ignore_enantiomers)
+        synonym_cache.set(key, mapper_id, parsed_syns_list)
+        return mapper_id, parsed_syns_list
+
+    # Callers see init_syns extended the same way gather_synonyms() does
+    if map_id in uniprot_mapper:
+        init_syns.append(uniprot_name)
+        init_syns.append(uniprot_name.lower())
+        init_syns.append(''.join(
+            c.lower() for c in str(uniprot_name) if c.isalnum()))
+
+    return cached
+
+
 def prepare_mapping_data(graph, data, stats):
     """
     """
@@ -963,12 +983,10 @@ def prepare_mapping_data(graph, data, stats):
         stats_logged = -1 * np.log10(stats_renamed + 1e-100)
         stats_max = abs(stats_logged).max().max()
 
-    # Make data dict with values and whether or not used
-    temp_idx = [
-        ''.join(
-            c.lower() for c in str(i) if c.isalnum())
-        for i in data_renamed.index.tolist()]
-    temp_idx_set = set(temp_idx)
+    # Index user identifiers once for all nodes
+    mapping_index = build_mapping_index(
+        data=data_renamed,
+        stats=stats_renamed)
 
     # Get cross-species CHEBI synonyms
     chebi_mapping = {}
@@ -983,7 +1001,80 @@ def prepare_mapping_data(graph, data, stats):
                 chebi_mapping[name].add(map_id)
 
     return data_renamed, stats_renamed, data_max, stats_max, n, \
-        temp_idx, temp_idx_set, chebi_mapping
+        mapping_index, chebi_mapping
+
+
+def build_mapping_index(
+        data,
+        stats):
+    """Build lookup tables from user identifiers to data and stats rows
+    - positions: row label -> row position for data and stats
+    - normalized: alphanumeric lowercase label -> first data row label with
+    that form
+    - values: row arrays, so a node's values are pulled by position
+    """
+
+    data_positions = {}
+    normalized = {}
+    for position, label in enumerate(data.index.tolist()):
+        data_positions[label] = position
+        normalized.setdefault(
+            ''.join(c.lower() for c in str(label) if c.isalnum()),
+            label)
+
+    stats_positions = {
+        label: position
+        for position, label in enumerate(stats.index.tolist())}
+
+    return {
+        'data_positions': data_positions,
+        'stats_positions': stats_positions,
+        'normalized': normalized,
+        'data_values': data.to_numpy(),
+        'stats_values': stats.to_numpy()}
+
+
+def find_mapped_label(
+        synonym,
+        mapping_index,
+        ignore_enantiomers=True):
+    """Find the data row label for a metabolite synonym
+    - First by alphanumeric lowercase form
+    - Then, if ignoring enantiomers, by D-/L-/N- prefixed forms, where the
+    last matching prefix in that order is used
+    """
+
+    _a = ''.join(c.lower() for c in synonym if c.isalnum())
+    if _a in mapping_index['normalized']:
+        return mapping_index['normalized'][_a]
+
+    label = None
+    if ignore_enantiomers == True:
+        for prefix in ['D-', 'd-', 'L-', 'l-', 'N-', 'n-']:
+            if prefix + str(synonym) in mapping_index['data_positions']:
+                label = prefix + str(synonym)
+
+    return label
+
+
+def set_mapped_values(
+        node,
+        label,
+        mapping_index,
+        colored_nodes):
+    """Attach the data and stats row for label to a node
+    - Colors are filled in later for all of colored_nodes by color_nodes()
+    """
+
+    data_position = mapping_index['data_positions'][label]
+    stats_position = mapping_index['stats_positions'][label]
+
+    node['user_label'] = label
+    node['values'] = mapping_index['data_values'][data_position].tolist()
+    node['values_rgba'] = None
+    node['values_js'] = None
+    node['stats'] = mapping_index['stats_values'][stats_position].tolist()
+    colored_nodes.append(node)
 
 
 def map_attributes(
@@ -997,7 +1088,8 @@ def map_attributes(
         chebi_synonyms,
         uniprot_mapper,
         metabolite_mapper,
-        ignore_enantiomers=True):
+        ignore_enantiomers=True,
+        synonym_cache=None):
     """Data overlay
     - Map repo id to species_id
     - If a node is a complex, take average of neighbors that are not
@@ -1009,13 +1101,14 @@ def map_attributes(
     print("Mapping data onto network...")
     print("Input data dimensions: " + str(data.shape))
     data_renamed, stats_renamed, data_max, stats_max, n, \
-    temp_idx, temp_idx_set, chebi_mapping = prepare_mapping_data(
+    mapping_index, chebi_mapping = prepare_mapping_data(
         graph=graph,
         data=data,
         stats=stats)
     print("Pre-processed data dimensions: " + str(data_renamed.shape))
     
     mapped_nodes = []
+    colored_nodes = []
 
     counter = 0
     node_number = len(list(graph.nodes()))
@@ -1056,13 +1149,13 @@ def map_attributes(
                 graph.nodes()[x]['synonyms'].append(s)
 
             # Step 2: Get initial CHEBI synonyms
-            _mapper, _synonyms = gather_synonyms(
+            _mapper, _synonyms = cached_gather_synonyms(
+                synonym_cache,
                 map_id,
                 init_syns,
                 metabolite_mapper,
                 uniprot_mapper,
-                ignore_enantiomers            
-                )
+                ignore_enantiomers)
 
             if len(_synonyms) > 0:
                 for _s in _synonyms:
@@ -1080,36 +1173,28 @@ def map_attributes(
                 rgba_tuples=colors)
             graph.nodes()[x]['stats'] = [None for x in range(n)]
 
-        elif map_id in set(data_renamed.index.tolist()) \
-        and map_id in set(stats_renamed.index.tolist()) \
+        elif map_id in mapping_index['data_positions'] \
+        and map_id in mapping_index['stats_positions'] \
         and map_id != 'none' \
         and len(map_id) > 1 \
         and graph.nodes()[x]['type'] != 'metabolite_component':
-            graph.nodes()[x]['user_label'] = map_id
-            graph.nodes()[x]['values'] = data_renamed.loc[map_id].tolist()
-            graph.nodes()[x]['values_rgba'] = extract_value(
-                value_array=data_renamed.loc[map_id].tolist(),
-                max_value=data_max)
-            graph.nodes()[x]['values_js'] = convert_rgba(
-                rgba_tuples=graph.nodes()[x]['values_rgba'])
-            graph.nodes()[x]['stats'] = stats_renamed.loc[map_id].tolist()
+            set_mapped_values(
+                node=graph.nodes()[x],
+                label=map_id,
+                mapping_index=mapping_index,
+                colored_nodes=colored_nodes)
             mapped_nodes.append(map_id)
 
-        elif backup_mapper in set(data_renamed.index.tolist()) \
-        and backup_mapper in set(stats_renamed.index.tolist()) \
+        elif backup_mapper in mapping_index['data_positions'] \
+        and backup_mapper in mapping_index['stats_positions'] \
         and backup_mapper != 'none' \
         and len(backup_mapper) > 1 \
         and graph.nodes()[x]['type'] != 'metabolite_component':
-            graph.nodes()[x]['user_label'] = backup_mapper
-            graph.nodes()[
-                x]['values'] = data_renamed.loc[backup_mapper].tolist()
-            graph.nodes()[x]['values_rgba'] = extract_value(
-                value_array=data_renamed.loc[backup_mapper].tolist(),
-                max_value=data_max)
-            graph.nodes()[x]['values_js'] = convert_rgba(
-                rgba_tuples=graph.nodes()[x]['values_rgba'])
-            graph.nodes()[
-                x]['stats'] = stats_renamed.loc[backup_mapper].tolist()
+            set_mapped_values(
+                node=graph.nodes()[x],
+                label=backup_mapper,
+                mapping_index=mapping_index,
+                colored_nodes=colored_nodes)
             mapped_nodes.append(backup_mapper)
 
         # elif map_id in chebi_synonyms
@@ -1120,50 +1205,32 @@ def map_attributes(
             if graph.nodes()[x]['name'] in chebi_mapping:
                 all_synonyms.extend(chebi_mapping[graph.nodes()[x]['name']])
 
+            # The last synonym with a match is used
             for a in all_synonyms:
-                _a = ''.join(c.lower() for c in a if c.isalnum())
-                if _a in temp_idx_set:
-                    _idx = data_renamed.index.tolist()[
-                        temp_idx.index(_a)]
-                elif ignore_enantiomers == True:
-                    if 'D-' + str(a) in data_renamed.index.tolist():
-                        _idx = 'D-' + str(a)
-                    if 'd-' + str(a) in data_renamed.index.tolist():
-                        _idx = 'd-' + str(a)
-                    if 'L-' + str(a) in data_renamed.index.tolist():
-                        _idx = 'L-' + str(a)
-                    if 'l-' + str(a) in data_renamed.index.tolist():
-                        _idx = 'l-' + str(a)
-                    if 'N-' + str(a) in data_renamed.index.tolist():
-                        _idx = 'N-' + str(a)
-                    if 'n-' + str(a) in data_renamed.index.tolist():
-                        _idx = 'n-' + str(a)
-                else:
-                    pass
+                _label = find_mapped_label(
+                    synonym=a,
+                    mapping_index=mapping_index,
+                    ignore_enantiomers=ignore_enantiomers)
+                if _label != None:
+                    _idx = _label
 
             if _idx != None \
             and len(_idx) > 1:
-                graph.nodes()[x]['user_label'] = _idx
-                graph.nodes()[x]['values'] = data_renamed.loc[_idx].tolist()
-                graph.nodes()[x]['values_rgba'] = extract_value(
-                    value_array=data_renamed.loc[_idx].tolist(),
-                    max_value=data_max)
-                graph.nodes()[x]['values_js'] = convert_rgba(
-                    rgba_tuples=graph.nodes()[x]['values_rgba'])
-                graph.nodes()[x]['stats'] = stats_renamed.loc[_idx].tolist()
+                set_mapped_values(
+                    node=graph.nodes()[x],
+                    label=_idx,
+                    mapping_index=mapping_index,
+                    colored_nodes=colored_nodes)
                 mapped_nodes.append(_idx)
-            elif map_id in set(data_renamed.index.tolist()) \
-            and map_id in set(stats_renamed.index.tolist()) \
+            elif map_id in mapping_index['data_positions'] \
+            and map_id in mapping_index['stats_positions'] \
             and map_id != 'none' \
             and len(map_id) > 1:
-                graph.nodes()[x]['user_label'] = map_id
-                graph.nodes()[x]['values'] = data_renamed.loc[map_id].tolist()
-                graph.nodes()[x]['values_rgba'] = extract_value(
-                    value_array=data_renamed.loc[map_id].tolist(),
-                    max_value=data_max)
-                graph.nodes()[x]['values_js'] = convert_rgba(
-                    rgba_tuples=graph.nodes()[x]['values_rgba'])
-                graph.nodes()[x]['stats'] = stats_renamed.loc[map_id].tolist()
+                set_mapped_values(
+                    node=graph.nodes()[x],
+                    label=map_id,
+                    mapping_index=mapping_index,
+                    colored_nodes=colored_nodes)
                 mapped_nodes.append(map_id)
             else:
                 colors = [MISSING_COLOR for x in range(n)]
@@ -1181,7 +1248,12 @@ def map_attributes(
                 rgba_tuples=colors)
             graph.nodes()[x]['stats'] = [None for x in range(n)]
 
-    non_mappers = [x for x in data.index.tolist() if x not in mapped_nodes]
+    color_nodes(
+        nodes=colored_nodes,
+        max_value=data_max)
+
+    mapped_set = set(mapped_nodes)
+    non_mappers = [x for x in data.index.tolist() if x not in mapped_set]
 
     return graph, data_max, stats_max, non_mappers
 
@@ -1193,19 +1265,92 @@ def extract_value(
     """Extract expression value
     """
 
-    def get_key_value(d, key):
-        if key in d:
-            return d[key]
-        else:
-            return d[max([x for x in d.keys() if x < key])]
+    values_rgba, values_js = color_values(
+        value_array=value_array,
+        max_value=max_value)
+
+    return values_rgba
+
+
+def extract_values(
+        value_matrix,
+        max_value,
+        N=255):
+    """Color a (nodes x samples) matrix of values in one pass
+    - Returns RGBA and web-friendly (0-255) RGBA arrays of shape
+    (nodes, samples, 4)
+    - Positions are rounded to the colormap table resolution as in
+    round(position, 3)
+    - Missing values (None or NaN) are colored with MISSING_COLOR
+    """
 
-    rgba = []
-    for x in value_array:
-        position = (x + max_value) / (2 * max_value)
-        rgba_tuple = get_key_value(CMAP, round(position, 3))
-        rgba.append(tuple(rgba_tuple))
+    resolution = len(CMAP_TABLE) - 1
+    values = np.array(value_matrix, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        position = (values + max_value) / (2 * max_value)
+    scaled = position * resolution
+    keys = np.rint(scaled)
 
-    return rgba
+    # Products that land on a half step may round differently than the
+    # decimal position itself, so round those as Python does
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for idx in zip(*np.nonzero(near_half)):
+        keys[idx] = round(round(float(position[idx]), 3) * resolution)
+
+    missing = np.isnan(keys)
+    keys = np.clip(np.nan_to_num(keys), 0, resolution).astype(int)
+
+    rgba = CMAP_TABLE[keys]
+    rgba[missing] = MISSING_COLOR
+    rgba_js = rgba.copy()
+    rgba_js[..., :3] = np.floor(rgba[..., :3] * N)
+
+    return rgba, rgba_js
+
+
+def rgba_to_lists(
+        rgba,
+        rgba_js):
+    """Convert one row of extract_values() output to values_rgba and
+    values_js tuple lists
+    """
+
+    values_rgba = [tuple(x) for x in rgba.tolist()]
+    values_js = [
+        (int(r), int(g), int(b), a) for r, g, b, a in rgba_js.tolist()]
+
+    return values_rgba, values_js
+
+
+def color_values(
+        value_array,
+        max_value):
+    """Get values_rgba and values_js for a single node's values
+    """
+
+    rgba, rgba_js = extract_values(
+        value_matrix=[value_array],
+        max_value=max_value)
+
+    return rgba_to_lists(rgba[0], rgba_js[0])
+
+
+def color_nodes(
+        nodes,
+        max_value):
+    """Set values_rgba and values_js for a list of nodes in one batch
+    """
+
+    if len(nodes) == 0:
+        return
+
+    rgba, rgba_js = extract_values(
+        value_matrix=[node['values'] for node in nodes],
+        max_value=max_value)
+
+    for i, node in enumerate(nodes):
+        node['values_rgba'], node['values_js'] = rgba_to_lists(
+            rgba[i], rgba_js[i])
 
 
 def output_graph(
@@ -1283,62 +1428,236 @@ def compile_node_degrees(
     return d
 
 
-def remove_nulls(values):
+def build_broadcast_index(
+        graph):
+    """Build a sparse, undirected node adjacency matrix for broadcasting
+    """
 
-    if all(None in v for v in values) == True:
-        return []
+    nodes = list(graph.nodes())
+    node_index = {x: i for i, x in enumerate(nodes)}
+    n = len(nodes)
 
-    else:
-        for v in values:
-            if None in v:
-                values.remove(v)
+    edges = list(graph.edges())
+    u = np.fromiter(
+        (node_index[e[0]] for e in edges), dtype=np.int64, count=len(edges))
+    v = np.fromiter(
+        (node_index[e[1]] for e in edges), dtype=np.int64, count=len(edges))
 
-        return values
+    adjacency = sparse.coo_matrix(
+        (np.ones(2 * len(edges), dtype=np.int8),
+         (np.concatenate((u, v)), np.concatenate((v, u)))),
+        shape=(n, n)).tocsr()
+    adjacency.sum_duplicates()
+    adjacency.data[:] = 1
 
+    return nodes, adjacency
 
-def infer_protein_values(values, length):
 
-    protein_vals = []
-    for i in range(length):
+def group_source_rows(
+        indptr,
+        indices,
+        source_array):
+    """Stack the source rows of each target, bucketed by source count
+    - Yields target positions and an array of (targets, samples, sources)
+    """
 
-        pos = []
+    counts = np.diff(indptr)
+    for k in np.unique(counts[counts > 0]):
+        members = np.flatnonzero(counts == k)
+        take = indices[indptr[members][:, None] + np.arange(k)]
+        yield members, np.ascontiguousarray(
+            source_array[take].transpose(0, 2, 1))
 
-        for j in range(len(values)):
 
-            if values[j][i] != None:
-                pos.append(values[j][i])
+def infer_group_values(
+        indptr,
+        indices,
+        source_array):
+    """Per-sample, NaN-aware median of each target's source values
+    """
 
-        protein_vals.append(median(pos))
+    inferred = np.full((len(indptr) - 1, source_array.shape[1]), np.nan)
+    for members, block in group_source_rows(indptr, indices, source_array):
+        block = np.sort(block, axis=2)  # NaN sorts last
+        count = (~np.isnan(block)).sum(axis=2, keepdims=True)
+        lower = np.take_along_axis(
+            block, np.maximum(count - 1, 0) // 2, axis=2)[..., 0]
+        upper = np.take_along_axis(block, count // 2, axis=2)[..., 0]
+        inferred[members] = np.where(
+            count[..., 0] > 0, (lower + upper) / 2.0, np.nan)
+
+    return inferred
+
+
+def infer_group_stats(
+        indptr,
+        indices,
+        source_array):
+    """Per-sample, NaN-aware geometric mean of each target's source stats
+    - A single available stat is used as is
+    - Stats are scaled by e and capped at 1.0
+    """
 
-    return protein_vals
+    inferred = np.full((len(indptr) - 1, source_array.shape[1]), np.nan)
+    with np.errstate(all='ignore'):
+        for members, block in group_source_rows(
+                indptr, indices, source_array):
+            present = ~np.isnan(block)
+            count = present.sum(axis=2)
+            logs = np.log(np.where(present, block, 1.0))
+            means = math.e * np.exp(logs.sum(axis=2) / count)
+            single = np.where(present, block, 0.0).sum(axis=2)
+            inferred[members] = np.where(count == 1, single, means)
 
+    inferred[inferred > 1.0] = 1.0
 
-def infer_protein_stats(stats, length, stat_type="float"):
+    return inferred
 
-    # Do not infer confidence intervals
-    if stat_type == "array":
-        protein_stats = [None for x in range(length)]
-    else:
-        protein_stats = []
-        for i in range(length):
 
-            pos = []
+def get_source_array(
+        rows,
+        length,
+        numeric=True):
+    """Stack node rows into a float array, flagging rows missing a value
+    - Non-numeric rows (confidence intervals) are only flagged
+    """
 
-            for j in range(len(stats)):
+    valid = np.fromiter(
+        (None not in r for r in rows), dtype=bool, count=len(rows))
+    source_array = np.full((len(rows), length), np.nan)
+    positions = np.flatnonzero(valid)
+    if numeric == True and len(positions) > 0:
+        source_array[positions] = np.array(
+            [rows[i] for i in positions], dtype=float).reshape(
+                len(positions), length)
 
-                if stats[j][i] != None:
-                    pos.append(stats[j][i])
+    return source_array, valid
 
-            if len(pos) == 1:
-                this_stat = pos[0]
-            else:
-                this_stat = (math.e * gmean(pos))
 
-            if this_stat > 1.0:
-                this_stat = 1.0
-            protein_stats.append(this_stat)
+def broadcast_pass(
+        node_data,
+        adjacency,
+        targets,
+        sources,
+        length,
+        max_value,
+        stat_type="float"):
+    """Infer target values and stats from their source neighbors
+    - Sources with a missing value (or stat) are ignored
+    - Targets that are also sources (nested complexes) see the updated
+      values of targets earlier in node order and the original values of
+      later ones, as when each target is updated in place in turn
+    """
 
-    return protein_stats
+    target_positions = np.flatnonzero(targets)
+    source_positions = np.flatnonzero(sources)
+    if len(target_positions) == 0 or len(source_positions) == 0:
+        return
+
+    # Columns are source nodes, then the updated copies of source nodes
+    # that are themselves targets
+    source_index = np.full(len(node_data), -1, dtype=np.int64)
+    source_index[source_positions] = np.arange(len(source_positions))
+    nested_positions = np.flatnonzero(sources & targets)
+    nested_index = np.full(len(node_data), -1, dtype=np.int64)
+    nested_index[nested_positions] = len(source_positions) \
+        + np.arange(len(nested_positions))
+    target_index = np.full(len(node_data), -1, dtype=np.int64)
+    target_index[target_positions] = np.arange(len(target_positions))
+
+    links = adjacency[target_positions][:, source_positions].tocsr()
+    links.sort_indices()
+    columns = source_positions[links.indices]
+    rows = np.repeat(np.arange(len(target_positions)), np.diff(links.indptr))
+    updated = (nested_index[columns] >= 0) \
+        & (columns < target_positions[rows])
+    links = sparse.csr_matrix(
+        (np.ones(len(columns), dtype=np.int8),
+         np.where(updated, nested_index[columns], source_index[columns]),
+         links.indptr),
+        shape=(
+            len(target_positions),
+            len(source_positions) + len(nested_positions)))
+
+    # Targets are resolved by depth, after the earlier targets they read
+    level = np.zeros(len(target_positions), dtype=np.int64)
+    for j, x in zip(rows[updated], columns[updated]):
+        level[j] = max(level[j], level[target_index[x]] + 1)
+
+    value_array, value_valid = get_source_array(
+        [node_data[x]['values'] for x in source_positions], length)
+    stat_array, stat_valid = get_source_array(
+        [node_data[x]['stats'] for x in source_positions],
+        length,
+        numeric=stat_type != "array")
+    copies = source_index[nested_positions]
+    value_array = np.concatenate((value_array, value_array[copies]))
+    value_valid = np.concatenate((value_valid, value_valid[copies]))
+    stat_array = np.concatenate((stat_array, stat_array[copies]))
+    stat_valid = np.concatenate((stat_valid, stat_valid[copies]))
+
+    inferred_values = np.full((len(target_positions), length), np.nan)
+    inferred_stats = np.full((len(target_positions), length), np.nan)
+    has_values = np.zeros(len(target_positions), dtype=bool)
+    has_stats = np.zeros(len(target_positions), dtype=bool)
+
+    for depth in range(level.max() + 1):
+        members = np.flatnonzero(level == depth)
+        level_links = links[members]
+
+        value_links = level_links @ sparse.diags(
+            value_valid.astype(np.int8), dtype=np.int8)
+        value_links.eliminate_zeros()
+        value_links.sort_indices()
+        has_values[members] = np.diff(value_links.indptr) > 0
+        inferred_values[members] = infer_group_values(
+            value_links.indptr, value_links.indices, value_array)
+
+        stat_links = level_links @ sparse.diags(
+            stat_valid.astype(np.int8), dtype=np.int8)
+        stat_links.eliminate_zeros()
+        stat_links.sort_indices()
+        has_stats[members] = np.diff(stat_links.indptr) > 0
+        if stat_type != "array":
+            inferred_stats[members] = infer_group_stats(
+                stat_links.indptr, stat_links.indices, stat_array)
+
+        # Publish updated copies for deeper targets to read
+        published = nested_index[target_positions[members]]
+        done = published >= 0
+        published, members = published[done], members[done]
+        with_values = has_values[members]
+        value_array[published[with_values]] = \
+            inferred_values[members[with_values]]
+        value_valid[published[with_values]] = True
+        with_stats = has_stats[members]
+        if stat_type == "array":
+            stat_valid[published[with_stats]] = False
+        else:
+            stat_array[published[with_stats]] = \
+                inferred_stats[members[with_stats]]
+            stat_valid[published[with_stats]] = True
+
+    # Mark as inferred if this is possible
+    colored = []
+    for j in np.flatnonzero(has_values | has_stats):
+        node = node_data[target_positions[j]]
+        node['inferred'] = 'true'
+
+        if has_values[j]:
+            node['values'] = inferred_values[j].tolist()
+            colored.append(node)
+
+        if has_stats[j]:
+            if stat_type == "array":
+                # Do not infer confidence intervals
+                node['stats'] = [None for x in range(length)]
+            else:
+                node['stats'] = inferred_stats[j].tolist()
+
+    color_nodes(
+        nodes=colored,
+        max_value=max_value)
 
 
 def broadcast_values(
@@ -1350,142 +1669,57 @@ def broadcast_values(
         broadcast_genes=True,
         broadcast_metabolites=True,
         stat_type="float"):
-    """
+    """Broadcast values and stats to unmeasured proteins and complexes
+    1. sub_type == 'protein_component' from neighboring genes
+    2. complex == 'true' from neighboring complex components (and
+       metabolite components if broadcast_metabolites)
+    - Values are the per-sample median of the components, stats the scaled
+      geometric mean; inferred nodes are marked as such
     """
 
-    u = graph.to_undirected()
     length = len(categories)
+    nodes, adjacency = build_broadcast_index(graph)
+    node_data = [graph.nodes()[x] for x in nodes]
+    types = np.array([d['type'] for d in node_data], dtype=object)
+    sub_types = np.array(
+        [d.get('sub_type') for d in node_data], dtype=object)
+
+    def get_candidates():
+        return np.fromiter(
+            (d['type'] != 'reaction'
+             and (None in d['values'] or None in d['stats'])
+             for d in node_data),
+            dtype=bool,
+            count=len(node_data))
 
     if broadcast_genes == True:
-        counter = 0
-        node_number = len(list(graph.nodes()))
-
-        for x in graph.nodes():
-            counter = track_progress(args_dict, counter, node_number, 5)
-
-            try:
-                graph.nodes()[x]['values']
-            except:
-                print(graph.nodes()[x])
-            if None not in graph.nodes()[x]['values'] \
-                    and None not in graph.nodes()[x]['stats']:
-                pass
-
-            elif graph.nodes()[x]['type'] == 'reaction':
-                pass
-
-            else:
-
-                # 1. sub_type == 'protein_component' && type == 'complex_component'
-                #       find edges
-                #       find nodes type == 'gene_component'
-                #       for x in values:
-                #           take min, max, avg of genes to broadcast
-                #           mark as inferred
-
-                if graph.nodes()[x]['sub_type'] == 'protein_component':
-
-                    gene_values = []
-                    gene_stats = []
-                    for neighbor in u[x]:
-
-                        if graph.nodes()[neighbor]['sub_type'] == 'gene':
-                            gene_values.append(
-                                graph.nodes()[neighbor]['values'])
-                            gene_stats.append(graph.nodes()[neighbor]['stats'])
-
-                    # Remove None and avg
-                    gene_values = remove_nulls(gene_values)
-                    gene_stats = remove_nulls(gene_stats)
-
-                    # Mark as inferred if this is possible
-                    if gene_values != []:
-                        inferred_values = infer_protein_values(
-                            gene_values, length)
-
-                        graph.nodes()[x]['inferred'] = 'true'
-                        graph.nodes()[x]['values'] = inferred_values
-                        graph.nodes()[x]['values_rgba'] = extract_value(
-                            value_array=inferred_values,
-                            max_value=max_value)
-                        graph.nodes()[x]['values_js'] = convert_rgba(
-                            rgba_tuples=graph.nodes()[x]['values_rgba'])
-
-                    if gene_stats != []:
-                        inferred_stats = infer_protein_stats(
-                            gene_stats, length, stat_type=stat_type)
-
-                        graph.nodes()[x]['inferred'] = 'true'
-                        graph.nodes()[x]['stats'] = inferred_stats
-    else:
-        progress_feed(args_dict, "graph", 5)
-
-
-    counter = 0
-    node_number = len(list(graph.nodes()))
-
-    for x in graph.nodes():
-        counter = track_progress(args_dict, counter, node_number, 5)
-
-        try:
-            graph.nodes()[x]['values']
-        except:
-            print(graph.nodes()[x])
-        if None not in graph.nodes()[x]['values'] \
-                and None not in graph.nodes()[x]['stats']:
-            pass
-
-        elif graph.nodes()[x]['type'] == 'reaction':
-            pass
-
-        else:
-
-            # 2. graph.nodes()[id]['complex'] == 'true'
-            #       find edges
-            #       find nodes type == 'complex_component'
-            #       for x in values:
-            #           take min, max, avg of genes to broadcast
-            #           mark as inferred
-
-            if 'complex' in graph.nodes()[x] \
-                    and graph.nodes()[x]['complex'] == 'true':
-
-                gene_values = []
-                gene_stats = []
-                for neighbor in u[x]:
-
-                    if graph.nodes()[neighbor]['type'] == 'complex_component':
-                        gene_values.append(graph.nodes()[neighbor]['values'])
-                        gene_stats.append(graph.nodes()[neighbor]['stats'])
-                    elif broadcast_metabolites == True \
-                            and graph.nodes()[neighbor]['type'] == 'metabolite_component':
-                        gene_values.append(graph.nodes()[neighbor]['values'])
-                        gene_stats.append(graph.nodes()[neighbor]['stats'])
-                    else:
-                        pass
-
-                # Remove None and avg
-                gene_values = remove_nulls(gene_values)
-                gene_stats = remove_nulls(gene_stats)
-
-                # Mark as inferred if this is possible
-                if gene_values != []:
-                    inferred_values = infer_protein_values(gene_values, length)
-
-                    graph.nodes()[x]['inferred'] = 'true'
-                    graph.nodes()[x]['values'] = inferred_values
-                    graph.nodes()[x]['values_rgba'] = extract_value(
-                        value_array=inferred_values,
-                        max_value=max_value)
-                    graph.nodes()[x]['values_js'] = convert_rgba(
-                        rgba_tuples=graph.nodes()[x]['values_rgba'])
-
-                if gene_stats != []:
-                    inferred_stats = infer_protein_stats(
-                        gene_stats, length, stat_type=stat_type)
+        broadcast_pass(
+            node_data=node_data,
+            adjacency=adjacency,
+            targets=get_candidates() & (sub_types == 'protein_component'),
+            sources=sub_types == 'gene',
+            length=length,
+            max_value=max_value,
+            stat_type=stat_type)
+    progress_feed(args_dict, "graph", 5)
 
-                    graph.nodes()[x]['inferred'] = 'true'
-                    graph.nodes()[x]['stats'] = inferred_stats
+    complexes = np.fromiter(
+        (d.get('complex') == 'true' for d in node_data),
+        dtype=bool,
+        count=len(node_data))
+    sources = types == 'complex_component'
+    if broadcast_metabolites == True:
+        sources = sources | (types == 'metabolite_component')
+
+    broadcast_pass(
+        node_data=node_data,
+        adjacency=adjacency,
+        targets=get_candidates() & complexes,
+        sources=sources,
+        length=length,
+        max_value=max_value,
+        stat_type=stat_type)
+    progress_feed(args_dict, "graph", 5)
 
     return graph
 
@@ -1547,7 +1781,20 @@ def make_motif_reaction_dictionary(
 def load_metabolite_synonym_dictionary(
         dir=os.path.join(os.path.dirname(__file__), 'data'),
         file='metabolite_mapping.pickle'):
-    """Read metabolite mapper, creating it if necessary"""
+    """Read metabolite mapper, creating it if necessary
+
+    If an indexed mapper store (metabolite_mapping.sqlite) is present in dir
+    and was written from the current zipped mapper, it is opened instead and
+    entries are read from disk as they are needed.
+    """
+
+    store_file = os.path.join(dir, MAPPER_STORE_FILE)
+    if os.path.exists(store_file):
+        if is_store_current(store_file, os.path.join(dir, file + '.zip')):
+            print("Opening metabolite mapper store...")
+            return MapperStore(store_file)
+        print("Warning: metabolite mapper store is out of date with "
+              + file + ".zip ... reading the mapper instead...")
 
     try:
         from metaboverse_cli.mapper.metaboliteMapper import ensure_metabolite_mapper
@@ -1588,6 +1835,34 @@ def load_metabolite_synonym_dictionary(
     return metabolite_mapper
 
 
+def load_synonym_cache(
+        args_dict,
+        network,
+        dir=os.path.join(os.path.dirname(__file__), 'data'),
+        file='metabolite_mapping.pickle.zip'):
+    """Open the synonym cache kept next to the organism curation file
+    """
+
+    cache_file = get_synonym_cache_file(args_dict)
+    if cache_file == None:
+        return None
+
+    curation_version = [
+        network.get('metaboverse-curate_version', 'none'),
+        network.get('curation_date', 'none')]
+
+    # The zipped mapper is the source of both the pickle and any current
+    # store, so key on it and only fall back to a store left on its own
+    mapper_file = os.path.join(dir, file)
+    if not os.path.exists(mapper_file):
+        mapper_file = os.path.join(dir, MAPPER_STORE_FILE)
+
+    return open_synonym_cache(
+        path=cache_file,
+        mapper_checksum=cached_file_checksum(mapper_file, cache_file),
+        curation_version=curation_version)
+
+
 def build_name_reference(
         ensembl,
         uniprot):
@@ -1689,24 +1964,30 @@ def __template__(
             uniprot=network['uniprot_synonyms'],
             chebi=network['chebi_mapper'],
             uniprot_metabolites=network['uniprot_metabolites'])
-    metabolite_mapper = load_metabolite_synonym_dictionary()
+    with profile_stage(args_dict, 'load_metabolite_synonym_dictionary'):
+        metabolite_mapper = load_metabolite_synonym_dictionary()
 
     # Generate graph and name mapping
     print('Building network...')
-    G, network['reaction_database'], network['pathway_database'] = build_graph(
-        args_dict=args_dict,
-        network=network['reaction_database'],
-        pathway_database=network['pathway_database'],
-        species_reference=network['species_database'],
-        name_reference=network['name_database'],
-        protein_reference=protein_dictionary,
-        chebi_dictionary=chebi_dictionary,
-        uniprot_reference=network['uniprot_synonyms'],
-        complexes=network['complex_dictionary'],
-        species_id=species_id,
-        gene_reference=network['ensembl_synonyms'],
-        compartment_reference=network['compartment_dictionary'],
-        component_database=network['components_database'])
+    with profile_stage(args_dict, 'build_graph') as stage:
+        G, network['reaction_database'], network['pathway_database'] = build_graph(
+            args_dict=args_dict,
+            network=network['reaction_database'],
+            pathway_database=network['pathway_database'],
+            species_reference=network['species_database'],
+            name_reference=network['name_database'],
+            protein_reference=protein_dictionary,
+            chebi_dictionary=chebi_dictionary,
+            uniprot_reference=network['uniprot_synonyms'],
+            complexes=network['complex_dictionary'],
+            species_id=species_id,
+            gene_reference=network['ensembl_synonyms'],
+            compartment_reference=network['compartment_dictionary'],
+            component_database=network['components_database'])
+        stage.count(
+            reactions=len(network['reaction_database']),
+            nodes=G.number_of_nodes(),
+            edges=G.number_of_edges())
     # additional_reactions=args_dict['additional_reactions'])
     progress_feed(args_dict, "graph", 1)
 
@@ -1732,25 +2013,29 @@ def __template__(
     args_dict['template_version'] = get_metaboverse_cli_version()
     args_dict['template_date'] = date.today().strftime('%Y-%m-%d')
 
-    output_graph(
-        graph=G,
-        output_name=os.path.join(args_dict['output'], graph_name),
-        pathway_dictionary=network['pathway_database'],
-        collapsed_pathway_dictionary=network['pathway_database'],
-        super_pathways=super_pathways,
-        reaction_dictionary=network['reaction_database'],
-        collapsed_reaction_dictionary=network['reaction_database'],
-        motif_reaction_dictionary=network['reaction_database'],
-        mod_collapsed_pathways={},
-        degree_dictionary=degree_dictionary,
-        max_value=0,
-        max_stat=1,
-        categories=[],
-        labels=args_dict['labels'],
-        blocklist=args_dict['blocklist'],
-        species_blocklist=[],
-        metadata=args_dict,
-        unmapped=[])
+    with profile_stage(args_dict, 'output_graph') as stage:
+        output_graph(
+            graph=G,
+            output_name=os.path.join(args_dict['output'], graph_name),
+            pathway_dictionary=network['pathway_database'],
+            collapsed_pathway_dictionary=network['pathway_database'],
+            super_pathways=super_pathways,
+            reaction_dictionary=network['reaction_database'],
+            collapsed_reaction_dictionary=network['reaction_database'],
+            motif_reaction_dictionary=network['reaction_database'],
+            mod_collapsed_pathways={},
+            degree_dictionary=degree_dictionary,
+            max_value=0,
+            max_stat=1,
+            categories=[],
+            labels=args_dict['labels'],
+            blocklist=args_dict['blocklist'],
+            species_blocklist=[],
+            metadata=args_dict,
+            unmapped=[])
+        stage.count(
+            nodes=G.number_of_nodes(),
+            edges=G.number_of_edges())
     print('Graphing complete.')
 
     return G, args_dict, network, name_reference, degree_dictionary, \
@@ -1788,18 +2073,32 @@ def __model__(
         network=network)
 
     print('Mapping user data...')
-    G, max_value, max_stat, non_mappers = map_attributes(
+    synonym_cache = load_synonym_cache(
         args_dict=args_dict,
-        graph=graph,
-        data=data,
-        stats=stats,
-        name_reference=name_reference,
-        degree_dictionary=degree_dictionary,
-        chebi_dictionary=chebi_dictionary,
-        chebi_synonyms=network['chebi_synonyms'],
-        uniprot_mapper=uniprot_mapper,
-        metabolite_mapper=metabolite_mapper,
-        ignore_enantiomers=True)
+        network=network)
+    with profile_stage(args_dict, 'map_attributes') as stage:
+        G, max_value, max_stat, non_mappers = map_attributes(
+            args_dict=args_dict,
+            graph=graph,
+            data=data,
+            stats=stats,
+            name_reference=name_reference,
+            degree_dictionary=degree_dictionary,
+            chebi_dictionary=chebi_dictionary,
+            chebi_synonyms=network['chebi_synonyms'],
+            uniprot_mapper=uniprot_mapper,
+            metabolite_mapper=metabolite_mapper,
+            ignore_enantiomers=True,
+            synonym_cache=synonym_cache)
+        stage.count(
+            rows=len(data.index),
+            unmapped_metabolites=len(non_mappers))
+        if stage.enabled:
+            stage.count(mapped_nodes=sum(
+                1 for x in G.nodes()
+                if None not in G.nodes()[x]['values']))
+    if synonym_cache != None:
+        synonym_cache.close()
     
     print('Searching for unmapped metabolomics values...')
     if args_dict['metabolomics'].lower() != 'none':
@@ -1838,15 +2137,20 @@ def __model__(
         args_dict["stat_type"] = 'array'
     else:
         args_dict["stat_type"] = 'float'
-    G = broadcast_values(
-        args_dict=args_dict,
-        graph=G,
-        categories=categories,
-        max_value=max_value,
-        max_stat=max_stat,
-        broadcast_genes=broadcast_genes,
-        broadcast_metabolites=broadcast_metabolites, 
-        stat_type=args_dict["stat_type"])
+    with profile_stage(args_dict, 'broadcast_values') as stage:
+        G = broadcast_values(
+            args_dict=args_dict,
+            graph=G,
+            categories=categories,
+            max_value=max_value,
+            max_stat=max_stat,
+            broadcast_genes=broadcast_genes,
+            broadcast_metabolites=broadcast_metabolites, 
+            stat_type=args_dict["stat_type"])
+        if stage.enabled:
+            stage.count(inferred_nodes=sum(
+                1 for x in G.nodes()
+                if G.nodes()[x].get('inferred') == 'true'))
     progress_feed(args_dict, "graph", 5)
 
     print('Compiling collapsed reaction reference...')
@@ -1876,18 +2180,23 @@ def __model__(
             species_blocklist.append(network['name_database'][b])
 
     # Collapse reactions
-    G, updated_reactions, changed_reactions, \
-    removed_reaction = collapse_nodes(
-        args_dict=args_dict,
-        graph=G,
-        reaction_dictionary=no_defective_reactions,
-        neighbors_dictionary=neighbors_dictionary,
-        degree_dictionary=degree_dictionary,
-        samples=len(categories),
-        collapse_with_modifiers=args_dict['collapse_with_modifiers'],
-        blocklist=species_blocklist,
-        degree_threshold=degree_threshold,
-        collapse_threshold=args_dict['collapse_threshold'])
+    with profile_stage(args_dict, 'collapse_nodes') as stage:
+        G, updated_reactions, changed_reactions, \
+        removed_reaction = collapse_nodes(
+            args_dict=args_dict,
+            graph=G,
+            reaction_dictionary=no_defective_reactions,
+            neighbors_dictionary=neighbors_dictionary,
+            degree_dictionary=degree_dictionary,
+            samples=len(categories),
+            collapse_with_modifiers=args_dict['collapse_with_modifiers'],
+            blocklist=species_blocklist,
+            degree_threshold=degree_threshold,
+            collapse_threshold=args_dict['collapse_threshold'])
+        stage.count(
+            reactions=len(no_defective_reactions),
+            collapsed_reactions=len(changed_reactions),
+            removed_reactions=len(removed_reaction))
     updated_pathway_dictionary = generate_updated_dictionary(
         original_database=network['pathway_database'],
         update_dictionary=changed_reactions,
@@ -1927,25 +2236,29 @@ def __model__(
     args_dict['neighbors_version'] = neighbors_dictionary['nbdb-Metaboverse-version']
     args_dict['neighbors_date'] = neighbors_dictionary['nbdb-Metaboverse-date']
 
-    output_graph(
-        graph=G,
-        output_name=os.path.join(args_dict['output'], graph_name),
-        pathway_dictionary=network['pathway_database'],
-        collapsed_pathway_dictionary=updated_pathway_dictionary,
-        super_pathways=super_pathways,
-        reaction_dictionary=network['reaction_database'],
-        collapsed_reaction_dictionary=updated_reactions,
-        motif_reaction_dictionary=motif_reaction_dictionary,
-        mod_collapsed_pathways=mod_collapsed_pathways,
-        degree_dictionary=degree_dictionary,
-        max_value=max_value,
-        max_stat=max_stat,
-        categories=categories,
-        labels=args_dict['labels'],
-        blocklist=named_blocklist,
-        species_blocklist=species_blocklist,
-        metadata=args_dict,
-        unmapped=non_mappers)
+    with profile_stage(args_dict, 'output_graph') as stage:
+        output_graph(
+            graph=G,
+            output_name=os.path.join(args_dict['output'], graph_name),
+            pathway_dictionary=network['pathway_database'],
+            collapsed_pathway_dictionary=updated_pathway_dictionary,
+            super_pathways=super_pathways,
+            reaction_dictionary=network['reaction_database'],
+            collapsed_reaction_dictionary=updated_reactions,
+            motif_reaction_dictionary=motif_reaction_dictionary,
+            mod_collapsed_pathways=mod_collapsed_pathways,
+            degree_dictionary=degree_dictionary,
+            max_value=max_value,
+            max_stat=max_stat,
+            categories=categories,
+            labels=args_dict['labels'],
+            blocklist=named_blocklist,
+            species_blocklist=species_blocklist,
+            metadata=args_dict,
+            unmapped=non_mappers)
+        stage.count(
+            nodes=G.number_of_nodes(),
+            edges=G.number_of_edges())
     print('Graphing complete.')
     progress_feed(args_dict, "graph", 1)
 
@@ -21,6 +21,8 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
+from bisect import bisect_left
+import numpy as np
 
 _seismic_data = [[0.000, [0.000, 0.000, 0.300]], [0.002, [0.000, 0.000, 0.300]], [0.004, [0.000, 0.000, 0.311]], [0.006, [0.000, 0.000, 0.311]], [0.008, [0.000, 0.000, 0.322]], [0.010, [0.000, 0.000, 0.322]], [0.012, [0.000, 0.000, 0.333]], [0.014, [0.000, 0.000, 0.333]], [0.016, [0.000, 0.000, 0.344]], [0.018, [0.000, 0.000, 0.344]], [0.020, [0.000, 0.000, 0.355]], [0.022, [0.000, 0.000, 0.355]], [0.023, [0.000, 0.000, 0.366]], [0.025, [0.000, 0.000, 0.366]], [0.027, [0.000, 0.000, 0.377]], [0.029, [0.000, 0.000, 0.377]], [0.031, [0.000, 0.000, 0.388]], [0.033, [0.000, 0.000, 0.388]], [0.035, [0.000, 0.000, 0.399]], [0.037, [0.000, 0.000, 0.399]], [0.039, [0.000, 0.000, 0.410]], [0.041, [0.000, 0.000, 0.410]], [0.043, [0.000, 0.000, 0.421]], [0.045, [0.000, 0.000, 0.421]], [0.047, [0.000, 0.000, 0.432]], [0.049, [0.000, 0.000, 0.432]], [0.051, [0.000, 0.000, 0.443]], [0.053, [0.000, 0.000, 0.443]], [0.055, [0.000, 0.000, 0.454]], [0.057, [0.000, 0.000, 0.454]], [0.059, [0.000, 0.000, 0.465]], [0.061, [0.000, 0.000, 0.465]], [0.063, [0.000, 0.000, 0.476]], [0.065, [0.000, 0.000, 0.476]], [0.067, [0.000, 0.000, 0.487]], [0.068, [0.000, 0.000, 0.487]], [0.070, [0.000, 0.000, 0.498]], [0.072, [0.000, 0.000, 0.498]], [0.074, [0.000, 0.000, 0.509]], [0.076, [0.000, 0.000, 0.509]], [0.078, [0.000, 0.000, 0.520]], [0.080, [0.000, 0.000, 0.520]], [0.082, [0.000, 0.000, 0.531]], [0.084, [0.000, 0.000, 0.531]], [0.086, [0.000, 0.000, 0.542]], [0.088, [0.000, 0.000, 0.542]], [0.090, [0.000, 0.000, 0.553]], [0.092, [0.000, 0.000, 0.553]], [0.094, [0.000, 0.000, 0.564]], [0.096, [0.000, 0.000, 0.564]], [0.098, [0.000, 0.000, 0.575]], [0.100, [0.000, 0.000, 0.575]], [0.102, [0.000, 0.000, 0.585]], [0.104, [0.000, 0.000, 0.585]], [0.106, [0.000, 0.000, 0.596]], [0.108, [0.000, 0.000, 0.596]], [0.110, [0.000, 0.000, 0.607]], [0.112, [0.000, 0.000, 0.607]], [0.114, [0.000, 0.000, 0.618]], [0.115, [0.000, 0.000, 0.618]], [0.117, [0.000, 0.000, 0.629]], [0.119, [0.000, 0.000, 0.629]], [0.121, [0.000, 0.000, 0.640]], [0.123, [0.000, 0.000, 0.640]], [0.125, [0.000, 0.000, 0.651]], [0.127, [0.000, 0.000, 0.651]], [0.129, [0.000, 0.000, 0.662]], [0.131, [0.000, 0.000, 0.662]], [0.133, [0.000, 0.000, 0.673]], [0.135, [0.000, 0.000, 0.673]], [0.137, [0.000, 0.000, 0.684]], [0.139, [0.000, 0.000, 0.684]], [0.141, [0.000, 0.000, 0.695]], [0.143, [0.000, 0.000, 0.695]], [0.145, [0.000, 0.000, 0.706]], [0.147, [0.000, 0.000, 0.706]], [0.149, [0.000, 0.000, 0.717]], [0.151, [0.000, 0.000, 0.717]], [0.153, [0.000, 0.000, 0.728]], [0.155, [0.000, 0.000, 0.728]], [0.157, [0.000, 0.000, 0.739]], [0.159, [0.000, 0.000, 0.739]], [0.160, [0.000, 0.000, 0.750]], [0.162, [0.000, 0.000, 0.750]], [0.164, [0.000, 0.000, 0.761]], [0.166, [0.000, 0.000, 0.761]], [0.168, [0.000, 0.000, 0.772]], [0.170, [0.000, 0.000, 0.772]], [0.172, [0.000, 0.000, 0.783]], [0.174, [0.000, 0.000, 0.783]], [0.176, [0.000, 0.000, 0.794]], [0.178, [0.000, 0.000, 0.794]], [0.180, [0.000, 0.000, 0.805]], [0.182, [0.000, 0.000, 0.805]], [0.184, [0.000, 0.000, 0.816]], [0.186, [0.000, 0.000, 0.816]], [0.188, [0.000, 0.000, 0.827]], [0.190, [0.000, 0.000, 0.827]], [0.192, [0.000, 0.000, 0.838]], [0.194, [0.000, 0.000, 0.838]], [0.196, [0.000, 0.000, 0.849]], [0.198, [0.000, 0.000, 0.849]], [0.200, [0.000, 0.000, 0.860]], [0.202, [0.000, 0.000, 0.860]], [0.204, [0.000, 0.000, 0.871]], [0.205, [0.000, 0.000, 0.871]], [0.207, [0.000, 0.000, 0.882]], [0.209, [0.000, 0.000, 0.882]], [0.211, [0.000, 0.000, 0.893]], [0.213, [0.000, 0.000, 0.893]], [0.215, [0.000, 0.000, 0.904]], [0.217, [0.000, 0.000, 0.904]], [0.219, [0.000, 0.000, 0.915]], [0.221, [0.000, 0.000, 0.915]], [0.223, [0.000, 0.000, 0.926]], [0.225, [0.000, 0.000, 0.926]], [0.227, [0.000, 0.000, 0.937]], [0.229, [0.000, 0.000, 0.937]], [0.231, [0.000, 0.000, 0.948]], [0.233, [0.000, 0.000, 0.948]], [0.235, [0.000, 0.000, 0.959]], [0.237, [0.000, 0.000, 0.959]], [0.239, [0.000, 0.000, 0.970]], [0.241, [0.000, 0.000, 0.970]], [0.243, [0.000, 0.000, 0.981]], [0.245, [0.000, 0.000, 0.981]], [0.247, [0.000, 0.000, 0.992]], [0.249, [0.000, 0.000, 0.992]], [0.250, [0.004, 0.004, 1.000]], [0.252, [0.004, 0.004, 1.000]], [0.254, [0.020, 0.020, 1.000]], [0.256, [0.020, 0.020, 1.000]], [0.258, [0.035, 0.035, 1.000]], [0.260, [0.035, 0.035, 1.000]], [0.262, [0.051, 0.051, 1.000]], [0.264, [0.051, 0.051, 1.000]], [0.266, [0.067, 0.067, 1.000]], [0.268, [0.067, 0.067, 1.000]], [0.270, [0.082, 0.082, 1.000]], [0.272, [0.082, 0.082, 1.000]], [0.274, [0.098, 0.098, 1.000]], [0.276, [0.098, 0.098, 1.000]], [0.278, [0.114, 0.114, 1.000]], [0.280, [0.114, 0.114, 1.000]], [0.282, [0.129, 0.129, 1.000]], [0.284, [0.129, 0.129, 1.000]], [0.286, [0.145, 0.145, 1.000]], [0.288, [0.145, 0.145, 1.000]], [0.290, [0.161, 0.161, 1.000]], [0.292, [0.161, 0.161, 1.000]], [0.294, [0.176, 0.176, 1.000]], [0.295, [0.176, 0.176, 1.000]], [0.297, [0.192, 0.192, 1.000]], [0.299, [0.192, 0.192, 1.000]], [0.301, [0.208, 0.208, 1.000]], [0.303, [0.208, 0.208, 1.000]], [0.305, [0.224, 0.224, 1.000]], [0.307, [0.224, 0.224, 1.000]], [0.309, [0.239, 0.239, 1.000]], [0.311, [0.239, 0.239, 1.000]], [0.313, [0.255, 0.255, 1.000]], [0.315, [0.255, 0.255, 1.000]], [0.317, [0.271, 0.271, 1.000]], [0.319, [0.271, 0.271, 1.000]], [0.321, [0.286, 0.286, 1.000]], [0.323, [0.286, 0.286, 1.000]], [0.325, [0.302, 0.302, 1.000]], [0.327, [0.302, 0.302, 1.000]], [0.329, [0.318, 0.318, 1.000]], [0.331, [0.318, 0.318, 1.000]], [0.333, [0.333, 0.333, 1.000]], [0.335, [0.333, 0.333, 1.000]], [0.337, [0.349, 0.349, 1.000]], [0.339, [0.349, 0.349, 1.000]], [0.341, [0.365, 0.365, 1.000]], [0.342, [0.365, 0.365, 1.000]], [0.344, [0.380, 0.380, 1.000]], [0.346, [0.380, 0.380, 1.000]], [0.348, [0.396, 0.396, 1.000]], [0.350, [0.396, 0.396, 1.000]], [0.352, [0.412, 0.412, 1.000]], [0.354, [0.412, 0.412, 1.000]], [0.356, [0.427, 0.427, 1.000]], [0.358, [0.427, 0.427, 1.000]], [0.360, [0.443, 0.443, 1.000]], [0.362, [0.443, 0.443, 1.000]], [0.364, [0.459, 0.459, 1.000]], [0.366, [0.459, 0.459, 1.000]], [0.368, [0.475, 0.475, 1.000]], [0.370, [0.475, 0.475, 1.000]], [0.372, [0.490, 0.490, 1.000]], [0.374, [0.490, 0.490, 1.000]], [0.376, [0.506, 0.506, 1.000]], [0.378, [0.506, 0.506, 1.000]], [0.380, [0.522, 0.522, 1.000]], [0.382, [0.522, 0.522, 1.000]], [0.384, [0.537, 0.537, 1.000]], [0.386, [0.537, 0.537, 1.000]], [0.387, [0.553, 0.553, 1.000]], [0.389, [0.553, 0.553, 1.000]], [0.391, [0.569, 0.569, 1.000]], [0.393, [0.569, 0.569, 1.000]], [0.395, [0.584, 0.584, 1.000]], [0.397, [0.584, 0.584, 1.000]], [0.399, [0.600, 0.600, 1.000]], [0.401, [0.600, 0.600, 1.000]], [0.403, [0.616, 0.616, 1.000]], [0.405, [0.616, 0.616, 1.000]], [0.407, [0.631, 0.631, 1.000]], [0.409, [0.631, 0.631, 1.000]], [0.411, [0.647, 0.647, 1.000]], [0.413, [0.647, 0.647, 1.000]], [0.415, [0.663, 0.663, 1.000]], [0.417, [0.663, 0.663, 1.000]], [0.419, [0.678, 0.678, 1.000]], [0.421, [0.678, 0.678, 1.000]], [0.423, [0.694, 0.694, 1.000]], [0.425, [0.694, 0.694, 1.000]], [0.427, [0.710, 0.710, 1.000]], [0.429, [0.710, 0.710, 1.000]], [0.431, [0.725, 0.725, 1.000]], [0.432, [0.725, 0.725, 1.000]], [0.434, [0.741, 0.741, 1.000]], [0.436, [0.741, 0.741, 1.000]], [0.438, [0.757, 0.757, 1.000]], [0.440, [0.757, 0.757, 1.000]], [0.442, [0.773, 0.773, 1.000]], [0.444, [0.773, 0.773, 1.000]], [0.446, [0.788, 0.788, 1.000]], [0.448, [0.788, 0.788, 1.000]], [0.450, [0.804, 0.804, 1.000]], [0.452, [0.804, 0.804, 1.000]], [0.454, [0.820, 0.820, 1.000]], [0.456, [0.820, 0.820, 1.000]], [0.458, [0.835, 0.835, 1.000]], [0.460, [0.835, 0.835, 1.000]], [0.462, [0.851, 0.851, 1.000]], [0.464, [0.851, 0.851, 1.000]], [0.466, [0.867, 0.867, 1.000]], [0.468, [0.867, 0.867, 1.000]], [0.470, [0.882, 0.882, 1.000]], [0.472, [0.882, 0.882, 1.000]], [0.474, [0.898, 0.898, 1.000]], [0.476, [0.898, 0.898, 1.000]], [0.477, [0.914, 0.914, 1.000]], [0.479, [0.914, 0.914, 1.000]], [0.481, [0.929, 0.929, 1.000]], [0.483, [0.929, 0.929, 1.000]], [0.485, [0.945, 0.945, 1.000]], [0.487, [0.945, 0.945, 1.000]], [0.489, [0.961, 0.961, 1.000]], [0.491, [0.961, 0.961, 1.000]], [0.493, [0.976, 0.976, 1.000]], [0.495, [0.976, 0.976, 1.000]], [0.497, [0.992, 0.992, 1.000]], [0.499, [0.992, 0.992, 1.000]], [
     0.501, [1.000, 0.992, 0.992]], [0.503, [1.000, 0.992, 0.992]], [0.505, [1.000, 0.976, 0.976]], [0.507, [1.000, 0.976, 0.976]], [0.509, [1.000, 0.961, 0.961]], [0.511, [1.000, 0.961, 0.961]], [0.513, [1.000, 0.945, 0.945]], [0.515, [1.000, 0.945, 0.945]], [0.517, [1.000, 0.929, 0.929]], [0.519, [1.000, 0.929, 0.929]], [0.521, [1.000, 0.914, 0.914]], [0.523, [1.000, 0.914, 0.914]], [0.524, [1.000, 0.898, 0.898]], [0.526, [1.000, 0.898, 0.898]], [0.528, [1.000, 0.882, 0.882]], [0.530, [1.000, 0.882, 0.882]], [0.532, [1.000, 0.867, 0.867]], [0.534, [1.000, 0.867, 0.867]], [0.536, [1.000, 0.851, 0.851]], [0.538, [1.000, 0.851, 0.851]], [0.540, [1.000, 0.835, 0.835]], [0.542, [1.000, 0.835, 0.835]], [0.544, [1.000, 0.820, 0.820]], [0.546, [1.000, 0.820, 0.820]], [0.548, [1.000, 0.804, 0.804]], [0.550, [1.000, 0.804, 0.804]], [0.552, [1.000, 0.788, 0.788]], [0.554, [1.000, 0.788, 0.788]], [0.556, [1.000, 0.773, 0.773]], [0.558, [1.000, 0.773, 0.773]], [0.560, [1.000, 0.757, 0.757]], [0.562, [1.000, 0.757, 0.757]], [0.564, [1.000, 0.741, 0.741]], [0.566, [1.000, 0.741, 0.741]], [0.568, [1.000, 0.725, 0.725]], [0.569, [1.000, 0.725, 0.725]], [0.571, [1.000, 0.710, 0.710]], [0.573, [1.000, 0.710, 0.710]], [0.575, [1.000, 0.694, 0.694]], [0.577, [1.000, 0.694, 0.694]], [0.579, [1.000, 0.678, 0.678]], [0.581, [1.000, 0.678, 0.678]], [0.583, [1.000, 0.663, 0.663]], [0.585, [1.000, 0.663, 0.663]], [0.587, [1.000, 0.647, 0.647]], [0.589, [1.000, 0.647, 0.647]], [0.591, [1.000, 0.631, 0.631]], [0.593, [1.000, 0.631, 0.631]], [0.595, [1.000, 0.616, 0.616]], [0.597, [1.000, 0.616, 0.616]], [0.599, [1.000, 0.600, 0.600]], [0.601, [1.000, 0.600, 0.600]], [0.603, [1.000, 0.584, 0.584]], [0.605, [1.000, 0.584, 0.584]], [0.607, [1.000, 0.569, 0.569]], [0.609, [1.000, 0.569, 0.569]], [0.611, [1.000, 0.553, 0.553]], [0.613, [1.000, 0.553, 0.553]], [0.614, [1.000, 0.537, 0.537]], [0.616, [1.000, 0.537, 0.537]], [0.618, [1.000, 0.522, 0.522]], [0.620, [1.000, 0.522, 0.522]], [0.622, [1.000, 0.506, 0.506]], [0.624, [1.000, 0.506, 0.506]], [0.626, [1.000, 0.490, 0.490]], [0.628, [1.000, 0.490, 0.490]], [0.630, [1.000, 0.475, 0.475]], [0.632, [1.000, 0.475, 0.475]], [0.634, [1.000, 0.459, 0.459]], [0.636, [1.000, 0.459, 0.459]], [0.638, [1.000, 0.443, 0.443]], [0.640, [1.000, 0.443, 0.443]], [0.642, [1.000, 0.427, 0.427]], [0.644, [1.000, 0.427, 0.427]], [0.646, [1.000, 0.412, 0.412]], [0.648, [1.000, 0.412, 0.412]], [0.650, [1.000, 0.396, 0.396]], [0.652, [1.000, 0.396, 0.396]], [0.654, [1.000, 0.380, 0.380]], [0.656, [1.000, 0.380, 0.380]], [0.658, [1.000, 0.365, 0.365]], [0.659, [1.000, 0.365, 0.365]], [0.661, [1.000, 0.349, 0.349]], [0.663, [1.000, 0.349, 0.349]], [0.665, [1.000, 0.333, 0.333]], [0.667, [1.000, 0.333, 0.333]], [0.669, [1.000, 0.318, 0.318]], [0.671, [1.000, 0.318, 0.318]], [0.673, [1.000, 0.302, 0.302]], [0.675, [1.000, 0.302, 0.302]], [0.677, [1.000, 0.286, 0.286]], [0.679, [1.000, 0.286, 0.286]], [0.681, [1.000, 0.271, 0.271]], [0.683, [1.000, 0.271, 0.271]], [0.685, [1.000, 0.255, 0.255]], [0.687, [1.000, 0.255, 0.255]], [0.689, [1.000, 0.239, 0.239]], [0.691, [1.000, 0.239, 0.239]], [0.693, [1.000, 0.224, 0.224]], [0.695, [1.000, 0.224, 0.224]], [0.697, [1.000, 0.208, 0.208]], [0.699, [1.000, 0.208, 0.208]], [0.701, [1.000, 0.192, 0.192]], [0.703, [1.000, 0.192, 0.192]], [0.705, [1.000, 0.176, 0.176]], [0.706, [1.000, 0.176, 0.176]], [0.708, [1.000, 0.161, 0.161]], [0.710, [1.000, 0.161, 0.161]], [0.712, [1.000, 0.145, 0.145]], [0.714, [1.000, 0.145, 0.145]], [0.716, [1.000, 0.129, 0.129]], [0.718, [1.000, 0.129, 0.129]], [0.720, [1.000, 0.114, 0.114]], [0.722, [1.000, 0.114, 0.114]], [0.724, [1.000, 0.098, 0.098]], [0.726, [1.000, 0.098, 0.098]], [0.728, [1.000, 0.082, 0.082]], [0.730, [1.000, 0.082, 0.082]], [0.732, [1.000, 0.067, 0.067]], [0.734, [1.000, 0.067, 0.067]], [0.736, [1.000, 0.051, 0.051]], [0.738, [1.000, 0.051, 0.051]], [0.740, [1.000, 0.035, 0.035]], [0.742, [1.000, 0.035, 0.035]], [0.744, [1.000, 0.020, 0.020]], [0.746, [1.000, 0.020, 0.020]], [0.748, [1.000, 0.004, 0.004]], [0.750, [1.000, 0.004, 0.004]], [0.751, [0.994, 0.000, 0.000]], [0.753, [0.994, 0.000, 0.000]], [0.755, [0.986, 0.000, 0.000]], [0.757, [0.986, 0.000, 0.000]], [0.759, [0.978, 0.000, 0.000]], [0.761, [0.978, 0.000, 0.000]], [0.763, [0.971, 0.000, 0.000]], [0.765, [0.971, 0.000, 0.000]], [0.767, [0.963, 0.000, 0.000]], [0.769, [0.963, 0.000, 0.000]], [0.771, [0.955, 0.000, 0.000]], [0.773, [0.955, 0.000, 0.000]], [0.775, [0.947, 0.000, 0.000]], [0.777, [0.947, 0.000, 0.000]], [0.779, [0.939, 0.000, 0.000]], [0.781, [0.939, 0.000, 0.000]], [0.783, [0.931, 0.000, 0.000]], [0.785, [0.931, 0.000, 0.000]], [0.787, [0.924, 0.000, 0.000]], [0.789, [0.924, 0.000, 0.000]], [0.791, [0.916, 0.000, 0.000]], [0.793, [0.916, 0.000, 0.000]], [0.795, [0.908, 0.000, 0.000]], [0.796, [0.908, 0.000, 0.000]], [0.798, [0.900, 0.000, 0.000]], [0.800, [0.900, 0.000, 0.000]], [0.802, [0.892, 0.000, 0.000]], [0.804, [0.892, 0.000, 0.000]], [0.806, [0.884, 0.000, 0.000]], [0.808, [0.884, 0.000, 0.000]], [0.810, [0.876, 0.000, 0.000]], [0.812, [0.876, 0.000, 0.000]], [0.814, [0.869, 0.000, 0.000]], [0.816, [0.869, 0.000, 0.000]], [0.818, [0.861, 0.000, 0.000]], [0.820, [0.861, 0.000, 0.000]], [0.822, [0.853, 0.000, 0.000]], [0.824, [0.853, 0.000, 0.000]], [0.826, [0.845, 0.000, 0.000]], [0.828, [0.845, 0.000, 0.000]], [0.830, [0.837, 0.000, 0.000]], [0.832, [0.837, 0.000, 0.000]], [0.834, [0.829, 0.000, 0.000]], [0.836, [0.829, 0.000, 0.000]], [0.838, [0.822, 0.000, 0.000]], [0.840, [0.822, 0.000, 0.000]], [0.841, [0.814, 0.000, 0.000]], [0.843, [0.814, 0.000, 0.000]], [0.845, [0.806, 0.000, 0.000]], [0.847, [0.806, 0.000, 0.000]], [0.849, [0.798, 0.000, 0.000]], [0.851, [0.798, 0.000, 0.000]], [0.853, [0.790, 0.000, 0.000]], [0.855, [0.790, 0.000, 0.000]], [0.857, [0.782, 0.000, 0.000]], [0.859, [0.782, 0.000, 0.000]], [0.861, [0.775, 0.000, 0.000]], [0.863, [0.775, 0.000, 0.000]], [0.865, [0.767, 0.000, 0.000]], [0.867, [0.767, 0.000, 0.000]], [0.869, [0.759, 0.000, 0.000]], [0.871, [0.759, 0.000, 0.000]], [0.873, [0.751, 0.000, 0.000]], [0.875, [0.751, 0.000, 0.000]], [0.877, [0.743, 0.000, 0.000]], [0.879, [0.743, 0.000, 0.000]], [0.881, [0.735, 0.000, 0.000]], [0.883, [0.735, 0.000, 0.000]], [0.885, [0.727, 0.000, 0.000]], [0.886, [0.727, 0.000, 0.000]], [0.888, [0.720, 0.000, 0.000]], [0.890, [0.720, 0.000, 0.000]], [0.892, [0.712, 0.000, 0.000]], [0.894, [0.712, 0.000, 0.000]], [0.896, [0.704, 0.000, 0.000]], [0.898, [0.704, 0.000, 0.000]], [0.900, [0.696, 0.000, 0.000]], [0.902, [0.696, 0.000, 0.000]], [0.904, [0.688, 0.000, 0.000]], [0.906, [0.688, 0.000, 0.000]], [0.908, [0.680, 0.000, 0.000]], [0.910, [0.680, 0.000, 0.000]], [0.912, [0.673, 0.000, 0.000]], [0.914, [0.673, 0.000, 0.000]], [0.916, [0.665, 0.000, 0.000]], [0.918, [0.665, 0.000, 0.000]], [0.920, [0.657, 0.000, 0.000]], [0.922, [0.657, 0.000, 0.000]], [0.924, [0.649, 0.000, 0.000]], [0.926, [0.649, 0.000, 0.000]], [0.928, [0.641, 0.000, 0.000]], [0.930, [0.641, 0.000, 0.000]], [0.932, [0.633, 0.000, 0.000]], [0.933, [0.633, 0.000, 0.000]], [0.935, [0.625, 0.000, 0.000]], [0.937, [0.625, 0.000, 0.000]], [0.939, [0.618, 0.000, 0.000]], [0.941, [0.618, 0.000, 0.000]], [0.943, [0.610, 0.000, 0.000]], [0.945, [0.610, 0.000, 0.000]], [0.947, [0.602, 0.000, 0.000]], [0.949, [0.602, 0.000, 0.000]], [0.951, [0.594, 0.000, 0.000]], [0.953, [0.594, 0.000, 0.000]], [0.955, [0.586, 0.000, 0.000]], [0.957, [0.586, 0.000, 0.000]], [0.959, [0.578, 0.000, 0.000]], [0.961, [0.578, 0.000, 0.000]], [0.963, [0.571, 0.000, 0.000]], [0.965, [0.571, 0.000, 0.000]], [0.967, [0.563, 0.000, 0.000]], [0.969, [0.563, 0.000, 0.000]], [0.971, [0.555, 0.000, 0.000]], [0.973, [0.555, 0.000, 0.000]], [0.975, [0.547, 0.000, 0.000]], [0.977, [0.547, 0.000, 0.000]], [0.978, [0.539, 0.000, 0.000]], [0.980, [0.539, 0.000, 0.000]], [0.982, [0.531, 0.000, 0.000]], [0.984, [0.531, 0.000, 0.000]], [0.986, [0.524, 0.000, 0.000]], [0.988, [0.524, 0.000, 0.000]], [0.990, [0.516, 0.000, 0.000]], [0.992, [0.516, 0.000, 0.000]], [0.994, [0.508, 0.000, 0.000]], [0.996, [0.508, 0.000, 0.000]], [0.998, [0.500, 0.000, 0.000]], [1.000, [0.500, 0.000, 0.000]]]
@@ -41,3 +43,26 @@ def get_mpl_colormap(name, alpha=1.0):
         return cmap
     else:
         print('Warning: Could not find provided colormap -- ' + str(name))
+
+
+def get_mpl_colormap_table(name, alpha=1.0, decimals=3):
+    """Retrieve matplotlib colormap as an RGBA lookup table
+    - Row i holds the color for position i / 10**decimals, using the nearest
+    colormap entry at or below that position
+    """
+
+    cmap = get_mpl_colormap(name, alpha=alpha)
+    if cmap == None:
+        return None
+
+    positions = sorted(cmap.keys())
+    resolution = 10 ** decimals
+    table = np.zeros((resolution + 1, 4))
+    for i in range(resolution + 1):
+        key = i / resolution
+        j = bisect_left(positions, key)
+        if j == len(positions) or positions[j] != key:
+            j -= 1
+        table[i] = cmap[positions[j]]
+
+    return table
@@ -0,0 +1,259 @@
+"""License Information
+metaboverse-cli
+Back-end CLI Tool for Curating Metabolic Networks for Metaboverse
+https://github.com/Metaboverse/metaboverse-cli/
+alias: metaboverse-cli
+
+MIT License
+
+Copyright (c) Jordan A. Berg, The University of Utah
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+from __future__ import print_function
+from collections.abc import Mapping
+import numpy as np
+import itertools
+import pickle
+import struct
+import json
+import os
+
+NBDB_MAGIC = b'MVNBDB1\n'
+NBDB_ALIGNMENT = 64
+NBDB_INDEX_EXTENSION = '.nbidx'
+
+
+def is_neighbors_database(
+        path):
+    """Check if a file is in the array-backed neighbors database format
+    """
+
+    with open(path, 'rb') as f:
+        return f.read(len(NBDB_MAGIC)) == NBDB_MAGIC
+
+
+def get_index_file(
+        path):
+    """Get the array-backed index file kept next to a pickled .nbdb file
+    """
+
+    return os.path.splitext(path)[0] + NBDB_INDEX_EXTENSION
+
+
+def get_source_signature(
+        path):
+    """Get the size and modification time of the .nbdb file an index was
+    built from
+    """
+
+    stat = os.stat(path)
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns
+    }
+
+
+def write_neighbors_database(
+        path,
+        neighbors_dictionary,
+        source_file=None):
+    """Write a neighbors dictionary in the array-backed format
+    - Reaction IDs are interned in a table stored in a JSON header, with the
+    reactions that have neighbor lists first
+    - Neighbor lists are stored as CSR-style indptr (int64) and indices
+    (int32) arrays at aligned offsets so they can be memory-mapped
+    - Non-list entries (nbdb-Metaboverse-version, etc.) are kept as metadata
+    - If given, the signature of the source .nbdb file is recorded so a stale
+    index can be detected
+    """
+
+    metadata = {}
+    id_index = {}
+    for k, v in neighbors_dictionary.items():
+        if isinstance(v, (list, tuple, set)):
+            id_index[k] = len(id_index)
+        else:
+            metadata[k] = v
+    keys = list(id_index)
+    n_keys = len(keys)
+
+    rows = [neighbors_dictionary[k] for k in keys]
+    indptr = np.zeros(n_keys + 1, dtype=np.int64)
+    np.cumsum(
+        np.fromiter(map(len, rows), dtype=np.int64, count=n_keys),
+        out=indptr[1:])
+    try:
+        indices = np.fromiter(
+            map(id_index.__getitem__, itertools.chain.from_iterable(rows)),
+            dtype=np.int32,
+            count=int(indptr[-1]))
+    except KeyError:
+        # Neighbors that are not keys themselves are added to the end of
+        # the table
+        intern = id_index.setdefault
+        indices = np.fromiter(
+            (intern(n, len(id_index))
+                for n in itertools.chain.from_iterable(rows)),
+            dtype=np.int32,
+            count=int(indptr[-1]))
+    ids = list(id_index)
+
+    header = {
+        'metadata': metadata,
+        'source': None if source_file == None \
+            else get_source_signature(source_file),
+        'ids': ids,
+        'keys': n_keys,
+        'indptr': [0, len(indptr)],
+        'indices': [0, len(indices)]
+    }
+
+    # Array offsets depend on the header length, so settle them first
+    while True:
+        header_bytes = json.dumps(header).encode('utf-8')
+        start = len(NBDB_MAGIC) + 8 + len(header_bytes)
+        indptr_offset = -(-start // NBDB_ALIGNMENT) * NBDB_ALIGNMENT
+        indices_offset = -(-(indptr_offset + indptr.nbytes)
+            // NBDB_ALIGNMENT) * NBDB_ALIGNMENT
+        if header['indptr'][0] == indptr_offset \
+        and header['indices'][0] == indices_offset:
+            break
+        header['indptr'][0] = indptr_offset
+        header['indices'][0] = indices_offset
+
+    temp_path = path + '.' + str(os.getpid()) + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(NBDB_MAGIC)
+        f.write(struct.pack('<Q', len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b'\0' * (indptr_offset - f.tell()))
+        f.write(indptr.astype('<i8').tobytes())
+        f.write(b'\0' * (indices_offset - f.tell()))
+        f.write(indices.astype('<i4').tobytes())
+    os.replace(temp_path, path)
+
+    return path
+
+
+class NeighborsDatabase(Mapping):
+    """Read-only mapping over an array-backed neighbors database
+
+    Supports the same neighbors_dictionary[key] and key in
+    neighbors_dictionary access as the pickled dictionary. Neighbor lists
+    are read from memory-mapped arrays as they are requested. Metadata
+    entries can be updated, but are not written back to the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(NBDB_MAGIC)) != NBDB_MAGIC:
+                raise ValueError(path + ' is not a neighbors database')
+            header_length = struct.unpack('<Q', f.read(8))[0]
+            header = json.loads(f.read(header_length).decode('utf-8'))
+
+        self.metadata = header['metadata']
+        self.source = header.get('source')
+        self.ids = np.empty(len(header['ids']), dtype=object)
+        self.ids[:] = header['ids']
+        self.n_keys = header['keys']
+        self.id_index = {
+            k: i for i, k in enumerate(header['ids'][:self.n_keys])}
+        self.indptr = self.map_array(path, '<i8', *header['indptr'])
+        self.indices = self.map_array(path, '<i4', *header['indices'])
+
+    def map_array(self, path, dtype, offset, count):
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(
+            path, dtype=dtype, mode='r', offset=offset, shape=(count,))
+
+    def __getitem__(self, key):
+        if key in self.id_index:
+            row = self.id_index[key]
+            start, end = self.indptr[row:row + 2].tolist()
+            return self.ids[self.indices[start:end]].tolist()
+        return self.metadata[key]
+
+    def __setitem__(self, key, value):
+        if key in self.id_index:
+            raise TypeError('Neighbor lists in ' + self.path + ' are read-only')
+        self.metadata[key] = value
+
+    def __contains__(self, key):
+        return key in self.id_index or key in self.metadata
+
+    def __iter__(self):
+        yield from self.id_index
+        yield from self.metadata
+
+    def __len__(self):
+        return self.n_keys + len(self.metadata)
+
+
+def build_neighbors_index(
+        input_file,
+        neighbors_dictionary=None):
+    """Write the array-backed index for a pickled .nbdb file
+    """
+
+    if neighbors_dictionary == None:
+        with open(input_file, 'rb') as f:
+            neighbors_dictionary = pickle.load(f)
+
+    return write_neighbors_database(
+        path=get_index_file(input_file),
+        neighbors_dictionary=neighbors_dictionary,
+        source_file=input_file)
+
+
+def read_neighbors_dictionary(
+        path):
+    """Read a neighbors dictionary from a .nbdb file
+    - The array-backed index next to the file is used if it was built from
+    the current file
+    - Otherwise the pickle is read and the index is rebuilt where the
+    directory is writable
+    - Files written directly in the array-backed format are also read
+    """
+
+    if is_neighbors_database(path):
+        return NeighborsDatabase(path)
+
+    index_file = get_index_file(path)
+    if os.path.exists(index_file):
+        try:
+            database = NeighborsDatabase(index_file)
+            if database.source == get_source_signature(path):
+                return database
+        except (ValueError, OSError, struct.error):
+            pass
+
+    with open(path, 'rb') as f:
+        neighbors_dictionary = pickle.load(f)
+
+    try:
+        return NeighborsDatabase(build_neighbors_index(
+            input_file=path,
+            neighbors_dictionary=neighbors_dictionary))
+    except OSError as e:
+        print('Unable to write neighbors index for ' + path + ': ' + str(e))
+        return neighbors_dictionary
@@ -0,0 +1,200 @@
+"""License Information
+metaboverse-cli
+Back-end CLI Tool for Curating Metabolic Networks for Metaboverse
+https://github.com/Metaboverse/metaboverse-cli/
+alias: metaboverse-cli
+
+MIT License
+
+Copyright (c) Jordan A. Berg, The University of Utah
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+from __future__ import print_function
+import hashlib
+import sqlite3
+import json
+import os
+
+
+def file_checksum(
+        path,
+        block_size=1 << 20):
+    """Get the SHA-256 checksum of a file, or 'none' if it does not exist
+    """
+
+    if path == None or not os.path.exists(path):
+        return 'none'
+
+    checksum = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            checksum.update(block)
+
+    return checksum.hexdigest()
+
+
+def cached_file_checksum(
+        path,
+        cache_path):
+    """Get the SHA-256 checksum of a file, reusing the one stored in the
+    SQLite cache at cache_path while the file's size and modification time
+    are unchanged
+    """
+
+    if path == None or not os.path.exists(path):
+        return 'none'
+    if cache_path == None:
+        return file_checksum(path)
+
+    stat = os.stat(path)
+    path = os.path.abspath(path)
+    try:
+        connection = sqlite3.connect(cache_path)
+    except Exception as e:
+        print(f"Warning: Unable to open synonym cache at {cache_path}: {e}")
+        return file_checksum(path)
+
+    try:
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS checksums ('
+            'path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, '
+            'checksum TEXT)')
+        row = connection.execute(
+            'SELECT checksum FROM checksums '
+            'WHERE path = ? AND size = ? AND mtime_ns = ?',
+            (path, stat.st_size, stat.st_mtime_ns)).fetchone()
+        if row != None:
+            return row[0]
+
+        checksum = file_checksum(path)
+        connection.execute(
+            'INSERT OR REPLACE INTO checksums VALUES (?, ?, ?, ?)',
+            (path, stat.st_size, stat.st_mtime_ns, checksum))
+        connection.commit()
+        return checksum
+    finally:
+        connection.close()
+
+
+def get_synonym_cache_file(
+        args_dict):
+    """Get the synonym cache path next to the organism curation (.mvdb) file
+    """
+
+    curation_file = None
+    for key in ['organism_curation_file', 'curation']:
+        if key in args_dict \
+        and str(args_dict[key]) != 'None':
+            curation_file = str(args_dict[key])
+            break
+
+    if curation_file == None:
+        return None
+
+    curation_file = os.path.join(args_dict.get('output', ''), curation_file)
+    return os.path.splitext(curation_file)[0] + '.synonyms.sqlite'
+
+
+class SynonymCache():
+    """SQLite cache of gather_synonyms() results across runs
+
+    Entries are stored per metabolite mapper checksum and curation version.
+    Entries from any other mapper or curation are removed when the cache is
+    opened. Within a version, the key is the map_id together with a digest
+    of its initial synonyms, its UniProt mapping, and the
+    ignore_enantiomers setting.
+    """
+
+    def __init__(self, path, mapper_checksum, curation_version):
+        self.path = path
+        self.version = json.dumps([mapper_checksum, curation_version])
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS synonyms ('
+            'version TEXT, key TEXT, mapper_id TEXT, synonyms TEXT, '
+            'PRIMARY KEY (version, key))')
+        self.connection.execute(
+            'DELETE FROM synonyms WHERE version != ?', (self.version,))
+        self.connection.commit()
+
+        self.entries = {}
+        for key, mapper_id, synonyms in self.connection.execute(
+                'SELECT key, mapper_id, synonyms FROM synonyms '
+                'WHERE version = ?', (self.version,)):
+            self.entries[key] = (json.loads(mapper_id), json.loads(synonyms))
+        self.pending = []
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, map_id, init_syns, uniprot_name, ignore_enantiomers):
+        return hashlib.sha1(json.dumps(
+            [map_id, init_syns, uniprot_name, ignore_enantiomers],
+            default=str).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        if key in self.entries:
+            self.hits += 1
+            mapper_id, synonyms = self.entries[key]
+            return mapper_id, list(synonyms)
+
+        self.misses += 1
+        return None
+
+    def set(self, key, mapper_id, synonyms):
+        self.entries[key] = (mapper_id, list(synonyms))
+        self.pending.append((
+            self.version,
+            key,
+            json.dumps(mapper_id, default=str),
+            json.dumps(synonyms, default=str)))
+
+    def close(self):
+        """Write new entries to disk and close the cache
+        """
+
+        if len(self.pending) > 0:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO synonyms VALUES (?, ?, ?, ?)',
+                self.pending)
+            self.connection.commit()
+            self.pending = []
+        self.connection.close()
+        print(f"Synonym cache: {self.hits} hits, {self.misses} misses ({self.path})")
+
+
+def open_synonym_cache(
+        path,
+        mapper_checksum,
+        curation_version):
+    """Open the synonym cache, or return None if it cannot be used
+    """
+
+    if path == None:
+        return None
+
+    try:
+        return SynonymCache(
+            path=path,
+            mapper_checksum=mapper_checksum,
+            curation_version=curation_version)
+    except Exception as e:
+        print(f"Warning: Unable to open synonym cache at {path}: {e}")
+        return None
@@ -116,8 +116,13 @@ def check_arguments(
     # Run sub-module specific checks
     if args_dict['cmd'] == 'curate':
         check_curate(args_dict)
+        if args_dict['threads'] < 1:
+            raise Exception('--threads must be a positive integer')
+        if args_dict['download_threads'] < 1:
+            raise Exception('--download_threads must be a positive integer')
     elif args_dict['cmd'] == 'metaboliteMapper':
-        pass
+        if args_dict['threads'] < 1:
+            raise Exception('--threads must be a positive integer')
     elif args_dict['cmd'] == 'electrum':
         pass
     else:
@@ -242,6 +247,17 @@ def parse_arguments(
         metavar='<path/filename.mvrs>',
         type=str,
         required=False)
+    electrum_opts.add_argument(
+        '--profile',
+        help='Write per-stage wall time, CPU time, peak memory and counters to a JSON report (memory tracing slows the run)',
+        metavar='<path/filename.json>',
+        type=str,
+        required=False)
+    electrum_opts.add_argument(
+        '--cprofile',
+        help='With --profile, also dump cProfile statistics for each stage next to the report',
+        action='store_true',
+        required=False)
 
     # metaboliteMapper parser
     mapper_parser = subparser.add_parser(
@@ -258,6 +274,32 @@ def parse_arguments(
         type=str,
         required=True)
 
+    # metaboliteMapper optional arguments
+    mapper_opts = mapper_parser.add_argument_group('optional arguments')
+    mapper_opts.add_argument(
+        '-t', '--threads',
+        help='Number of worker processes to use when parsing HMDB records (default: 1)',
+        metavar='<int>',
+        type=int,
+        default=1,
+        required=False)
+    mapper_opts.add_argument(
+        '--store',
+        help='Also write an indexed SQLite store (metabolite_mapping.sqlite) that analyze and electrum will read lazily in place of the pickle',
+        action='store_true',
+        required=False)
+    mapper_opts.add_argument(
+        '--profile',
+        help='Write per-stage wall time, CPU time, peak memory and counters to a JSON report (memory tracing slows the run)',
+        metavar='<path/filename.json>',
+        type=str,
+        required=False)
+    mapper_opts.add_argument(
+        '--cprofile',
+        help='With --profile, also dump cProfile statistics for each stage next to the report',
+        action='store_true',
+        required=False)
+
     # Curate parser
     curate_parser = subparser.add_parser(
         'curate',
@@ -350,6 +392,38 @@ def parse_arguments(
         help='Force all intermediate database files to be freshly created.',
         action='store_true',
         required=False)
+    curate_opts.add_argument(
+        '--reactome_archive',
+        help='Path to a local Reactome SBML tarball (all_species.3.1.sbml.tgz) to read pathways from instead of downloading it',
+        metavar='<path/filename.tgz>',
+        type=str,
+        required=False)
+    curate_opts.add_argument(
+        '--reference_dir',
+        help='Directory to cache downloaded reference files in and reuse them from while upstream is unchanged. Files placed directly in this directory are used as an offline mirror instead of downloading',
+        metavar='<path>',
+        type=str,
+        required=False)
+    curate_opts.add_argument(
+        '--download_threads',
+        help='Number of reference files to download at the same time (default: 1). 1 downloads each file only when it is needed; larger values download all reference files up front, so they may all sit on disk at once',
+        metavar='<int>',
+        type=int,
+        default=1,
+        required=False)
+    curate_opts.add_argument(
+        '--mapping_dir',
+        help='Directory of per-species Reactome All_Levels mapping partitions. Each mapping file is downloaded and split for all species the first time and reused by later curations',
+        metavar='<path>',
+        type=str,
+        required=False)
+    curate_opts.add_argument(
+        '--threads',
+        help='Number of worker processes to use when parsing Reactome pathway files (default: 1)',
+        metavar='<int>',
+        type=int,
+        default=1,
+        required=False)
     curate_opts.add_argument(
         '--collapse_with_modifiers',
         help='Include modifiers when considering a potential reaction collapse.',
@@ -407,6 +481,23 @@ def parse_arguments(
         metavar='<path/filename>',
         type=str,
         required=False)
+    curate_opts.add_argument(
+        '--progress_stream',
+        help='Also write progress as newline-delimited JSON events to a file or named pipe (use - for stdout)',
+        metavar='<path/filename>',
+        type=str,
+        required=False)
+    curate_opts.add_argument(
+        '--profile',
+        help='Write per-stage wall time, CPU time, peak memory and counters to a JSON report (memory tracing slows the run)',
+        metavar='<path/filename.json>',
+        type=str,
+        required=False)
+    curate_opts.add_argument(
+        '--cprofile',
+        help='With --profile, also dump cProfile statistics for each stage next to the report',
+        action='store_true',
+        required=False)
 
 
     # Get arguments are print help if no arguments provided
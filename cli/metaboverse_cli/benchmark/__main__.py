@@ -0,0 +1,1005 @@
+"""License Information
+metaboverse-cli
+Back-end CLI Tool for Curating Metabolic Networks for Metaboverse
+https://github.com/Metaboverse/metaboverse-cli/
+alias: metaboverse-cli
+
+MIT License
+
+Copyright (c) Jordan A. Berg, The University of Utah
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+from __future__ import print_function
+import numpy as np
+import subprocess
+import argparse
+import tempfile
+import tarfile
+import shutil
+import json
+import time
+import sys
+import os
+from pathlib import Path
+
+
+def get_project_root():
+    """Get the path to the project root directory"""
+    current_file = Path(__file__).resolve()
+    for parent in current_file.parents:
+        if parent.name == 'cli':
+            return parent
+        if parent.name == 'Metaboverse':
+            return parent / 'cli'
+    return current_file.parent.parent.parent
+
+# Add project root to path
+project_root = get_project_root()
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+if str(project_root.parent) not in sys.path:
+    sys.path.insert(0, str(project_root.parent))
+
+try:
+    # First try normal package imports
+    from metaboverse_cli import __version__
+    from metaboverse_cli.analyze.model import load_references, build_graph, \
+        compile_pathway_degree, compile_node_degrees, map_attributes, \
+        broadcast_values, make_motif_reaction_dictionary, output_graph
+    from metaboverse_cli.analyze.collapse import collapse_nodes, \
+        generate_updated_dictionary
+    from metaboverse_cli.analyze.utils import remove_defective_reactions
+    from metaboverse_cli.analyze.__main__ import make_neighbors_dictionary
+    from metaboverse_cli.curate.load_reactions_db import get_pathways, \
+        PathwayArchive, get_database, add_species, add_names, add_bigg_names, get_namespace, \
+        process_components, load_sbml, process_manual, stream_manual, \
+        load_custom_json, process_custom
+    from metaboverse_cli.curate.__main__ import build_chebi_synonyms, \
+        add_reactome_metabolites, parse_complexes, reference_complex_species, \
+        parse_table
+    from metaboverse_cli.curate.utils import read_reactome_mapping, \
+        split_reactome_mapping
+    from metaboverse_cli.benchmark.synthetic import get_scale, make_network, \
+        make_metabolite_mapper, make_omics, make_reference_tables, \
+        write_synthetic
+    from metaboverse_cli.benchmark.sbml import write_reactome_pathways, \
+        write_bigg_model, write_custom_model
+    from metaboverse_cli.profiler import start_profiler, write_profile_report, \
+        profile_stage, get_profiler
+except ImportError:
+    try:
+        # Then try relative imports
+        from __init__ import __version__
+        from analyze.model import load_references, build_graph, \
+            compile_pathway_degree, compile_node_degrees, map_attributes, \
+            broadcast_values, make_motif_reaction_dictionary, output_graph
+        from analyze.collapse import collapse_nodes, generate_updated_dictionary
+        from analyze.utils import remove_defective_reactions
+        from analyze.__main__ import make_neighbors_dictionary
+        from curate.load_reactions_db import get_pathways, PathwayArchive, \
+            get_database, \
+            add_species, add_names, add_bigg_names, get_namespace, \
+            process_components, load_sbml, process_manual, stream_manual, \
+            load_custom_json, process_custom
+        from curate.__main__ import build_chebi_synonyms, \
+            add_reactome_metabolites, parse_complexes, \
+            reference_complex_species, parse_table
+        from curate.utils import read_reactome_mapping, \
+            split_reactome_mapping
+        from benchmark.synthetic import get_scale, make_network, \
+            make_metabolite_mapper, make_omics, make_reference_tables, \
+            write_synthetic
+        from benchmark.sbml import write_reactome_pathways, write_bigg_model, \
+            write_custom_model
+        from profiler import start_profiler, write_profile_report, \
+            profile_stage, get_profiler
+    except ImportError:
+        try:
+            # Finally try direct imports
+            import importlib.util
+            def load_module(name, path):
+                spec = importlib.util.spec_from_file_location(name, path)
+                if spec is None:
+                    raise ImportError(f"Could not find module at {path}")
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                return module
+
+            base_path = os.path.dirname(os.path.dirname(__file__))
+
+            init = load_module("__init__", os.path.join(base_path, "__init__.py"))
+            __version__ = init.__version__
+
+            model = load_module("model", os.path.join(base_path, "analyze", "model.py"))
+            load_references = model.load_references
+            build_graph = model.build_graph
+            compile_pathway_degree = model.compile_pathway_degree
+            compile_node_degrees = model.compile_node_degrees
+            map_attributes = model.map_attributes
+            broadcast_values = model.broadcast_values
+            make_motif_reaction_dictionary = model.make_motif_reaction_dictionary
+            output_graph = model.output_graph
+
+            collapse = load_module("collapse", os.path.join(base_path, "analyze", "collapse.py"))
+            collapse_nodes = collapse.collapse_nodes
+            generate_updated_dictionary = collapse.generate_updated_dictionary
+
+            utils_analyze = load_module("utils_analyze", os.path.join(base_path, "analyze", "utils.py"))
+            remove_defective_reactions = utils_analyze.remove_defective_reactions
+
+            analyze_main = load_module("analyze_main", os.path.join(base_path, "analyze", "__main__.py"))
+            make_neighbors_dictionary = analyze_main.make_neighbors_dictionary
+
+            load_reactions_db = load_module("load_reactions_db", os.path.join(base_path, "curate", "load_reactions_db.py"))
+            get_pathways = load_reactions_db.get_pathways
+            PathwayArchive = load_reactions_db.PathwayArchive
+            get_database = load_reactions_db.get_database
+            add_species = load_reactions_db.add_species
+            add_names = load_reactions_db.add_names
+            add_bigg_names = load_reactions_db.add_bigg_names
+            get_namespace = load_reactions_db.get_namespace
+            process_components = load_reactions_db.process_components
+            load_sbml = load_reactions_db.load_sbml
+            process_manual = load_reactions_db.process_manual
+            stream_manual = load_reactions_db.stream_manual
+            load_custom_json = load_reactions_db.load_custom_json
+            process_custom = load_reactions_db.process_custom
+
+            curate_main = load_module("curate_main", os.path.join(base_path, "curate", "__main__.py"))
+            build_chebi_synonyms = curate_main.build_chebi_synonyms
+            add_reactome_metabolites = curate_main.add_reactome_metabolites
+            parse_complexes = curate_main.parse_complexes
+            reference_complex_species = curate_main.reference_complex_species
+            parse_table = curate_main.parse_table
+
+            curate_utils = load_module("curate_utils", os.path.join(base_path, "curate", "utils.py"))
+            read_reactome_mapping = curate_utils.read_reactome_mapping
+            split_reactome_mapping = curate_utils.split_reactome_mapping
+
+            synthetic = load_module("synthetic", os.path.join(base_path, "benchmark", "synthetic.py"))
+            get_scale = synthetic.get_scale
+            make_network = synthetic.make_network
+            make_metabolite_mapper = synthetic.make_metabolite_mapper
+            make_omics = synthetic.make_omics
+            make_reference_tables = synthetic.make_reference_tables
+            write_synthetic = synthetic.write_synthetic
+
+            sbml = load_module("sbml", os.path.join(base_path, "benchmark", "sbml.py"))
+            write_reactome_pathways = sbml.write_reactome_pathways
+            write_bigg_model = sbml.write_bigg_model
+            write_custom_model = sbml.write_custom_model
+
+            profiler = load_module("profiler", os.path.join(base_path, "profiler.py"))
+            start_profiler = profiler.start_profiler
+            write_profile_report = profiler.write_profile_report
+            profile_stage = profiler.profile_stage
+            get_profiler = profiler.get_profiler
+        except ImportError as e:
+            print(f"Error importing dependencies: {e}")
+            print(f"Current sys.path: {sys.path}")
+            print(f"Current directory: {os.getcwd()}")
+            print(f"File location: {__file__}")
+            raise
+
+
+def get_git_commit():
+    """Get the checked out commit of the source tree, if available
+    """
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            timeout=10)
+    except Exception:
+        return None
+    if commit.returncode != 0:
+        return None
+
+    return commit.stdout.strip()
+
+
+def run_pipeline(
+        args_dict,
+        network,
+        data,
+        stats,
+        metabolite_mapper):
+    """Run the analyze steps of __template__() and __model__() on a network
+    held in memory, recording each as a profiler stage
+    """
+
+    with profile_stage(args_dict, 'load_references'):
+        reverse_genes, protein_dictionary, chebi_dictionary, \
+            name_reference, uniprot_mapper = load_references(
+                args_dict=args_dict,
+                ensembl=network['ensembl_synonyms'],
+                uniprot=network['uniprot_synonyms'],
+                chebi=network['chebi_mapper'],
+                uniprot_metabolites=network['uniprot_metabolites'])
+
+    with profile_stage(args_dict, 'build_graph') as stage:
+        G, network['reaction_database'], network['pathway_database'] = build_graph(
+            args_dict=args_dict,
+            network=network['reaction_database'],
+            pathway_database=network['pathway_database'],
+            species_reference=network['species_database'],
+            name_reference=network['name_database'],
+            protein_reference=protein_dictionary,
+            chebi_dictionary=chebi_dictionary,
+            uniprot_reference=network['uniprot_synonyms'],
+            complexes=network['complex_dictionary'],
+            species_id=network['organism_id'],
+            gene_reference=network['ensembl_synonyms'],
+            compartment_reference=network['compartment_dictionary'],
+            component_database=network['components_database'])
+        stage.count(
+            reactions=len(network['reaction_database']),
+            nodes=G.number_of_nodes(),
+            edges=G.number_of_edges())
+
+    scale_factor = int(len(network['reaction_database'].keys()) * 0.0157)
+    super_pathways = compile_pathway_degree(
+        pathways=network['pathway_database'],
+        scale_factor=scale_factor)
+    degree_dictionary = compile_node_degrees(
+        graph=G)
+    no_defective_reactions = remove_defective_reactions(
+        network=network)
+
+    with profile_stage(args_dict, 'make_neighbors_dictionary') as stage:
+        neighbors_dictionary = make_neighbors_dictionary(
+            args_dict=args_dict,
+            graph=G,
+            reaction_dictionary=no_defective_reactions)
+        stage.count(reactions=len(neighbors_dictionary) - 3)
+
+    with profile_stage(args_dict, 'map_attributes') as stage:
+        G, max_value, max_stat, non_mappers = map_attributes(
+            args_dict=args_dict,
+            graph=G,
+            data=data,
+            stats=stats,
+            name_reference=name_reference,
+            degree_dictionary=degree_dictionary,
+            chebi_dictionary=chebi_dictionary,
+            chebi_synonyms=network['chebi_synonyms'],
+            uniprot_mapper=uniprot_mapper,
+            metabolite_mapper=metabolite_mapper,
+            ignore_enantiomers=True)
+        stage.count(
+            rows=len(data.index),
+            unmapped_metabolites=len(non_mappers))
+
+    categories = data.columns.tolist()
+    with profile_stage(args_dict, 'broadcast_values') as stage:
+        G = broadcast_values(
+            args_dict=args_dict,
+            graph=G,
+            categories=categories,
+            max_value=max_value,
+            max_stat=max_stat,
+            broadcast_genes=args_dict['broadcast_genes'],
+            broadcast_metabolites=args_dict['broadcast_metabolites'],
+            stat_type='float')
+        stage.count(inferred_nodes=sum(
+            1 for x in G.nodes()
+            if G.nodes()[x].get('inferred') == 'true'))
+
+    degrees = [v for k, v in degree_dictionary.items() if 'reaction' not in k]
+    if len(degrees) > 0:
+        degree_threshold = np.percentile(degrees, 98)
+    else:
+        degree_threshold = 0
+
+    with profile_stage(args_dict, 'collapse_nodes') as stage:
+        G, updated_reactions, changed_reactions, \
+        removed_reaction = collapse_nodes(
+            args_dict=args_dict,
+            graph=G,
+            reaction_dictionary=no_defective_reactions,
+            neighbors_dictionary=neighbors_dictionary,
+            degree_dictionary=degree_dictionary,
+            samples=len(categories),
+            collapse_with_modifiers=args_dict['collapse_with_modifiers'],
+            blocklist=[],
+            degree_threshold=degree_threshold,
+            collapse_threshold=args_dict['collapse_threshold'])
+        stage.count(
+            reactions=len(no_defective_reactions),
+            collapsed_reactions=len(changed_reactions),
+            removed_reactions=len(removed_reaction))
+
+    updated_pathway_dictionary = generate_updated_dictionary(
+        original_database=network['pathway_database'],
+        update_dictionary=changed_reactions,
+        removed_reaction=removed_reaction)
+    motif_reaction_dictionary = make_motif_reaction_dictionary(
+        network=network,
+        updated_reactions=updated_reactions,
+        updated_pathway_dictionary=updated_pathway_dictionary)
+    mod_collapsed_pathways = {}
+    for k, v in updated_pathway_dictionary.items():
+        mod_collapsed_pathways[v['id']] = v
+
+    with profile_stage(args_dict, 'output_graph') as stage:
+        output_graph(
+            graph=G,
+            output_name=os.path.join(
+                args_dict['output'], network['organism_id'] + '.mvrs'),
+            pathway_dictionary=network['pathway_database'],
+            collapsed_pathway_dictionary=updated_pathway_dictionary,
+            super_pathways=super_pathways,
+            reaction_dictionary=network['reaction_database'],
+            collapsed_reaction_dictionary=updated_reactions,
+            motif_reaction_dictionary=motif_reaction_dictionary,
+            mod_collapsed_pathways=mod_collapsed_pathways,
+            degree_dictionary=degree_dictionary,
+            max_value=max_value,
+            max_stat=max_stat,
+            categories=categories,
+            labels=args_dict['labels'],
+            blocklist=[],
+            species_blocklist=[],
+            metadata=args_dict,
+            unmapped=non_mappers)
+        stage.count(
+            nodes=G.number_of_nodes(),
+            edges=G.number_of_edges())
+
+    return G
+
+
+def prepare_benchmark(
+        args_dict):
+    """Set up the output directory and start the profiler
+    - A temporary directory is used if no output directory is given
+
+    Returns the temporary directory to remove afterwards, or None
+    """
+
+    temporary = None
+    if args_dict.get('output') == None:
+        temporary = tempfile.mkdtemp(prefix='metaboverse_benchmark_')
+        args_dict['output'] = temporary
+    args_dict['output'] = os.path.abspath(args_dict['output']) + os.path.sep
+
+    args_dict['cmd'] = 'benchmark'
+    args_dict['organism_id'] = args_dict.get('organism_id', 'SYN')
+    args_dict['profile'] = args_dict['report']
+    start_profiler(args_dict)
+
+    return temporary
+
+
+def finish_benchmark(
+        args_dict,
+        temporary,
+        extra):
+    """Write the report with the benchmark settings and source commit added
+    """
+
+    extra['version'] = __version__
+    extra['commit'] = get_git_commit()
+    write_profile_report(
+        args_dict,
+        extra=extra)
+    if temporary != None:
+        shutil.rmtree(temporary, ignore_errors=True)
+
+
+def run_benchmark(
+        args_dict):
+    """Generate a synthetic network and time the analyze pipeline on it
+    - Writes a --profile style JSON report to args_dict['report'], with the
+    benchmark settings and source commit added
+    """
+
+    reactions = get_scale(args_dict['reactions'])
+    temporary = prepare_benchmark(args_dict)
+    args_dict.update({
+        'labels': '',
+        'blocklist': '',
+        'collapse_with_modifiers': False,
+        'collapse_threshold': 0.3,
+        'broadcast_genes': True,
+        'broadcast_metabolites': True})
+
+    try:
+        print('Generating synthetic network with ' + str(reactions) \
+            + ' reactions (seed ' + str(args_dict['seed']) + ')...')
+        with profile_stage(args_dict, 'generate') as stage:
+            network = make_network(
+                reactions=reactions,
+                seed=args_dict['seed'],
+                organism_id=args_dict['organism_id'],
+                species=args_dict.get('species'))
+            data, stats = make_omics(
+                network=network,
+                samples=args_dict['samples'],
+                seed=args_dict['seed'])
+            metabolite_mapper = make_metabolite_mapper(
+                network=network)
+            stage.count(
+                reactions=len(network['reaction_database']),
+                components=len(network['components_database']),
+                rows=len(data.index))
+        if args_dict.get('write_inputs') == True:
+            write_synthetic(
+                output=args_dict['output'],
+                network=network,
+                data=data,
+                stats=stats)
+
+        start = time.perf_counter()
+        run_pipeline(
+            args_dict=args_dict,
+            network=network,
+            data=data,
+            stats=stats,
+            metabolite_mapper=metabolite_mapper)
+        print('Pipeline completed in ' \
+            + str(round(time.perf_counter() - start, 2)) + ' seconds')
+    finally:
+        finish_benchmark(
+            args_dict=args_dict,
+            temporary=temporary,
+            extra={
+                'benchmark': {
+                    'suite': 'analyze',
+                    'reactions': reactions,
+                    'species': args_dict.get('species'),
+                    'seed': args_dict['seed'],
+                    'samples': args_dict['samples']}})
+
+    with open(args_dict['report']) as report_file:
+        return json.load(report_file)
+
+
+def time_reactome(
+        args_dict,
+        network,
+        annotation_density):
+    """Time parsing, species extraction, name database construction and the
+    full process_components() on Reactome-style pathway files
+    """
+
+    with profile_stage(args_dict, 'reactome.generate'):
+        pathways_dir, pathways = write_reactome_pathways(
+            output=os.path.join(args_dict['output'], 'reactome'),
+            network=network,
+            annotation_density=annotation_density)
+
+    with profile_stage(args_dict, 'reactome.parse_sbml') as stage:
+        pathways_list = get_pathways(
+            species_id=network['organism_id'],
+            pathways_dir=pathways_dir)
+        records = []
+        for pathway in pathways_list:
+            db = get_database(pathways_dir, pathway)
+            sbml_namespace = get_namespace(sbml_tree=db)
+            records.append((
+                db.findall(str(sbml_namespace + 'model'))[0],
+                sbml_namespace))
+        species = sum(
+            len(r.findall(str(ns + 'listOfSpecies'))[0]) for r, ns in records)
+        stage.count(
+            pathways=len(records),
+            reactions=sum(
+                len(r.findall(str(ns + 'listOfReactions'))[0])
+                for r, ns in records),
+            species=species)
+
+    with profile_stage(args_dict, 'reactome.extract_species') as stage:
+        species_database = {}
+        components_database = {}
+        species_cache = {}
+        for pathway_record, sbml_namespace in records:
+            species_database, name_database, compartment_database, \
+                components_database = add_species(
+                    species_database=species_database,
+                    name_database={},
+                    compartment_database={},
+                    components_database=components_database,
+                    pathway_record=pathway_record,
+                    sbml_namespace=sbml_namespace,
+                    species_cache=species_cache)
+        stage.count(
+            species=species,
+            unique_species=len(components_database))
+
+    with profile_stage(args_dict, 'reactome.name_database') as stage:
+        name_database = {}
+        for pathway_record, sbml_namespace in records:
+            for child in pathway_record.findall(
+                    str(sbml_namespace + 'listOfSpecies'))[0]:
+                name_database = add_names(
+                    name_database=name_database,
+                    child=child,
+                    specie=child.attrib.get('id', ''))
+        stage.count(
+            species=species,
+            names=len(name_database))
+    del records
+
+    with profile_stage(args_dict, 'reactome.process_components') as stage:
+        args_dict, pathway_database, reaction_database, species_database, \
+        name_database, compartment_database, compartment_dictionary, \
+        components_database = process_components(
+            output_dir=args_dict['output'],
+            pathways_dir=pathways_dir,
+            pathways_list=pathways_list,
+            species_id=network['organism_id'],
+            args_dict=args_dict)
+        stage.count(
+            pathways=len(pathway_database),
+            reactions=sum(
+                len(v['reactions']) for v in pathway_database.values()),
+            species=species,
+            unique_reactions=len(reaction_database),
+            unique_species=len(components_database))
+
+    archive_file = os.path.join(
+        args_dict['output'], 'all_species.3.1.sbml.tgz')
+    with tarfile.open(archive_file, 'w:gz') as tar:
+        for pathway in pathways_list:
+            tar.add(
+                os.path.join(pathways_dir, pathway + '.sbml'),
+                arcname=pathway + '.sbml')
+
+    with profile_stage(args_dict, 'reactome.process_archive') as stage:
+        archive = PathwayArchive(
+            tar_file=archive_file,
+            species_id=network['organism_id'])
+        args_dict, pathway_database, reaction_database, species_database, \
+        name_database, compartment_database, compartment_dictionary, \
+        components_database = process_components(
+            output_dir=args_dict['output'],
+            pathways_dir=archive,
+            pathways_list=get_pathways(
+                species_id=network['organism_id'],
+                pathways_dir=archive),
+            species_id=network['organism_id'],
+            args_dict=args_dict)
+        archive.close()
+        stage.count(
+            pathways=len(pathway_database),
+            reactions=sum(
+                len(v['reactions']) for v in pathway_database.values()),
+            species=species)
+
+
+def time_bigg(
+        args_dict,
+        network,
+        annotation_density):
+    """Time parsing, name database construction and the full
+    process_manual() on a BiGG-style SBML model, and the single-pass
+    stream_manual() loader
+    """
+
+    with profile_stage(args_dict, 'bigg.generate'):
+        model_file = write_bigg_model(
+            output=os.path.join(args_dict['output'], 'bigg'),
+            network=network,
+            annotation_density=annotation_density)
+
+    reactions = len(network['reaction_database'])
+    species = len(network['components_database'])
+    with profile_stage(args_dict, 'bigg.parse_sbml') as stage:
+        sbml_db = load_sbml(
+            sbml_url=model_file)
+        stage.count(
+            reactions=reactions,
+            species=species)
+
+    with profile_stage(args_dict, 'bigg.name_database') as stage:
+        sbml_namespace = get_namespace(sbml_tree=sbml_db)
+        name_database = {}
+        for child in sbml_db[0].findall(
+                str(sbml_namespace + 'listOfSpecies'))[0]:
+            specie = child.attrib.get('id', '')
+            name_database = add_names(
+                name_database=name_database,
+                child=child,
+                specie=specie)
+            name_database = add_bigg_names(
+                name_database=name_database,
+                child=child,
+                specie=specie,
+                sbml_namespace=sbml_namespace)
+        stage.count(
+            species=species,
+            names=len(name_database))
+
+    with profile_stage(args_dict, 'bigg.process_manual') as stage:
+        process_manual(
+            sbml_db=sbml_db,
+            args_dict=args_dict)
+        stage.count(
+            reactions=reactions,
+            species=species)
+    del sbml_db
+
+    with profile_stage(args_dict, 'bigg.stream_manual') as stage:
+        stream_manual(
+            sbml_url=model_file,
+            args_dict=args_dict)
+        stage.count(
+            reactions=reactions,
+            species=species)
+
+
+def time_custom(
+        args_dict,
+        network):
+    """Time reading and process_custom() on a custom JSON model
+    """
+
+    with profile_stage(args_dict, 'custom.generate'):
+        model_file = write_custom_model(
+            output=os.path.join(args_dict['output'], 'custom'),
+            network=network)
+
+    reactions = len(network['reaction_database'])
+    species = len(network['components_database'])
+    with profile_stage(args_dict, 'custom.parse_json') as stage:
+        sbml_db = load_custom_json(
+            sbml_url=model_file)
+        stage.count(
+            reactions=reactions,
+            species=species)
+
+    with profile_stage(args_dict, 'custom.process_custom') as stage:
+        process_custom(
+            sbml_db=sbml_db,
+            sbml_url=model_file,
+            args_dict=args_dict)
+        stage.count(
+            reactions=reactions,
+            species=species)
+
+
+def time_tables(
+        args_dict,
+        network,
+        rows):
+    """Time the ChEBI and Reactome reference table parsing in curate
+    """
+
+    with profile_stage(args_dict, 'tables.generate'):
+        tables = make_reference_tables(
+            network=network,
+            rows=rows,
+            seed=args_dict['seed'])
+
+    with profile_stage(args_dict, 'tables.chebi_synonyms') as stage:
+        chebi_mapper, chebi_synonyms, uniprot_metabolites = \
+            build_chebi_synonyms(
+                chebi=tables['chebi_names'])
+        stage.count(
+            rows=len(tables['chebi_names'].index),
+            chebi_ids=len(chebi_synonyms))
+
+    with profile_stage(args_dict, 'tables.supplement_components') as stage:
+        species_database, name_database, components_database = \
+            add_reactome_metabolites(
+                species_database=dict(network['species_database']),
+                name_database=dict(network['name_database']),
+                components_database=dict(network['components_database']),
+                compartment_dictionary=network['compartment_dictionary'],
+                species_id=network['organism_id'],
+                chebi=tables['chebi_reactome'])
+        stage.count(
+            rows=len(tables['chebi_reactome'].index),
+            species=len(species_database))
+
+    mapping_file = os.path.join(
+        args_dict['output'], 'ChEBI2Reactome_PE_All_Levels.txt')
+    tables['chebi_reactome'].to_csv(
+        mapping_file, sep='\t', header=False, index=False)
+
+    with profile_stage(args_dict, 'tables.read_mapping') as stage:
+        mapping = read_reactome_mapping(
+            mapping_file,
+            species_id=network['organism_id'],
+            usecols=[1, 2, 3])
+        stage.count(
+            rows=len(tables['chebi_reactome'].index),
+            species_rows=len(mapping.index))
+
+    with profile_stage(args_dict, 'tables.split_mapping') as stage:
+        partition_dir = split_reactome_mapping(
+            mapping_file,
+            os.path.join(args_dict['output'], 'mappings'))
+        stage.count(
+            rows=len(tables['chebi_reactome'].index),
+            partitions=len(os.listdir(partition_dir)))
+    os.remove(mapping_file)
+
+    with profile_stage(args_dict, 'tables.parse_complexes') as stage:
+        complex_dictionary = parse_complexes(tables)
+        stage.count(
+            rows=len(tables['complex_participants'].index) \
+                + len(tables['complex_pathway'].index),
+            complexes=len(complex_dictionary))
+
+    with profile_stage(args_dict, 'tables.reference_complex_species') as stage:
+        complex_dictionary = reference_complex_species(
+            reference=complex_dictionary,
+            name_database=name_database)
+        stage.count(
+            complexes=len(complex_dictionary))
+
+    with profile_stage(args_dict, 'tables.parse_table') as stage:
+        parse_table(
+            reference=tables,
+            key='analyte_reactions')
+        stage.count(
+            rows=len(tables['analyte_reactions'].index))
+
+
+def get_throughput(
+        stages):
+    """Reactions, species and table rows per second for each stage that
+    counts them
+    """
+
+    throughput = {}
+    for s in stages:
+        if s == {} or s['name'].endswith('generate'):
+            continue
+        rates = {}
+        for key in ['reactions', 'species', 'rows']:
+            if key in s['counters']:
+                rates[key + '_per_second'] = round(
+                    s['counters'][key] / max(s['wall_time'], 1e-9), 1)
+        if len(rates) > 0:
+            throughput[s['name']] = rates
+
+    return throughput
+
+
+def run_curation_benchmark(
+        args_dict):
+    """Write synthetic Reactome, BiGG and custom models and time the curation
+    parsers on them
+    - Writes a --profile style JSON report to args_dict['report'], with
+    reactions/s and species/s for each stage added
+    """
+
+    reactions = get_scale(args_dict['reactions'])
+    formats = [
+        f.strip().lower()
+        for f in str(args_dict.get('formats', 'reactome,bigg,custom')).split(',')]
+    annotation_density = args_dict.get('annotation_density', 1)
+
+    temporary = prepare_benchmark(args_dict)
+    args_dict['session_data'] = os.path.join(
+        args_dict['output'], 'session_data.json')
+    args_dict['database_source'] = 'biomodels/bigg'
+    with open(args_dict['session_data'], 'w') as session_file:
+        json.dump({}, session_file)
+
+    throughput = {}
+    try:
+        network = make_network(
+            reactions=reactions,
+            seed=args_dict['seed'],
+            organism_id=args_dict['organism_id'],
+            species=args_dict.get('species'))
+        print('Timing curation of ' + str(reactions) + ' reactions and ' \
+            + str(len(network['components_database'])) + ' species...')
+
+        if 'reactome' in formats:
+            time_reactome(
+                args_dict=args_dict,
+                network=network,
+                annotation_density=annotation_density)
+        if 'bigg' in formats:
+            time_bigg(
+                args_dict=args_dict,
+                network=network,
+                annotation_density=annotation_density)
+        if 'custom' in formats:
+            time_custom(
+                args_dict=args_dict,
+                network=network)
+        if 'tables' in formats:
+            time_tables(
+                args_dict=args_dict,
+                network=network,
+                rows=args_dict.get('table_rows', 200000))
+
+        profiler = get_profiler(args_dict)
+        if profiler != None:
+            throughput = get_throughput([s.record for s in profiler.stages])
+    finally:
+        finish_benchmark(
+            args_dict=args_dict,
+            temporary=temporary,
+            extra={
+                'benchmark': {
+                    'suite': 'curation',
+                    'reactions': reactions,
+                    'species': args_dict.get('species'),
+                    'seed': args_dict['seed'],
+                    'annotation_density': annotation_density,
+                    'threads': args_dict.get('threads', 1),
+                    'table_rows': args_dict.get('table_rows', 200000),
+                    'formats': formats},
+                'throughput': throughput})
+
+    print('\n{:<36}{:>16}{:>16}{:>16}'.format(
+        'stage', 'reactions/s', 'species/s', 'rows/s'))
+    for k, v in throughput.items():
+        print('{:<36}{:>16}{:>16}{:>16}'.format(
+            k,
+            str(v.get('reactions_per_second', '')),
+            str(v.get('species_per_second', '')),
+            str(v.get('rows_per_second', ''))))
+
+    with open(args_dict['report']) as report_file:
+        return json.load(report_file)
+
+
+def compare_reports(
+        baseline,
+        report):
+    """Print per-stage wall time and memory peak of a report against a
+    baseline report
+    """
+
+    baseline_stages = {s['name']: s for s in baseline['stages']}
+
+    print('\n{:<28}{:>12}{:>12}{:>9}{:>12}{:>12}{:>9}'.format(
+        'stage', 'base (s)', 'new (s)', 'ratio',
+        'base (MB)', 'new (MB)', 'ratio'))
+    for s in report['stages']:
+        if s['name'] not in baseline_stages:
+            continue
+        b = baseline_stages[s['name']]
+        print('{:<28}{:>12.3f}{:>12.3f}{:>9.2f}{:>12.1f}{:>12.1f}{:>9.2f}'.format(
+            s['name'],
+            b['wall_time'],
+            s['wall_time'],
+            s['wall_time'] / max(b['wall_time'], 1e-9),
+            b['memory_peak'] / 1e6,
+            s['memory_peak'] / 1e6,
+            s['memory_peak'] / max(b['memory_peak'], 1)))
+    if baseline.get('benchmark') != report.get('benchmark'):
+        print('Warning: benchmark settings differ from the baseline report')
+
+
+def parse_arguments(
+        args=None):
+    """Parse benchmark arguments
+    """
+
+    parser = argparse.ArgumentParser(
+        prog='python -m metaboverse_cli.benchmark',
+        description='Time and memory-profile the analyze pipeline on a ' \
+            + 'synthetic network, without network access.')
+    parser.add_argument(
+        '--suite',
+        help='Pipeline to time: analyze (graph building through output) or curation (SBML/JSON model parsing)',
+        choices=['analyze', 'curation'],
+        default='analyze')
+    parser.add_argument(
+        '-r', '--reactions',
+        help='Number of reactions, or a named scale (1k, 10k, 100k)',
+        type=str,
+        default='1k')
+    parser.add_argument(
+        '-s', '--seed',
+        help='Random seed for the synthetic network and data',
+        type=int,
+        default=0)
+    parser.add_argument(
+        '--species',
+        help='Approximate number of species (default scales with --reactions)',
+        type=int,
+        required=False)
+    parser.add_argument(
+        '--annotation_density',
+        help='Extra cross-references per species and reaction in generated SBML (curation suite)',
+        type=int,
+        default=1)
+    parser.add_argument(
+        '--formats',
+        help='Comma separated model formats to time (curation suite); add tables to time ChEBI/Reactome reference table parsing',
+        metavar='reactome,bigg,custom,tables',
+        type=str,
+        default='reactome,bigg,custom')
+    parser.add_argument(
+        '--table_rows',
+        help='Rows per synthetic reference table for the tables format (default 200000)',
+        type=int,
+        default=200000)
+    parser.add_argument(
+        '--samples',
+        help='Number of data columns',
+        type=int,
+        default=3)
+    parser.add_argument(
+        '--report',
+        help='Path and filename for the JSON report',
+        metavar='<path/filename.json>',
+        type=str,
+        default='benchmark.json')
+    parser.add_argument(
+        '--compare',
+        help='Previous JSON report to compare stage times against',
+        metavar='<path/filename.json>',
+        type=str,
+        required=False)
+    parser.add_argument(
+        '-o', '--output',
+        help='Directory for the output graph and neighbors files (a temporary directory is used if not given)',
+        metavar='<path>',
+        type=str,
+        required=False)
+    parser.add_argument(
+        '--write_inputs',
+        help='Also write the synthetic .mvdb and data tables to --output',
+        action='store_true',
+        required=False)
+    parser.add_argument(
+        '-t', '--threads',
+        help='Worker processes for Reactome pathway parsing (curation suite)',
+        type=int,
+        default=1)
+    parser.add_argument(
+        '--no_memory',
+        help='Skip tracemalloc memory tracking, which slows the timed code',
+        action='store_true',
+        required=False)
+    parser.add_argument(
+        '--cprofile',
+        help='Also write a cProfile dump for each stage next to the report',
+        action='store_true',
+        required=False)
+
+    return vars(parser.parse_args(args))
+
+
+def main(
+        args=None):
+
+    args_dict = parse_arguments(args)
+    args_dict['profile_memory'] = not args_dict.pop('no_memory')
+    if args_dict['suite'] == 'curation':
+        report = run_curation_benchmark(args_dict)
+    else:
+        report = run_benchmark(args_dict)
+
+    if args_dict.get('compare') != None:
+        with open(args_dict['compare']) as baseline_file:
+            baseline = json.load(baseline_file)
+        compare_reports(
+            baseline=baseline,
+            report=report)
+
+
+if __name__ == '__main__':
+    main()
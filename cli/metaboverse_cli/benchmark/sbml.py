@@ -0,0 +1,461 @@
+"""License Information
+metaboverse-cli
+Back-end CLI Tool for Curating Metabolic Networks for Metaboverse
+https://github.com/Metaboverse/metaboverse-cli/
+alias: metaboverse-cli
+
+MIT License
+
+Copyright (c) Jordan A. Berg, The University of Utah
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+from __future__ import print_function
+from xml.sax.saxutils import escape, quoteattr
+import json
+import os
+
+
+SBML_HEADER = "<?xml version='1.0' encoding='utf-8' standalone='no'?>\n"
+RDF_OPEN = '<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" ' \
+    + 'xmlns:bqbiol="http://biomodels.net/biology-qualifiers/">'
+
+# SBO terms used by Reactome exports
+SBO_TERMS = {
+    'metabolite_component': 'SBO:0000247',
+    'protein_component': 'SBO:0000297',
+    'complex_component': 'SBO:0000253'}
+
+
+def get_resource(
+        _id,
+        style='reactome'):
+    """Identifiers.org / Reactome style URL for a CHEBI or UniProt ID
+    """
+
+    if _id.startswith('CHEBI:'):
+        if style == 'reactome':
+            return 'https://www.ebi.ac.uk/chebi/searchId.do?chebiId=' + _id
+        return 'http://identifiers.org/chebi/' + _id
+    if style == 'reactome':
+        return 'https://purl.uniprot.org/uniprot/' + _id
+    return 'http://identifiers.org/uniprot/' + _id
+
+
+def write_bag(
+        lines,
+        qualifier,
+        resources,
+        indent):
+    """Add a bqbiol qualifier bag of resource URLs
+    """
+
+    if len(resources) == 0:
+        return
+    lines.append(indent + '<bqbiol:' + qualifier + '>')
+    lines.append(indent + '  <rdf:Bag>')
+    for r in resources:
+        lines.append(indent + '    <rdf:li rdf:resource=' + quoteattr(r) + ' />')
+    lines.append(indent + '  </rdf:Bag>')
+    lines.append(indent + '</bqbiol:' + qualifier + '>')
+
+
+def get_references(
+        key,
+        annotation_density):
+    """Cross-references parsers read past, annotation_density per element
+    """
+
+    return [
+        'http://www.ncbi.nlm.nih.gov/pubmed/' + str(1000000 + key * 10 + i)
+        for i in range(annotation_density)]
+
+
+def write_reactome_species(
+        lines,
+        specie,
+        component,
+        compartment_name,
+        annotation_density):
+    """Add a Reactome-style species element
+    """
+
+    key = int(specie.split('_')[1])
+    metaid = 'metaid_s' + str(key)
+    lines.append(
+        '      <species boundaryCondition="false" compartment='
+        + quoteattr(component['compartment'])
+        + ' constant="false" hasOnlySubstanceUnits="false" id='
+        + quoteattr(specie) + ' metaid=' + quoteattr(metaid)
+        + ' name=' + quoteattr(
+            component['name'] + ' [' + compartment_name + ']')
+        + ' sboTerm=' + quoteattr(SBO_TERMS[component['type']]) + '>')
+    lines.append(
+        '        <notes>\n          <p xmlns="http://www.w3.org/1999/xhtml">'
+        + escape('Derived from a synthetic ' + component['type']
+            + ' in ' + compartment_name)
+        + '</p>\n        </notes>')
+    lines.append('        <annotation>')
+    lines.append('          ' + RDF_OPEN)
+    lines.append(
+        '            <rdf:Description rdf:about=' + quoteattr('#' + metaid) + '>')
+    resources = []
+    if component['is'] != '':
+        resources.append(get_resource(component['is']))
+    resources.append(
+        'https://identifiers.org/reactome:' + component['reactome_id'])
+    write_bag(lines, 'is', resources, '              ')
+    write_bag(
+        lines,
+        'hasPart',
+        [get_resource(x) for x in component['hasPart']],
+        '              ')
+    write_bag(
+        lines,
+        'isDescribedBy',
+        get_references(key, annotation_density),
+        '              ')
+    lines.append('            </rdf:Description>')
+    lines.append('          </rdf:RDF>')
+    lines.append('        </annotation>')
+    lines.append('      </species>')
+
+
+def write_reactome_reaction(
+        lines,
+        reaction,
+        annotation_density):
+    """Add a Reactome-style reaction element
+    """
+
+    key = int(reaction['id'].split('_')[1])
+    metaid = 'metaid_r' + str(key)
+    lines.append(
+        '      <reaction compartment=' + quoteattr(reaction['compartment'])
+        + ' fast="false" id=' + quoteattr(reaction['id'])
+        + ' metaid=' + quoteattr(metaid)
+        + ' name=' + quoteattr(reaction['name'])
+        + ' reversible=' + quoteattr(reaction['reversible']) + '>')
+    lines.append(
+        '        <notes>\n          <p xmlns="http://www.w3.org/1999/xhtml">'
+        + escape(reaction['notes']) + '</p>\n        </notes>')
+    lines.append('        <annotation>')
+    lines.append('          ' + RDF_OPEN)
+    lines.append(
+        '            <rdf:Description rdf:about=' + quoteattr('#' + metaid) + '>')
+    write_bag(
+        lines,
+        'is',
+        ['https://identifiers.org/reactome:' + reaction['reactome']],
+        '              ')
+    write_bag(
+        lines,
+        'isDescribedBy',
+        get_references(key, annotation_density),
+        '              ')
+    lines.append('            </rdf:Description>')
+    lines.append('          </rdf:RDF>')
+    lines.append('        </annotation>')
+
+    for tag, direction, items in [
+            ('listOfReactants', 'input', reaction['reactants']),
+            ('listOfProducts', 'output', reaction['products'])]:
+        if len(items) == 0:
+            continue
+        lines.append('        <' + tag + '>')
+        for x in items:
+            lines.append(
+                '          <speciesReference constant="true" id='
+                + quoteattr('speciesreference_' + str(key) + '_' + direction
+                    + '_' + x.split('_')[1])
+                + ' sboTerm="SBO:0000010" species=' + quoteattr(x)
+                + ' stoichiometry="1" />')
+        lines.append('        </' + tag + '>')
+    if len(reaction['modifiers']) > 0:
+        lines.append('        <listOfModifiers>')
+        for x, _type in reaction['modifiers']:
+            lines.append(
+                '          <modifierSpeciesReference id='
+                + quoteattr('modifierspeciesreference_' + str(key) + '_'
+                    + _type + '_' + x.split('_')[1])
+                + ' sboTerm="SBO:0000013" species=' + quoteattr(x) + ' />')
+        lines.append('        </listOfModifiers>')
+    lines.append('      </reaction>')
+
+
+def write_reactome_pathways(
+        output,
+        network,
+        annotation_density=1):
+    """Write a network as one Reactome-style SBML file per pathway, as found
+    in the Reactome all_species SBML download
+    - A species or reaction is written to every pathway file using it
+    - annotation_density sets the number of extra cross-references per
+    species and reaction
+
+    Returns the pathway file directory and pathway names
+    """
+
+    if not os.path.isdir(output):
+        os.makedirs(output)
+
+    components = network['components_database']
+    compartments = network['compartment_dictionary']
+    pathways = []
+    for pathway, record in network['pathway_database'].items():
+        reactions = [network['reaction_database'][r] for r in record['reactions']]
+        if len(reactions) == 0:
+            continue
+
+        species = {}
+        for r in reactions:
+            for x in r['reactants'] + r['products'] \
+                    + [m[0] for m in r['modifiers']]:
+                species[x] = True
+        used_compartments = sorted(set(
+            [components[x]['compartment'] for x in species]
+            + [r['compartment'] for r in reactions]))
+
+        lines = [SBML_HEADER.rstrip()]
+        lines.append(
+            '<sbml xmlns="http://www.sbml.org/sbml/level3/version1/core" '
+            + 'level="3" version="1">')
+        lines.append(
+            '  <model id=' + quoteattr(record['id'])
+            + ' metaid="metaid_0" name=' + quoteattr(record['name']) + '>')
+        lines.append('    <listOfCompartments>')
+        for c in used_compartments:
+            lines.append(
+                '      <compartment constant="true" id=' + quoteattr(c)
+                + ' name=' + quoteattr(compartments[c])
+                + ' sboTerm="SBO:0000290" />')
+        lines.append('    </listOfCompartments>')
+        lines.append('    <listOfSpecies>')
+        for x in species:
+            write_reactome_species(
+                lines=lines,
+                specie=x,
+                component=components[x],
+                compartment_name=compartments[components[x]['compartment']],
+                annotation_density=annotation_density)
+        lines.append('    </listOfSpecies>')
+        lines.append('    <listOfReactions>')
+        for r in reactions:
+            write_reactome_reaction(
+                lines=lines,
+                reaction=r,
+                annotation_density=annotation_density)
+        lines.append('    </listOfReactions>')
+        lines.append('  </model>')
+        lines.append('</sbml>')
+
+        with open(os.path.join(output, pathway + '.sbml'), 'w') as sbml_file:
+            sbml_file.write('\n'.join(lines) + '\n')
+        pathways.append(pathway)
+
+    return output, pathways
+
+
+def get_bigg_id(
+        prefix,
+        _id):
+
+    return prefix + _id.replace(' ', '_').replace('+', 'p') \
+        .replace(':', '_').replace('-', '_')
+
+
+def write_bigg_model(
+        output,
+        network,
+        annotation_density=1):
+    """Write a network as a single BiGG/BioModels-style SBML model
+    - Metabolites carry bigg, chebi and further identifiers.org references;
+    with annotation_density > 0, some also carry BioModels-style notes
+    - Proteins are written as species annotated with UniProt IDs
+
+    Returns the model file path
+    """
+
+    if not os.path.isdir(output):
+        os.makedirs(output)
+
+    components = network['components_database']
+    compartments = network['compartment_dictionary']
+    model_id = 'i' + network['organism_id'] \
+        + str(len(network['reaction_database']))
+    species_ids = {
+        x: get_bigg_id('M_', x) for x in components.keys()}
+
+    lines = [
+        "<?xml version='1.0' encoding='UTF-8'?>",
+        '<sbml xmlns:fbc="http://www.sbml.org/sbml/level3/version1/fbc/version2" '
+        + 'xmlns="http://www.sbml.org/sbml/level3/version1/core" level="3" '
+        + 'version="1" sboTerm="SBO:0000624" fbc:required="false">',
+        '  <model fbc:strict="true" id=' + quoteattr(model_id)
+        + ' metaid=' + quoteattr(model_id)
+        + ' name=' + quoteattr('Synthetic model ' + model_id) + '>',
+        '    <listOfCompartments>']
+    for k, v in compartments.items():
+        lines.append(
+            '      <compartment id=' + quoteattr(k) + ' name=' + quoteattr(v)
+            + ' constant="true"/>')
+    lines.append('    </listOfCompartments>')
+
+    lines.append('    <listOfSpecies>')
+    for x, component in components.items():
+        specie = species_ids[x]
+        key = int(x.split('_')[1])
+        name = component['name']
+        lines.append(
+            '      <species id=' + quoteattr(specie)
+            + ' constant="false" boundaryCondition="false" '
+            + 'hasOnlySubstanceUnits="false" name=' + quoteattr(name)
+            + ' metaid=' + quoteattr(specie)
+            + ' sboTerm=' + quoteattr(SBO_TERMS[component['type']])
+            + ' compartment=' + quoteattr(component['compartment']) + '>')
+
+        bigg = get_bigg_id('', name)
+        if component['type'] == 'metabolite_component' \
+                and annotation_density > 0 and key % 2 == 0:
+            lines.append('        <notes>')
+            lines.append(
+                '          <html:body xmlns:html="http://www.w3.org/1999/xhtml">')
+            lines.append('            <html:p>BIGG: ' + escape(bigg) + '</html:p>')
+            lines.append(
+                '            <html:p>KEGG: C' + str(key).zfill(5) + '</html:p>')
+            lines.append('          </html:body>')
+            lines.append('        </notes>')
+
+        resources = []
+        if component['type'] == 'metabolite_component':
+            resources.append('http://identifiers.org/bigg.metabolite/' + bigg)
+            resources.append(get_resource(component['is'], style='bigg'))
+            resources += [
+                'http://identifiers.org/hmdb/HMDB' + str(key * 10 + i).zfill(5)
+                for i in range(annotation_density)]
+            resources.append(
+                'http://identifiers.org/kegg.compound/C' + str(key).zfill(5))
+        elif component['type'] == 'protein_component':
+            resources.append(get_resource(component['is'], style='bigg'))
+        resources += [
+            'http://identifiers.org/metanetx.chemical/MNXM' + str(key * 10 + i)
+            for i in range(annotation_density)]
+
+        lines.append(
+            '        <sbml:annotation '
+            + 'xmlns:sbml="http://www.sbml.org/sbml/level3/version1/core">')
+        lines.append(
+            '          <rdf:RDF '
+            + 'xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" '
+            + 'xmlns:bqbiol="http://biomodels.net/biology-qualifiers/">')
+        lines.append(
+            '            <rdf:Description rdf:about=' + quoteattr('#' + specie) + '>')
+        write_bag(lines, 'is', resources, '              ')
+        write_bag(
+            lines,
+            'hasPart',
+            [get_resource(p, style='bigg') for p in component['hasPart']],
+            '              ')
+        lines.append('            </rdf:Description>')
+        lines.append('          </rdf:RDF>')
+        lines.append('        </sbml:annotation>')
+        lines.append('      </species>')
+    lines.append('    </listOfSpecies>')
+
+    lines.append('    <listOfReactions>')
+    for reaction in network['reaction_database'].values():
+        reaction_id = get_bigg_id('R_', reaction['id'])
+        lines.append(
+            '      <reaction id=' + quoteattr(reaction_id)
+            + ' fast="false" reversible=' + quoteattr(reaction['reversible'])
+            + ' name=' + quoteattr(reaction['name'])
+            + ' metaid=' + quoteattr(reaction_id)
+            + ' sboTerm="SBO:0000176">')
+        for tag, items in [
+                ('listOfReactants', reaction['reactants']),
+                ('listOfProducts', reaction['products'])]:
+            if len(items) == 0:
+                continue
+            lines.append('        <' + tag + '>')
+            for x in items:
+                lines.append(
+                    '          <speciesReference species='
+                    + quoteattr(species_ids[x])
+                    + ' stoichiometry="1" constant="true"/>')
+            lines.append('        </' + tag + '>')
+        if len(reaction['modifiers']) > 0:
+            lines.append('        <listOfModifiers>')
+            for x, _type in reaction['modifiers']:
+                lines.append(
+                    '          <modifierSpeciesReference species='
+                    + quoteattr(species_ids[x]) + '/>')
+            lines.append('        </listOfModifiers>')
+        lines.append('      </reaction>')
+    lines.append('    </listOfReactions>')
+    lines.append('  </model>')
+    lines.append('</sbml>')
+
+    model_file = os.path.join(output, model_id + '.xml')
+    with open(model_file, 'w') as sbml_file:
+        sbml_file.write('\n'.join(lines) + '\n')
+
+    return model_file
+
+
+def write_custom_model(
+        output,
+        network):
+    """Write a network in the custom JSON format read by process_custom()
+    - Proteins and complexes are written as modifier species
+
+    Returns the model file path
+    """
+
+    if not os.path.isdir(output):
+        os.makedirs(output)
+
+    components = network['components_database']
+    model = {
+        'species': {},
+        'reactions': {},
+        'synonyms': {}}
+    for x, component in components.items():
+        if component['type'] == 'metabolite_component':
+            _type = 'metabolite'
+        else:
+            _type = 'modifier'
+        model['species'][x] = {
+            'id': x,
+            'name': component['name'],
+            'type': _type}
+    for name, chebi in network['chebi_mapper'].items():
+        model['synonyms'][name] = chebi
+    for k, v in network['reaction_database'].items():
+        model['reactions'][k] = {
+            'name': v['name'],
+            'reactants': v['reactants'],
+            'products': v['products'],
+            'modifiers': v['modifiers']}
+
+    model_file = os.path.join(output, network['organism_id'] + '.json')
+    with open(model_file, 'w') as json_file:
+        json.dump(model, json_file)
+
+    return model_file
@@ -0,0 +1,598 @@
+"""License Information
+metaboverse-cli
+Back-end CLI Tool for Curating Metabolic Networks for Metaboverse
+https://github.com/Metaboverse/metaboverse-cli/
+alias: metaboverse-cli
+
+MIT License
+
+Copyright (c) Jordan A. Berg, The University of Utah
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+from __future__ import print_function
+from itertools import accumulate
+from datetime import date
+import pandas as pd
+import numpy as np
+import random
+import os
+import sys
+from pathlib import Path
+
+
+def get_project_root():
+    """Get the path to the project root directory"""
+    current_file = Path(__file__).resolve()
+    for parent in current_file.parents:
+        if parent.name == 'cli':
+            return parent
+        if parent.name == 'Metaboverse':
+            return parent / 'cli'
+    return current_file.parent.parent.parent
+
+# Add project root to path
+project_root = get_project_root()
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+if str(project_root.parent) not in sys.path:
+    sys.path.insert(0, str(project_root.parent))
+
+try:
+    # First try normal package imports
+    from metaboverse_cli.utils import write_database, prepare_output
+except ImportError:
+    try:
+        # Then try relative imports
+        from utils import write_database, prepare_output
+    except ImportError:
+        try:
+            # Finally try direct imports
+            import importlib.util
+            def load_module(name, path):
+                spec = importlib.util.spec_from_file_location(name, path)
+                if spec is None:
+                    raise ImportError(f"Could not find module at {path}")
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                return module
+
+            base_path = os.path.dirname(os.path.dirname(__file__))
+            utils = load_module("utils", os.path.join(base_path, "utils.py"))
+            write_database = utils.write_database
+            prepare_output = utils.prepare_output
+        except ImportError as e:
+            print(f"Error importing dependencies: {e}")
+            print(f"Current sys.path: {sys.path}")
+            print(f"Current directory: {os.getcwd()}")
+            print(f"File location: {__file__}")
+            raise
+
+
+# Named scales for --reactions
+SCALES = {
+    '1k': 1000,
+    '10k': 10000,
+    '100k': 100000}
+
+COMPARTMENTS = [
+    'cytosol',
+    'mitochondrial matrix',
+    'nucleoplasm',
+    'endoplasmic reticulum lumen',
+    'extracellular region',
+    'plasma membrane']
+
+# Most-used metabolites come first so they become the network hubs
+HUB_METABOLITES = [
+    'H2O',
+    'H+',
+    'ATP',
+    'ADP',
+    'Pi',
+    'NAD+',
+    'NADH',
+    'CO2',
+    'PPi',
+    'CoA-SH',
+    'NADP+',
+    'NADPH',
+    'O2',
+    'L-Glu',
+    'AMP']
+
+
+def get_scale(
+        reactions):
+    """Convert a named scale (1k, 10k, 100k) or number to a reaction count
+    """
+
+    reactions = str(reactions).strip().lower()
+    if reactions in SCALES:
+        return SCALES[reactions]
+    if reactions.endswith('k'):
+        return int(float(reactions[:-1]) * 1000)
+
+    return int(reactions)
+
+
+def get_sort_name(
+        name):
+    """Key build_graph() uses to drop reactions with duplicate names
+    """
+
+    return ''.join(sorted(name.lower().replace(" ", "")))
+
+
+def make_picker(
+        rng,
+        population,
+        skew=1.):
+    """Return a function drawing k items from population with Zipf-like
+    weights, so that early items are drawn most often
+    """
+
+    cum_weights = list(accumulate(
+        1. / (i + 1) ** skew for i in range(len(population))))
+
+    def pick(k):
+        return rng.choices(population, cum_weights=cum_weights, k=k)
+
+    return pick
+
+
+def add_component(
+        network,
+        specie,
+        name,
+        compartment,
+        _is,
+        _type,
+        has_part=None):
+    """Add a species to the components, species, name and compartment
+    records, as curate does for each SBML species
+    """
+
+    network['components_database'][specie] = {
+        'id': specie,
+        'reactome_id': 'R-SYN-' + specie.split('_')[1],
+        'name': name,
+        'is': _is,
+        'isEncodedBy': '',
+        'hasPart': list(has_part) if has_part != None else [],
+        'type': _type,
+        'compartment': compartment
+    }
+    network['species_database'][specie] = name
+    network['name_database'][name] = specie
+    network['name_database'][specie] = specie
+    if _is != '':
+        network['name_database'][_is] = specie
+
+
+def make_network(
+        reactions=1000,
+        seed=0,
+        organism_id='SYN',
+        species=None):
+    """Generate a synthetic network with the layout of a curated .mvdb file
+    - Component counts scale with the number of reactions, or with species,
+    the approximate number of species, if given
+    - Metabolite and pathway usage is skewed, so a few hub metabolites and
+    super pathways appear as they do in Reactome
+    - Output is fully determined by the arguments
+    """
+
+    rng = random.Random(seed)
+
+    if species == None:
+        n_chemicals = int(reactions * 0.4)
+        n_proteins = int(reactions * 0.5)
+        n_complexes = int(reactions * 0.15)
+    else:
+        # About 1.3 species per metabolite, one per protein and complex
+        n_chemicals = int(species * 0.34)
+        n_proteins = int(species * 0.43)
+        n_complexes = int(species * 0.13)
+    n_chemicals = max(len(HUB_METABOLITES) + 5, n_chemicals)
+    n_proteins = max(10, n_proteins)
+    n_complexes = max(5, n_complexes)
+    n_pathways = max(1, reactions // 40)
+
+    network = {
+        'organism_id': organism_id,
+        'pathway_database': {},
+        'reaction_database': {},
+        'species_database': {},
+        'name_database': {},
+        'ensembl_synonyms': {},
+        'uniprot_synonyms': {},
+        'chebi_mapper': {},
+        'chebi_synonyms': {},
+        'uniprot_metabolites': {},
+        'complex_dictionary': {},
+        'compartment_dictionary': {},
+        'components_database': {},
+        'curation_date': date.today().strftime('%Y-%m-%d'),
+        'metaboverse-curate_version': 'synthetic',
+        'database_version': 'synthetic-' + str(seed),
+        'database_date': date.today().strftime('%Y-%m-%d')
+    }
+
+    compartments = []
+    for i, c in enumerate(COMPARTMENTS):
+        compartment_id = 'compartment_' + str(i + 1)
+        network['compartment_dictionary'][compartment_id] = c
+        compartments.append(compartment_id)
+
+    counter = [0]
+
+    def next_specie():
+        counter[0] += 1
+        return 'species_' + str(counter[0])
+
+    # Metabolites, each present in one or two compartments
+    chemicals = []
+    hub_species = []
+    metabolite_species = []
+    for i in range(n_chemicals):
+        if i < len(HUB_METABOLITES):
+            name = HUB_METABOLITES[i]
+        else:
+            name = 'metabolite ' + str(i)
+        chebi = 'CHEBI:' + str(10000 + i)
+        chemicals.append((name, chebi))
+
+        network['chebi_mapper'][name] = chebi
+        network['chebi_synonyms'][chebi] = [name, name.lower()]
+        if i % 3 == 0:
+            network['uniprot_metabolites'][name + ' ion'] = chebi
+
+        n_compartments = 1 if rng.random() < 0.7 else 2
+        for c in rng.sample(compartments, n_compartments):
+            specie = next_specie()
+            add_component(
+                network=network,
+                specie=specie,
+                name=name,
+                compartment=c,
+                _is=chebi,
+                _type='metabolite_component')
+            if i < len(HUB_METABOLITES):
+                hub_species.append(specie)
+            else:
+                metabolite_species.append(specie)
+
+    # Proteins and their genes
+    proteins = []
+    protein_species = []
+    for i in range(n_proteins):
+        gene_name = 'GENE' + str(i + 1)
+        gene = 'ENSSYNG' + str(i + 1).zfill(11)
+        uniprot = 'S' + str(i + 1).zfill(5)
+        network['ensembl_synonyms'][gene] = gene_name
+        network['uniprot_synonyms'][uniprot] = gene_name
+        proteins.append(uniprot)
+
+        specie = next_specie()
+        c = rng.choice(compartments)
+        add_component(
+            network=network,
+            specie=specie,
+            name=gene_name,
+            compartment=c,
+            _is=uniprot,
+            _type='protein_component')
+        protein_species.append(specie)
+
+    # Complexes of proteins, some with a bound metabolite
+    complex_species = []
+    pick_chemical = make_picker(rng, chemicals)
+    for i in range(n_complexes):
+        parts = rng.sample(proteins, rng.randint(2, 4))
+        if rng.random() < 0.2:
+            parts.append(pick_chemical(1)[0][1])
+
+        specie = next_specie()
+        c = rng.choice(compartments)
+        add_component(
+            network=network,
+            specie=specie,
+            name='complex ' + str(i + 1),
+            compartment=c,
+            _is='',
+            _type='complex_component',
+            has_part=parts)
+        complex_species.append(specie)
+
+    # Pathways, with skewed sizes
+    pathways = []
+    for i in range(n_pathways):
+        pathway = 'R-SYN-' + str(900000 + i)
+        network['pathway_database'][pathway] = {
+            'id': 'pathway_' + str(i + 1),
+            'reactome': pathway,
+            'name': 'Synthetic pathway ' + str(i + 1),
+            'reactions': []
+        }
+        pathways.append(pathway)
+
+    # Reactions, chained within their pathway as in Reactome: a reaction
+    # often consumes a product of the previous reaction of its pathway
+    pick_hub = make_picker(rng, hub_species)
+    pick_pathway = make_picker(rng, pathways, skew=0.8)
+    enzymes = protein_species + complex_species
+    last_products = {}
+    seen_names = set()
+    for i in range(reactions):
+        reaction_id = 'reaction_' + str(i + 1)
+        reaction_pathways = list(dict.fromkeys(
+            pick_pathway(rng.randint(1, 2))))
+
+        reactants = rng.sample(metabolite_species, rng.randint(1, 2))
+        previous = last_products.get(reaction_pathways[0], [])
+        if len(previous) > 0 and rng.random() < 0.6:
+            reactants[0] = rng.choice(previous)
+        products = [
+            x for x in rng.sample(metabolite_species, rng.randint(1, 2))
+            if x not in reactants]
+        if len(products) == 0:
+            products = [rng.choice(metabolite_species)]
+        last_products[reaction_pathways[0]] = products
+
+        # Co-factors and small molecules
+        if rng.random() < 0.6:
+            reactants += [x for x in set(pick_hub(1)) if x not in reactants]
+        if rng.random() < 0.6:
+            products += [
+                x for x in set(pick_hub(1))
+                if x not in reactants and x not in products]
+
+        # Binding and transport reactions move proteins and complexes
+        if rng.random() < 0.2:
+            reactants.append(rng.choice(enzymes))
+        if rng.random() < 0.2:
+            products.append(rng.choice(enzymes))
+
+        modifiers = []
+        for m in rng.sample(enzymes, rng.randint(0, 2)):
+            draw = rng.random()
+            if draw < 0.85:
+                modifiers.append([m, 'catalyst'])
+            elif draw < 0.95:
+                modifiers.append([m, 'inhibitor'])
+            else:
+                modifiers.append([m, 'other'])
+
+        species_names = network['species_database']
+        name = ' + '.join(species_names[x] for x in reactants) \
+            + ' => ' \
+            + ' + '.join(species_names[x] for x in products)
+        if rng.random() < 0.01:
+            name = 'Defective ' + name
+        _name = name
+        suffix = 1
+        while get_sort_name(_name) in seen_names:
+            suffix += 1
+            _name = name + ' (' + str(suffix) + ')'
+        seen_names.add(get_sort_name(_name))
+
+        network['reaction_database'][reaction_id] = {
+            'compartment': rng.choice(compartments),
+            'id': reaction_id,
+            'reactome': 'R-SYN-' + str(i + 1),
+            'name': _name,
+            'reversible': 'true' if rng.random() < 0.3 else 'false',
+            'notes': 'Synthetic reaction ' + str(i + 1),
+            'reactants': reactants,
+            'products': products,
+            'modifiers': modifiers}
+        network['name_database'][_name] = reaction_id
+
+        for pathway in reaction_pathways:
+            network['pathway_database'][pathway]['reactions'].append(
+                reaction_id)
+
+    return network
+
+
+def make_metabolite_mapper(
+        network):
+    """Generate a metabolite mapper (as made by metaboliteMapper) covering
+    the network's metabolites
+    """
+
+    hmdb_dictionary = {}
+    display_dictionary = {}
+    mapping_dictionary = {}
+    for name in network['chebi_mapper'].keys():
+        synonyms = sorted(set([
+            name,
+            name.lower(),
+            ''.join(c.lower() for c in name if c.isalnum())]))
+        hmdb_dictionary[name] = synonyms
+        display_dictionary[name] = [name]
+        for s in synonyms:
+            mapping_dictionary[s] = name
+
+    return {
+        'hmdb_dictionary': hmdb_dictionary,
+        'display_dictionary': display_dictionary,
+        'mapping_dictionary': mapping_dictionary
+    }
+
+
+def make_omics(
+        network,
+        samples=3,
+        coverage=0.6,
+        seed=0):
+    """Generate data and stats tables for a synthetic network
+    - Genes are listed by Ensembl ID, proteins by UniProt ID and metabolites
+    by name, each for a coverage fraction of the network
+    - A few rows name nothing in the network, so they stay unmapped
+    """
+
+    rng = np.random.default_rng(seed)
+
+    genes = list(network['ensembl_synonyms'].keys())
+    proteins = list(network['uniprot_synonyms'].keys())
+    metabolites = list(network['chebi_mapper'].keys())
+
+    def sample(items):
+        n = int(len(items) * coverage)
+        return [items[i] for i in sorted(
+            rng.choice(len(items), size=n, replace=False))]
+
+    index = sample(genes) + sample(proteins) + sample(metabolites)
+    index += [
+        'unmapped metabolite ' + str(i + 1)
+        for i in range(max(1, len(metabolites) // 50))]
+
+    columns = ['sample_' + str(i + 1) for i in range(samples)]
+    data = pd.DataFrame(
+        rng.normal(0., 1.5, size=(len(index), samples)),
+        index=index,
+        columns=columns)
+    stats = pd.DataFrame(
+        rng.beta(0.5, 2., size=(len(index), samples)),
+        index=index,
+        columns=columns)
+
+    return data, stats
+
+
+def make_reference_tables(
+        network,
+        rows=200000,
+        seed=0):
+    """Generate the ChEBI and Reactome reference tables that curate reads
+    - chebi_names follows ChEBI names.tsv, chebi_reactome the headerless
+    ChEBI2Reactome_PE_All_Levels table, complex_participants and
+    complex_pathway the Reactome complex tables, and analyte_reactions the
+    table layout parse_table() reads
+    - About a third of the Reactome rows are for the network organism, and
+    some metabolites match network species
+    """
+
+    rng = np.random.default_rng(seed)
+    organism = network['organism_id']
+    compartments = np.array(list(network['compartment_dictionary'].values()))
+
+    def numbered(prefix, numbers):
+        return prefix + pd.Series(numbers).astype(str)
+
+    def with_compartment(names, size):
+        names = names + ' [' + compartments[
+            rng.integers(0, len(compartments), size=size)] + ']'
+        # A few names carry no compartment
+        names[rng.random(size) < 0.02] = names[0].split(' [')[0]
+        return names
+
+    # ChEBI names, about three names per compound and some shared names
+    sources = np.array([
+        'KEGG COMPOUND', 'ChEBI', 'IUPAC', 'UniProt', 'SUBMITTER',
+        'ChemIDplus', 'NIST Chemistry WebBook', 'HMDB', 'LIPID MAPS',
+        'MetaCyc', 'DrugBank', 'JCBN', 'PDBeChem', 'KEGG DRUG', 'UM-BBD'])
+    compounds = rng.integers(10000, 10000 + max(1, rows // 3), size=rows)
+    chebi_names = pd.DataFrame({
+        'ID': np.arange(1, rows + 1),
+        'COMPOUND_ID': compounds,
+        'NAME': numbered('compound ', rng.integers(0, max(1, rows // 2), size=rows)),
+        'TYPE': 'SYNONYM',
+        'SOURCE': sources[rng.integers(0, len(sources), size=rows)],
+        'ADAPTED': 'F',
+        'LANGUAGE': 'en'})
+
+    # ChEBI to Reactome physical entities over several organisms
+    organisms = np.array([organism, organism, 'HSA', 'MMU', 'DRE', 'SCE'])
+    entity_organisms = organisms[rng.integers(0, len(organisms), size=rows)]
+    entities = rng.integers(1, max(2, rows // 2), size=rows)
+    chebi_reactome = pd.DataFrame({
+        0: numbered('', compounds),
+        1: 'R-' + entity_organisms + '-' + pd.Series(entities).astype(str),
+        2: with_compartment(numbered('metabolite ', compounds), rows),
+        3: 'R-' + entity_organisms + '-' + pd.Series(
+            900000 + entities % 500).astype(str),
+        4: 'https://reactome.org/PathwayBrowser/#/' + pd.Series(entities).astype(str),
+        5: numbered('pathway ', entities % 500),
+        6: 'IEA',
+        7: 'Synthetic organism'})
+
+    # Complex participants and complex pathways
+    n_complexes = max(1, rows // 10)
+    complex_ids = numbered('R-' + organism + '-', np.arange(n_complexes) + 500000)
+    participants = (
+        numbered('chebi:', rng.integers(10000, 20000, size=n_complexes)) + '|'
+        + numbered('uniprot:S', rng.integers(1, 9999, size=n_complexes)) + '|'
+        + numbered('ensembl:ENSSYNG', rng.integers(1, 9999, size=n_complexes)))
+    participating = complex_ids.sample(
+        frac=1., random_state=seed).reset_index(drop=True)
+    participating[rng.random(n_complexes) < 0.7] = '-'
+    complex_participants = pd.DataFrame({
+        'identifier': complex_ids,
+        'name': with_compartment(numbered('complex ', np.arange(n_complexes)), n_complexes),
+        'participants': participants,
+        'participatingComplex': participating,
+        'pubMedIdentifiers': '-'})
+    pathway_complexes = rng.integers(0, n_complexes, size=n_complexes * 3)
+    complex_pathway = pd.DataFrame({
+        'complex': complex_ids[pathway_complexes].reset_index(drop=True),
+        'pathway': numbered('R-' + organism + '-', 900000 + pathway_complexes % 500),
+        'top_level_pathway': numbered('R-' + organism + '-', 900000 + pathway_complexes % 20)})
+
+    # Analyte to reaction table
+    analytes = rng.integers(0, max(1, rows // 2), size=rows)
+    analyte_reactions = pd.DataFrame({
+        'analyte_id': numbered('R-ALL-', analytes),
+        'analyte_name': with_compartment(numbered('metabolite ', analytes), rows),
+        'reaction_id': numbered('R-' + organism + '-', rng.integers(0, rows, size=rows)),
+        'reaction_name': numbered('reaction ', rng.integers(0, rows, size=rows)),
+        'source_id': numbered('', analytes + 10000)})
+
+    return {
+        'chebi_names': chebi_names,
+        'chebi_reactome': chebi_reactome,
+        'complex_participants': complex_participants,
+        'complex_pathway': complex_pathway,
+        'analyte_reactions': analyte_reactions}
+
+
+def write_synthetic(
+        output,
+        network,
+        data,
+        stats):
+    """Write a synthetic network as <organism_id>.mvdb, with its data and
+    stats tables, so it can also be run through metaboverse
+    """
+
+    write_database(
+        output=output,
+        file=network['organism_id'] + '.mvdb',
+        database=network)
+
+    dir = prepare_output(output=output)
+    data.to_csv(
+        os.path.join(dir, network['organism_id'] + '_data.txt'),
+        sep='\t')
+    stats.to_csv(
+        os.path.join(dir, network['organism_id'] + '_stats.txt'),
+        sep='\t')
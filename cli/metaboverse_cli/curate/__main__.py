@@ -29,42 +29,99 @@ SOFTWARE.
 """
 from __future__ import print_function
 import pandas as pd
+import numpy as np
 from datetime import date
-import requests
 import re
 import os
 
 """Import internal dependencies
 """
 try:
-    from curate.load_reactions_db import __main__ as load_reactions
-    from curate.load_complexes_db import __main__ as load_complexes
-    from utils import progress_feed, write_database, write_database_json, \
-    safestr, get_metaboverse_cli_version, download_file_ftp
-except:
-    import importlib.util
-    spec = importlib.util.spec_from_file_location(
-        "__main__", os.path.abspath("./metaboverse_cli/curate/load_reactions_db.py"))
-    load_reactions = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(load_reactions)
-    load_reactions = load_reactions.__main__
-
-    spec = importlib.util.spec_from_file_location(
-        "__main__", os.path.abspath("./metaboverse_cli/curate/load_complexes_db.py"))
-    load_complexes = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(load_complexes)
-    load_complexes = load_complexes.__main__
-
-    spec = importlib.util.spec_from_file_location(
-        "", os.path.abspath("./metaboverse_cli/utils.py"))
-    utils = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(utils)
-    progress_feed = utils.progress_feed
-    write_database = utils.write_database
-    write_database_json = utils.write_database_json
-    safestr = utils.safestr
-    get_metaboverse_cli_version = utils.get_metaboverse_cli_version
-    download_file_ftp = utils.download_file_ftp
+    from metaboverse_cli.curate.load_reactions_db import __main__ as load_reactions
+    from metaboverse_cli.curate.load_reactions_db import reactome_sbml_url
+    from metaboverse_cli.curate.load_complexes_db import __main__ as load_complexes
+    from metaboverse_cli.curate.load_complexes_db import \
+        complex_participants_url, complex_pathway_url
+    from metaboverse_cli.utils import progress_feed, write_database, \
+        write_database_json, safestr, get_metaboverse_cli_version
+    from metaboverse_cli.curate.utils import read_reactome_mapping, \
+        split_reactome_mapping, get_mapping_partition
+    from metaboverse_cli.curate.fetch_references import fetch_reference, \
+        prefetch_references, finish_prefetch, cancel_prefetch, get_release
+    from metaboverse_cli.profiler import profile_stage
+except ImportError:
+    try:
+        from curate.load_reactions_db import __main__ as load_reactions
+        from curate.load_reactions_db import reactome_sbml_url
+        from curate.load_complexes_db import __main__ as load_complexes
+        from curate.load_complexes_db import complex_participants_url, \
+            complex_pathway_url
+        from utils import progress_feed, write_database, write_database_json, \
+        safestr, get_metaboverse_cli_version
+        from curate.utils import read_reactome_mapping, \
+            split_reactome_mapping, get_mapping_partition
+        from curate.fetch_references import fetch_reference, \
+            prefetch_references, finish_prefetch, cancel_prefetch, \
+            get_release
+        from profiler import profile_stage
+    except:
+        import importlib.util
+        spec = importlib.util.spec_from_file_location(
+            "__main__", os.path.abspath("./metaboverse_cli/curate/load_reactions_db.py"))
+        load_reactions = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(load_reactions)
+        reactome_sbml_url = load_reactions.reactome_sbml_url
+        load_reactions = load_reactions.__main__
+
+        spec = importlib.util.spec_from_file_location(
+            "__main__", os.path.abspath("./metaboverse_cli/curate/load_complexes_db.py"))
+        load_complexes = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(load_complexes)
+        complex_participants_url = load_complexes.complex_participants_url
+        complex_pathway_url = load_complexes.complex_pathway_url
+        load_complexes = load_complexes.__main__
+
+        spec = importlib.util.spec_from_file_location(
+            "", os.path.abspath("./metaboverse_cli/utils.py"))
+        utils = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(utils)
+        progress_feed = utils.progress_feed
+        write_database = utils.write_database
+        write_database_json = utils.write_database_json
+        safestr = utils.safestr
+        get_metaboverse_cli_version = utils.get_metaboverse_cli_version
+
+        spec = importlib.util.spec_from_file_location(
+            "", os.path.abspath("./metaboverse_cli/curate/utils.py"))
+        curate_utils = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(curate_utils)
+        read_reactome_mapping = curate_utils.read_reactome_mapping
+        split_reactome_mapping = curate_utils.split_reactome_mapping
+        get_mapping_partition = curate_utils.get_mapping_partition
+
+        spec = importlib.util.spec_from_file_location(
+            "", os.path.abspath("./metaboverse_cli/curate/fetch_references.py"))
+        fetch_references = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(fetch_references)
+        fetch_reference = fetch_references.fetch_reference
+        prefetch_references = fetch_references.prefetch_references
+        finish_prefetch = fetch_references.finish_prefetch
+        cancel_prefetch = fetch_references.cancel_prefetch
+        get_release = fetch_references.get_release
+
+        spec = importlib.util.spec_from_file_location(
+            "", os.path.abspath("./metaboverse_cli/profiler.py"))
+        profiler = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(profiler)
+        profile_stage = profiler.profile_stage
+
+"""Set globals
+"""
+ensembl_mapping_url = 'https://reactome.org/download/current/Ensembl2Reactome_PE_All_Levels.txt'
+uniprot_mapping_url = 'https://reactome.org/download/current/UniProt2Reactome_PE_All_Levels.txt'
+chebi_mapping_url = 'https://reactome.org/download/current/ChEBI2Reactome_PE_All_Levels.txt'
+chebi_names_url = 'ftp://ftp.ebi.ac.uk/pub/databases/chebi/Flat_file_tab_delimited/names.tsv.gz'
+reactome_release_url = 'https://reactome.org/tag/release'
 
 
 def parse_table(
@@ -86,37 +143,44 @@ def parse_table(
             'reaction_id',
             'reaction_name']
 
-    reference_parsed = reference[key][column_names].copy()
-    reference_parsed['analyte'] = reference_parsed['analyte_name'].str.split(
-        ' \[').str[0]
-    reference_parsed['compartment'] = reference_parsed['analyte_name'].str.split(
-        ' \[').str[1].str.split('\]').str[0]
-
-    reference_dictionary = {}
-
-    counter = 0
-    total = len(reference_parsed.index.tolist())
-
-    for index, row in reference_parsed.iterrows():
-
-        reference_dictionary[row[0]] = {}
-        reference_dictionary[row[0]]['analyte_id'] = row[0]
-        reference_dictionary[row[0]]['reaction_id'] = row[2]
-        reference_dictionary[row[0]]['reaction_name'] = row[3]
-
-        if 'source_id' in reference[key].columns.tolist():
-            reference_dictionary[row[0]]['source_id'] = row[4]
-            reference_dictionary[row[0]]['analyte'] = row[5]
-            reference_dictionary[row[0]]['compartment'] = row[6]
-
-        else:
-            reference_dictionary[row[0]]['analyte'] = row[4]
-            reference_dictionary[row[0]]['compartment'] = row[5]
-
-        if int(counter % (total / 15)) == 0 and args_dict != None:
-            progress_feed(args_dict, "graph")
-
-        counter += 1
+    reference_parsed = reference[key][column_names]
+    analyte = reference_parsed['analyte_name'].str.split(
+        ' [', n=1, regex=False).str[0]
+    compartment = reference_parsed['analyte_name'].str.extract(
+        r' \[([^\]]*)', expand=False)
+
+    columns = [reference_parsed[c].tolist() for c in column_names[:4]]
+    if 'source_id' in column_names:
+        reference_dictionary = {
+            analyte_id: {
+                'analyte_id': analyte_id,
+                'reaction_id': reaction_id,
+                'reaction_name': reaction_name,
+                'source_id': source_id,
+                'analyte': _analyte,
+                'compartment': _compartment}
+            for analyte_id, _, reaction_id, reaction_name, source_id,
+                _analyte, _compartment in zip(
+                    *columns, reference_parsed['source_id'].tolist(),
+                    analyte.tolist(), compartment.tolist())}
+    else:
+        reference_dictionary = {
+            analyte_id: {
+                'analyte_id': analyte_id,
+                'reaction_id': reaction_id,
+                'reaction_name': reaction_name,
+                'analyte': _analyte,
+                'compartment': _compartment}
+            for analyte_id, _, reaction_id, reaction_name,
+                _analyte, _compartment in zip(
+                    *columns, analyte.tolist(), compartment.tolist())}
+
+    # Same progress increment as stepping through the rows
+    total = len(reference_parsed.index)
+    if args_dict != None and total > 0:
+        increment = int(np.sum(
+            (np.arange(total) % (total / 15)).astype(int) == 0))
+        progress_feed(args_dict, "graph", increment)
 
     return reference_dictionary
 
@@ -129,14 +193,16 @@ def parse_complexes(reference):
             pathway_key='pathway',
             top_level_pathway_key='top_level_pathway'):
         """Creates a dictionary with pathway information."""
-        pathway_dictionary = {}
-        for _, row in complex_pathway_df.iterrows():
-            complex_id = row[complex_key]
-            pathway_dictionary[complex_id] = {
+        pathway_dictionary = {
+            complex_id: {
                 'complex': complex_id,
-                'pathway': row[pathway_key],
-                'top_level_pathway': row[top_level_pathway_key]
+                'pathway': pathway,
+                'top_level_pathway': top_level_pathway
             }
+            for complex_id, pathway, top_level_pathway in zip(
+                complex_pathway_df[complex_key].tolist(),
+                complex_pathway_df[pathway_key].tolist(),
+                complex_pathway_df[top_level_pathway_key].tolist())}
         return pathway_dictionary
 
     def prepare_complexes_information(
@@ -170,17 +236,26 @@ def parse_complexes(reference):
 
     def create_complex_dictionary(complexes_information, pathway_dictionary):
         """Creates a dictionary with complex information including participants."""
+        compartments = complexes_information['compartment']
+        compartments = compartments.astype(object).where(
+            compartments.notna(), None)
         complex_dictionary = {}
-        for _, row in complexes_information.iterrows():
-            complex_id = row['identifier']
+        for complex_id, complex_name, compartment, participating_complex, \
+                participants in zip(
+                    complexes_information['identifier'].tolist(),
+                    complexes_information['complex'].tolist(),
+                    compartments.tolist(),
+                    complexes_information['participatingComplex'].tolist(),
+                    complexes_information['participants'].tolist()):
+            pathway = pathway_dictionary.get(complex_id, {})
             complex_dictionary[complex_id] = {
                 'complex_id': complex_id,
-                'complex_name': row['complex'],
-                'compartment': row['compartment'] if pd.notna(row['compartment']) else None,
-                'participating_complex': None if row['participatingComplex'] == '-' else row['participatingComplex'],
-                'pathway': pathway_dictionary.get(complex_id, {}).get('pathway', None),
-                'top_level_pathway': pathway_dictionary.get(complex_id, {}).get('top_level_pathway', None),
-                'participants': parse_participants(row['participants'])
+                'complex_name': complex_name,
+                'compartment': compartment,
+                'participating_complex': None if participating_complex == '-' else participating_complex,
+                'pathway': pathway.get('pathway', None),
+                'top_level_pathway': pathway.get('top_level_pathway', None),
+                'participants': parse_participants(participants)
             }
         return complex_dictionary
 
@@ -192,23 +267,95 @@ def parse_complexes(reference):
     return complex_dictionary
 
 
+def load_reactome_mapping(
+        output_dir,
+        species_id,
+        url,
+        file_name,
+        usecols,
+        species_column=3,
+        mapping_dir=None,
+        reference_dir=None):
+    """Read the rows of a Reactome All_Levels mapping file for one species
+    - With mapping_dir, the file is downloaded and split into per-species
+    partitions once, and later calls for any species read their partition
+    """
+
+    if mapping_dir == None:
+        file = fetch_reference(
+            url=url,
+            output_dir=output_dir,
+            reference_dir=reference_dir,
+            file_name=file_name)
+        mapping = read_reactome_mapping(
+            file,
+            species_id=species_id,
+            usecols=usecols,
+            species_column=species_column)
+        if reference_dir == None:
+            os.remove(file)
+        return mapping
+
+    # Partitions are reused while the upstream file is unchanged, or if it
+    # cannot be reached
+    release = get_release(url)
+    partition = get_mapping_partition(
+        mapping_dir, file_name, species_id, release=release)
+    if partition == None:
+        if not os.path.exists(mapping_dir):
+            os.makedirs(mapping_dir)
+        file = fetch_reference(
+            url=url,
+            output_dir=mapping_dir,
+            reference_dir=reference_dir,
+            file_name=file_name)
+        print('Splitting ' + file_name + ' by species...')
+        split_reactome_mapping(
+            file,
+            mapping_dir,
+            file_name=file_name,
+            species_column=species_column,
+            release=release)
+        if reference_dir == None:
+            os.remove(file)
+        partition = get_mapping_partition(mapping_dir, file_name, species_id)
+    else:
+        print('Using species partition ' + partition)
+
+    if not os.path.exists(partition):
+        return pd.DataFrame(
+            columns=sorted(set(usecols) | {species_column}),
+            dtype=str)
+
+    return read_reactome_mapping(
+        partition,
+        species_id=species_id,
+        usecols=usecols,
+        species_column=species_column)
+
+
 def parse_ensembl_synonyms(
         output_dir,
         species_id,
-        url='https://reactome.org/download/current/Ensembl2Reactome_PE_All_Levels.txt',
+        url=ensembl_mapping_url,
         file_name='Ensembl2Reactome_PE_All_Levels.txt',
         reactome_location=3,
         name_location=2,
-        id_location=0):
+        id_location=0,
+        mapping_dir=None,
+        reference_dir=None):
     """Retrieve Ensembl gene entity synonyms
     """
     print('Downloading Ensembl synonym database...', '\n\t', url)
-    os.system('curl -kL ' + url + ' -o \"' + output_dir + file_name + '\"')
-    ensembl = pd.read_csv(
-        output_dir + file_name,
-        sep='\t',
-        header=None)
-    os.remove(output_dir + file_name)
+    ensembl = load_reactome_mapping(
+        output_dir=output_dir,
+        species_id=species_id,
+        url=url,
+        file_name=file_name,
+        usecols=[id_location, name_location, reactome_location],
+        species_column=reactome_location,
+        mapping_dir=mapping_dir,
+        reference_dir=reference_dir)
 
     ensembl[name_location] = ensembl[name_location].str.split(
         ' \[').str[0].tolist()
@@ -223,21 +370,26 @@ def parse_ensembl_synonyms(
 def parse_uniprot_synonyms(
         output_dir,
         species_id,
-        url='https://reactome.org/download/current/UniProt2Reactome_PE_All_Levels.txt',
+        url=uniprot_mapping_url,
         file_name='UniProt2Reactome_PE_All_Levels.txt',
         reactome_location=3,
         name_location=2,
-        id_location=0):
+        id_location=0,
+        mapping_dir=None,
+        reference_dir=None):
     """Retrieve UniProt protein entity synonyms
     """
 
     print('Downloading UniProt synonym database...', '\n\t', url)
-    os.system('curl -kL ' + url + ' -o "' + output_dir + file_name + '"')
-    uniprot = pd.read_csv(
-        output_dir + file_name,
-        sep='\t',
-        header=None)
-    os.remove(output_dir + file_name)
+    uniprot = load_reactome_mapping(
+        output_dir=output_dir,
+        species_id=species_id,
+        url=url,
+        file_name=file_name,
+        usecols=[id_location, name_location, reactome_location],
+        species_column=reactome_location,
+        mapping_dir=mapping_dir,
+        reference_dir=reference_dir)
 
     uniprot[name_location] = uniprot[name_location].str.split(
         ' \[').str[0].tolist()
@@ -251,43 +403,72 @@ def parse_uniprot_synonyms(
 
 def parse_chebi_synonyms(
         output_dir,
-        url='ftp://ftp.ebi.ac.uk/pub/databases/chebi/Flat_file_tab_delimited/names.tsv.gz',
+        url=chebi_names_url,
         file_name='names.tsv',
         name_string='NAME',
         id_string='COMPOUND_ID',
-        source_string='SOURCE'):
+        source_string='SOURCE',
+        reference_dir=None):
     """Retrieve CHEBI chemical entity synonyms."""
 
     # Download the file
     print('Downloading ChEBI synonym database...', '\n\t', url)
     if not output_dir.endswith('/'):
         output_dir += '/'
-    output_path = f"{output_dir}{file_name}.gz"
-    download_file_ftp(url, output_path)
+    output_path = fetch_reference(
+        url=url,
+        output_dir=output_dir,
+        reference_dir=reference_dir,
+        file_name=f"{file_name}.gz")
     
     # Read the gzipped TSV file into a pandas DataFrame
-    chebi = pd.read_csv(f"{output_dir}{file_name}.gz", sep='\t', compression='gzip')
+    chebi = pd.read_csv(output_path, sep='\t', compression='gzip')
     # Remove the gzipped file after reading
-    os.remove(f"{output_dir}{file_name}.gz")
-
-    # Initialize dictionaries to store the parsed data
-    chebi_dictionary = {}
-    chebi_synonyms = {}
-    uniprot_metabolites = {}
-
-    # Iterate over each row of the DataFrame
-    for index, row in chebi.iterrows():
-        # Check if the source column contains one of the specified keywords
-        if any(keyword in row[source_string].upper() for keyword in ['KEGG', 'CHEM', 'JCBN', 'CHEBI', 'HMDB', 'DRUG', 'IUPAC', 'LIPID', 'METACYC', 'SUBMITTER']):
-            chebi_id = f'CHEBI:{row[id_string]}'
-            chebi_dictionary[row[name_string]] = chebi_id
-            
-            if chebi_id in chebi_synonyms:
-                chebi_synonyms[chebi_id].append(row[name_string])
-            else:
-                chebi_synonyms[chebi_id] = [row[name_string]]
-        else:
-            uniprot_metabolites[row[name_string]] = f'CHEBI:{row[id_string]}'
+    if reference_dir == None:
+        os.remove(output_path)
+
+    return build_chebi_synonyms(
+        chebi=chebi,
+        name_string=name_string,
+        id_string=id_string,
+        source_string=source_string)
+
+
+def build_chebi_synonyms(
+        chebi,
+        name_string='NAME',
+        id_string='COMPOUND_ID',
+        source_string='SOURCE',
+        sources=['KEGG', 'CHEM', 'JCBN', 'CHEBI', 'HMDB', 'DRUG', 'IUPAC',
+                 'LIPID', 'METACYC', 'SUBMITTER']):
+    """Build ChEBI name and synonym dictionaries from the ChEBI names table
+    - Names from the listed sources map to their ChEBI ID, all others go to
+    the UniProt metabolite dictionary
+    """
+
+    chebi_ids = 'CHEBI:' + chebi[id_string].astype(str)
+    names = chebi[name_string]
+    mask = chebi[source_string].str.upper().str.contains(
+        '|'.join(sources), regex=True, na=False).to_numpy(dtype=bool)
+
+    chebi_dictionary = dict(zip(
+        names[mask].tolist(),
+        chebi_ids[mask].tolist()))
+
+    # Group names by ChEBI ID in first-seen order, keeping table order
+    # within each ID
+    codes, uniques = pd.factorize(
+        chebi_ids[mask].to_numpy(dtype=object),
+        sort=False)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.cumsum(np.bincount(codes, minlength=len(uniques)))[:-1]
+    chebi_synonyms = dict(zip(
+        uniques.tolist(),
+        [n.tolist() for n in np.split(
+            names[mask].to_numpy(dtype=object)[order], bounds)]))
+    uniprot_metabolites = dict(zip(
+        names[~mask].tolist(),
+        chebi_ids[~mask].tolist()))
 
     return chebi_dictionary, chebi_synonyms, uniprot_metabolites
 
@@ -300,7 +481,7 @@ def reference_complex_species(
 
     new_dict = {}
     for k, v in reference.items():
-        if reference[k]['complex_id'] in list(name_database.keys()):
+        if reference[k]['complex_id'] in name_database:
             new_dict[name_database[reference[k]['complex_id']]] = reference[k]
 
     return new_dict
@@ -313,37 +494,70 @@ def supplement_components(
         compartment_dictionary,
         species_id,
         output_dir,
-        url='https://reactome.org/download/current/ChEBI2Reactome_PE_All_Levels.txt',
+        url=chebi_mapping_url,
         file_name='ChEBI2Reactome_PE_All_Levels.txt',
         name_string=2,
         id_string=1,
-        source_string=3):
+        source_string=3,
+        mapping_dir=None,
+        reference_dir=None):
     """
     """
 
     print('Downloading ChEBI synonym database...', '\n\t', url)
-    os.system('curl -kL ' + url + ' -o "' + output_dir + file_name + '"')
-    chebi = pd.read_csv(
-        output_dir + file_name,
-        sep='\t',
-        header=None)
-    os.remove(output_dir + file_name)
+    chebi = load_reactome_mapping(
+        output_dir=output_dir,
+        species_id=species_id,
+        url=url,
+        file_name=file_name,
+        usecols=[id_string, name_string, source_string],
+        species_column=source_string,
+        mapping_dir=mapping_dir,
+        reference_dir=reference_dir)
+
+    return add_reactome_metabolites(
+        species_database=species_database,
+        name_database=name_database,
+        components_database=components_database,
+        compartment_dictionary=compartment_dictionary,
+        species_id=species_id,
+        chebi=chebi,
+        name_string=name_string,
+        id_string=id_string,
+        source_string=source_string)
+
+
+def add_reactome_metabolites(
+        species_database,
+        name_database,
+        components_database,
+        compartment_dictionary,
+        species_id,
+        chebi,
+        name_string=2,
+        id_string=1,
+        source_string=3):
+    """Add metabolite species from the ChEBI2Reactome table that are missing
+    from the databases
+    """
 
     chebi = chebi.loc[chebi[source_string].str.contains(species_id)]
     reversed_compartments = {v:k for k, v in compartment_dictionary.items()}
 
-    for index, row in chebi.iterrows():
-        species_id = 'species_' + row[id_string].split('-')[-1]
-        reactome_id = row[id_string]
-        try:
-            name = row[name_string].split(' [')[0]
-        except:
-            name = row[name_string]
-        
-        try:
-            compartment = row[name_string].split(' [')[1].split(']')[0]
-        except:
-            compartment = None
+    reactome_ids = chebi[id_string]
+    species_ids = 'species_' + reactome_ids.str.split('-').str[-1]
+    names = chebi[name_string].str.split(' [', n=1, regex=False).str[0]
+    names = names.where(names.notna(), chebi[name_string])
+    compartments = chebi[name_string].str.extract(
+        r' \[([^\]]*)', expand=False)
+    compartments = compartments.astype(object).where(
+        compartments.notna(), None)
+
+    for species_id, reactome_id, name, compartment in zip(
+            species_ids.tolist(),
+            reactome_ids.tolist(),
+            names.tolist(),
+            compartments.tolist()):
         if compartment in reversed_compartments:
             compartment_id = reversed_compartments[compartment]
         elif compartment in compartment_dictionary:
@@ -375,13 +589,22 @@ def supplement_components(
     return species_database, name_database, components_database
 
 
-def get_reactome_version():
+def get_reactome_version(
+        output_dir='./',
+        reference_dir=None):
     """Get most recent Reactome database version at time of curation
     """
-    reactome_url = "https://reactome.org/tag/release"
-    f = requests.get(reactome_url)
-    matches_old = re.findall(r"\bversion (\d+) released", f.text, re.IGNORECASE)
-    matches_new = re.findall(r"\bv(\d+) released", f.text, re.IGNORECASE)
+    release_file = fetch_reference(
+        url=reactome_release_url,
+        output_dir=output_dir,
+        reference_dir=reference_dir,
+        file_name='reactome_release.html')
+    with open(release_file, 'r', encoding='utf-8', errors='replace') as f:
+        text = f.read()
+    if reference_dir == None:
+        os.remove(release_file)
+    matches_old = re.findall(r"\bversion (\d+) released", text, re.IGNORECASE)
+    matches_new = re.findall(r"\bv(\d+) released", text, re.IGNORECASE)
     matches = matches_old + matches_new
     if matches:
         current_version = max(int(version) for version in matches)
@@ -404,6 +627,39 @@ def add_genes(
     return name_database
 
 
+def get_reference_files(
+        args_dict):
+    """List the upstream files a curation will fetch, as (url, file_name)
+    - Skips files that are already available locally as a --reactome_archive
+    or as species partitions in --mapping_dir
+    """
+
+    reactome = args_dict['database_source'].lower() == 'reactome'
+
+    def is_partitioned(url):
+        return args_dict.get('mapping_dir') != None \
+            and get_mapping_partition(
+                args_dict['mapping_dir'],
+                url.split('/')[-1],
+                args_dict['organism_id']) != None
+
+    references = []
+    if reactome and str(args_dict.get('reactome_archive')).lower() == 'none':
+        references.append((reactome_sbml_url, None))
+    if not is_partitioned(chebi_mapping_url):
+        references.append((chebi_mapping_url, None))
+    references.append((chebi_names_url, 'names.tsv.gz'))
+    if reactome:
+        references.append((complex_participants_url, None))
+        references.append((complex_pathway_url, None))
+        for url in [ensembl_mapping_url, uniprot_mapping_url]:
+            if not is_partitioned(url):
+                references.append((url, None))
+        references.append((reactome_release_url, 'reactome_release.html'))
+
+    return references
+
+
 def __main__(
         args_dict):
     """Curate database
@@ -416,114 +672,151 @@ def __main__(
             + '.mvdb'
     args_dict['network'] = args_dict['organism_curation_file']
 
-    # Load reactions
-    print('Curating reaction network database. Please be patient, this will take several minutes...')
-    print('Loading reactions...')
-    args_dict, pathway_database, reaction_database, species_database, \
-    name_database, compartment_dictionary, components_database = load_reactions(
-            species_id=args_dict['organism_id'],
+    # Start downloads so each parser can begin once its own file is in
+    if args_dict.get('download_threads', 1) > 1:
+        prefetch_references(
+            get_reference_files(args_dict),
             output_dir=args_dict['output'],
-            database_source=args_dict['database_source'],
-            sbml_url=args_dict['organism_curation_file'],
-            args_dict=args_dict)
-
-    species_database, name_database, components_database = supplement_components(
-        species_database=species_database,
-        name_database=name_database,
-        components_database=components_database,
-        compartment_dictionary=compartment_dictionary,
-        species_id=args_dict['organism_id'],
-        output_dir=args_dict['output'])
-
-    print('Parsing ChEBI database...')
-    chebi_mapper, chebi_synonyms, uniprot_metabolites = parse_chebi_synonyms(
-        output_dir=args_dict['output'])
-    progress_feed(args_dict, "graph", 5)
-
-    if args_dict['database_source'].lower() == 'reactome':
-        print('Loading complex database...')
-        complexes_reference = load_complexes(
-            output_dir=args_dict['output'])
-        progress_feed(args_dict, "graph", 2)
-
-        print('Parsing complex database...')
-        complexes_reference['complex_dictionary'] = parse_complexes(
-            complexes_reference)
-        progress_feed(args_dict, "graph", 1)
-
-        print('Finalizing complex database...')
-        complexes_reference['complex_dictionary'] = reference_complex_species(
-            reference=complexes_reference['complex_dictionary'],
-            name_database=name_database)
-        progress_feed(args_dict, "graph", 1)
-
-        print('Parsing Ensembl database...')
-        ensembl_reference = parse_ensembl_synonyms(
-            output_dir=args_dict['output'],
-            species_id=args_dict['organism_id'])
-        progress_feed(args_dict, "graph", 7)
-
-        print('Adding gene IDs to name database...')
-        name_database = add_genes(
+            reference_dir=args_dict.get('reference_dir'),
+            threads=args_dict['download_threads'])
+
+    try:
+        # Load reactions
+        print('Curating reaction network database. Please be patient, this will take several minutes...')
+        print('Loading reactions...')
+        with profile_stage(args_dict, 'load_reactions') as stage:
+            args_dict, pathway_database, reaction_database, species_database, \
+            name_database, compartment_dictionary, components_database = load_reactions(
+                    species_id=args_dict['organism_id'],
+                    output_dir=args_dict['output'],
+                    database_source=args_dict['database_source'],
+                    sbml_url=args_dict['organism_curation_file'],
+                    args_dict=args_dict)
+            stage.count(
+                pathways=len(pathway_database),
+                reactions=len(reaction_database),
+                species=len(species_database))
+
+        species_database, name_database, components_database = supplement_components(
+            species_database=species_database,
             name_database=name_database,
-            ensembl_reference=ensembl_reference)
-        progress_feed(args_dict, "graph", 1)
-
-        print('Parsing UniProt database...')
-        uniprot_reference = parse_uniprot_synonyms(
+            components_database=components_database,
+            compartment_dictionary=compartment_dictionary,
+            species_id=args_dict['organism_id'],
             output_dir=args_dict['output'],
-            species_id=args_dict['organism_id'])
-        progress_feed(args_dict, "graph", 3)
+            mapping_dir=args_dict.get('mapping_dir'),
+            reference_dir=args_dict.get('reference_dir'))
+
+        print('Parsing ChEBI database...')
+        with profile_stage(args_dict, 'parse_chebi_synonyms') as stage:
+            chebi_mapper, chebi_synonyms, uniprot_metabolites = parse_chebi_synonyms(
+                output_dir=args_dict['output'],
+                reference_dir=args_dict.get('reference_dir'))
+            stage.count(
+                chebi_ids=len(chebi_mapper),
+                synonyms=len(chebi_synonyms))
+        progress_feed(args_dict, "graph", 5)
+
+        if args_dict['database_source'].lower() == 'reactome':
+            print('Loading complex database...')
+            complexes_reference = load_complexes(
+                output_dir=args_dict['output'],
+                reference_dir=args_dict.get('reference_dir'))
+            progress_feed(args_dict, "graph", 2)
+
+            print('Parsing complex database...')
+            complexes_reference['complex_dictionary'] = parse_complexes(
+                complexes_reference)
+            progress_feed(args_dict, "graph", 1)
+
+            print('Finalizing complex database...')
+            complexes_reference['complex_dictionary'] = reference_complex_species(
+                reference=complexes_reference['complex_dictionary'],
+                name_database=name_database)
+            progress_feed(args_dict, "graph", 1)
+
+            print('Parsing Ensembl database...')
+            ensembl_reference = parse_ensembl_synonyms(
+                output_dir=args_dict['output'],
+                species_id=args_dict['organism_id'],
+                mapping_dir=args_dict.get('mapping_dir'),
+                reference_dir=args_dict.get('reference_dir'))
+            progress_feed(args_dict, "graph", 7)
+
+            print('Adding gene IDs to name database...')
+            name_database = add_genes(
+                name_database=name_database,
+                ensembl_reference=ensembl_reference)
+            progress_feed(args_dict, "graph", 1)
+
+            print('Parsing UniProt database...')
+            uniprot_reference = parse_uniprot_synonyms(
+                output_dir=args_dict['output'],
+                species_id=args_dict['organism_id'],
+                mapping_dir=args_dict.get('mapping_dir'),
+                reference_dir=args_dict.get('reference_dir'))
+            progress_feed(args_dict, "graph", 3)
+
+            database_version = str(get_reactome_version(
+                output_dir=args_dict['output'],
+                reference_dir=args_dict.get('reference_dir'))) + ' (Reactome)'
+            _species_id = args_dict['organism_id']
 
-        database_version = str(get_reactome_version()) + ' (Reactome)'
-        _species_id = args_dict['organism_id']
-
-    else:
-        complexes_reference = {
-            'complex_dictionary': {}
+        else:
+            complexes_reference = {
+                'complex_dictionary': {}
+            }
+            ensembl_reference = {}
+            uniprot_reference = {}
+            database_version = args_dict['database_version']
+            _species_id = args_dict['organism_id']
+
+        with profile_stage(args_dict, 'fetch_references') as stage:
+            fetch_report = finish_prefetch()
+            stage.count(
+                files=len(fetch_report),
+                bytes=sum(r['bytes'] for r in fetch_report))
+
+        metaboverse_db = {
+            'organism_id': _species_id,
+            'pathway_database': pathway_database,
+            'reaction_database': reaction_database,
+            'species_database': species_database,
+            'name_database': name_database,
+            'ensembl_synonyms': ensembl_reference,
+            'uniprot_synonyms': uniprot_reference,
+            'chebi_mapper': chebi_mapper,
+            'chebi_synonyms': chebi_synonyms,
+            'uniprot_metabolites': uniprot_metabolites,
+            'complex_dictionary': complexes_reference['complex_dictionary'],
+            'compartment_dictionary': compartment_dictionary,
+            'components_database': components_database,
+            'curation_date': date.today().strftime('%Y-%m-%d'),
+            'metaboverse-curate_version': get_metaboverse_cli_version(),
+            'database_version': database_version,
+            'database_date': date.today().strftime('%Y-%m-%d')
         }
-        ensembl_reference = {}
-        uniprot_reference = {}
-        database_version = args_dict['database_version']
-        _species_id = args_dict['organism_id']
-
-    metaboverse_db = {
-        'organism_id': _species_id,
-        'pathway_database': pathway_database,
-        'reaction_database': reaction_database,
-        'species_database': species_database,
-        'name_database': name_database,
-        'ensembl_synonyms': ensembl_reference,
-        'uniprot_synonyms': uniprot_reference,
-        'chebi_mapper': chebi_mapper,
-        'chebi_synonyms': chebi_synonyms,
-        'uniprot_metabolites': uniprot_metabolites,
-        'complex_dictionary': complexes_reference['complex_dictionary'],
-        'compartment_dictionary': compartment_dictionary,
-        'components_database': components_database,
-        'curation_date': date.today().strftime('%Y-%m-%d'),
-        'metaboverse-curate_version': get_metaboverse_cli_version(),
-        'database_version': database_version,
-        'database_date': date.today().strftime('%Y-%m-%d')
-    }
-
-    # Write database to file
-    print('Writing metaboverse database to file...')
-    if args_dict['cmd'] == 'curate':
-        args_dict['curation'] = _species_id + '.mvdb'
-        write_database(
-            output=args_dict['output'],
-            file=args_dict['curation'],
-            database=metaboverse_db)
-    elif args_dict['cmd'] == 'electrum':
-        args_dict['curation'] = _species_id + '.eldb'
-        write_database_json(
-            output=args_dict['output'],
-            file=args_dict['curation'],
-            database=metaboverse_db)
-    else:
-        raise Exception('Unable to output database file.')
-    progress_feed(args_dict, "graph", 5)
-    print('Metaboverse database curation complete.')
 
-    return args_dict
+        # Write database to file
+        print('Writing metaboverse database to file...')
+        if args_dict['cmd'] == 'curate':
+            args_dict['curation'] = _species_id + '.mvdb'
+            write_database(
+                output=args_dict['output'],
+                file=args_dict['curation'],
+                database=metaboverse_db)
+        elif args_dict['cmd'] == 'electrum':
+            args_dict['curation'] = _species_id + '.eldb'
+            write_database_json(
+                output=args_dict['output'],
+                file=args_dict['curation'],
+                database=metaboverse_db)
+        else:
+            raise Exception('Unable to output database file.')
+        progress_feed(args_dict, "graph", 5)
+        print('Metaboverse database curation complete.')
+
+        return args_dict
+    finally:
+        # Drop downloads that were never used if curation stopped early
+        cancel_prefetch()
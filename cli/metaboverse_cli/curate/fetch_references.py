@@ -0,0 +1,533 @@
+"""License Information
+metaboverse-cli
+Back-end CLI Tool for Curating Metabolic Networks for Metaboverse
+https://github.com/Metaboverse/metaboverse-cli/
+alias: metaboverse-cli
+
+MIT License
+
+Copyright (c) Jordan A. Berg, The University of Utah
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+from __future__ import print_function
+from concurrent.futures import ThreadPoolExecutor
+from ftplib import FTP
+from contextlib import closing
+from datetime import datetime
+import threading
+import requests
+import tempfile
+import hashlib
+import shutil
+import json
+import time
+import os
+
+"""Set globals
+"""
+index_name = 'index.json'
+objects_name = 'objects'
+index_lock = threading.Lock()
+prefetch_lock = threading.Lock()
+prefetched = {}
+fetch_report = []
+download_retries = 3
+download_backoff = 2
+
+
+def hash_file(
+        file,
+        block_size=1 << 20):
+    """Get the sha256 hex digest of a file
+    """
+
+    digest = hashlib.sha256()
+    with open(file, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def get_release(
+        url,
+        timeout=30):
+    """Get the upstream release of a reference file without downloading it
+    - HTTP(S) files use the ETag, or Last-Modified and Content-Length
+    - FTP files use the modification time and size
+    - Returns '' if the server gives nothing to compare against and None if
+    it cannot be reached
+    """
+
+    try:
+        if url.startswith('ftp://'):
+            server_address, file_path = url[6:].split('/', 1)
+            with closing(FTP(server_address, timeout=timeout)) as ftp:
+                ftp.login()
+                modified = ftp.sendcmd('MDTM ' + file_path).split()[-1]
+                ftp.voidcmd('TYPE I')
+                size = ftp.size(file_path)
+            return modified + '-' + str(size)
+
+        response = requests.head(
+            url,
+            allow_redirects=True,
+            timeout=timeout)
+        if response.status_code >= 400:
+            return None
+    except Exception:
+        return None
+
+    headers = response.headers
+    if 'ETag' in headers:
+        return headers['ETag']
+    if 'Last-Modified' in headers:
+        return headers['Last-Modified'] + '-' \
+            + str(headers.get('Content-Length', ''))
+
+    return ''
+
+
+def read_validator(
+        state_file):
+    """Upstream validator a partial download was started against
+    """
+
+    if not os.path.isfile(state_file):
+        return None
+    with open(state_file, 'r') as f:
+        return f.read().strip() or None
+
+
+def write_validator(
+        state_file,
+        validator):
+    """Record the upstream validator of a partial download
+    """
+
+    if validator == None:
+        if os.path.exists(state_file):
+            os.remove(state_file)
+        return
+    with open(state_file, 'w') as f:
+        f.write(validator)
+
+
+def download_http(
+        url,
+        partial,
+        timeout=60):
+    """Download an HTTP(S) file into partial, resuming what is already there
+    - A Range request continues the partial file when upstream still has
+    the ETag or Last-Modified it was started against (If-Range), otherwise
+    the whole file is downloaded again
+    """
+
+    state_file = partial + '.state'
+    offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+    validator = read_validator(state_file)
+    headers = {'Accept-Encoding': 'identity'}
+    if offset > 0 and validator != None:
+        headers['Range'] = 'bytes=' + str(offset) + '-'
+        headers['If-Range'] = validator
+
+    with requests.get(
+            url,
+            headers=headers,
+            stream=True,
+            timeout=timeout) as response:
+        if response.status_code == 416:
+            os.remove(partial)
+            raise IOError('Unable to resume ' + url)
+        response.raise_for_status()
+
+        # The raw stream is written as is, so it has to be the file itself
+        encoding = response.headers.get('Content-Encoding', 'identity')
+        if encoding.strip().lower() not in ('', 'identity'):
+            raise IOError(
+                'Unexpected Content-Encoding ' + encoding + ' for ' + url)
+
+        if response.status_code == 206:
+            mode = 'ab'
+            expected = offset
+        else:
+            mode = 'wb'
+            expected = 0
+            write_validator(
+                state_file,
+                response.headers.get(
+                    'ETag', response.headers.get('Last-Modified')))
+        if 'Content-Length' in response.headers:
+            expected += int(response.headers['Content-Length'])
+        else:
+            expected = None
+
+        with open(partial, mode) as f:
+            for block in response.raw.stream(1 << 20, decode_content=False):
+                f.write(block)
+
+    if expected != None and os.path.getsize(partial) != expected:
+        raise IOError('Incomplete download of ' + url)
+
+    return mode == 'ab'
+
+
+def download_ftp(
+        url,
+        partial,
+        timeout=60):
+    """Download an FTP file into partial, resuming what is already there
+    - The transfer restarts at the partial size (REST) when upstream has the
+    modification time it was started against
+    """
+
+    state_file = partial + '.state'
+    offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+    server_address, file_path = url[6:].split('/', 1)
+
+    with closing(FTP(server_address, timeout=timeout)) as ftp:
+        ftp.login()
+        try:
+            validator = ftp.sendcmd('MDTM ' + file_path).split()[-1]
+        except Exception:
+            validator = None
+        if offset == 0 or validator == None \
+                or validator != read_validator(state_file):
+            offset = 0
+        write_validator(state_file, validator)
+
+        with open(partial, 'ab' if offset > 0 else 'wb') as f:
+            ftp.retrbinary(
+                'RETR ' + file_path,
+                f.write,
+                rest=offset if offset > 0 else None)
+
+    return offset > 0
+
+
+def download_reference(
+        url,
+        file,
+        timeout=60,
+        retries=None,
+        backoff=None):
+    """Download a reference file
+    - The file is written to <file>.partial and moved into place once
+    complete, so an interrupted download never leaves a truncated file.
+    Failed transfers are retried, continuing the partial file, and a partial
+    file left by an earlier run is resumed.
+    - Adds the transfer rate to the fetch report
+    """
+
+    if retries == None:
+        retries = download_retries
+    if backoff == None:
+        backoff = download_backoff
+
+    partial = file + '.partial'
+    start = time.time()
+    resumed = False
+    attempts = 0
+    while True:
+        attempts += 1
+        offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+        try:
+            if url.startswith('ftp://'):
+                resumed = download_ftp(url, partial, timeout) or resumed
+            else:
+                resumed = download_http(url, partial, timeout) or resumed
+            break
+        except Exception as e:
+            if attempts > retries:
+                raise
+            print('Download of ' + url + ' failed (' + str(e)
+                  + ') ... retrying...')
+            if not os.path.exists(partial) \
+                    or os.path.getsize(partial) <= offset:
+                time.sleep(backoff * attempts)
+
+    os.replace(partial, file)
+    if os.path.exists(partial + '.state'):
+        os.remove(partial + '.state')
+
+    seconds = max(time.time() - start, 1e-9)
+    size = os.path.getsize(file)
+    with prefetch_lock:
+        fetch_report.append({
+            'url': url,
+            'file': file,
+            'bytes': size,
+            'seconds': round(seconds, 3),
+            'bytes_per_second': round(size / seconds, 1),
+            'attempts': attempts,
+            'resumed': resumed})
+    print('Downloaded ' + os.path.basename(file) + ': '
+          + str(round(size / 1e6, 1)) + ' MB in '
+          + str(round(seconds, 1)) + ' s ('
+          + str(round(size / 1e6 / seconds, 2)) + ' MB/s)')
+
+    return file
+
+
+def load_index(
+        reference_dir):
+    """Read the reference cache index, keyed by URL
+    """
+
+    index_file = os.path.join(reference_dir, index_name)
+    if not os.path.isfile(index_file):
+        return {}
+
+    try:
+        with open(index_file, 'r') as f:
+            return json.load(f)
+    except ValueError:
+        print('Warning: unreadable reference index ' + index_file
+              + ' ... ignoring...')
+        return {}
+
+
+def write_index(
+        reference_dir,
+        index):
+    """Atomically replace the reference cache index
+    """
+
+    index_file = os.path.join(reference_dir, index_name)
+    handle, temporary = tempfile.mkstemp(
+        prefix=index_name + '.',
+        dir=reference_dir)
+    with os.fdopen(handle, 'w') as f:
+        json.dump(index, f, indent=4)
+    os.replace(temporary, index_file)
+
+
+def check_entry(
+        reference_dir,
+        entry):
+    """Path of a cached file if it is still intact, otherwise None
+    """
+
+    file = os.path.join(reference_dir, entry['file'])
+    if not os.path.isfile(file) \
+            or os.path.getsize(file) != entry['size'] \
+            or hash_file(file) != entry['sha256']:
+        return None
+
+    return file
+
+
+def check_mirror(
+        file):
+    """Verify a mirrored file against its optional <file>.sha256 sidecar
+    """
+
+    sidecar = file + '.sha256'
+    if os.path.isfile(sidecar):
+        with open(sidecar, 'r') as f:
+            expected = f.read().split()[0].lower()
+        if hash_file(file) != expected:
+            raise Exception(file, 'does not match its sha256 checksum')
+
+    return file
+
+
+def fetch_reference(
+        url,
+        output_dir='./',
+        reference_dir=None,
+        file_name=None):
+    """Get a local copy of an upstream reference file
+    - Without reference_dir, the file is downloaded to output_dir as before
+    and the caller removes it when done
+    - With reference_dir, a file of the same name placed directly in
+    reference_dir is used as an offline mirror. Otherwise downloads are kept
+    under reference_dir/objects/<sha256>/ and reused while the upstream
+    ETag or modification time is unchanged, or when upstream cannot be
+    reached. Cached files belong to the cache and must not be removed.
+    - If the URL was passed to prefetch_references(), waits for that
+    transfer instead of starting a new one
+    """
+
+    with prefetch_lock:
+        prefetch = prefetched.pop(url, None)
+    if prefetch != None:
+        return prefetch[0].result()
+
+    return get_reference(
+        url=url,
+        output_dir=output_dir,
+        reference_dir=reference_dir,
+        file_name=file_name)
+
+
+def get_reference(
+        url,
+        output_dir='./',
+        reference_dir=None,
+        file_name=None):
+    """Download or look up a reference file for fetch_reference()
+    """
+
+    if file_name == None:
+        file_name = url.split('/')[-1]
+
+    if reference_dir == None:
+        return download_reference(
+            url,
+            os.path.join(output_dir, file_name))
+
+    mirror = os.path.join(reference_dir, file_name)
+    if os.path.isfile(mirror):
+        print('Using mirrored reference: ' + mirror)
+        return check_mirror(mirror)
+
+    if not os.path.isdir(os.path.join(reference_dir, objects_name)):
+        os.makedirs(os.path.join(reference_dir, objects_name))
+
+    index = load_index(reference_dir)
+    release = get_release(url)
+    if url in index \
+            and (release == None
+                 or (release != '' and release == index[url]['release'])):
+        file = check_entry(reference_dir, index[url])
+        if file != None:
+            print('Using cached reference: ' + file)
+            return file
+        print('Cached copy of ' + url + ' is damaged ... downloading...')
+    elif release == None:
+        print('Warning: unable to reach ' + url)
+
+    file = download_reference(
+        url,
+        os.path.join(reference_dir, objects_name, file_name))
+    sha256 = hash_file(file)
+    object_dir = os.path.join(reference_dir, objects_name, sha256)
+    if not os.path.isdir(object_dir):
+        os.makedirs(object_dir)
+    cached_file = os.path.join(object_dir, file_name)
+    os.replace(file, cached_file)
+
+    with index_lock:
+        index = load_index(reference_dir)
+        previous = index.get(url)
+        index[url] = {
+            'file': os.path.relpath(cached_file, reference_dir),
+            'sha256': sha256,
+            'size': os.path.getsize(cached_file),
+            'release': release if release != None else '',
+            'fetched': datetime.now().isoformat(timespec='seconds')}
+        write_index(reference_dir, index)
+
+        if previous != None and previous['sha256'] != sha256 \
+                and previous['sha256'] not in [
+                    e['sha256'] for e in index.values()]:
+            shutil.rmtree(
+                os.path.join(reference_dir, objects_name, previous['sha256']),
+                ignore_errors=True)
+
+    return cached_file
+
+
+def prefetch_references(
+        references,
+        output_dir='./',
+        reference_dir=None,
+        threads=4):
+    """Start fetching reference files in the background
+    - references is a list of (url, file_name) pairs, fetched with up to
+    threads concurrent transfers
+    - fetch_reference() for a prefetched URL only waits for that transfer,
+    so each parser starts as soon as its own input has landed
+    """
+
+    pool = ThreadPoolExecutor(max_workers=max(1, threads))
+    with prefetch_lock:
+        for url, file_name in references:
+            if url in prefetched:
+                continue
+            prefetched[url] = (
+                pool.submit(
+                    get_reference,
+                    url=url,
+                    output_dir=output_dir,
+                    reference_dir=reference_dir,
+                    file_name=file_name),
+                reference_dir)
+    pool.shutdown(wait=False)
+
+
+def remove_unused_reference(
+        future):
+    """Remove the file of a finished prefetch that was never used
+    """
+
+    if future.cancelled() or future.exception() != None:
+        return
+    file = future.result()
+    if os.path.exists(file):
+        os.remove(file)
+
+
+def cancel_prefetch():
+    """Drop prefetched transfers that were never used, e.g. after an error
+    - Queued transfers are cancelled and running ones are left to finish in
+    the background
+    - Their files are removed once done, unless they belong to a
+    reference_dir cache
+    """
+
+    with prefetch_lock:
+        unused = list(prefetched.values())
+        prefetched.clear()
+
+    for future, reference_dir in unused:
+        if future.cancel() or reference_dir != None:
+            continue
+        future.add_done_callback(remove_unused_reference)
+
+
+def finish_prefetch():
+    """Wait for prefetched transfers that were never used and clear them
+    - Their files are removed unless they belong to a reference_dir cache
+
+    Returns the fetch report: bytes, seconds and bytes_per_second for each
+    file downloaded since the last call
+    """
+
+    with prefetch_lock:
+        unused = list(prefetched.values())
+        prefetched.clear()
+
+    for future, reference_dir in unused:
+        try:
+            file = future.result()
+        except Exception as e:
+            print('Warning: unused reference download failed: ' + str(e))
+            continue
+        if reference_dir == None and os.path.exists(file):
+            os.remove(file)
+
+    with prefetch_lock:
+        report = list(fetch_report)
+        del fetch_report[:]
+
+    return report
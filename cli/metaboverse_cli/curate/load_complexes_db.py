@@ -33,33 +33,46 @@ import os
 """Import internal dependencies
 """
 try:
-    from curate.utils import get_table
-except:
-    import importlib.util
-    spec = importlib.util.spec_from_file_location(
-        "get_table", os.path.abspath("./metaboverse_cli/curate/utils.py"))
-    get_table = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(get_table)
-    get_table = get_table.get_table
+    from metaboverse_cli.curate.utils import get_table
+except ImportError:
+    try:
+        from curate.utils import get_table
+    except:
+        import importlib.util
+        spec = importlib.util.spec_from_file_location(
+            "get_table", os.path.abspath("./metaboverse_cli/curate/utils.py"))
+        get_table = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(get_table)
+        get_table = get_table.get_table
+
+"""Set globals
+"""
+complex_participants_url = 'https://reactome.org/download/current/ComplexParticipantsPubMedIdentifiers_human.txt'
+complex_pathway_url = 'https://reactome.org/download/current/Complex_2_Pathway_human.txt'
 
 """Get tables
 """
 
 
 def __main__(
-        output_dir):
+        output_dir,
+        reference_dir=None):
 
     complex_participants = get_table(
         output_dir=output_dir,
-        url='https://reactome.org/download/current/ComplexParticipantsPubMedIdentifiers_human.txt',
-        column_names=0)
-    os.remove(output_dir + 'ComplexParticipantsPubMedIdentifiers_human.txt')
+        url=complex_participants_url,
+        column_names=0,
+        reference_dir=reference_dir)
+    if reference_dir == None:
+        os.remove(output_dir + complex_participants_url.split('/')[-1])
 
     complex_pathway = get_table(
         output_dir=output_dir,
-        url='https://reactome.org/download/current/Complex_2_Pathway_human.txt',
-        column_names=0)
-    os.remove(output_dir + 'Complex_2_Pathway_human.txt')
+        url=complex_pathway_url,
+        column_names=0,
+        reference_dir=reference_dir)
+    if reference_dir == None:
+        os.remove(output_dir + complex_pathway_url.split('/')[-1])
 
     return {
         'complex_participants': complex_participants,
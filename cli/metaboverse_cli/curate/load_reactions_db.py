@@ -29,10 +29,11 @@ SOFTWARE.
 """
 from __future__ import print_function
 import xml.etree.ElementTree as et
+import multiprocessing
+import threading
 import hashlib
 import tarfile
 import time
-import glob
 import stat
 import json
 import re
@@ -43,17 +44,36 @@ import os
 """Import internal dependencies
 """
 try:
-    from utils import progress_feed, track_progress, update_session, safestr
-except:
-    import importlib.util
-    spec = importlib.util.spec_from_file_location(
-        "", os.path.abspath("./metaboverse_cli/utils.py"))
-    utils = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(utils)
-    progress_feed = utils.progress_feed
-    track_progress = utils.track_progress
-    update_session = utils.update_session
-    safestr = utils.safestr
+    from metaboverse_cli.utils import progress_feed, track_progress, \
+        update_session, safestr
+except ImportError:
+    try:
+        from utils import progress_feed, track_progress, update_session, safestr
+    except:
+        import importlib.util
+        spec = importlib.util.spec_from_file_location(
+            "", os.path.abspath(os.path.join(
+                os.path.dirname(__file__), "..", "utils.py")))
+        utils = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(utils)
+        progress_feed = utils.progress_feed
+        track_progress = utils.track_progress
+        update_session = utils.update_session
+        safestr = utils.safestr
+
+try:
+    from metaboverse_cli.curate.fetch_references import fetch_reference
+except ImportError:
+    try:
+        from curate.fetch_references import fetch_reference
+    except:
+        import importlib.util
+        spec = importlib.util.spec_from_file_location(
+            "", os.path.abspath(os.path.join(
+                os.path.dirname(__file__), "fetch_references.py")))
+        fetch_references = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(fetch_references)
+        fetch_reference = fetch_references.fetch_reference
 
 
 """Global variables
@@ -66,6 +86,8 @@ reactome_split = 'reactome:'
 gene_split = 'gene='
 mirbase_split = 'acc='
 other_split = '/'
+worker_species_cache = {}
+reactome_sbml_url = 'https://reactome.org/download/current/all_species.3.1.sbml.tgz'
 
 
 """Functions
@@ -88,52 +110,95 @@ def get_namespace(
     return re.search('{(.*)}', sbml_tree.tag).group(0)
 
 
-def handle_folder_contents(dir):
-
-    if os.path.exists(dir):
-        try:
-            files = glob.glob(dir + "*")
-            for f in files:
-                os.remove(f)
-        except:
-            print('Unable to remove files from: ' +
-                  str(dir) + ' ... skipping...')
-
-        try:
-            os.rmdir(dir)
-        except:
-            print('Unable to remove directory named: ' +
-                  str(dir) + ' ... skipping...')
+class PathwayArchive():
+    """Pathway SBML files read straight from a Reactome tarball
 
+    Member names are scanned once and only the members for species_id are
+    kept. Files are parsed from the archive without extracting them; reading
+    them in get_pathways() order keeps the compressed stream moving forward.
+    """
 
-def unpack_pathways(
+    def __init__(
+            self,
+            tar_file,
+            species_id=None,
+            remove=False):
+        self.tar_file = tar_file
+        self.remove = remove
+        self.tar = tarfile.open(tar_file, 'r:*')
+        self.members = {}
+        for member in self.tar:
+            name = os.path.basename(member.name)
+            if not member.isfile() or '.' not in name:
+                continue
+            if species_id != None and species_id not in name:
+                continue
+            self.members[name.split('.')[:-1][0]] = member
+
+    def get_pathways(
+            self,
+            species_id):
+        return [p for p in self.members.keys() if species_id in p]
+
+    def read(
+            self,
+            pathway_name):
+        return self.tar.extractfile(self.members[pathway_name]).read()
+
+    def get_database(
+            self,
+            pathway_name):
+        pathway_contents = et.parse(
+            self.tar.extractfile(self.members[pathway_name]))
+        return pathway_contents.getroot()
+
+    def close(self):
+        self.tar.close()
+        if self.remove == True and os.path.exists(self.tar_file):
+            os.remove(self.tar_file)
+
+
+def open_pathways(
         output_dir,
-        url='https://reactome.org/download/current/all_species.3.1.sbml.tgz'):
-    """Load tarballed sbml reactome pathway files from reactome site
+        species_id,
+        archive=None,
+        url=reactome_sbml_url,
+        reference_dir=None):
+    """Open the Reactome pathway tarball without extracting it
+    - A local archive is used as is, otherwise the tarball is downloaded to
+    output_dir and removed again when the archive is closed, or taken from
+    the reference_dir cache and kept
     """
 
-    file = output_dir + url.split('/')[-1]
-    pathways_dir = file[:-4] + os.path.sep
-    handle_folder_contents(
-        dir=pathways_dir)
+    if archive != None and str(archive).lower() != 'none':
+        if not os.path.isfile(archive):
+            raise Exception(archive, 'does not exist')
+        print('Reading Reactome pathways from: ' + str(archive))
+        return PathwayArchive(
+            tar_file=archive,
+            species_id=species_id)
 
-    os.system('curl -kL ' + url + ' -o \"' + file + '\"')
-    os.makedirs(pathways_dir)
+    file = fetch_reference(
+        url=url,
+        output_dir=output_dir,
+        reference_dir=reference_dir)
 
-    tar = tarfile.open(file, "r:gz")
-    tar.extractall(path=pathways_dir)
-    tar.close()
-    os.remove(file)
-
-    return pathways_dir
+    return PathwayArchive(
+        tar_file=file,
+        species_id=species_id,
+        remove=reference_dir == None)
 
 
 def get_pathways(
         species_id,
         pathways_dir):
     """Get list of pathways to parse
+    - pathways_dir may also be a PathwayArchive
     """
 
+    if isinstance(pathways_dir, PathwayArchive):
+        return pathways_dir.get_pathways(species_id)
+
     # Check provided path exists
     if not os.path.isdir(pathways_dir):
         raise Exception(pathways_dir, 'does not exist')
@@ -157,8 +222,15 @@ def get_database(
         pathway_name,
         extension='.sbml'):
     """Import sbml reaction data
+    - pathways_dir may also be a PathwayArchive, or the contents of a
+    pathway file already read from one
     """
 
+    if isinstance(pathways_dir, PathwayArchive):
+        return pathways_dir.get_database(pathway_name)
+    if isinstance(pathways_dir, bytes):
+        return et.fromstring(pathways_dir)
+
     if not pathways_dir.endswith(os.path.sep):
         pathways_dir = pathways_dir + os.path.sep
 
@@ -316,24 +388,39 @@ def add_names(
     """Add names to dictionary to map species ID
     """
 
-    for rank in child.iter(str(bqbiol_namespace + search_string)):
-        for _rank in rank.iter(str(rdf_namespace + 'li')):
+    items = [
+        _rank.attrib[str(rdf_namespace + 'resource')]
+        for rank in child.iter(str(bqbiol_namespace + search_string))
+        for _rank in rank.iter(str(rdf_namespace + 'li'))]
 
-            item = _rank.attrib[str(rdf_namespace + 'resource')]
-            _id = item.split('/')[-1]
-            if 'chebi' in item.lower():
-                _id = check_chebi(item=_id)
-                _id = _id.split(' ')[0]
-            name_database[_id] = specie
-            name_database[specie] = specie
-
-            # If element has parentheses, remove what's in between as
-            # additional key
-            if '(' in _id and ')' in _id:
-                name_database = add_alternative_names(
-                    name_database=name_database,
-                    item=_id,
-                    specie=specie)
+    return add_item_names(
+        name_database=name_database,
+        items=items,
+        specie=specie)
+
+
+def add_item_names(
+        name_database,
+        items,
+        specie):
+    """Add names for a list of annotation resources to map species ID
+    """
+
+    for item in items:
+        _id = item.split('/')[-1]
+        if 'chebi' in item.lower():
+            _id = check_chebi(item=_id)
+            _id = _id.split(' ')[0]
+        name_database[_id] = specie
+        name_database[specie] = specie
+
+        # If element has parentheses, remove what's in between as
+        # additional key
+        if '(' in _id and ')' in _id:
+            name_database = add_alternative_names(
+                name_database=name_database,
+                item=_id,
+                specie=specie)
 
     return name_database
 
@@ -438,6 +525,49 @@ def process_item(item):
     return _id, _type
                     
 
+def get_species_annotations(
+        child,
+        bqbiol_namespace=bqbiol_namespace,
+        rdf_namespace=rdf_namespace):
+    """Get the "is" and "hasPart" resources of a species element in
+    document order
+    """
+
+    li = rdf_namespace + 'li'
+    resource = rdf_namespace + 'resource'
+
+    return (
+        [_rank.attrib[resource]
+            for rank in child.iter(bqbiol_namespace + 'is')
+            for _rank in rank.iter(li)],
+        [_rank.attrib[resource]
+            for rank in child.iter(bqbiol_namespace + 'hasPart')
+            for _rank in rank.iter(li)])
+
+
+def get_species_key(
+        child,
+        bqbiol_namespace=bqbiol_namespace,
+        rdf_namespace=rdf_namespace):
+    """Content key for a species element, used to reuse parsed annotations
+    - Holds the id, name and compartment and the "is" and "hasPart"
+    resources in document order, which is all add_species() reads, so a
+    species annotated differently in another file gets its own entry
+    """
+
+    is_items, has_part_items = get_species_annotations(
+        child=child,
+        bqbiol_namespace=bqbiol_namespace,
+        rdf_namespace=rdf_namespace)
+
+    return (
+        child.get('id', ''),
+        child.get('name', ''),
+        child.get('compartment', ''),
+        tuple(is_items),
+        tuple(has_part_items))
+
+
 def add_species(
         species_database,
         name_database,
@@ -446,8 +576,13 @@ def add_species(
         pathway_record,
         sbml_namespace,
         bqbiol_namespace=bqbiol_namespace,
-        rdf_namespace=rdf_namespace):
+        rdf_namespace=rdf_namespace,
+        species_cache=None):
     """Add species records for pathway to database
+    - If a species_cache dictionary is provided, species elements already
+    parsed from earlier pathway files (by get_species_key()) are not parsed
+    again. Their cached record and names are written again, so the
+    databases are the same as without the cache
     """
 
     species = pathway_record.findall(
@@ -457,10 +592,21 @@ def add_species(
     # Collect species information
     for child in species:
 
+        key = get_species_key(
+            child=child,
+            bqbiol_namespace=bqbiol_namespace,
+            rdf_namespace=rdf_namespace)
+        if species_cache != None and key in species_cache:
+            specie, name, compartment, record, names = species_cache[key]
+            species_database[specie] = name
+            compartment_database[specie] = compartment
+            for n in names:
+                name_database[n] = specie
+            components_database[specie] = record
+            continue
+
         # Initialize specie record and add common name
-        specie = child.attrib.get('id', '')
-        name = child.attrib.get('name', '')
-        compartment = child.attrib.get('compartment', '')
+        specie, name, compartment, is_items, has_part_items = key
 
         if '[' in name:
             name = name.split(' [')[0]
@@ -471,9 +617,9 @@ def add_species(
         compartment_database[specie] = compartment
 
         # Add names and ids to name dictionary
-        name_database[name] = specie
+        species_names = {name: specie}
 
-        components_database[specie] = {
+        record = {
             'id': specie,
             'reactome_id': '',
             'name': name,
@@ -483,46 +629,217 @@ def add_species(
             'type': '',
             'compartment': compartment
         }
+        components_database[specie] = record
 
-        for rank in child.iter(str(bqbiol_namespace + 'is')):
-            for _rank in rank.iter(str(rdf_namespace + 'li')):
-                item = _rank.attrib[str(rdf_namespace + 'resource')]
-                if 'reactome' not in item.lower():
-                    _id, _type = process_item(item)
-                    components_database[specie]['is'] = _id
-                    components_database[specie]['type'] = _type
-                else:
-                    if reactome_split in item.lower():
-                        r_id = item.split(reactome_split)[1]
-                        components_database[specie]['reactome_id'] = r_id
-                    else:
-                        r_id = item.split(other_split)[-1]
-                        components_database[specie]['reactome_id'] = r_id
-
-        for rank in child.iter(str(bqbiol_namespace + 'hasPart')):
-            for _rank in rank.iter(str(rdf_namespace + 'li')):
-                item = _rank.attrib[str(rdf_namespace + 'resource')]
-                if 'reactome' not in item:
-                    components_database[specie]['type'] = 'complex_component'
-                    _id, _type = process_item(item)
-                    components_database[specie]['hasPart'].append(_id)
+        for item in is_items:
+            if 'reactome' not in item.lower():
+                _id, _type = process_item(item)
+                record['is'] = _id
+                record['type'] = _type
+            else:
+                if reactome_split in item.lower():
+                    r_id = item.split(reactome_split)[1]
+                    record['reactome_id'] = r_id
                 else:
-                    _id = item.split(other_split)[-1]
-                    components_database[specie]['hasPart'].append(_id)
+                    r_id = item.split(other_split)[-1]
+                    record['reactome_id'] = r_id
+
+        for item in has_part_items:
+            if 'reactome' not in item:
+                record['type'] = 'complex_component'
+                _id, _type = process_item(item)
+                record['hasPart'].append(_id)
+            else:
+                _id = item.split(other_split)[-1]
+                record['hasPart'].append(_id)
 
         # Add source ID
-        name_database = add_names(
-            name_database=name_database,
-            child=child,
-            specie=specie,
-            search_string='is',
-            bqbiol_namespace=bqbiol_namespace,
-            rdf_namespace=rdf_namespace)
+        species_names = add_item_names(
+            name_database=species_names,
+            items=is_items,
+            specie=specie)
+        name_database.update(species_names)
+
+        if species_cache != None:
+            species_cache[key] = (
+                specie, name, compartment, record, tuple(species_names))
 
     return (species_database, name_database, compartment_database,
             components_database)
 
 
+def parse_pathway(
+        pathways_dir,
+        pathway,
+        bqbiol_namespace=bqbiol_namespace,
+        rdf_namespace=rdf_namespace,
+        species_cache=None):
+    """Parse a single pathway file into database fragments
+    - Fragments are merged in pathway order by merge_pathway(), so the
+    pathway can be parsed in a worker process
+    - species_cache is passed on to add_species()
+    - Pathway reactions are kept in file order and only converted to a list
+    of unique IDs when merged
+    """
+
+    pathway_database = {}
+    reaction_database = {}
+    species_database = {}
+    name_database = {}
+    compartment_database = {}
+    compartment_dictionary = {}
+    components_database = {}
+
+    db = get_database(
+        pathways_dir,
+        pathway)
+    sbml_namespace = get_namespace(
+        sbml_tree=db
+    )
+
+    pathway_record = db.findall(
+        str(sbml_namespace + 'model')
+    )[0]
+
+    pathway_info = pathway_record.attrib
+
+    id = pathway_info['id']
+    pathway_database[pathway] = {
+        'id': id,
+        'reactome': pathway,
+        'name': pathway_info['name'],
+        'reactions': []
+    }
+
+    # Parse out reactions
+    reactions = pathway_record.findall(
+        str(sbml_namespace + 'listOfReactions')
+    )[0]
+
+    # Parse out compartment IDs and names
+    compartments = pathway_record.findall(
+        str(sbml_namespace + 'listOfCompartments')
+    )[0]
+    for c in range(len(compartments)):
+        id = compartments[c].attrib['id']
+        name = compartments[c].attrib['name']
+        compartment_dictionary[id] = name
+
+    # Extract reactions from pathway
+    for reaction in reactions:
+
+        # Get metadata
+        compartment, id, reactome, name, reversible, notes = get_metadata(
+            reaction=reaction,
+            sbml_namespace=sbml_namespace)
+
+        # Get pathway high-level information (reactions, name, compartment)
+        reaction_id = reaction.attrib['id']
+        pathway_database[pathway]['reactions'].append(reaction_id)
+
+        name_database[name] = reaction_id
+        reaction_database[id] = {
+            'compartment': compartment,
+            'id': id,
+            'reactome': reactome,
+            'name': name,
+            'reversible': reversible,
+            'notes': notes}
+
+        # Collect reactants for a given reaction by species ID
+        reaction_database[reaction_id]['reactants'] = add_reaction_components(
+            type='listOfReactants',
+            reaction=reaction,
+            sbml_namespace=sbml_namespace)
+
+        # Collect products for a given reaction by species ID
+        reaction_database[reaction_id]['products'] = add_reaction_components(
+            type='listOfProducts',
+            reaction=reaction,
+            sbml_namespace=sbml_namespace)
+
+        # Collect modifiers for a given reaction by species ID
+        reaction_database[reaction_id]['modifiers'] = add_reaction_components(
+            type='listOfModifiers',
+            reaction=reaction,
+            sbml_namespace=sbml_namespace)
+
+    # Generate species dict
+    species_database, name_database, compartment_database, \
+        components_database = add_species(
+            species_database=species_database,
+            name_database=name_database,
+            compartment_database=compartment_database,
+            components_database=components_database,
+            pathway_record=pathway_record,
+            sbml_namespace=sbml_namespace,
+            bqbiol_namespace=bqbiol_namespace,
+            rdf_namespace=rdf_namespace,
+            species_cache=species_cache)
+
+    return (pathway_database, reaction_database, species_database,
+    name_database, compartment_database, compartment_dictionary,
+    components_database)
+
+
+def init_pathway_worker():
+    """Give each worker process its own species cache
+    """
+
+    global worker_species_cache
+    worker_species_cache = {}
+
+
+def parse_pathway_worker(
+        task):
+    """Parse a pathway file in a worker process
+    """
+
+    return parse_pathway(
+        *task,
+        species_cache=worker_species_cache)
+
+
+def iter_pathway_tasks(
+        pathways_dir,
+        pathways_list,
+        bqbiol_namespace,
+        rdf_namespace,
+        slots):
+    """Yield parse_pathway() tasks in pathway order, waiting for a free slot
+    before reading each one
+    """
+
+    for pathway in pathways_list:
+        slots.acquire()
+        if isinstance(pathways_dir, PathwayArchive):
+            yield (pathways_dir.read(pathway), pathway,
+                bqbiol_namespace, rdf_namespace)
+        else:
+            yield (pathways_dir, pathway, bqbiol_namespace, rdf_namespace)
+
+
+def merge_pathway(
+        databases,
+        fragments):
+    """Merge the fragments from parse_pathway() into the running databases
+    - Later pathways overwrite earlier ones key by key, as when all pathways
+    are parsed into the same dictionaries
+    """
+
+    pathway_database = fragments[0]
+    for pathway in pathway_database.keys():
+        # Drop repeated reactions, keeping file order so the list can be
+        # written to JSON and matches between sequential and threaded runs
+        pathway_database[pathway]['reactions'] = list(dict.fromkeys(
+            pathway_database[pathway]['reactions']))
+
+    for database, fragment in zip(databases, fragments):
+        database.update(fragment)
+
+    return databases
+
+
 def process_components(
         output_dir,
         pathways_dir,
@@ -530,8 +847,12 @@ def process_components(
         species_id,
         args_dict=None,
         bqbiol_namespace=bqbiol_namespace,
-        rdf_namespace=rdf_namespace):
+        rdf_namespace=rdf_namespace,
+        threads=None):
     """Process species-specific pathways
+    - With threads > 1 (or args_dict['threads']), pathway files are parsed by
+    a pool of worker processes and merged in pathway order, giving the same
+    databases as a single-process run
     """
 
     # Initialize databases
@@ -542,109 +863,65 @@ def process_components(
     compartment_database = {}
     compartment_dictionary = {}
     components_database = {}
+    databases = (pathway_database, reaction_database, species_database,
+        name_database, compartment_database, compartment_dictionary,
+        components_database)
+
+    if threads == None:
+        threads = 1
+        if args_dict != None:
+            threads = args_dict.get('threads', 1) or 1
+    threads = min(threads, max(len(pathways_list), 1))
 
     print('Extracting pathway-level reaction data for: ' + str(species_id))
+    if threads > 1:
+        print('\tUsing ' + str(threads) + ' worker processes')
 
     counter = 0
     pathway_number = len(pathways_list)
 
-    # Cycle through each pathway database and extract  contents
-    for pathway in pathways_list:
-        counter = track_progress(args_dict, counter, pathway_number, 7)
-
-        db = get_database(
-            pathways_dir,
-            pathway)
-        sbml_namespace = get_namespace(
-            sbml_tree=db
-        )
-
-        pathway_record = db.findall(
-            str(sbml_namespace + 'model')
-        )[0]
-
-        pathway_info = pathway_record.attrib
-
-        id = pathway_info['id']
-        pathway_database[pathway] = {
-            'id': id,
-            'reactome': pathway,
-            'name': pathway_info['name'],
-            'reactions': set()
-        }
-
-        # Parse out reactions
-        reactions = pathway_record.findall(
-            str(sbml_namespace + 'listOfReactions')
-        )[0]
-
-        # Parse out compartment IDs and names
-        compartments = pathway_record.findall(
-            str(sbml_namespace + 'listOfCompartments')
-        )[0]
-        for c in range(len(compartments)):
-            id = compartments[c].attrib['id']
-            name = compartments[c].attrib['name']
-            compartment_dictionary[id] = name
-
-        # Extract reactions from pathway
-        for reaction in reactions:
-
-            # Get metadata
-            compartment, id, reactome, name, reversible, notes = get_metadata(
-                reaction=reaction,
-                sbml_namespace=sbml_namespace)
-
-            # Get pathway high-level information (reactions, name, compartment)
-            pathway_database, reaction_id = add_reaction(
-                pathway_database=pathway_database,
-                reaction=reaction,
-                pathway=pathway,
-                bqbiol_namespace=bqbiol_namespace,
-                rdf_namespace=rdf_namespace)
-
-            name_database[name] = reaction_id
-            reaction_database[id] = {
-                'compartment': compartment,
-                'id': id,
-                'reactome': reactome,
-                'name': name,
-                'reversible': reversible,
-                'notes': notes}
-
-            # Collect reactants for a given reaction by species ID
-            reaction_database[reaction_id]['reactants'] = add_reaction_components(
-                type='listOfReactants',
-                reaction=reaction,
-                sbml_namespace=sbml_namespace)
-
-            # Collect products for a given reaction by species ID
-            reaction_database[reaction_id]['products'] = add_reaction_components(
-                type='listOfProducts',
-                reaction=reaction,
-                sbml_namespace=sbml_namespace)
-
-            # Collect modifiers for a given reaction by species ID
-            reaction_database[reaction_id]['modifiers'] = add_reaction_components(
-                type='listOfModifiers',
-                reaction=reaction,
-                sbml_namespace=sbml_namespace)
-
-        # Convert reaction set for pathway to list
-        pathway_database[pathway]['reactions'] = list(
-            pathway_database[pathway]['reactions'])
-
-        # Generate species dict
-        species_database, name_database, compartment_database, \
-            components_database = add_species(
-                species_database=species_database,
-                name_database=name_database,
-                compartment_database=compartment_database,
-                components_database=components_database,
-                pathway_record=pathway_record,
-                sbml_namespace=sbml_namespace,
-                bqbiol_namespace=bqbiol_namespace,
-                rdf_namespace=rdf_namespace)
+    # Cycle through each pathway database and extract contents
+    if threads <= 1:
+        species_cache = {}
+        for pathway in pathways_list:
+            counter = track_progress(args_dict, counter, pathway_number, 7)
+            merge_pathway(
+                databases=databases,
+                fragments=parse_pathway(
+                    pathways_dir,
+                    pathway,
+                    bqbiol_namespace,
+                    rdf_namespace,
+                    species_cache=species_cache))
+    else:
+        # Archive members are read here, in order, and parsed by the workers.
+        # At most a window of tasks is read ahead of the merged results
+        chunksize = max(1, min(16, pathway_number // (threads * 4)))
+        window = threads * chunksize * 4
+        slots = threading.Semaphore(window)
+        with multiprocessing.Pool(
+                processes=threads,
+                initializer=init_pathway_worker) as pool:
+            try:
+                for fragments in pool.imap(
+                        parse_pathway_worker,
+                        iter_pathway_tasks(
+                            pathways_dir,
+                            pathways_list,
+                            bqbiol_namespace,
+                            rdf_namespace,
+                            slots),
+                        chunksize=chunksize):
+                    slots.release()
+                    counter = track_progress(
+                        args_dict, counter, pathway_number, 7)
+                    merge_pathway(
+                        databases=databases,
+                        fragments=fragments)
+            finally:
+                # Unblock the task reader so the pool can shut down early
+                for _ in range(window):
+                    slots.release()
 
     return (args_dict, pathway_database, reaction_database, species_database,
     name_database, compartment_database, compartment_dictionary,
@@ -691,25 +968,36 @@ def update_model_metadata(
     """Get model metadata and update session info
     """
 
+    return update_model_attributes(
+        attributes=sbml_db[0].attrib,
+        args_dict=args_dict)
+
+
+def update_model_attributes(
+        attributes,
+        args_dict):
+    """Update session info from the model element attributes
+    """
+
     session_file = args_dict['session_data']
     update_session(
         session_file=session_file,
         key='organism_id',
-        value=sbml_db[0].attrib['id'])
-    args_dict['organism_id'] = sbml_db[0].attrib['id']
+        value=attributes['id'])
+    args_dict['organism_id'] = attributes['id']
 
-    if 'name' in sbml_db[0].attrib:
+    if 'name' in attributes:
         update_session(
             session_file=session_file,
             key='organism',
-            value=sbml_db[0].attrib['name'])
+            value=attributes['name'])
     else:
         update_session(
             session_file=session_file,
             key='organism',
             value='unknown')
-    if 'metaid' in sbml_db[0].attrib:
-        _ver = sbml_db[0].attrib['metaid'] + ' (' + args_dict['database_source'] + ')'
+    if 'metaid' in attributes:
+        _ver = attributes['metaid'] + ' (' + args_dict['database_source'] + ')'
         update_session(
             session_file=session_file,
             key='database_version',
@@ -725,6 +1013,151 @@ def update_model_metadata(
     return args_dict
 
 
+def add_manual_species(
+        species_database,
+        name_database,
+        compartment_database,
+        components_database,
+        child,
+        sbml_namespace,
+        bqbiol_namespace=bqbiol_namespace,
+        rdf_namespace=rdf_namespace):
+    """Add a species element from a BiGG/BioModels model to the databases
+    """
+
+    specie = child.attrib.get('id', '')
+    name = child.attrib.get('name', specie)
+    sboTerm = child.attrib.get('sboTerm', '')
+    compartment = child.attrib.get('compartment', '')
+
+    species_database[specie] = name
+    compartment_database[specie] = compartment
+    name_database[name] = specie
+    components_database[specie] = {
+        'id': specie,
+        'reactome_id': sboTerm,
+        'name': name,
+        'is': specie,
+        'isEncodedBy': '',
+        'hasPart': [],
+        'type': '',
+        'compartment': compartment
+    }
+
+    for rank in child.iter(str(bqbiol_namespace + 'is')):
+        for _rank in rank.iter(str(rdf_namespace + 'li')):
+            item = _rank.attrib[str(rdf_namespace + 'resource')]
+            if 'reactome' not in item.lower():
+                if 'chebi' in item.lower() \
+                        or 'kegg' in item.lower() \
+                        or 'hmdb' in item.lower() \
+                        or 'bigg' in item.lower():
+                    _id = item.split('/')[-1]
+                    components_database[specie]['is'] = _id
+                    components_database[specie]['type'] = 'metabolite_component'
+                elif 'uniprot' in item.lower():
+                    _id = item.split('/')[-1]
+                    components_database[specie]['is'] = _id
+                    components_database[specie]['type'] = 'protein_component'
+                else:
+                    components_database[specie]['type'] = 'other'
+            else:
+                r_id = item.split('/')[-1]
+                components_database[specie]['reactome_id'] = r_id
+
+    for rank in child.iter(str(bqbiol_namespace + 'hasPart')):
+        for _rank in rank.iter(str(rdf_namespace + 'li')):
+            item = _rank.attrib[str(rdf_namespace + 'resource')]
+            if 'reactome' not in item:
+                components_database[specie]['type'] = 'complex_component'
+                if 'chebi' in item.lower() \
+                        or 'kegg' in item.lower() \
+                        or 'hmdb' in item.lower() \
+                        or 'bigg' in item.lower():
+                    _id = item.split('/')[-1]
+                    components_database[specie]['hasPart'].append(
+                        _id)
+                elif 'uniprot' in item.lower():
+                    _id = item.split('/')[-1]
+                    components_database[specie]['hasPart'].append(
+                        _id)
+                elif 'mirbase' in item.lower():
+                    _id = item.split('acc=')[1]
+                    components_database[specie]['hasPart'].append(
+                        _id)
+                else:
+                    pass
+
+    for rank in child.iter(str(bqbiol_namespace + 'isEncodedBy')):
+        for _rank in rank.iter(str(rdf_namespace + 'li')):
+            item = _rank.attrib[str(rdf_namespace + 'resource')]
+            if 'reactome' not in item:
+                if 'kegg.genes' in item.lower():
+                    _id = item.split('/')[-1]
+                    _id_ = _id.split(':')[-1]
+                    components_database[specie]['isEncodedBy'] = _id_
+                else:
+                    _id = item.split('/')[-1]
+                    components_database[specie]['isEncodedBy'] = _id
+
+    # Add source ID
+    name_database = add_names(
+        name_database=name_database,
+        child=child,
+        specie=specie,
+        search_string='is',
+        bqbiol_namespace=bqbiol_namespace,
+        rdf_namespace=rdf_namespace)
+
+    name_database = add_bigg_names(
+        name_database=name_database,
+        child=child,
+        specie=specie,
+        sbml_namespace=sbml_namespace,
+        search_string='notes')
+
+    return (species_database, name_database, compartment_database,
+            components_database)
+
+
+def add_manual_reaction(
+        pathway_database,
+        reaction_database,
+        name_database,
+        child,
+        sbml_namespace):
+    """Add a reaction element from a BiGG/BioModels model to the databases
+    """
+
+    # Get metadata
+    _id = child.attrib.get('id', '')
+    _name = child.attrib.get('name', _id)
+    _reversible = child.attrib.get('reversible', 'false')
+
+    name_database[_name] = _id
+    pathway_database['All']['reactions'].add(_id)
+    reaction_database[_id] = {
+        'compartment': '',
+        'id': _id,
+        'name': _name,
+        'reversible': _reversible,
+        'notes': ''}
+    reaction_database[_id]['reactants'] = add_reaction_components_manual(
+        type='listOfReactants',
+        reaction=child,
+        sbml_namespace=sbml_namespace)
+    reaction_database[_id]['products'] = add_reaction_components_manual(
+        type='listOfProducts',
+        reaction=child,
+        sbml_namespace=sbml_namespace)
+    reaction_database[_id]['modifiers'] = add_reaction_components_manual(
+        type='listOfModifiers',
+        reaction=child,
+        sbml_namespace=sbml_namespace)
+
+    return pathway_database, reaction_database, name_database
+
+
 def process_manual(
         sbml_db,
         args_dict):
@@ -774,127 +1207,120 @@ def process_manual(
         if x.tag == str(sbml_namespace + 'listOfSpecies'):
             for child in x:
                 if child.tag == str(sbml_namespace + 'species'):
-                    specie = child.attrib.get('id', '')
-                    name = child.attrib.get('name', specie)
-                    sboTerm = child.attrib.get('sboTerm', '')
-                    compartment = child.attrib.get('compartment', '')
-
-                    species_database[specie] = name
-                    compartment_database[specie] = compartment
-                    name_database[name] = specie
-                    components_database[specie] = {
-                        'id': specie,
-                        'reactome_id': sboTerm,
-                        'name': name,
-                        'is': specie,
-                        'isEncodedBy': '',
-                        'hasPart': [],
-                        'type': '',
-                        'compartment': compartment
-                    }
-
-                    for rank in child.iter(str(bqbiol_namespace + 'is')):
-                        for _rank in rank.iter(str(rdf_namespace + 'li')):
-                            item = _rank.attrib[str(rdf_namespace + 'resource')]
-                            if 'reactome' not in item.lower():
-                                if 'chebi' in item.lower() \
-                                        or 'kegg' in item.lower() \
-                                        or 'hmdb' in item.lower() \
-                                        or 'bigg' in item.lower():
-                                    _id = item.split('/')[-1]
-                                    components_database[specie]['is'] = _id
-                                    components_database[specie]['type'] = 'metabolite_component'
-                                elif 'uniprot' in item.lower():
-                                    _id = item.split('/')[-1]
-                                    components_database[specie]['is'] = _id
-                                    components_database[specie]['type'] = 'protein_component'
-                                else:
-                                    components_database[specie]['type'] = 'other'
-                            else:
-                                r_id = item.split('/')[-1]
-                                components_database[specie]['reactome_id'] = r_id
-
-                    for rank in child.iter(str(bqbiol_namespace + 'hasPart')):
-                        for _rank in rank.iter(str(rdf_namespace + 'li')):
-                            item = _rank.attrib[str(rdf_namespace + 'resource')]
-                            if 'reactome' not in item:
-                                components_database[specie]['type'] = 'complex_component'
-                                if 'chebi' in item.lower() \
-                                        or 'kegg' in item.lower() \
-                                        or 'hmdb' in item.lower() \
-                                        or 'bigg' in item.lower():
-                                    _id = item.split('/')[-1]
-                                    components_database[specie]['hasPart'].append(
-                                        _id)
-                                elif 'uniprot' in item.lower():
-                                    _id = item.split('/')[-1]
-                                    components_database[specie]['hasPart'].append(
-                                        _id)
-                                elif 'mirbase' in item.lower():
-                                    _id = item.split('acc=')[1]
-                                    components_database[specie]['hasPart'].append(
-                                        _id)
-                                else:
-                                    pass
-
-                    for rank in child.iter(str(bqbiol_namespace + 'isEncodedBy')):
-                        for _rank in rank.iter(str(rdf_namespace + 'li')):
-                            item = _rank.attrib[str(rdf_namespace + 'resource')]
-                            if 'reactome' not in item:
-                                if 'kegg.genes' in item.lower():
-                                    _id = item.split('/')[-1]
-                                    _id_ = _id.split(':')[-1]
-                                    components_database[specie]['isEncodedBy'] = _id_
-                                else:
-                                    _id = item.split('/')[-1]
-                                    components_database[specie]['isEncodedBy'] = _id
-
-                    # Add source ID
-                    name_database = add_names(
-                        name_database=name_database,
-                        child=child,
-                        specie=specie,
-                        search_string='is',
-                        bqbiol_namespace=bqbiol_namespace,
-                        rdf_namespace=rdf_namespace)
-
-                    name_database = add_bigg_names(
-                        name_database=name_database,
-                        child=child,
-                        specie=specie,
-                        sbml_namespace=sbml_namespace,
-                        search_string='notes')
+                    species_database, name_database, compartment_database, \
+                        components_database = add_manual_species(
+                            species_database=species_database,
+                            name_database=name_database,
+                            compartment_database=compartment_database,
+                            components_database=components_database,
+                            child=child,
+                            sbml_namespace=sbml_namespace)
 
     # Generate reaction database
     for x in elements:
         if x.tag == str(sbml_namespace + 'listOfReactions'):
             for child in x:
                 if child.tag == str(sbml_namespace + 'reaction'):
-                    # Get metadata
-                    _id = child.attrib.get('id', '')
-                    _name = child.attrib.get('name', _id)
-                    _reversible = child.attrib.get('reversible', 'false')
-
-                    name_database[_name] = _id
-                    pathway_database['All']['reactions'].add(_id)
-                    reaction_database[_id] = {
-                        'compartment': '',
-                        'id': _id,
-                        'name': _name,
-                        'reversible': _reversible,
-                        'notes': ''}
-                    reaction_database[_id]['reactants'] = add_reaction_components_manual(
-                        type='listOfReactants',
-                        reaction=child,
-                        sbml_namespace=sbml_namespace)
-                    reaction_database[_id]['products'] = add_reaction_components_manual(
-                        type='listOfProducts',
-                        reaction=child,
+                    pathway_database, reaction_database, name_database = \
+                        add_manual_reaction(
+                            pathway_database=pathway_database,
+                            reaction_database=reaction_database,
+                            name_database=name_database,
+                            child=child,
+                            sbml_namespace=sbml_namespace)
+
+    return (args_dict, pathway_database, reaction_database, species_database,
+    name_database, compartment_database, compartment_dictionary,
+    components_database)
+
+
+def stream_manual(
+        sbml_url,
+        args_dict):
+    """Parse a BiGG/BioModels SBML model in a single streaming pass
+    - Gives the same databases as load_sbml() followed by process_manual(),
+    but each compartment, species and reaction is dropped from the tree once
+    it has been processed, so memory stays bounded for genome-scale models
+    - Reaction names are added to the name database after all species, as in
+    process_manual()
+    """
+
+    # Initialize databases
+    pathway_database = {
+        'All': {
+            'id': 'All',
+            'reactome': 'All',
+            'name': 'All',
+            'reactions': set()
+        }
+    }
+    reaction_database = {}
+    name_database = {}
+    compartment_dictionary = {}
+    compartment_database = {}
+    species_database = {}
+    components_database = {}
+    reaction_names = {}
+
+    start = time.time()
+    sbml_namespace = ''
+    model = None
+    stack = []
+    for event, elem in et.iterparse(sbml_url, events=('start', 'end')):
+        if event == 'start':
+            if len(stack) == 0:
+                sbml_namespace = get_namespace(
+                    sbml_tree=elem)
+            elif len(stack) == 1 and model == None:
+                # Get model information
+                model = elem
+                args_dict = update_model_attributes(
+                    attributes=elem.attrib,
+                    args_dict=args_dict)
+            stack.append(elem)
+            continue
+
+        stack.pop()
+        if len(stack) == 3 and stack[1] is model:
+            parent = stack[2]
+            if parent.tag == str(sbml_namespace + 'listOfCompartments') \
+            and elem.tag == str(sbml_namespace + 'compartment'):
+                id = elem.attrib.get('id', '')
+                name = elem.attrib.get('name', '')
+                compartment_dictionary[id] = name
+            elif parent.tag == str(sbml_namespace + 'listOfSpecies') \
+            and elem.tag == str(sbml_namespace + 'species'):
+                species_database, name_database, compartment_database, \
+                    components_database = add_manual_species(
+                        species_database=species_database,
+                        name_database=name_database,
+                        compartment_database=compartment_database,
+                        components_database=components_database,
+                        child=elem,
                         sbml_namespace=sbml_namespace)
-                    reaction_database[_id]['modifiers'] = add_reaction_components_manual(
-                        type='listOfModifiers',
-                        reaction=child,
+            elif parent.tag == str(sbml_namespace + 'listOfReactions') \
+            and elem.tag == str(sbml_namespace + 'reaction'):
+                pathway_database, reaction_database, reaction_names = \
+                    add_manual_reaction(
+                        pathway_database=pathway_database,
+                        reaction_database=reaction_database,
+                        name_database=reaction_names,
+                        child=elem,
                         sbml_namespace=sbml_namespace)
+            parent.remove(elem)
+        elif len(stack) > 0 and len(stack) < 3:
+            stack[-1].remove(elem)
+
+    name_database.update(reaction_names)
+
+    elapsed = time.time() - start
+    print('Parsed ' + str(len(species_database)) + ' species and ' \
+        + str(len(reaction_database)) + ' reactions in ' \
+        + str(round(elapsed, 2)) + ' seconds (' \
+        + str(round(len(reaction_database) / max(elapsed, 1e-9), 1)) \
+        + ' reactions/s, ' \
+        + str(round(len(species_database) / max(elapsed, 1e-9), 1)) \
+        + ' species/s)')
 
     return (args_dict, pathway_database, reaction_database, species_database,
     name_database, compartment_database, compartment_dictionary,
@@ -1067,43 +1493,44 @@ def __main__(
 
     # Get pathways files
     if database_source.lower() == 'reactome':
-        pathways_dir = unpack_pathways(
-            output_dir=output_dir)
-        progress_feed(args_dict, "graph", 10)
-
-        pathways_list = get_pathways(
-            species_id=species_id,
-            pathways_dir=pathways_dir)
-        progress_feed(args_dict, "graph", 5)
-
-        # Get list of reaction files to use for populating database
-        args_dict, pathway_database, reaction_database, species_database, \
-        name_database, compartment_database, compartment_dictionary, \
-        components_database = process_components(
+        reactome_archive = None
+        reference_dir = None
+        if args_dict != None:
+            reactome_archive = args_dict.get('reactome_archive')
+            reference_dir = args_dict.get('reference_dir')
+        pathways_dir = open_pathways(
             output_dir=output_dir,
-            pathways_dir=pathways_dir,
-            pathways_list=pathways_list,
             species_id=species_id,
-            args_dict=args_dict)
+            archive=reactome_archive,
+            reference_dir=reference_dir)
+        progress_feed(args_dict, "graph", 10)
 
-        if 'sbml' in pathways_dir:
-            handle_folder_contents(
-                dir=pathways_dir)
-        else:
-            print(
-                'Could not find SMBL file directory, skipping removal of this directory...')
+        # Remove a downloaded tarball even if parsing fails
+        try:
+            pathways_list = get_pathways(
+                species_id=species_id,
+                pathways_dir=pathways_dir)
+            progress_feed(args_dict, "graph", 5)
+
+            # Get list of reaction files to use for populating database
+            args_dict, pathway_database, reaction_database, species_database, \
+            name_database, compartment_database, compartment_dictionary, \
+            components_database = process_components(
+                output_dir=output_dir,
+                pathways_dir=pathways_dir,
+                pathways_list=pathways_list,
+                species_id=species_id,
+                args_dict=args_dict)
+        finally:
+            pathways_dir.close()
 
     elif database_source.lower() == 'biomodels/bigg' and sbml_url != "None":
-        sbml_db = load_sbml(
-            sbml_url=sbml_url)
-        progress_feed(args_dict, "graph", 10)
-
         args_dict, pathway_database, reaction_database, species_database, \
         name_database, compartment_database, compartment_dictionary, \
-        components_database = process_manual(
-                sbml_db=sbml_db,
+        components_database = stream_manual(
+                sbml_url=sbml_url,
                 args_dict=args_dict)
-        progress_feed(args_dict, "graph", 13)
+        progress_feed(args_dict, "graph", 23)
 
     elif database_source.lower() == 'custom' and sbml_url != "None":
         sbml_db = load_custom_json(
@@ -29,22 +29,45 @@ SOFTWARE.
 """
 from __future__ import print_function
 import pandas as pd
+import tempfile
+import shutil
+import json
 import os
 
+"""Import internal dependencies
+"""
+try:
+    from metaboverse_cli.curate.fetch_references import fetch_reference, \
+        hash_file
+except ImportError:
+    try:
+        from curate.fetch_references import fetch_reference, hash_file
+    except:
+        import importlib.util
+        spec = importlib.util.spec_from_file_location(
+            "", os.path.abspath(os.path.join(
+                os.path.dirname(__file__), "fetch_references.py")))
+        fetch_references = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(fetch_references)
+        fetch_reference = fetch_references.fetch_reference
+        hash_file = fetch_references.hash_file
+
 
 def get_table(
         output_dir,
         url,
         column_names,
         organism='Homo sapiens',
-        organism_key='organism'):
+        organism_key='organism',
+        reference_dir=None):
     """Get reactome table from web
     """
 
     # chebi_reactome_reactions
     file = unpack_table(
         url=url,
-        output_dir=output_dir)
+        output_dir=output_dir,
+        reference_dir=reference_dir)
 
     if isinstance(column_names, list):
         header_type = None
@@ -74,9 +97,199 @@ def get_table(
 
 def unpack_table(
         url,
-        output_dir='./'):
+        output_dir='./',
+        reference_dir=None):
+
+    return fetch_reference(
+        url=url,
+        output_dir=output_dir,
+        reference_dir=reference_dir)
+
+
+"""Read Reactome *2Reactome_PE_All_Levels mapping files
+"""
+
+
+def read_reactome_mapping(
+        file,
+        species_id,
+        usecols,
+        species_column=3,
+        chunksize=250000):
+    """Read a headerless Reactome mapping table for one species
+    - Only usecols are parsed and rows are filtered on the species code as
+    each chunk is read, so the whole multi-species table is never in memory
+    - Gives the same table as reading the full file and filtering it with
+    str.contains(species_id)
+    """
+
+    if species_column not in usecols:
+        usecols = sorted(set(usecols) | {species_column})
+
+    chunks = []
+    reader = pd.read_csv(
+        file,
+        sep='\t',
+        header=None,
+        usecols=usecols,
+        dtype=str,
+        chunksize=chunksize)
+    for chunk in reader:
+        chunks.append(chunk.loc[chunk[species_column].str.contains(
+            species_id, na=False)])
+
+    if len(chunks) == 0:
+        return pd.DataFrame(columns=usecols, dtype=str)
+
+    return pd.concat(chunks)
+
+
+partition_source_name = 'source.json'
+
+
+def read_partition_source(
+        partition_dir):
+    """Read the release and sha256 of the file a partition was split from
+    - Returns None if the partition does not record its source
+    """
+
+    source_file = os.path.join(partition_dir, partition_source_name)
+    if not os.path.isfile(source_file):
+        return None
+    try:
+        with open(source_file, 'r') as f:
+            return json.load(f)
+    except ValueError:
+        return None
+
+
+def write_partition_source(
+        partition_dir,
+        release,
+        sha256):
+    """Record the release and sha256 of the file a partition was split from
+    """
+
+    handle, temporary_file = tempfile.mkstemp(
+        dir=partition_dir,
+        suffix='.tmp')
+    with os.fdopen(handle, 'w') as f:
+        json.dump({
+            'release': release if release != None else '',
+            'sha256': sha256}, f)
+    os.replace(
+        temporary_file,
+        os.path.join(partition_dir, partition_source_name))
+
+
+def get_mapping_partition(
+        mapping_dir,
+        file_name,
+        species_id,
+        release=None):
+    """Path of the species partition of a split mapping file
+    - Returns None if the file has not been split in mapping_dir
+    - If the upstream release is given, also returns None when the partition
+    was split from a different release, or one that cannot be compared
+    """
+
+    partition_dir = os.path.join(
+        mapping_dir, file_name.rsplit('.', 1)[0])
+    if not os.path.isdir(partition_dir):
+        return None
+
+    if release != None:
+        source = read_partition_source(partition_dir)
+        if source == None \
+                or release == '' \
+                or source['release'] != release:
+            return None
+
+    return os.path.join(partition_dir, species_id + '.txt')
+
+
+def split_reactome_mapping(
+        file,
+        mapping_dir,
+        file_name=None,
+        species_column=3,
+        release=None):
+    """Split a Reactome mapping table into one file per species in one pass
+    - Rows are copied unchanged and in order to
+    mapping_dir/<file name>/<species code>.txt, where the code is taken from
+    the Reactome ID in species_column (R-HSA-... gives HSA)
+    - The release and sha256 of the file are recorded with the partitions.
+    An existing partition split from the same file is kept
+    - The partition directory only appears once the split is complete. If
+    another process publishes the same file first, its partitions are used
+
+    Returns the partition directory
+    """
+
+    if file_name == None:
+        file_name = os.path.basename(file)
+    partition_dir = os.path.join(
+        mapping_dir, file_name.rsplit('.', 1)[0])
+
+    sha256 = hash_file(file)
+    source = read_partition_source(partition_dir)
+    if source != None and source['sha256'] == sha256:
+        if source['release'] != (release if release != None else ''):
+            write_partition_source(partition_dir, release, sha256)
+        return partition_dir
+
+    temporary_dir = tempfile.mkdtemp(
+        dir=mapping_dir,
+        prefix=os.path.basename(partition_dir) + '.',
+        suffix='.tmp')
+    partitions = {}
+    try:
+        with open(file, 'rb') as mapping:
+            for line in mapping:
+                fields = line.split(b'\t', species_column + 1)
+                if len(fields) <= species_column:
+                    continue
+                code = fields[species_column].split(b'-', 2)
+                if len(code) < 3:
+                    continue
+                code = code[1]
+                if code not in partitions:
+                    partitions[code] = open(os.path.join(
+                        temporary_dir, code.decode() + '.txt'), 'wb')
+                if not line.endswith(b'\n'):
+                    line += b'\n'
+                partitions[code].write(line)
+    except:
+        for partition in partitions.values():
+            partition.close()
+        shutil.rmtree(temporary_dir, ignore_errors=True)
+        raise
+    for partition in partitions.values():
+        partition.close()
+    write_partition_source(temporary_dir, release, sha256)
+
+    # Move an out of date partition aside before publishing the new one
+    if os.path.exists(partition_dir):
+        source = read_partition_source(partition_dir)
+        if source != None and source['sha256'] == sha256:
+            shutil.rmtree(temporary_dir, ignore_errors=True)
+            return partition_dir
+        previous_dir = tempfile.mkdtemp(
+            dir=mapping_dir,
+            prefix=os.path.basename(partition_dir) + '.',
+            suffix='.old')
+        try:
+            os.replace(partition_dir, os.path.join(previous_dir, 'partition'))
+        except FileNotFoundError:
+            pass
+        shutil.rmtree(previous_dir, ignore_errors=True)
 
-    file = output_dir + url.split('/')[-1]
-    os.system('curl -kL ' + url + ' -o "' + file + '"')
+    try:
+        os.replace(temporary_dir, partition_dir)
+    except OSError:
+        # Another process published its partitions in the meantime
+        if not os.path.isdir(partition_dir):
+            raise
+        shutil.rmtree(temporary_dir, ignore_errors=True)
 
-    return file
+    return partition_dir
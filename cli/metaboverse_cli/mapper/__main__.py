@@ -37,7 +37,11 @@ import io
 import os
 import re
 import sys
+import time
+import threading
+import multiprocessing
 from collections import defaultdict
+from itertools import islice
 from pathlib import Path
 
 def get_project_root():
@@ -60,12 +64,16 @@ if str(project_root.parent) not in sys.path:
 try:
     # First try normal package imports
     from metaboverse_cli.utils import prepare_output, write_database, write_database_json
-    from metaboverse_cli.mapper.special_pairs import REDOX_PAIRS
+    from metaboverse_cli.mapper.special_pairs import REDOX_PAIRS, get_redox_index
+    from metaboverse_cli.mapper.mapper_store import write_mapper_store, MAPPER_STORE_FILE
+    from metaboverse_cli.profiler import profile_stage
 except ImportError:
     try:
         # Then try relative imports
         from utils import prepare_output, write_database, write_database_json
-        from special_pairs import REDOX_PAIRS
+        from special_pairs import REDOX_PAIRS, get_redox_index
+        from mapper_store import write_mapper_store, MAPPER_STORE_FILE
+        from profiler import profile_stage
     except ImportError:
         try:
             # Finally try direct imports
@@ -88,6 +96,14 @@ except ImportError:
 
             special_pairs = load_module("special_pairs", os.path.join(base_path, "special_pairs.py"))
             REDOX_PAIRS = special_pairs.REDOX_PAIRS
+            get_redox_index = special_pairs.get_redox_index
+
+            mapper_store = load_module("mapper_store", os.path.join(base_path, "mapper_store.py"))
+            write_mapper_store = mapper_store.write_mapper_store
+            MAPPER_STORE_FILE = mapper_store.MAPPER_STORE_FILE
+
+            profiler = load_module("profiler", os.path.join(parent_path, "metaboverse_cli", "profiler.py"))
+            profile_stage = profiler.profile_stage
 
         except ImportError as e:
             print(f"Error importing dependencies: {e}")
@@ -155,11 +171,8 @@ def validate_redox_mapping(metabolite_mapper):
     """
     issues = []
     
-    # Create reverse mapping from synonyms to their redox pair
-    redox_syn_to_pair = {}
-    for pair_name, synonyms in REDOX_PAIRS.items():
-        for syn in synonyms:
-            redox_syn_to_pair[syn.lower()] = pair_name
+    # Reverse mapping from synonyms to their redox pair
+    redox_syn_to_pair = get_redox_index().key_pairs
     
     # Check each mapping in the metabolite mapper
     for syn, mapped_to in metabolite_mapper['mapping_dictionary'].items():
@@ -185,20 +198,7 @@ def get_redox_pair_for_metabolite(name, synonyms):
     Determine which redox pair a metabolite belongs to based on its name and synonyms.
     Returns (pair_key, is_oxidized) or (None, None) if not part of a redox pair.
     """
-    name_lower = name.lower()
-    synonyms_lower = {s.lower() for s in synonyms}
-    
-    # Check each redox pair
-    for pair_key, pair_syns in REDOX_PAIRS.items():
-        pair_syns_lower = {s.lower() for s in pair_syns}
-        
-        # Check if this metabolite matches any synonyms in the pair
-        if name_lower in pair_syns_lower or any(s in pair_syns_lower for s in synonyms_lower):
-            # Determine if this is the oxidized or reduced form
-            is_oxidized = any(ox_pattern in pair_key.lower() for ox_pattern in ['oxidized', '+', '(ox)'])
-            return pair_key, is_oxidized
-            
-    return None, None
+    return get_redox_index().match_keys(name, synonyms)
 
 def download_hmbd_reference(
         output_dir,
@@ -230,108 +230,234 @@ def download_hmbd_reference(
         print('\tand place the file in:', output_dir)
         return None
 
-def parse_hmdb_synonyms(
+def read_hmdb_record(
+        metabolite,
+        xml_tag='{http://www.hmdb.ca}'):
+    """Collect the naming fields of a single HMDB <metabolite> element
+
+    Returns a list of (field, text) pairs in document order, where field is
+    one of 'name', 'synonym', 'iupac', or 'accession'. The record holds no
+    references to the XML tree, so the element can be cleared once read.
+    """
+
+    fields = []
+    for y in metabolite:
+        if y.text == None:
+            continue
+
+        if y.tag == xml_tag + 'name':
+            fields.append(('name', y.text))
+
+        elif y.tag == xml_tag + 'synonyms':
+            for child in y:
+                if child.text:
+                    fields.append(('synonym', child.text))
+
+        elif y.tag in [xml_tag + 'iupac_name', xml_tag + 'traditional_iupac']:
+            fields.append(('iupac', y.text))
+
+        elif y.tag == xml_tag + 'accession':
+            fields.append(('accession', y.text))
+
+    return fields
+
+
+def process_hmdb_record(
+        fields):
+    """Build the synonym sets for a single HMDB record with strict redox pair
+    handling
+
+    Returns (name, synonyms, display_synonyms), or None if the record has no
+    usable name.
+    """
+
+    name = ''
+    all_synonyms = set()
+    display_synonyms = set()
+
+    # First get all possible names/synonyms
+    for field, text in fields:
+        simple_string = ''.join(
+            str(c).lower() for c in text if c.isalnum()
+        )
+
+        if field == 'name':
+            name = simple_string
+            all_synonyms.add(simple_string)
+            all_synonyms.add(str(text).lower())
+            display_synonyms.add(str(text))
+
+        elif field in ['synonym', 'iupac']:
+            all_synonyms.add(simple_string)
+            all_synonyms.add(str(text).lower())
+            display_synonyms.add(str(text))
+
+        elif field == 'accession':
+            all_synonyms.add(simple_string)
+            all_synonyms.add(str(text).lower())
+            all_synonyms.add(str(text))
+            display_synonyms.add(str(text))
+
+    if not name:
+        return None
+
+    # Determine which redox pair this metabolite belongs to
+    pair_key, is_oxidized = get_redox_pair_for_metabolite(name, all_synonyms)
+
+    if pair_key:
+        # Only keep synonyms that match this specific redox form
+        allowed_synonyms = get_redox_index().key_terms[pair_key]
+        filtered_synonyms = {s for s in all_synonyms
+                          if s.lower() in allowed_synonyms or
+                          ''.join(c.lower() for c in s if c.isalnum()) in allowed_synonyms}
+        filtered_display = {s for s in display_synonyms
+                         if s.lower() in allowed_synonyms or
+                         ''.join(c.lower() for c in s if c.isalnum()) in allowed_synonyms}
+    else:
+        # Not a redox pair, keep all synonyms
+        filtered_synonyms = all_synonyms
+        filtered_display = display_synonyms
+
+    return name, filtered_synonyms, filtered_display
+
+
+def iterparse_hmdb(
         output_file,
         xml_tag='{http://www.hmdb.ca}'):
-    """Retrieve HMDB chemical entity synonyms with strict redox pair handling
+    """Stream HMDB <metabolite> records from the XML file one at a time
+
+    Each top-level element is cleared from the tree as soon as it has been
+    read, so memory use stays flat regardless of the size of the file.
     """
-    
-    print("Parsing HMDB metabolite records...")
-    try:
-        tree = et.parse(output_file)
-        contents = tree.getroot()
-        tree = None  # Release the tree object
-    except Exception as e:
-        print(f"Error parsing XML file: {e}")
-        raise
 
-    # Create a mapping from synonyms to their redox pair
-    redox_synonym_to_pair = {}
-    for pair_key, synonyms in REDOX_PAIRS.items():
-        for syn in synonyms:
-            redox_synonym_to_pair[syn.lower()] = pair_key
-            # Also add alphanumeric version
-            redox_synonym_to_pair[''.join(c.lower() for c in syn if c.isalnum())] = pair_key
+    depth = 0
+    root = None
+    for event, element in et.iterparse(output_file, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = element
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth == 1:
+            if element.tag == xml_tag + 'metabolite':
+                yield read_hmdb_record(
+                    metabolite=element,
+                    xml_tag=xml_tag)
+            # Drop the finished record (and any siblings) from the root
+            root.clear()
+
+
+def process_hmdb_batch(
+        batch):
+    """Process a batch of raw HMDB records in a worker process
+    """
+
+    return [process_hmdb_record(fields) for fields in batch]
+
 
+def iter_hmdb_batches(
+        records,
+        batch_size,
+        slots):
+    """Group raw records into batches, waiting for a free slot before each
+    batch so that only a bounded number are read ahead of the workers
+    """
+
+    while True:
+        slots.acquire()
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def process_hmdb_records(
+        records,
+        threads=1,
+        batch_size=1000):
+    """Yield processed HMDB records in the order they were read
+
+    Raw records are grouped into batches of batch_size and handed to a pool
+    of worker processes. The parent keeps reading the file while the workers
+    run, but at most threads * 2 batches are read ahead so that the parsed
+    file never has to be held in memory.
+    """
+
+    if threads <= 1:
+        for fields in records:
+            yield process_hmdb_record(fields)
+        return
+
+    slots = threading.Semaphore(threads * 2)
+    with multiprocessing.Pool(processes=threads) as pool:
+        try:
+            for results in pool.imap(
+                    process_hmdb_batch,
+                    iter_hmdb_batches(records, batch_size, slots)):
+                slots.release()
+                for record in results:
+                    yield record
+        finally:
+            # Unblock the batch reader so the pool can shut down early
+            for _ in range(threads * 2):
+                slots.release()
+
+
+def parse_hmdb_synonyms(
+        output_file,
+        xml_tag='{http://www.hmdb.ca}',
+        progress_interval=10000,
+        threads=1,
+        batch_size=1000):
+    """Retrieve HMDB chemical entity synonyms with strict redox pair handling
+
+    With threads > 1, records are processed in batches by a pool of worker
+    processes. Results are merged in file order, so the dictionaries are the
+    same as for a single-process run.
+    """
+
+    print("Parsing HMDB metabolite records...")
+    if threads > 1:
+        print(f"\tUsing {threads} worker processes")
     hmdb_dictionary = {}
     display_dictionary = {}
     mapping_dictionary = {}
-    
+
     # First pass to build initial dictionaries
     temp_synonyms = defaultdict(set)
     temp_display = defaultdict(set)
 
-    for x in contents:
-        if x.tag == xml_tag + 'metabolite':
-            name = ''
-            all_synonyms = set()
-            display_synonyms = set()
-            
-            # First get all possible names/synonyms
-            for y in x:
-                if y.text != None:
-                    simple_string = ''.join(
-                        str(c).lower() for c in y.text if c.isalnum()
-                    )
-                else:
-                    continue
-
-                if y.tag == xml_tag + 'name':
-                    name = simple_string
-                    all_synonyms.add(simple_string)
-                    all_synonyms.add(str(y.text).lower())
-                    display_synonyms.add(str(y.text))
-
-                elif y.tag == xml_tag + 'synonyms':
-                    for child in y:
-                        if child.text:
-                            simple_child = ''.join(
-                                str(c).lower() for c in child.text if c.isalnum()
-                            )
-                            all_synonyms.add(simple_child)
-                            all_synonyms.add(str(child.text).lower())
-                            display_synonyms.add(str(child.text))
-
-                elif y.tag in [xml_tag + 'iupac_name', xml_tag + 'traditional_iupac']:
-                    all_synonyms.add(simple_string)
-                    all_synonyms.add(str(y.text).lower())
-                    display_synonyms.add(str(y.text))
-                
-                elif y.tag == xml_tag + 'accession':
-                    all_synonyms.add(simple_string)
-                    all_synonyms.add(str(y.text).lower())
-                    all_synonyms.add(str(y.text))
-                    display_synonyms.add(str(y.text))
-
-            if name:
-                # Determine which redox pair this metabolite belongs to
-                pair_key, is_oxidized = get_redox_pair_for_metabolite(name, all_synonyms)
-                
-                if pair_key:
-                    # Only keep synonyms that match this specific redox form
-                    allowed_synonyms = {s.lower() for s in REDOX_PAIRS[pair_key]}
-                    filtered_synonyms = {s for s in all_synonyms 
-                                      if s.lower() in allowed_synonyms or 
-                                      ''.join(c.lower() for c in s if c.isalnum()) in allowed_synonyms}
-                    filtered_display = {s for s in display_synonyms 
-                                     if s.lower() in allowed_synonyms or 
-                                     ''.join(c.lower() for c in s if c.isalnum()) in allowed_synonyms}
-                else:
-                    # Not a redox pair, keep all synonyms
-                    filtered_synonyms = all_synonyms
-                    filtered_display = display_synonyms
-
+    start = time.time()
+    counter = 0
+    try:
+        records = iterparse_hmdb(
+            output_file=output_file,
+            xml_tag=xml_tag)
+        for record in process_hmdb_records(
+                records=records,
+                threads=threads,
+                batch_size=batch_size):
+            if record != None:
+                name, filtered_synonyms, filtered_display = record
                 temp_synonyms[name].update(filtered_synonyms)
                 temp_display[name].update(filtered_display)
 
-    # Clear references to XML objects
-    contents = None
+            counter += 1
+            if counter % progress_interval == 0:
+                print_hmdb_progress(counter, start)
+    except Exception as e:
+        print(f"Error parsing XML file: {e}")
+        raise
+    if counter % progress_interval != 0:
+        print_hmdb_progress(counter, start)
 
     # Second pass to build final dictionaries
     for name, synonyms in temp_synonyms.items():
         hmdb_dictionary[name] = sorted(list(synonyms))
         display_dictionary[name] = sorted(list(temp_display[name]))
-        for syn in synonyms:
+        for syn in hmdb_dictionary[name]:
             mapping_dictionary[syn] = name
 
     # Validate the mapping
@@ -344,20 +470,36 @@ def parse_hmdb_synonyms(
     return hmdb_dictionary, display_dictionary, mapping_dictionary
 
 
+def print_hmdb_progress(
+        counter,
+        start):
+    """Report HMDB parsing throughput
+    """
+
+    elapsed = max(time.time() - start, 1e-9)
+    print(f"\tParsed {counter} records ({int(counter / elapsed)} records/s)")
+
+
 def __main__(
         args_dict):
     """Build metabolite name mapping dictionary
     """
 
-    output_file = download_hmbd_reference(
-        output_dir=args_dict['output']
-    )
+    with profile_stage(args_dict, 'download_hmdb_reference'):
+        output_file = download_hmbd_reference(
+            output_dir=args_dict['output']
+        )
 
     try:
         if output_file and os.path.exists(output_file):
-            hmdb_dictionary, display_dictionary, mapping_dictionary = parse_hmdb_synonyms(
-                output_file=output_file
-            )
+            with profile_stage(args_dict, 'parse_hmdb_synonyms') as stage:
+                hmdb_dictionary, display_dictionary, mapping_dictionary = parse_hmdb_synonyms(
+                    output_file=output_file,
+                    threads=args_dict.get('threads', 1)
+                )
+                stage.count(
+                    metabolites=len(hmdb_dictionary),
+                    synonyms=len(mapping_dictionary))
         else:
             print("Using ChEBI as primary metabolite mapping source...")
             hmdb_dictionary = {}
@@ -380,24 +522,36 @@ def __main__(
             'mapping_dictionary': mapping_dictionary
         }
 
-        print('Writing database to file...')
-        # First write the pickle file
-        pickle_file = 'metabolite_mapping.pickle'
-        write_database(
-            output=args_dict['output'],
-            file=pickle_file,
-            database=mapping_db)
-        
-        # Create zip file containing the pickle file
-        zip_path = os.path.join(args_dict['output'], 'metabolite_mapping.pickle.zip')
-        pickle_path = os.path.join(args_dict['output'], pickle_file)
-        
-        print('Creating zip archive...')
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            zipf.write(pickle_path, pickle_file)
-        
-        print(f'Successfully created metabolite mapper at: {zip_path}')
-        
+        with profile_stage(args_dict, 'write_metabolite_mapper'):
+            print('Writing database to file...')
+            # First write the pickle file
+            pickle_file = 'metabolite_mapping.pickle'
+            write_database(
+                output=args_dict['output'],
+                file=pickle_file,
+                database=mapping_db)
+
+            # Create zip file containing the pickle file
+            zip_path = os.path.join(args_dict['output'], 'metabolite_mapping.pickle.zip')
+            pickle_path = os.path.join(args_dict['output'], pickle_file)
+
+            print('Creating zip archive...')
+            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                zipf.write(pickle_path, pickle_file)
+
+            print(f'Successfully created metabolite mapper at: {zip_path}')
+
+            store_path = os.path.join(args_dict['output'], MAPPER_STORE_FILE)
+            if args_dict.get('store', False):
+                store_path = write_mapper_store(
+                    path=store_path,
+                    mapping_db=mapping_db,
+                    source_file=zip_path)
+                print(f'Successfully created metabolite mapper store at: {store_path}')
+            elif os.path.exists(store_path):
+                # A store from an earlier build no longer matches the mapper
+                os.remove(store_path)
+
         # Clean up temporary files
         try:
             os.remove(pickle_path)  # Remove uncompressed pickle file
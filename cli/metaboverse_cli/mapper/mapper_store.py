@@ -0,0 +1,220 @@
+"""License Information
+metaboverse-cli
+Back-end CLI Tool for Curating Metabolic Networks for Metaboverse
+https://github.com/Metaboverse/metaboverse-cli/
+alias: metaboverse-cli
+
+MIT License
+
+Copyright (c) Jordan A. Berg, The University of Utah
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+from __future__ import print_function
+import hashlib
+import sqlite3
+import json
+import os
+from pathlib import Path
+
+MAPPER_STORE_FILE = 'metabolite_mapping.sqlite'
+MAPPER_TABLES = [
+    'hmdb_dictionary',
+    'display_dictionary',
+    'mapping_dictionary']
+
+
+def get_source_signature(
+        source_file,
+        block_size=1 << 20):
+    """Size, modification time and SHA-256 of the zipped mapper a store is
+    written from
+    """
+
+    checksum = hashlib.sha256()
+    with open(source_file, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            checksum.update(block)
+    stat = os.stat(source_file)
+
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': checksum.hexdigest()}
+
+
+def write_mapper_store(
+        path,
+        mapping_db,
+        source_file=None):
+    """Write a metabolite mapper database as an indexed, read-only SQLite store
+
+    Each dictionary is stored as a (dictionary, key, value) table keyed on
+    (dictionary, key). Values are stored as JSON. The signature of
+    source_file, the zipped mapper pickle, is recorded so that a store left
+    behind by an older mapper can be detected.
+    """
+
+    temp_path = path + '.tmp'
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    connection = sqlite3.connect(temp_path)
+    connection.execute(
+        'CREATE TABLE mapper ('
+        'dictionary TEXT, key TEXT, value TEXT, '
+        'PRIMARY KEY (dictionary, key)) WITHOUT ROWID')
+    for table in MAPPER_TABLES:
+        connection.executemany(
+            'INSERT OR REPLACE INTO mapper VALUES (?, ?, ?)',
+            ((table, k, json.dumps(v))
+                for k, v in mapping_db.get(table, {}).items()))
+    connection.execute(
+        'CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT)')
+    if source_file != None and os.path.exists(source_file):
+        connection.execute(
+            'INSERT INTO metadata VALUES (?, ?)',
+            ('source', json.dumps(get_source_signature(source_file))))
+    connection.commit()
+    connection.close()
+
+    os.replace(temp_path, path)
+    return path
+
+
+def is_store_current(
+        path,
+        source_file):
+    """Check that a mapper store was written from the current zipped mapper
+
+    The source file is only hashed when its size matches and its
+    modification time does not. A store is always current if there is no
+    source file to compare against.
+    """
+
+    if source_file == None or not os.path.exists(source_file):
+        return True
+
+    try:
+        connection = sqlite3.connect(
+            Path(os.path.abspath(path)).as_uri() + '?mode=ro',
+            uri=True)
+        try:
+            row = connection.execute(
+                'SELECT value FROM metadata WHERE key = ?',
+                ('source',)).fetchone()
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return False
+    if row == None:
+        return False
+
+    source = json.loads(row[0])
+    stat = os.stat(source_file)
+    if stat.st_size != source['size']:
+        return False
+    if stat.st_mtime_ns == source['mtime_ns']:
+        return True
+
+    return get_source_signature(source_file)['sha256'] == source['sha256']
+
+
+class MapperTable():
+    """Read-only, dict-like view of one dictionary in a mapper store
+
+    Lookups are memoized, so repeated queries for the same synonym only hit
+    the database once.
+    """
+
+    def __init__(self, connection, dictionary):
+        self.connection = connection
+        self.dictionary = dictionary
+        self.cache = {}
+
+    def lookup(self, key):
+        if key not in self.cache:
+            row = self.connection.execute(
+                'SELECT value FROM mapper WHERE dictionary = ? AND key = ?',
+                (self.dictionary, key)).fetchone()
+            self.cache[key] = None if row == None else json.loads(row[0])
+        return self.cache[key]
+
+    def __getitem__(self, key):
+        value = self.lookup(key)
+        if value == None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return isinstance(key, str) and self.lookup(key) != None
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        return self.cache[key]
+
+    def __len__(self):
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM mapper WHERE dictionary = ?',
+            (self.dictionary,)).fetchone()[0]
+
+    def items(self):
+        for key, value in self.connection.execute(
+                'SELECT key, value FROM mapper WHERE dictionary = ?',
+                (self.dictionary,)):
+            yield key, json.loads(value)
+
+    def keys(self):
+        for key, value in self.items():
+            yield key
+
+    def __iter__(self):
+        return self.keys()
+
+
+class MapperStore():
+    """Lazily-loaded metabolite mapper backed by a SQLite store
+
+    Supports the same metabolite_mapper['mapping_dictionary'][synonym]
+    access pattern as the unpickled mapper dictionary.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(
+            Path(os.path.abspath(path)).as_uri() + '?mode=ro',
+            uri=True,
+            check_same_thread=False)
+        self.tables = {
+            table: MapperTable(self.connection, table)
+            for table in MAPPER_TABLES}
+
+    def __getitem__(self, table):
+        return self.tables[table]
+
+    def __contains__(self, table):
+        return table in self.tables
+
+    def keys(self):
+        return self.tables.keys()
+
+    def close(self):
+        self.connection.close()
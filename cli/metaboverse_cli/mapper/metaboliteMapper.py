@@ -40,12 +40,16 @@ try:
     # First try normal package import
     from metaboverse_cli.mapper.__main__ import parse_hmdb_synonyms, download_hmbd_reference, update_redox_pairs
     from metaboverse_cli.mapper.special_pairs import REDOX_PAIRS
+    from metaboverse_cli.mapper.mapper_store import write_mapper_store, \
+        is_store_current, MAPPER_STORE_FILE
     from metaboverse_cli.utils import write_database
 except ImportError:
     try:
         # Then try relative import
         from mapper.__main__ import parse_hmdb_synonyms, download_hmbd_reference, update_redox_pairs
         from special_pairs import REDOX_PAIRS
+        from mapper_store import write_mapper_store, is_store_current, \
+            MAPPER_STORE_FILE
         from utils import write_database
     except ImportError:
         try:
@@ -70,6 +74,11 @@ except ImportError:
             special_pairs = load_module("special_pairs", os.path.join(base_path, "special_pairs.py"))
             REDOX_PAIRS = special_pairs.REDOX_PAIRS
 
+            mapper_store = load_module("mapper_store", os.path.join(base_path, "mapper_store.py"))
+            write_mapper_store = mapper_store.write_mapper_store
+            is_store_current = mapper_store.is_store_current
+            MAPPER_STORE_FILE = mapper_store.MAPPER_STORE_FILE
+
             utils = load_module("utils", os.path.join(parent_path, "metaboverse_cli", "utils.py"))
             write_database = utils.write_database
 
@@ -80,7 +89,21 @@ except ImportError:
             print(f"File location: {__file__}")
             raise
 
-def ensure_metabolite_mapper(output_dir=None, force_rebuild=False):
+def convert_mapper_to_store(mapper_file):
+    """
+    Writes the indexed SQLite store for an existing zipped metabolite mapper.
+    Returns the path to the store.
+    """
+    with zipfile.ZipFile(mapper_file + '.zip', 'r') as zip_ref:
+        mapping_db = pickle.load(
+            zip_ref.open(os.path.basename(mapper_file)))
+
+    return write_mapper_store(
+        path=os.path.join(os.path.dirname(mapper_file), MAPPER_STORE_FILE),
+        mapping_db=mapping_db,
+        source_file=mapper_file + '.zip')
+
+def ensure_metabolite_mapper(output_dir=None, force_rebuild=False, write_store=False):
     """
     Ensures a metabolite mapper exists, creating it if necessary.
     Returns the path to the metabolite mapper file.
@@ -88,6 +111,8 @@ def ensure_metabolite_mapper(output_dir=None, force_rebuild=False):
     Args:
         output_dir (str): Directory to store the mapper. If None, uses a temp directory
         force_rebuild (bool): If True, rebuilds the mapper even if it exists
+        write_store (bool): If True, also writes the indexed SQLite store
+            (metabolite_mapping.sqlite) next to the zipped pickle
     
     Returns:
         str: Path to the metabolite mapper file
@@ -102,7 +127,13 @@ def ensure_metabolite_mapper(output_dir=None, force_rebuild=False):
     zip_file = mapper_file + '.zip'
     
     # Check if zipped mapper exists and we don't need to rebuild
+    store_file = os.path.join(output_dir, MAPPER_STORE_FILE)
     if os.path.exists(zip_file) and not force_rebuild:
+        if write_store \
+        and (not os.path.exists(store_file)
+             or not is_store_current(store_file, zip_file)):
+            print('Writing metabolite mapper store...')
+            convert_mapper_to_store(mapper_file)
         return mapper_file
     
     # Create the mapper
@@ -159,6 +190,16 @@ def ensure_metabolite_mapper(output_dir=None, force_rebuild=False):
     print('Creating zip archive...')
     with zipfile.ZipFile(zip_file, 'w', zipfile.ZIP_DEFLATED) as zipf:
         zipf.write(mapper_file, 'metabolite_mapping.pickle')
+
+    if write_store:
+        print('Writing metabolite mapper store...')
+        write_mapper_store(
+            path=store_file,
+            mapping_db=mapping_db,
+            source_file=zip_file)
+    elif os.path.exists(store_file):
+        # A store from an earlier build no longer matches the mapper
+        os.remove(store_file)
     
     # Remove the unzipped pickle file
     if os.path.exists(mapper_file):
@@ -175,6 +216,9 @@ def __main__(args_dict):
     os.makedirs(output_dir, exist_ok=True)
     
     # Force rebuild mapper in output directory
-    mapper_file = ensure_metabolite_mapper(output_dir=output_dir, force_rebuild=True)
+    mapper_file = ensure_metabolite_mapper(
+        output_dir=output_dir,
+        force_rebuild=True,
+        write_store=args_dict.get('store', False))
     print(f"Metabolite mapper created successfully at: {mapper_file}")
     return 0 
\ No newline at end of file
@@ -78,6 +78,216 @@ REDOX_PAIRS = {
     }
 }
 
+def normalize_string(s):
+    """Normalize a string for consistent matching:
+    - Convert to lowercase
+    - Remove whitespace
+    - Remove common punctuation
+    
+    Args:
+        s (str): String to normalize
+        
+    Returns:
+        str: Normalized string
+    """
+    if not s:
+        return ""
+    
+    s = str(s)
+    s = s.lower() 
+    s = s.replace(" ", "") 
+    
+    # Keep only alphanumeric characters
+    s = ''.join(c for c in s if c.isalnum())
+    
+    # Remove common punctuation that might vary between representations
+    for char in ['-', '_', ',', '.', '(', ')', '[', ']', '{', '}', ':', ';', '\'', '=', '"', '`']:
+        s = s.replace(char, "")
+        
+    return s
+
+
+class RedoxIndex():
+    """Lookup tables for REDOX_PAIRS, built once and shared by all callers
+    
+    - lowercase: lowercase term -> [(pair_order, pair_name, redox_state), ...]
+    - normalized: normalized term -> (pair_name, redox_state), including
+      forms of NAD+, NADH, etc. without the trailing + or H
+    - terms: (pair_name, redox_state) -> set of lowercase terms
+    - pair_terms: pair_name -> set of lowercase terms for both states
+    - key_terms: pair_name -> set of the lowercase state keys of the pair
+    - key_pairs: lowercase state key -> pair_name (the last pair wins)
+    - key_oxidized: pair_name -> whether the pair name reads as oxidized
+
+    The key_* tables match the mapper's HMDB filtering, which iterates each
+    pair's form dictionary and so compares against its keys
+    """
+
+    def __init__(self, redox_pairs):
+        self.lowercase = {}
+        self.terms = {}
+        self.pair_terms = {}
+        self.key_terms = {}
+        self.key_pairs = {}
+        self.key_lowercase = {}
+        self.key_oxidized = {}
+        self.pair_names = list(redox_pairs)
+        for pair_order, (pair_name, forms) in enumerate(redox_pairs.items()):
+            self.key_terms[pair_name] = {k.lower() for k in forms}
+            for key_lower in self.key_terms[pair_name]:
+                self.key_pairs[key_lower] = pair_name
+                self.key_lowercase.setdefault(key_lower, pair_order)
+            self.key_oxidized[pair_name] = any(
+                ox_pattern in pair_name.lower()
+                for ox_pattern in ['oxidized', '+', '(ox)'])
+            self.pair_terms[pair_name] = set()
+            for state in ['oxidized', 'reduced']:
+                self.terms[(pair_name, state)] = set()
+                for term in forms[state]:
+                    term_lower = term.lower()
+                    self.terms[(pair_name, state)].add(term_lower)
+                    self.pair_terms[pair_name].add(term_lower)
+                    self.lowercase.setdefault(term_lower, []).append(
+                        (pair_order, pair_name, state))
+
+        self.normalized = self.build_normalized_lookup(redox_pairs)
+
+    def build_normalized_lookup(self, redox_pairs):
+        """Build the normalized term lookup used by classify()
+        """
+
+        redox_lookup = {}
+        
+        # Track base forms for ambiguous cases (like "nad" without "+" or "h")
+        base_forms = {}
+        
+        for pair_name, forms in redox_pairs.items():
+            # Process oxidized forms
+            for term in forms['oxidized']:
+                # Standard normalized form
+                key = normalize_string(term)
+                redox_lookup[key] = (pair_name, 'oxidized')
+                
+                # Special case for NAD+, NADP+, etc. - try without the +
+                if '+' in term:
+                    key_without_plus = normalize_string(term).replace('+', '')
+                    redox_lookup[key_without_plus] = (pair_name, 'oxidized')
+                    
+                    # Store base form for ambiguous matching later
+                    base_form = key_without_plus
+                    if base_form not in base_forms:
+                        base_forms[base_form] = (pair_name, 'oxidized')  # Default to oxidized for ambiguous cases
+                    
+                    # Also handle potential space before the + (e.g., "NAD +")
+                    key_with_space = normalize_string(term).replace('+', ' +')
+                    redox_lookup[key_with_space] = (pair_name, 'oxidized')
+            
+            # Process reduced forms
+            for term in forms['reduced']:
+                # Standard normalized form
+                key = normalize_string(term)
+                redox_lookup[key] = (pair_name, 'reduced')
+                
+                # Special case for NADH, NADPH, etc. - try without the H
+                if term.lower().endswith('h'):
+                    key_without_h = normalize_string(term)[:-1]
+                    # Don't override oxidized form default for base forms
+                    if key_without_h not in redox_lookup:
+                        redox_lookup[key_without_h] = (pair_name, 'reduced')
+                    
+                    # Store base form (but don't override existing)
+                    base_form = key_without_h
+                    if base_form not in base_forms:
+                        base_forms[base_form] = (pair_name, 'reduced')
+                    
+                    # Also handle potential space before the H (e.g., "NAD H")
+                    key_with_space = normalize_string(term)[:-1] + ' H'
+                    redox_lookup[key_with_space] = (pair_name, 'reduced')
+        
+        # Add default mappings for base forms (prefer oxidized state for ambiguous cases)
+        for base_form, (pair, state) in base_forms.items():
+            if base_form not in redox_lookup:
+                redox_lookup[base_form] = (pair, state)
+
+        return redox_lookup
+
+    def lookup(self, term):
+        """Return (redox_pair, redox_state) for a term by its normalized
+        form, or (None, None)
+        """
+
+        return self.normalized.get(normalize_string(term), (None, None))
+
+    def classify(self, name, synonyms=[]):
+        """Return (redox_pair, redox_state) by normalized form, checking the
+        name first and then each synonym in order
+        """
+
+        for term in [name] + list(synonyms):
+            redox_pair, redox_state = self.lookup(term)
+            if redox_pair:
+                return redox_pair, redox_state
+
+        return None, None
+
+    def classify_many(self, synonyms):
+        """Return (redox_pair, redox_state) for each synonym in a list
+        """
+
+        return [self.lookup(s) for s in synonyms]
+
+    def match(self, name, synonyms=[]):
+        """Return (redox_pair, redox_state) by exact lowercase match
+        
+        Pairs are checked in REDOX_PAIRS order. Within a pair the name is
+        checked before the synonyms, and the oxidized form before the reduced
+        form.
+        """
+
+        best = None
+        for term_order, term in enumerate([name] + list(synonyms)):
+            for pair_order, pair_name, state in self.lowercase.get(
+                    term.lower(), []):
+                rank = (pair_order, term_order, state != 'oxidized')
+                if best == None or rank < best[0]:
+                    best = (rank, pair_name, state)
+
+        if best == None:
+            return None, None
+        return best[1], best[2]
+
+    def match_keys(self, name, synonyms=[]):
+        """Return (redox_pair, is_oxidized) for the first pair, in
+        REDOX_PAIRS order, with a state key matching the name or a synonym,
+        or (None, None)
+        """
+
+        best = None
+        for term in [name] + list(synonyms):
+            pair_order = self.key_lowercase.get(term.lower())
+            if pair_order != None and (best == None or pair_order < best):
+                best = pair_order
+
+        if best == None:
+            return None, None
+        pair_name = self.pair_names[best]
+        return pair_name, self.key_oxidized[pair_name]
+
+
+_REDOX_INDEX = None
+
+
+def get_redox_index():
+    """Get the shared RedoxIndex, building it on first use
+    """
+
+    global _REDOX_INDEX
+    if _REDOX_INDEX == None:
+        _REDOX_INDEX = RedoxIndex(REDOX_PAIRS)
+
+    return _REDOX_INDEX
+
+
 def get_redox_state(metabolite_name, synonyms):
     """Determine if a metabolite is part of a redox pair and its state
     
@@ -89,24 +299,8 @@ def get_redox_state(metabolite_name, synonyms):
         tuple: (redox_pair_name, redox_state) where redox_state is 'oxidized' or 'reduced'
                Returns (None, None) if not a redox pair
     """
-    metabolite_lower = metabolite_name.lower()
-    
-    for pair_name, forms in REDOX_PAIRS.items():
-        # Check if the metabolite name matches any of the forms
-        if metabolite_lower in [s.lower() for s in forms['oxidized']]:
-            return pair_name, 'oxidized'
-        if metabolite_lower in [s.lower() for s in forms['reduced']]:
-            return pair_name, 'reduced'
-            
-        # Check synonyms if no direct match
-        for syn in synonyms:
-            syn_lower = syn.lower()
-            if syn_lower in [s.lower() for s in forms['oxidized']]:
-                return pair_name, 'oxidized'
-            if syn_lower in [s.lower() for s in forms['reduced']]:
-                return pair_name, 'reduced'
-    
-    return None, None
+
+    return get_redox_index().match(metabolite_name, synonyms)
 
 def filter_redox_synonyms(synonyms, redox_pair, redox_state):
     """Filter synonyms to only include those matching the correct redox state
@@ -122,5 +316,5 @@ def filter_redox_synonyms(synonyms, redox_pair, redox_state):
     if not redox_pair or not redox_state:
         return synonyms
         
-    allowed_synonyms = set(REDOX_PAIRS[redox_pair][redox_state])
-    return [s for s in synonyms if s.lower() in [a.lower() for a in allowed_synonyms]]
\ No newline at end of file
+    allowed_synonyms = get_redox_index().terms[(redox_pair, redox_state)]
+    return [s for s in synonyms if s.lower() in allowed_synonyms]
@@ -0,0 +1,297 @@
+"""License Information
+metaboverse-cli
+Back-end CLI Tool for Curating Metabolic Networks for Metaboverse
+https://github.com/Metaboverse/metaboverse-cli/
+alias: metaboverse-cli
+
+MIT License
+
+Copyright (c) Jordan A. Berg, The University of Utah
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+from __future__ import print_function
+from contextlib import contextmanager
+from datetime import datetime
+import tracemalloc
+import cProfile
+import platform
+import json
+import time
+import sys
+import os
+import types
+
+
+# This module can be loaded under more than one name (see the import
+# fallbacks in each sub-module), so profilers are kept in a single
+# per-process registry keyed by report path
+_profile_state = sys.modules.setdefault(
+    '_metaboverse_profile', types.ModuleType('_metaboverse_profile'))
+if not hasattr(_profile_state, 'profilers'):
+    _profile_state.profilers = {}
+_profilers = _profile_state.profilers
+
+
+class Stage():
+    """Timing, memory and counters recorded for one stage
+    - Check enabled before computing counters that cost a pass over data
+    """
+
+    enabled = True
+
+    def __init__(
+            self,
+            name):
+
+        self.name = name
+        self.counters = {}
+        self.record = {}
+        self.memory_peak = 0
+        self.profile = None
+
+    def count(
+            self,
+            **counters):
+        """Set domain counters (reactions, nodes, edges, ...) for the stage
+        """
+
+        for k, v in counters.items():
+            self.counters[k] = int(v)
+
+
+class NullStage():
+    """Stand-in used when profiling is off
+    """
+
+    enabled = False
+
+    def count(
+            self,
+            **counters):
+        pass
+
+
+NULL_STAGE = NullStage()
+
+
+class StageProfiler():
+    """Collect per-stage wall time, CPU time, tracemalloc peak and counters
+    for a --profile report
+    - Stages may nest; a parent's memory peak includes its children and
+    its optional cProfile dump excludes them
+    """
+
+    def __init__(
+            self,
+            report_file,
+            cprofile=False,
+            memory=True):
+
+        self.report_file = os.path.abspath(report_file)
+        self.cprofile = cprofile
+        self.stages = []
+        self.active = []
+        self.started = datetime.now().isoformat(timespec='seconds')
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.memory_peak = 0
+        self.pid = os.getpid()
+
+        # Without tracemalloc, memory fields are reported as 0
+        self.started_tracing = memory == True and not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start()
+
+    def get_profile_file(
+            self,
+            index,
+            name):
+
+        stem = os.path.splitext(self.report_file)[0]
+        return stem + '.' + str(index) + '.' + name + '.prof'
+
+    @contextmanager
+    def stage(
+            self,
+            name):
+        """Record a stage around the body of a with block
+        """
+
+        stage = Stage(name)
+        index = len(self.stages)
+        self.stages.append(stage)
+
+        if len(self.active) > 0:
+            parent = self.active[-1]
+            parent.memory_peak = max(
+                parent.memory_peak, tracemalloc.get_traced_memory()[1])
+            if parent.profile != None:
+                parent.profile.disable()
+        tracemalloc.reset_peak()
+        self.active.append(stage)
+
+        memory_start = tracemalloc.get_traced_memory()[0]
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if self.cprofile == True:
+            stage.profile = cProfile.Profile()
+            stage.profile.enable()
+
+        try:
+            yield stage
+        finally:
+            if stage.profile != None:
+                stage.profile.disable()
+            wall_time = time.perf_counter() - wall_start
+            cpu_time = time.process_time() - cpu_start
+            memory_end, memory_peak = tracemalloc.get_traced_memory()
+            stage.memory_peak = max(stage.memory_peak, memory_peak)
+
+            self.memory_peak = max(self.memory_peak, stage.memory_peak)
+            self.active.pop()
+            if len(self.active) > 0:
+                parent = self.active[-1]
+                parent.memory_peak = max(parent.memory_peak, stage.memory_peak)
+                if parent.profile != None:
+                    parent.profile.enable()
+            tracemalloc.reset_peak()
+
+            stage.record = {
+                'name': name,
+                'depth': len(self.active),
+                'wall_time': round(wall_time, 6),
+                'cpu_time': round(cpu_time, 6),
+                'memory_peak': stage.memory_peak,
+                'memory_delta': memory_end - memory_start,
+                'counters': stage.counters}
+            if stage.profile != None:
+                stage.record['cprofile'] = self.get_profile_file(index, name)
+                stage.profile.dump_stats(stage.record['cprofile'])
+                stage.profile = None
+
+    def get_report(
+            self,
+            args_dict=None,
+            extra=None):
+        """Build the JSON report for all finished stages
+        - extra holds additional top-level fields, e.g. benchmark settings
+        """
+
+        if tracemalloc.is_tracing():
+            self.memory_peak = max(
+                self.memory_peak, tracemalloc.get_traced_memory()[1])
+
+        report = {
+            'started': self.started,
+            'wall_time': round(time.perf_counter() - self.wall_start, 6),
+            'cpu_time': round(time.process_time() - self.cpu_start, 6),
+            'memory_peak': self.memory_peak,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'stages': [s.record for s in self.stages if s.record != {}]}
+        if args_dict != None:
+            report['cmd'] = args_dict.get('cmd')
+            report['organism_id'] = args_dict.get('organism_id')
+        if extra != None:
+            report.update(extra)
+
+        return report
+
+    def write(
+            self,
+            args_dict=None,
+            extra=None):
+        """Write the JSON report
+        """
+
+        with open(self.report_file, 'w') as outfile:
+            json.dump(self.get_report(args_dict, extra), outfile, indent=4)
+        if self.started_tracing:
+            tracemalloc.stop()
+        print('Wrote profile report to: ' + self.report_file)
+
+
+def get_profiler(
+        args_dict):
+    """Get the active profiler for the --profile report in args_dict, or
+    None if profiling is off
+    """
+
+    if args_dict == None:
+        return None
+    report_file = args_dict.get('profile')
+    if report_file == None or str(report_file) == 'None':
+        return None
+
+    profiler = _profilers.get(os.path.abspath(report_file))
+    if profiler == None or profiler.pid != os.getpid():
+        return None
+    return profiler
+
+
+def start_profiler(
+        args_dict):
+    """Start collecting stages if --profile was given
+    """
+
+    report_file = args_dict.get('profile')
+    if report_file == None or str(report_file) == 'None':
+        return None
+    args_dict['profile'] = report_file = os.path.abspath(report_file)
+
+    profiler = StageProfiler(
+        report_file=report_file,
+        cprofile=args_dict.get('cprofile', False) == True,
+        memory=args_dict.get('profile_memory', True) != False)
+    _profilers[profiler.report_file] = profiler
+
+    return profiler
+
+
+def write_profile_report(
+        args_dict,
+        extra=None):
+    """Write and close the --profile report, if profiling is on
+    """
+
+    profiler = get_profiler(args_dict)
+    if profiler != None:
+        profiler.write(args_dict, extra)
+        del _profilers[profiler.report_file]
+
+
+@contextmanager
+def profile_stage(
+        args_dict,
+        name):
+    """Record a named stage if profiling is on
+
+    with profile_stage(args_dict, 'build_graph') as stage:
+        ...
+        stage.count(nodes=..., edges=...)
+    """
+
+    profiler = get_profiler(args_dict)
+    if profiler == None:
+        yield NULL_STAGE
+    else:
+        with profiler.stage(name) as stage:
+            yield stage
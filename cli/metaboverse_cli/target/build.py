@@ -43,8 +43,9 @@ import re
 import os
 
 try:
-    from analyze.model import build_chebi_reference, build_name_reference, load_metabolite_synonym_dictionary, uniprot_ensembl_reference, gather_synonyms, name_graph, compile_node_degrees
+    from analyze.model import build_chebi_reference, build_name_reference, load_metabolite_synonym_dictionary, uniprot_ensembl_reference, gather_synonyms, cached_gather_synonyms, load_synonym_cache, name_graph, compile_node_degrees
     from utils import progress_feed
+    from profiler import profile_stage
 except:
     import importlib.util
     module_path = os.path.abspath(
@@ -58,6 +59,8 @@ except:
     load_metabolite_synonym_dictionary = model.load_metabolite_synonym_dictionary
     uniprot_ensembl_reference = model.uniprot_ensembl_reference
     gather_synonyms = model.gather_synonyms
+    cached_gather_synonyms = model.cached_gather_synonyms
+    load_synonym_cache = model.load_synonym_cache
     name_graph = model.name_graph
     compile_node_degrees = model.compile_node_degrees
 
@@ -69,6 +72,14 @@ except:
     spec.loader.exec_module(progress_feed)
     progress_feed = progress_feed.progress_feed
 
+    module_path = os.path.abspath(
+        os.path.join(".", "metaboverse_cli", "profiler.py"
+                     ))
+    spec = importlib.util.spec_from_file_location("profiler", module_path)
+    profiler = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(profiler)
+    profile_stage = profiler.profile_stage
+
 
 def get_metabolites(
         data,
@@ -197,7 +208,8 @@ def targeted_graph(
         name_database,
         metabolite_mapper,
         uniprot_mapper,
-        component_database):
+        component_database,
+        synonym_cache=None):
     """Build graph
     - Add nodes and edges
     - Map names to objects in the graph for display
@@ -215,7 +227,8 @@ def targeted_graph(
             reversed_species=reversed_species,
             name_database=name_database,
             metabolite_mapper=metabolite_mapper,
-            uniprot_mapper=uniprot_mapper)
+            uniprot_mapper=uniprot_mapper,
+            synonym_cache=synonym_cache)
         species_ids = fix_species_ids(
             id_list=species_ids)
 
@@ -262,7 +275,8 @@ def get_species(
         reversed_species,
         name_database,
         metabolite_mapper,
-        uniprot_mapper):
+        uniprot_mapper,
+        synonym_cache=None):
     """
     """
 
@@ -290,7 +304,8 @@ def get_species(
         except:
             _mapper = next(iter(metabolite['name']))
 
-    mapper_id, parsed_syns_list = gather_synonyms(
+    mapper_id, parsed_syns_list = cached_gather_synonyms(
+        synonym_cache=synonym_cache,
         map_id=_mapper,
         init_syns=list(identifiers),
         metabolite_mapper=metabolite_mapper,
@@ -385,7 +400,8 @@ def __main__(
     # add any mapping IDs
     # Add synonyms
     # Change name to user provided if available
-    metabolite_mapper = load_metabolite_synonym_dictionary()
+    with profile_stage(args_dict, 'load_metabolite_synonym_dictionary'):
+        metabolite_mapper = load_metabolite_synonym_dictionary()
 
     u = {}
     for k, v in network['uniprot_metabolites'].items():
@@ -409,16 +425,27 @@ def __main__(
     # Generate graph
     # Name mapping
     print('Building network...')
-    reference = targeted_graph(
-        metabolites=metabolites,
-        reactions=network['reaction_database'],
-        pathways=network['pathway_database'],
-        species_reference=network['species_database'],
-        reversed_species=reversed_species,
-        name_database=network['name_database'],
-        metabolite_mapper=metabolite_mapper,
-        uniprot_mapper=u,
-        component_database=network['components_database'])
+    synonym_cache = load_synonym_cache(
+        args_dict=args_dict,
+        network=network)
+    with profile_stage(args_dict, 'targeted_graph') as stage:
+        reference = targeted_graph(
+            metabolites=metabolites,
+            reactions=network['reaction_database'],
+            pathways=network['pathway_database'],
+            species_reference=network['species_database'],
+            reversed_species=reversed_species,
+            name_database=network['name_database'],
+            metabolite_mapper=metabolite_mapper,
+            uniprot_mapper=u,
+            component_database=network['components_database'],
+            synonym_cache=synonym_cache)
+        stage.count(
+            metabolites=len(metabolites),
+            mapped_metabolites=sum(
+                1 for v in reference.values() if len(v['species_ids']) > 0))
+    if synonym_cache != None:
+        synonym_cache.close()
 
     # May need a reaction id mapper for reactome IDs
     reactome_mapper = {}
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Run unit tests for Metaboverse redox pair mapping
+Run unit tests for Metaboverse redox pair mapping and test_*.py modules
 """
 import unittest
 import os
@@ -14,7 +14,11 @@ from unit_tests import TestRedoxPairMapping
 
 if __name__ == '__main__':
     # Create a test suite
-    suite = unittest.TestLoader().loadTestsFromTestCase(TestRedoxPairMapping)
+    loader = unittest.TestLoader()
+    suite = loader.loadTestsFromTestCase(TestRedoxPairMapping)
+    suite.addTests(loader.discover(
+        os.path.dirname(os.path.abspath(__file__)),
+        pattern='test_*.py'))
     
     # Run the tests
     result = unittest.TextTestRunner(verbosity=2).run(suite)
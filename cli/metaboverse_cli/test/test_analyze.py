@@ -0,0 +1,161 @@
+"""License Information
+metaboverse-cli
+Back-end CLI Tool for Curating Metabolic Networks for Metaboverse
+https://github.com/Metaboverse/metaboverse-cli/
+alias: metaboverse-cli
+
+MIT License
+
+Copyright (c) Jordan A. Berg, The University of Utah
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+import unittest
+import tempfile
+import pickle
+import os
+import sys
+import networkx as nx
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import functions to test
+try:
+    from analyze.__main__ import build_reaction_neighbors
+    from analyze.neighbors_db import NeighborsDatabase, \
+        write_neighbors_database, read_neighbors_dictionary, get_index_file
+except ImportError:
+    # For running tests directly
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from metaboverse_cli.analyze.__main__ import build_reaction_neighbors
+    from metaboverse_cli.analyze.neighbors_db import NeighborsDatabase, \
+        write_neighbors_database, read_neighbors_dictionary, get_index_file
+
+
+def two_hop_neighbors(graph, reaction_ids):
+    """Reference two-hop search over an undirected adjacency dictionary"""
+    neighbors = {}
+    for one, two in graph.edges():
+        neighbors.setdefault(one, set()).add(two)
+        neighbors.setdefault(two, set()).add(one)
+
+    reaction_neighbors = {}
+    for node, components in neighbors.items():
+        if node in reaction_ids:
+            reaction_neighbors[node] = set(
+                r for c in components for r in neighbors[c]
+                if r in reaction_ids)
+    return reaction_neighbors
+
+
+class TestNeighborsDictionary(unittest.TestCase):
+    """Test the sparse reaction neighbors builder"""
+
+    def test_build_reaction_neighbors(self):
+        """Test that the sparse product finds the same two-hop reactions"""
+        graph = nx.DiGraph()
+        graph.add_edges_from([
+            ('A', 'R1'), ('R2', 'A'), ('R2', 'B'), ('B', 'R3'),
+            ('R3', 'R4'), ('R5', 'R5'), ('C', 'D')])
+        graph.add_node('R6')
+        reaction_ids = {'R1', 'R2', 'R3', 'R4', 'R5', 'R6'}
+
+        neighbors = build_reaction_neighbors(
+            graph=graph,
+            reaction_ids=reaction_ids,
+            block_size=2)
+
+        self.assertEqual(
+            {k: set(v) for k, v in neighbors.items()},
+            two_hop_neighbors(graph, reaction_ids))
+        self.assertEqual(set(neighbors['R3']), {'R2', 'R3'})
+        self.assertNotIn('R6', neighbors)
+        for v in neighbors.values():
+            self.assertEqual(len(v), len(set(v)))
+
+    def test_build_reaction_neighbors_empty(self):
+        """Test that a graph without reactions gives an empty dictionary"""
+        self.assertEqual(build_reaction_neighbors(nx.DiGraph(), set()), {})
+
+
+class TestNeighborsDatabase(unittest.TestCase):
+    """Test the array-backed neighbors database format"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.neighbors_dictionary = {
+            'R1': ['R2', 'R1'],
+            'R2': ['R3', 'R2', 'R1'],
+            'R3': [],
+            'R4': ['R9'],
+            'nbdb-Metaboverse-version': '0.0.0',
+            'nbdb-Metaboverse-date': '2024-01-01',
+            'nbdb-Metaboverse-url': 'T.nbdb'}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def check_database(self, database):
+        self.assertIsInstance(database, NeighborsDatabase)
+        self.assertEqual(dict(database.items()), self.neighbors_dictionary)
+        self.assertIn('R3', database.keys())
+        self.assertNotIn('R9', database)
+        with self.assertRaises(KeyError):
+            database['R9']
+
+    def test_round_trip(self):
+        """Test that the mapped database reads back the same dictionary"""
+        path = write_neighbors_database(
+            path=os.path.join(self.tmp_dir.name, 'T.nbdb'),
+            neighbors_dictionary=self.neighbors_dictionary)
+        database = read_neighbors_dictionary(path)
+        self.check_database(database)
+
+        database['nbdb-Metaboverse-url'] = path
+        self.assertEqual(database['nbdb-Metaboverse-url'], path)
+        with self.assertRaises(TypeError):
+            database['R1'] = []
+
+    def test_pickle_index(self):
+        """Test that pickled .nbdb files are left in place and indexed"""
+        path = os.path.join(self.tmp_dir.name, 'T.nbdb')
+        with open(path, 'wb') as f:
+            pickle.dump(self.neighbors_dictionary, f)
+
+        self.check_database(read_neighbors_dictionary(path))
+        with open(path, 'rb') as f:
+            self.assertEqual(pickle.load(f), self.neighbors_dictionary)
+        index_file = get_index_file(path)
+        self.assertEqual(index_file, os.path.join(self.tmp_dir.name, 'T.nbidx'))
+        index_mtime = os.stat(index_file).st_mtime_ns
+        self.check_database(read_neighbors_dictionary(path))
+        self.assertEqual(os.stat(index_file).st_mtime_ns, index_mtime)
+
+        # A replaced .nbdb file gets a new index
+        self.neighbors_dictionary['R3'] = ['R4']
+        with open(path, 'wb') as f:
+            pickle.dump(self.neighbors_dictionary, f)
+        os.utime(path, ns=(index_mtime + 10**9, index_mtime + 10**9))
+        self.check_database(read_neighbors_dictionary(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
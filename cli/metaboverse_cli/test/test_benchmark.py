@@ -0,0 +1,194 @@
+"""License Information
+metaboverse-cli
+Back-end CLI Tool for Curating Metabolic Networks for Metaboverse
+https://github.com/Metaboverse/metaboverse-cli/
+alias: metaboverse-cli
+
+MIT License
+
+Copyright (c) Jordan A. Berg, The University of Utah
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+import unittest
+import tempfile
+import json
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import functions to test
+try:
+    from benchmark.synthetic import get_scale, get_sort_name, make_network, \
+        make_omics
+    from benchmark.sbml import write_reactome_pathways
+    from benchmark.__main__ import run_benchmark, run_curation_benchmark
+    from curate.load_reactions_db import process_components
+except ImportError:
+    # For running tests directly
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from metaboverse_cli.benchmark.synthetic import get_scale, \
+        get_sort_name, make_network, make_omics
+    from metaboverse_cli.benchmark.sbml import write_reactome_pathways
+    from metaboverse_cli.benchmark.__main__ import run_benchmark, \
+        run_curation_benchmark
+    from metaboverse_cli.curate.load_reactions_db import process_components
+
+
+class TestSyntheticNetwork(unittest.TestCase):
+    """Test the synthetic network generator"""
+
+    def test_scale(self):
+        """Test named scales"""
+        self.assertEqual(get_scale('10k'), 10000)
+        self.assertEqual(get_scale('2.5k'), 2500)
+        self.assertEqual(get_scale(300), 300)
+
+    def test_deterministic(self):
+        """Test that the same seed gives the same network and data"""
+        network = make_network(reactions=200, seed=7)
+        again = make_network(reactions=200, seed=7)
+        other = make_network(reactions=200, seed=8)
+        self.assertEqual(network['reaction_database'], again['reaction_database'])
+        self.assertEqual(network['components_database'], again['components_database'])
+        self.assertNotEqual(network['reaction_database'], other['reaction_database'])
+
+        data, stats = make_omics(network, samples=2, seed=7)
+        _data, _stats = make_omics(again, samples=2, seed=7)
+        self.assertTrue(data.equals(_data))
+        self.assertTrue(stats.equals(_stats))
+        self.assertEqual(data.columns.tolist(), ['sample_1', 'sample_2'])
+
+    def test_references(self):
+        """Test that every referenced species and reaction exists"""
+        network = make_network(reactions=200, seed=1)
+        self.assertEqual(len(network['reaction_database']), 200)
+
+        components = network['components_database']
+        sort_names = set()
+        for k, v in network['reaction_database'].items():
+            for x in v['reactants'] + v['products']:
+                self.assertIn(x, components)
+            for x in v['modifiers']:
+                self.assertIn(x[0], components)
+            sort_names.add(get_sort_name(v['name']))
+        self.assertEqual(len(sort_names), 200)
+
+        for k, v in network['pathway_database'].items():
+            for r in v['reactions']:
+                self.assertIn(r, network['reaction_database'])
+        for k, v in components.items():
+            if v['type'] == 'protein_component':
+                self.assertIn(v['is'], network['uniprot_synonyms'])
+            elif v['type'] == 'metabolite_component':
+                self.assertIn(v['is'], network['chebi_synonyms'])
+
+
+class TestBenchmark(unittest.TestCase):
+    """Test the benchmark harness on a small network"""
+
+    def test_run_benchmark(self):
+        with tempfile.TemporaryDirectory() as directory:
+            report_file = os.path.join(directory, 'benchmark.json')
+            run_benchmark({
+                'reactions': '100',
+                'seed': 0,
+                'samples': 2,
+                'report': report_file,
+                'output': directory,
+                'write_inputs': True})
+
+            self.assertTrue(os.path.exists(os.path.join(directory, 'SYN.nbdb')))
+            self.assertTrue(os.path.exists(os.path.join(directory, 'SYN.mvrs')))
+            self.assertTrue(os.path.exists(os.path.join(directory, 'SYN.mvdb')))
+
+            with open(report_file) as json_file:
+                report = json.load(json_file)
+
+        self.assertEqual(
+            report['benchmark'],
+            {'suite': 'analyze', 'reactions': 100, 'species': None,
+             'seed': 0, 'samples': 2})
+        self.assertEqual(
+            [s['name'] for s in report['stages']],
+            ['generate', 'load_references', 'build_graph',
+             'make_neighbors_dictionary', 'map_attributes',
+             'broadcast_values', 'collapse_nodes', 'output_graph'])
+        build_graph = report['stages'][2]
+        self.assertEqual(build_graph['counters']['reactions'], 100)
+        self.assertGreater(build_graph['counters']['nodes'], 100)
+
+    def test_run_curation_benchmark(self):
+        with tempfile.TemporaryDirectory() as directory:
+            report_file = os.path.join(directory, 'curation.json')
+            report = run_curation_benchmark({
+                'reactions': '100',
+                'species': 80,
+                'seed': 0,
+                'report': report_file,
+                'profile_memory': False})
+
+        self.assertEqual(report['benchmark']['formats'],
+            ['reactome', 'bigg', 'custom'])
+        for stage in ['reactome.parse_sbml', 'reactome.process_components',
+                      'bigg.process_manual', 'custom.process_custom']:
+            self.assertGreater(
+                report['throughput'][stage]['reactions_per_second'], 0)
+        self.assertIn('species_per_second',
+            report['throughput']['reactome.name_database'])
+
+
+class TestSyntheticSBML(unittest.TestCase):
+    """Test that generated SBML round-trips through the curation parser"""
+
+    def test_reactome_round_trip(self):
+        network = make_network(reactions=50, seed=2)
+        with tempfile.TemporaryDirectory() as directory:
+            session_file = os.path.join(directory, 'session.json')
+            with open(session_file, 'w') as f:
+                json.dump({}, f)
+            pathways_dir, pathways = write_reactome_pathways(
+                output=directory,
+                network=network,
+                annotation_density=2)
+            results = process_components(
+                output_dir=directory,
+                pathways_dir=pathways_dir,
+                pathways_list=pathways,
+                species_id='SYN',
+                args_dict={'session_data': session_file})
+
+        reaction_database = results[2]
+        components_database = results[7]
+        self.assertEqual(
+            set(reaction_database.keys()),
+            set(network['reaction_database'].keys()))
+        for k in components_database.keys():
+            self.assertIn(k, network['components_database'])
+        for k, v in network['reaction_database'].items():
+            self.assertEqual(
+                sorted(reaction_database[k]['reactants']),
+                sorted(v['reactants']))
+
+
+if __name__ == '__main__':
+    unittest.main()
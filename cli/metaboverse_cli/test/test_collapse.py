@@ -0,0 +1,170 @@
+"""License Information
+metaboverse-cli
+Back-end CLI Tool for Curating Metabolic Networks for Metaboverse
+https://github.com/Metaboverse/metaboverse-cli/
+alias: metaboverse-cli
+
+MIT License
+
+Copyright (c) Jordan A. Berg, The University of Utah
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+import unittest
+import io
+import os
+import sys
+import contextlib
+import networkx as nx
+from networkx.readwrite import json_graph
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import functions to test
+try:
+    from analyze.collapse import collapse_nodes, build_neighbor_index, \
+        find_neighbor_candidates, get_unity_lists, make_side_signature, \
+        get_unity_sides
+except ImportError:
+    # For running tests directly
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from metaboverse_cli.analyze.collapse import collapse_nodes, \
+        build_neighbor_index, find_neighbor_candidates, get_unity_lists, \
+        make_side_signature, get_unity_sides
+
+
+def make_reaction(key, reactants, products, modifiers=[]):
+    return {
+        'compartment': 'c1', 'id': key, 'name': key + ' name',
+        'reversible': 'false', 'notes': '',
+        'reactants': reactants, 'products': products,
+        'modifiers': modifiers, 'additional_components': []}
+
+
+def make_test_network():
+    """A measured A -> B -> C -> D chain with an unrelated hub reaction"""
+    reaction_dictionary = {
+        'R1': make_reaction('R1', ['A', 'H'], ['B']),
+        'R2': make_reaction('R2', ['B'], ['C'], [['E', 'catalyst']]),
+        'R3': make_reaction('R3', ['C'], ['D', 'H']),
+        'R4': make_reaction('R4', ['H'], ['F'])}
+    values = {'A': 1.0, 'B': None, 'C': None, 'D': 2.0,
+              'E': None, 'F': 3.0, 'H': 4.0}
+
+    graph = nx.DiGraph()
+    for s, v in values.items():
+        graph.add_node(s, values=[v])
+    degree_dictionary = {s: 1 for s in values}
+    degree_dictionary['H'] = 10
+    return graph, reaction_dictionary, degree_dictionary
+
+
+def run_collapse(neighbors_dictionary, collapse_threshold=0.3):
+    graph, reaction_dictionary, degree_dictionary = make_test_network()
+    with contextlib.redirect_stdout(io.StringIO()):
+        graph, updated_reactions, changed_reactions, removed_reaction = \
+            collapse_nodes(
+                args_dict={},
+                graph=graph,
+                reaction_dictionary=reaction_dictionary,
+                neighbors_dictionary=neighbors_dictionary,
+                degree_dictionary=degree_dictionary,
+                samples=1,
+                collapse_with_modifiers=False,
+                blocklist=[],
+                degree_threshold=5,
+                collapse_threshold=collapse_threshold)
+    return json_graph.node_link_data(graph, edges='links'), \
+        updated_reactions, changed_reactions, removed_reaction
+
+
+class TestCollapseNodes(unittest.TestCase):
+    """Test reaction collapse with and without a neighbors dictionary"""
+
+    def test_neighbor_candidates(self):
+        """Test that only reactions sharing a non-hub species or a side are
+        candidates"""
+        graph, reaction_dictionary, degree_dictionary = make_test_network()
+        neighbor_index = build_neighbor_index(reaction_dictionary)
+        candidates = find_neighbor_candidates(
+            key='R2',
+            real_reactants=['B'],
+            real_products=['C'],
+            reaction_dictionary=reaction_dictionary,
+            neighbor_index=neighbor_index,
+            degree_dictionary=degree_dictionary,
+            blocklist=set(),
+            collapse_threshold=0.3,
+            degree_threshold=5)
+        self.assertEqual(candidates, ['R1', 'R3'])
+
+    def test_side_signatures(self):
+        """Test that precomputed sides give the same unity proportions"""
+        degree_dictionary = {'A': 1, 'B': 1, 'C': 1, 'H': 10}
+        signature = make_side_signature(
+            reactants=['A', 'A', 'H'],
+            products=['B', 'C'],
+            degree_dictionary=degree_dictionary,
+            blocklist={'C'},
+            degree_threshold=5)
+        self.assertEqual(signature['short'], ['A', 'A', 'B'])
+        self.assertEqual(signature['hub_products'], (frozenset(['B', 'C']), 2))
+
+        neighbor = make_side_signature(
+            reactants=['B'],
+            products=['A'],
+            degree_dictionary=degree_dictionary,
+            blocklist={'C'},
+            degree_threshold=5)
+        self.assertEqual(
+            get_unity_sides(
+                signature['short_reactants'], neighbor['short_products']),
+            get_unity_lists(['A', 'A'], ['A']))
+
+    def test_missing_neighbors_match_full_neighbors(self):
+        """Test that missing neighbor entries give the same collapse"""
+        graph, reaction_dictionary, degree_dictionary = make_test_network()
+        neighbors_dictionary = {
+            k: list(reaction_dictionary.keys()) for k in reaction_dictionary}
+
+        full = run_collapse(neighbors_dictionary)
+        partial = run_collapse({'R1': neighbors_dictionary['R1']})
+        missing = run_collapse({})
+
+        self.assertEqual(full, partial)
+        self.assertEqual(full, missing)
+        self.assertIn('R1_R2_R3', full[1])
+        self.assertEqual(full[3], {'R1', 'R2', 'R3'})
+
+    def test_zero_threshold_neighbors(self):
+        """Test that a threshold of 0 checks every known neighbor"""
+        graph, reaction_dictionary, degree_dictionary = make_test_network()
+        neighbors_dictionary = {
+            k: list(reaction_dictionary.keys()) for k in reaction_dictionary}
+
+        full = run_collapse(neighbors_dictionary, collapse_threshold=0)
+        missing = run_collapse({}, collapse_threshold=0)
+
+        self.assertEqual(full, missing)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,499 @@
+"""License Information
+metaboverse-cli
+Back-end CLI Tool for Curating Metabolic Networks for Metaboverse
+https://github.com/Metaboverse/metaboverse-cli/
+alias: metaboverse-cli
+
+MIT License
+
+Copyright (c) Jordan A. Berg, The University of Utah
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+import unittest
+import pandas as pd
+import tempfile
+import tarfile
+import shutil
+import json
+import re
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import functions to test
+try:
+    from curate.__main__ import build_chebi_synonyms, add_reactome_metabolites, \
+        parse_table, parse_complexes, reference_complex_species, \
+        load_reactome_mapping, get_reference_files
+    from curate.utils import read_reactome_mapping, split_reactome_mapping, \
+        get_mapping_partition
+    from curate.load_reactions_db import process_components, PathwayArchive, \
+        get_database, get_namespace, add_species, load_sbml, process_manual, \
+        stream_manual
+    from benchmark.synthetic import make_network
+    from benchmark.sbml import write_reactome_pathways, write_bigg_model
+except ImportError:
+    # For running tests directly
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from metaboverse_cli.curate.__main__ import build_chebi_synonyms, \
+        add_reactome_metabolites, parse_table, parse_complexes, \
+        reference_complex_species, load_reactome_mapping, get_reference_files
+    from metaboverse_cli.curate.utils import read_reactome_mapping, \
+        split_reactome_mapping, get_mapping_partition
+    from metaboverse_cli.curate.load_reactions_db import process_components, \
+        PathwayArchive, get_database, get_namespace, add_species, load_sbml, \
+        process_manual, stream_manual
+    from metaboverse_cli.benchmark.synthetic import make_network
+    from metaboverse_cli.benchmark.sbml import write_reactome_pathways, \
+        write_bigg_model
+
+
+class TestReferenceTables(unittest.TestCase):
+    """Test parsing of the ChEBI and Reactome reference tables"""
+
+    def test_build_chebi_synonyms(self):
+        chebi = pd.DataFrame({
+            'COMPOUND_ID': [15422, 456216, 15422, 30616, 15422],
+            'NAME': ['ATP', 'ADP', 'adenosine triphosphate', 'ATP(4-)', 'ATP'],
+            'SOURCE': ['KEGG COMPOUND', 'ChEBI', 'IUPAC', 'UniProt', 'UniProt']})
+        chebi_dictionary, chebi_synonyms, uniprot_metabolites = \
+            build_chebi_synonyms(chebi=chebi)
+
+        self.assertEqual(chebi_dictionary, {
+            'ATP': 'CHEBI:15422',
+            'ADP': 'CHEBI:456216',
+            'adenosine triphosphate': 'CHEBI:15422'})
+        self.assertEqual(list(chebi_synonyms.items()), [
+            ('CHEBI:15422', ['ATP', 'adenosine triphosphate']),
+            ('CHEBI:456216', ['ADP'])])
+        self.assertEqual(uniprot_metabolites, {
+            'ATP(4-)': 'CHEBI:30616',
+            'ATP': 'CHEBI:15422'})
+
+    def test_add_reactome_metabolites(self):
+        chebi = pd.DataFrame({
+            0: ['15422', '15422', '456216', '16474'],
+            1: ['R-HSA-113592', 'R-HSA-113593', 'R-MMU-1', 'R-HSA-5'],
+            2: ['ATP [cytosol]', 'ATP [nucleoplasm]', 'ADP [cytosol]', 'NADPH'],
+            3: ['R-HSA-1', 'R-HSA-1', 'R-MMU-1', 'R-HSA-2']})
+        species_database = {'species_113592': 'ATP'}
+        name_database = {'ATP': 'species_113592'}
+        components_database = {'species_113592': {'id': 'species_113592'}}
+        species_database, name_database, components_database = \
+            add_reactome_metabolites(
+                species_database=species_database,
+                name_database=name_database,
+                components_database=components_database,
+                compartment_dictionary={'compartment_1': 'nucleoplasm'},
+                species_id='HSA',
+                chebi=chebi)
+
+        self.assertEqual(
+            list(components_database.keys()),
+            ['species_113592', 'species_113593', 'species_5'])
+        self.assertEqual(
+            components_database['species_113593']['compartment'],
+            'compartment_1')
+        self.assertEqual(components_database['species_5']['compartment'], None)
+        self.assertEqual(components_database['species_5']['name'], 'NADPH')
+        self.assertEqual(name_database['ATP'], 'species_113592')
+        self.assertEqual(name_database['NADPH'], 'species_5')
+
+    def test_parse_table(self):
+        table = pd.DataFrame({
+            'analyte_id': ['R-ALL-1', 'R-ALL-2', 'R-ALL-1'],
+            'analyte_name': ['ATP [cytosol]', 'ADP', 'ATP [nucleoplasm]'],
+            'reaction_id': ['R-HSA-10', 'R-HSA-11', 'R-HSA-12'],
+            'reaction_name': ['a', 'b', 'c']})
+        reference_dictionary = parse_table(
+            reference={'table': table},
+            key='table')
+
+        self.assertEqual(list(reference_dictionary.keys()), ['R-ALL-1', 'R-ALL-2'])
+        self.assertEqual(reference_dictionary['R-ALL-1'], {
+            'analyte_id': 'R-ALL-1',
+            'reaction_id': 'R-HSA-12',
+            'reaction_name': 'c',
+            'analyte': 'ATP',
+            'compartment': 'nucleoplasm'})
+        self.assertTrue(pd.isna(reference_dictionary['R-ALL-2']['compartment']))
+
+    def test_parse_complexes(self):
+        reference = {
+            'complex_participants': pd.DataFrame({
+                'identifier': ['R-HSA-1', 'R-HSA-2'],
+                'name': ['AB complex [cytosol]', 'C dimer'],
+                'participants': ['chebi:15422|uniprot:P1', 'ensembl:ENSG1'],
+                'participatingComplex': ['-', 'R-HSA-1']}),
+            'complex_pathway': pd.DataFrame({
+                'complex': ['R-HSA-1', 'R-HSA-1'],
+                'pathway': ['R-HSA-10', 'R-HSA-11'],
+                'top_level_pathway': ['R-HSA-100', 'R-HSA-100']})}
+        complex_dictionary = parse_complexes(reference)
+
+        self.assertEqual(complex_dictionary['R-HSA-1']['complex_name'], 'AB complex')
+        self.assertEqual(complex_dictionary['R-HSA-1']['compartment'], 'cytosol')
+        self.assertEqual(complex_dictionary['R-HSA-1']['pathway'], 'R-HSA-11')
+        self.assertEqual(
+            complex_dictionary['R-HSA-1']['participants']['chebi'], ['15422'])
+        self.assertEqual(complex_dictionary['R-HSA-2']['compartment'], None)
+        self.assertEqual(complex_dictionary['R-HSA-2']['pathway'], None)
+        self.assertEqual(
+            complex_dictionary['R-HSA-2']['participating_complex'], 'R-HSA-1')
+
+        complex_dictionary = reference_complex_species(
+            reference=complex_dictionary,
+            name_database={'R-HSA-2': 'species_2'})
+        self.assertEqual(list(complex_dictionary.keys()), ['species_2'])
+
+
+
+class TestReactomeMapping(unittest.TestCase):
+    """Test reading and splitting Reactome All_Levels mapping files"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_name = 'Ensembl2Reactome_PE_All_Levels.txt'
+        self.file = os.path.join(self.temp_dir, self.file_name)
+        with open(self.file, 'w') as mapping:
+            for i in range(12):
+                species = ['HSA', 'MMU', 'DRE'][i % 3]
+                mapping.write('\t'.join([
+                    'ENSG' + str(i),
+                    'R-' + species + '-' + str(100 + i),
+                    'gene ' + str(i) + ' [cytosol]',
+                    'R-' + species + '-' + str(i),
+                    'pathway ' + str(i),
+                    'https://reactome.org',
+                    'TAS',
+                    'Organism']) + '\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_read_reactome_mapping(self):
+        full = pd.read_csv(self.file, sep='\t', header=None)
+        full = full.loc[full[3].str.contains('MMU'), [0, 2, 3]]
+        mapping = read_reactome_mapping(
+            self.file,
+            species_id='MMU',
+            usecols=[0, 2],
+            chunksize=5)
+
+        self.assertEqual(list(mapping.columns), [0, 2, 3])
+        self.assertEqual(mapping.values.tolist(), full.values.tolist())
+        self.assertEqual(list(mapping.index), list(full.index))
+
+    def test_split_reactome_mapping(self):
+        self.assertEqual(
+            get_mapping_partition(self.temp_dir, self.file_name, 'HSA'), None)
+        partition_dir = split_reactome_mapping(self.file, self.temp_dir)
+
+        self.assertEqual(
+            sorted(os.listdir(partition_dir)),
+            ['DRE.txt', 'HSA.txt', 'MMU.txt', 'source.json'])
+        for species_id in ['HSA', 'MMU', 'DRE']:
+            partition = get_mapping_partition(
+                self.temp_dir, self.file_name, species_id)
+            self.assertEqual(
+                read_reactome_mapping(
+                    partition, species_id, usecols=[0, 2]).values.tolist(),
+                read_reactome_mapping(
+                    self.file, species_id, usecols=[0, 2]).values.tolist())
+
+        os.remove(self.file)
+        mapping = load_reactome_mapping(
+            output_dir=self.temp_dir,
+            species_id='DRE',
+            url=None,
+            file_name=self.file_name,
+            usecols=[0, 2],
+            mapping_dir=self.temp_dir)
+        self.assertEqual(mapping[0].tolist(), ['ENSG2', 'ENSG5', 'ENSG8', 'ENSG11'])
+
+        mapping = load_reactome_mapping(
+            output_dir=self.temp_dir,
+            species_id='SCE',
+            url=None,
+            file_name=self.file_name,
+            usecols=[0, 2],
+            mapping_dir=self.temp_dir)
+        self.assertEqual(len(mapping.index), 0)
+
+    def test_partition_release(self):
+        """Test that partitions from another release are split again"""
+        partition_dir = split_reactome_mapping(
+            self.file, self.temp_dir, release='"v1"')
+        self.assertEqual(
+            get_mapping_partition(
+                self.temp_dir, self.file_name, 'HSA', release='"v1"'),
+            os.path.join(partition_dir, 'HSA.txt'))
+        self.assertNotEqual(
+            get_mapping_partition(self.temp_dir, self.file_name, 'HSA'), None)
+        for release in ['"v2"', '']:
+            self.assertEqual(
+                get_mapping_partition(
+                    self.temp_dir, self.file_name, 'HSA', release=release),
+                None)
+
+        # An unchanged file only updates the recorded release
+        modified = os.stat(os.path.join(partition_dir, 'HSA.txt')).st_mtime_ns
+        split_reactome_mapping(self.file, self.temp_dir, release='"v2"')
+        self.assertEqual(
+            os.stat(os.path.join(partition_dir, 'HSA.txt')).st_mtime_ns,
+            modified)
+        self.assertNotEqual(
+            get_mapping_partition(
+                self.temp_dir, self.file_name, 'HSA', release='"v2"'),
+            None)
+
+        with open(self.file, 'a') as mapping:
+            mapping.write('ENSG99\tR-SCE-1\tgene 99\tR-SCE-2\tpathway 99\n')
+        split_reactome_mapping(self.file, self.temp_dir, release='"v3"')
+        self.assertEqual(
+            sorted(os.listdir(partition_dir)),
+            ['DRE.txt', 'HSA.txt', 'MMU.txt', 'SCE.txt', 'source.json'])
+        self.assertEqual(
+            sorted(os.listdir(self.temp_dir)),
+            [self.file_name.rsplit('.', 1)[0], self.file_name])
+
+    def test_get_reference_files(self):
+        args_dict = {
+            'database_source': 'reactome',
+            'organism_id': 'HSA',
+            'reactome_archive': None,
+            'mapping_dir': None}
+        names = [
+            (url.split('/')[-1], file_name)
+            for url, file_name in get_reference_files(args_dict)]
+        self.assertEqual(names, [
+            ('all_species.3.1.sbml.tgz', None),
+            ('ChEBI2Reactome_PE_All_Levels.txt', None),
+            ('names.tsv.gz', 'names.tsv.gz'),
+            ('ComplexParticipantsPubMedIdentifiers_human.txt', None),
+            ('Complex_2_Pathway_human.txt', None),
+            ('Ensembl2Reactome_PE_All_Levels.txt', None),
+            ('UniProt2Reactome_PE_All_Levels.txt', None),
+            ('release', 'reactome_release.html')])
+
+        split_reactome_mapping(self.file, self.temp_dir)
+        args_dict['reactome_archive'] = 'all_species.3.1.sbml.tgz'
+        args_dict['mapping_dir'] = self.temp_dir
+        self.assertEqual(
+            [url.split('/')[-1] for url, file_name in get_reference_files(args_dict)],
+            ['ChEBI2Reactome_PE_All_Levels.txt', 'names.tsv.gz',
+             'ComplexParticipantsPubMedIdentifiers_human.txt',
+             'Complex_2_Pathway_human.txt',
+             'UniProt2Reactome_PE_All_Levels.txt', 'release'])
+
+        args_dict['database_source'] = 'biomodels/bigg'
+        self.assertEqual(
+            [url.split('/')[-1] for url, file_name in get_reference_files(args_dict)],
+            ['ChEBI2Reactome_PE_All_Levels.txt', 'names.tsv.gz'])
+
+
+class TestPathwayComponents(unittest.TestCase):
+    """Test pathway parsing against generated SBML"""
+
+    def test_process_components_threads(self):
+        """Test that worker processes give the same databases"""
+        network = make_network(reactions=200, seed=4)
+        with tempfile.TemporaryDirectory() as directory:
+            session_file = os.path.join(directory, 'session.json')
+            with open(session_file, 'w') as f:
+                json.dump({}, f)
+            pathways_dir, pathways = write_reactome_pathways(
+                output=directory,
+                network=network)
+            results = [
+                process_components(
+                    output_dir=directory,
+                    pathways_dir=pathways_dir,
+                    pathways_list=pathways,
+                    species_id='SYN',
+                    args_dict={'session_data': session_file},
+                    threads=threads)[1:]
+                for threads in [1, 3]]
+
+        for sequential, parallel in zip(results[0], results[1]):
+            self.assertEqual(
+                json.dumps(sequential),
+                json.dumps(parallel))
+
+    def test_add_species_cache(self):
+        """Test that cached species give the same databases"""
+        network = make_network(reactions=200, seed=5)
+        with tempfile.TemporaryDirectory() as directory:
+            pathways_dir, pathways = write_reactome_pathways(
+                output=directory,
+                network=network,
+                annotation_density=2)
+            results = []
+            for species_cache in [None, {}]:
+                databases = ({}, {}, {}, {})
+                for pathway in pathways:
+                    db = get_database(pathways_dir, pathway)
+                    sbml_namespace = get_namespace(sbml_tree=db)
+                    databases = add_species(
+                        *databases,
+                        pathway_record=db.findall(sbml_namespace + 'model')[0],
+                        sbml_namespace=sbml_namespace,
+                        species_cache=species_cache)
+                results.append(databases)
+
+        self.assertGreater(len(species_cache), 0)
+        for uncached, cached in zip(results[0], results[1]):
+            self.assertEqual(
+                json.dumps(uncached),
+                json.dumps(cached))
+
+    def test_species_cache_annotations(self):
+        """Test that a species annotated differently in a later file is
+        parsed again, as without the cache"""
+        network = make_network(reactions=200, seed=5)
+        with tempfile.TemporaryDirectory() as directory:
+            session_file = os.path.join(directory, 'session.json')
+            with open(session_file, 'w') as f:
+                json.dump({}, f)
+            pathways_dir, pathways = write_reactome_pathways(
+                output=directory,
+                network=network,
+                annotation_density=2)
+
+            # Re-annotate the last copy of a species shared between files
+            seen = {}
+            for pathway in pathways:
+                with open(os.path.join(pathways_dir, pathway + '.sbml')) as f:
+                    contents = f.read()
+                for block in re.findall(r'<species .*?</species>', contents, re.S):
+                    if 'CHEBI:' in block:
+                        seen.setdefault(
+                            re.search(r' id="([^"]+)"', block).group(1),
+                            []).append((pathway, block))
+            specie, copies = next(
+                (k, v) for k, v in seen.items() if len(v) > 1)
+            pathway, block = copies[-1]
+            pathway_file = os.path.join(pathways_dir, pathway + '.sbml')
+            with open(pathway_file) as f:
+                contents = f.read()
+            with open(pathway_file, 'w') as f:
+                f.write(contents.replace(block, re.sub(
+                    r'CHEBI:[0-9]+', 'CHEBI:999999', block)))
+
+            results = [
+                process_components(
+                    output_dir=directory,
+                    pathways_dir=pathways_dir,
+                    pathways_list=pathways,
+                    species_id='SYN',
+                    args_dict={'session_data': session_file},
+                    threads=threads)[1:]
+                for threads in [1, 3]]
+            databases = ({}, {}, {}, {})
+            for pathway in pathways:
+                db = get_database(pathways_dir, pathway)
+                sbml_namespace = get_namespace(sbml_tree=db)
+                databases = add_species(
+                    *databases,
+                    pathway_record=db.findall(sbml_namespace + 'model')[0],
+                    sbml_namespace=sbml_namespace)
+
+        self.assertEqual(databases[3][specie]['is'], 'CHEBI:999999')
+        for result in results:
+            self.assertEqual(result[6], databases[3])
+        self.assertEqual(json.dumps(results[0]), json.dumps(results[1]))
+
+    def test_pathway_archive(self):
+        """Test that pathways read from a tarball match extracted files"""
+        network = make_network(reactions=120, seed=6)
+        with tempfile.TemporaryDirectory() as directory:
+            session_file = os.path.join(directory, 'session.json')
+            with open(session_file, 'w') as f:
+                json.dump({}, f)
+            pathways_dir, pathways = write_reactome_pathways(
+                output=directory,
+                network=network)
+            archive_file = os.path.join(directory, 'pathways.tgz')
+            with tarfile.open(archive_file, 'w:gz') as tar:
+                for pathway in pathways:
+                    tar.add(
+                        os.path.join(pathways_dir, pathway + '.sbml'),
+                        arcname='all_species/' + pathway + '.sbml')
+                tar.add(
+                    os.path.join(pathways_dir, pathways[0] + '.sbml'),
+                    arcname='all_species/R-OTH-1.sbml')
+
+            archive = PathwayArchive(
+                tar_file=archive_file,
+                species_id='SYN')
+            self.assertEqual(archive.get_pathways('SYN'), pathways)
+            results = [
+                process_components(
+                    output_dir=directory,
+                    pathways_dir=source,
+                    pathways_list=pathways,
+                    species_id='SYN',
+                    args_dict={'session_data': session_file},
+                    threads=threads)[1:]
+                for source, threads in [
+                    (pathways_dir, 1), (archive, 1), (archive, 2)]]
+            archive.close()
+            self.assertTrue(os.path.exists(archive_file))
+
+        for extracted, archived, parallel in zip(*results):
+            self.assertEqual(
+                json.dumps(extracted),
+                json.dumps(archived))
+            self.assertEqual(
+                json.dumps(extracted),
+                json.dumps(parallel))
+
+    def test_stream_manual(self):
+        """Test that the streaming BiGG loader matches process_manual()"""
+        network = make_network(reactions=150, seed=7)
+        with tempfile.TemporaryDirectory() as directory:
+            session_file = os.path.join(directory, 'session.json')
+            with open(session_file, 'w') as f:
+                json.dump({}, f)
+            model_file = write_bigg_model(
+                output=directory,
+                network=network,
+                annotation_density=2)
+            args_dict = {
+                'session_data': session_file,
+                'database_source': 'biomodels/bigg'}
+            parsed = process_manual(
+                sbml_db=load_sbml(sbml_url=model_file),
+                args_dict=dict(args_dict))
+            streamed = stream_manual(
+                sbml_url=model_file,
+                args_dict=dict(args_dict))
+
+        self.assertEqual(len(streamed[2]), 150)
+        for x, y in zip(parsed, streamed):
+            self.assertEqual(
+                json.dumps(x, default=list),
+                json.dumps(y, default=list))
+
+
+if __name__ == '__main__':
+    unittest.main()
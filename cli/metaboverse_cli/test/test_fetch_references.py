@@ -0,0 +1,345 @@
+"""License Information
+metaboverse-cli
+Back-end CLI Tool for Curating Metabolic Networks for Metaboverse
+https://github.com/Metaboverse/metaboverse-cli/
+alias: metaboverse-cli
+
+MIT License
+
+Copyright (c) Jordan A. Berg, The University of Utah
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler, \
+    SimpleHTTPRequestHandler
+from functools import partial
+import unittest
+import tempfile
+import threading
+import hashlib
+import json
+import time
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import functions to test
+try:
+    from curate import fetch_references
+    from curate.fetch_references import fetch_reference, get_release, \
+        download_reference, prefetch_references, finish_prefetch, \
+        cancel_prefetch
+except ImportError:
+    # For running tests directly
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from metaboverse_cli.curate import fetch_references
+    from metaboverse_cli.curate.fetch_references import fetch_reference, \
+        get_release, download_reference, prefetch_references, \
+        finish_prefetch, cancel_prefetch
+
+
+class CountingHandler(SimpleHTTPRequestHandler):
+    """Serve files and count GET requests"""
+
+    gets = []
+
+    def do_GET(self):
+        self.gets.append(self.path)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serve one file with ETag and Range support, optionally dropping the
+    connection part way through the next transfer"""
+
+    contents = b''
+    etag = '"1"'
+    drop_after = None
+    delay = 0
+    encoding = None
+    starts = []
+    active = [0, 0]
+
+    def do_HEAD(self):
+        self.respond(head=True)
+
+    def do_GET(self):
+        self.respond()
+
+    def respond(self, head=False):
+        start = 0
+        if 'Range' in self.headers \
+                and self.headers.get('If-Range') == self.etag:
+            start = int(self.headers['Range'].split('=')[1].split('-')[0])
+        body = self.contents[start:]
+        self.send_response(206 if start > 0 else 200)
+        self.send_header('ETag', self.etag)
+        self.send_header('Content-Length', str(len(body)))
+        if self.encoding != None:
+            self.send_header('Content-Encoding', self.encoding)
+        if start > 0:
+            self.send_header('Content-Range', 'bytes ' + str(start) + '-'
+                             + str(len(self.contents) - 1) + '/'
+                             + str(len(self.contents)))
+        self.end_headers()
+        if head:
+            return
+
+        RangeHandler.starts.append(start)
+        RangeHandler.active[0] += 1
+        RangeHandler.active[1] = max(RangeHandler.active)
+        time.sleep(self.delay)
+        RangeHandler.active[0] -= 1
+        if RangeHandler.drop_after != None:
+            body = body[:RangeHandler.drop_after]
+            RangeHandler.drop_after = None
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestFetchReferences(unittest.TestCase):
+    """Test the reference download cache and offline mirror"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.upstream = os.path.join(self.directory.name, 'upstream')
+        self.reference_dir = os.path.join(self.directory.name, 'references')
+        self.output_dir = os.path.join(self.directory.name, 'output')
+        os.makedirs(self.upstream)
+        os.makedirs(self.output_dir)
+        self.write_upstream(b'ENSG1\tR-HSA-1\tgene\n')
+
+        CountingHandler.gets = []
+        self.server = ThreadingHTTPServer(
+            ('127.0.0.1', 0),
+            partial(CountingHandler, directory=self.upstream))
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = 'http://127.0.0.1:' + str(self.server.server_port) \
+            + '/Ensembl2Reactome_PE_All_Levels.txt'
+        self.backoff = fetch_references.download_backoff
+        fetch_references.download_backoff = 0
+
+    def tearDown(self):
+        fetch_references.download_backoff = self.backoff
+        if self.server != None:
+            self.server.shutdown()
+            self.server.server_close()
+        self.directory.cleanup()
+
+    def write_upstream(self, contents, modified=1600000000):
+        file = os.path.join(self.upstream, 'Ensembl2Reactome_PE_All_Levels.txt')
+        with open(file, 'wb') as f:
+            f.write(contents)
+        os.utime(file, (modified, modified))
+
+    def read(self, file):
+        with open(file, 'rb') as f:
+            return f.read()
+
+    def test_fetch_without_cache(self):
+        file = fetch_reference(
+            url=self.url,
+            output_dir=self.output_dir)
+
+        self.assertEqual(
+            file,
+            os.path.join(self.output_dir, 'Ensembl2Reactome_PE_All_Levels.txt'))
+        self.assertEqual(self.read(file), b'ENSG1\tR-HSA-1\tgene\n')
+        self.assertEqual(os.listdir(self.output_dir), [
+            'Ensembl2Reactome_PE_All_Levels.txt'])
+
+    def test_fetch_cached(self):
+        self.assertNotEqual(get_release(self.url), None)
+        file = fetch_reference(
+            url=self.url,
+            reference_dir=self.reference_dir)
+        sha256 = hashlib.sha256(b'ENSG1\tR-HSA-1\tgene\n').hexdigest()
+        self.assertEqual(file, os.path.join(
+            self.reference_dir, 'objects', sha256,
+            'Ensembl2Reactome_PE_All_Levels.txt'))
+        with open(os.path.join(self.reference_dir, 'index.json')) as f:
+            index = json.load(f)
+        self.assertEqual(index[self.url]['sha256'], sha256)
+
+        # Unchanged upstream is not downloaded again
+        self.assertEqual(
+            fetch_reference(url=self.url, reference_dir=self.reference_dir),
+            file)
+        self.assertEqual(len(CountingHandler.gets), 1)
+
+        # A new upstream release replaces the cached copy
+        self.write_upstream(b'ENSG2\tR-HSA-2\tgene\n', modified=1700000000)
+        updated = fetch_reference(
+            url=self.url,
+            reference_dir=self.reference_dir)
+        self.assertEqual(self.read(updated), b'ENSG2\tR-HSA-2\tgene\n')
+        self.assertFalse(os.path.exists(file))
+        self.assertEqual(len(CountingHandler.gets), 2)
+
+        # The cached copy is used while upstream cannot be reached
+        self.server.shutdown()
+        self.server.server_close()
+        self.server = None
+        self.assertEqual(get_release(self.url, timeout=5), None)
+        self.assertEqual(
+            fetch_reference(url=self.url, reference_dir=self.reference_dir),
+            updated)
+
+        # A damaged cached copy is not used
+        with open(updated, 'ab') as f:
+            f.write(b'x')
+        with self.assertRaises(Exception):
+            fetch_reference(url=self.url, reference_dir=self.reference_dir)
+
+    def test_fetch_mirror(self):
+        os.makedirs(self.reference_dir)
+        mirror = os.path.join(
+            self.reference_dir, 'Ensembl2Reactome_PE_All_Levels.txt')
+        with open(mirror, 'wb') as f:
+            f.write(b'ENSG3\tR-HSA-3\tgene\n')
+
+        self.assertEqual(
+            fetch_reference(url=self.url, reference_dir=self.reference_dir),
+            mirror)
+        self.assertEqual(len(CountingHandler.gets), 0)
+
+        with open(mirror + '.sha256', 'w') as f:
+            f.write(hashlib.sha256(b'other').hexdigest() + '  '
+                    + os.path.basename(mirror) + '\n')
+        with self.assertRaises(Exception):
+            fetch_reference(url=self.url, reference_dir=self.reference_dir)
+
+
+
+class TestFetchManager(unittest.TestCase):
+    """Test resumed, retried and concurrent reference downloads"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        RangeHandler.contents = os.urandom(100000)
+        RangeHandler.etag = '"1"'
+        RangeHandler.drop_after = None
+        RangeHandler.delay = 0
+        RangeHandler.encoding = None
+        RangeHandler.starts = []
+        RangeHandler.active = [0, 0]
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = 'http://127.0.0.1:' + str(self.server.server_port) + '/'
+        self.backoff = fetch_references.download_backoff
+        fetch_references.download_backoff = 0
+        finish_prefetch()
+
+    def tearDown(self):
+        fetch_references.download_backoff = self.backoff
+        self.server.shutdown()
+        self.server.server_close()
+        self.directory.cleanup()
+
+    def read(self, file):
+        with open(file, 'rb') as f:
+            return f.read()
+
+    def test_download_resume(self):
+        RangeHandler.drop_after = 30000
+        file = download_reference(
+            self.url + 'names.tsv.gz',
+            os.path.join(self.directory.name, 'names.tsv.gz'))
+
+        self.assertEqual(self.read(file), RangeHandler.contents)
+        self.assertEqual(RangeHandler.starts, [0, 30000])
+        self.assertEqual(os.listdir(self.directory.name), ['names.tsv.gz'])
+        report = finish_prefetch()
+        self.assertEqual(report[0]['bytes'], 100000)
+        self.assertEqual(report[0]['attempts'], 2)
+        self.assertEqual(report[0]['resumed'], True)
+        self.assertTrue(report[0]['bytes_per_second'] > 0)
+
+    def test_download_changed_upstream(self):
+        file = os.path.join(self.directory.name, 'names.tsv.gz')
+        with open(file + '.partial', 'wb') as f:
+            f.write(b'stale')
+        with open(file + '.partial.state', 'w') as f:
+            f.write('"0"')
+        download_reference(self.url + 'names.tsv.gz', file)
+
+        self.assertEqual(self.read(file), RangeHandler.contents)
+        self.assertEqual(RangeHandler.starts, [0])
+
+    def test_download_encoded(self):
+        RangeHandler.encoding = 'gzip'
+        file = os.path.join(self.directory.name, 'names.tsv.gz')
+        with self.assertRaises(IOError):
+            download_reference(self.url + 'names.tsv.gz', file, retries=0)
+        self.assertFalse(os.path.exists(file))
+
+    def test_prefetch_references(self):
+        RangeHandler.delay = 0.5
+        references = [
+            (self.url + 'a.txt', None),
+            (self.url + 'b.txt', None),
+            (self.url + 'c.txt', 'c_renamed.txt')]
+        prefetch_references(
+            references,
+            output_dir=self.directory.name,
+            threads=3)
+
+        file = fetch_reference(
+            url=self.url + 'c.txt',
+            output_dir=self.directory.name)
+        self.assertEqual(
+            file, os.path.join(self.directory.name, 'c_renamed.txt'))
+        self.assertEqual(self.read(file), RangeHandler.contents)
+        self.assertEqual(RangeHandler.active[1], 3)
+
+        report = finish_prefetch()
+        self.assertEqual(len(report), 3)
+        self.assertEqual(os.listdir(self.directory.name), ['c_renamed.txt'])
+
+    def test_cancel_prefetch(self):
+        RangeHandler.delay = 0.5
+        prefetch_references(
+            [(self.url + 'a.txt', None), (self.url + 'b.txt', None)],
+            output_dir=self.directory.name,
+            threads=1)
+        while len(RangeHandler.starts) == 0:
+            time.sleep(0.01)
+        future = fetch_references.prefetched[self.url + 'a.txt'][0]
+        cancel_prefetch()
+
+        self.assertEqual(fetch_references.prefetched, {})
+        future.result()
+        for i in range(100):
+            if len(os.listdir(self.directory.name)) == 0:
+                break
+            time.sleep(0.01)
+        self.assertEqual(os.listdir(self.directory.name), [])
+        self.assertEqual(RangeHandler.starts, [0])
+        finish_prefetch()
+
+
+if __name__ == '__main__':
+    unittest.main()
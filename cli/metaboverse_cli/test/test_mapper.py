@@ -0,0 +1,247 @@
+"""License Information
+metaboverse-cli
+Back-end CLI Tool for Curating Metabolic Networks for Metaboverse
+https://github.com/Metaboverse/metaboverse-cli/
+alias: metaboverse-cli
+
+MIT License
+
+Copyright (c) Jordan A. Berg, The University of Utah
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+import unittest
+import tempfile
+import zipfile
+import pickle
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import functions to test
+try:
+    from mapper.__main__ import parse_hmdb_synonyms, iterparse_hmdb, \
+        get_redox_pair_for_metabolite, validate_redox_mapping
+    from mapper.mapper_store import write_mapper_store, MapperStore, \
+        is_store_current
+    from analyze.model import gather_synonyms, \
+        load_metabolite_synonym_dictionary
+except ImportError:
+    # For running tests directly
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from metaboverse_cli.mapper.__main__ import parse_hmdb_synonyms, \
+        iterparse_hmdb, get_redox_pair_for_metabolite, validate_redox_mapping
+    from metaboverse_cli.mapper.mapper_store import write_mapper_store, \
+        MapperStore, is_store_current
+    from metaboverse_cli.analyze.model import gather_synonyms, \
+        load_metabolite_synonym_dictionary
+
+
+HMDB_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<hmdb xmlns="http://www.hmdb.ca">
+<metabolite>
+  <accession>HMDB0000122</accession>
+  <name>D-Glucose</name>
+  <synonyms>
+    <synonym>Dextrose</synonym>
+    <synonym>Glucose</synonym>
+  </synonyms>
+  <iupac_name>(3R,4S,5S,6R)-6-(hydroxymethyl)oxane-2,3,4,5-tetrol</iupac_name>
+  <taxonomy>
+    <metabolite>nested records are not top-level metabolites</metabolite>
+  </taxonomy>
+</metabolite>
+<metabolite>
+  <accession>HMDB0000243</accession>
+  <name>Pyruvic acid</name>
+  <synonyms/>
+  <traditional_iupac>pyruvic acid</traditional_iupac>
+</metabolite>
+<metabolite>
+  <accession>HMDB0000902</accession>
+  <name>NAD</name>
+  <synonyms>
+    <synonym>NAD+</synonym>
+    <synonym>NADH</synonym>
+    <synonym>Nadide</synonym>
+  </synonyms>
+</metabolite>
+<metabolite>
+  <accession>HMDB9999999</accession>
+  <name>+</name>
+</metabolite>
+</hmdb>
+"""
+
+
+class TestHMDBParser(unittest.TestCase):
+    """Test the streaming HMDB metabolite parser"""
+
+    def setUp(self):
+        """Write a small HMDB-formatted file"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.hmdb_file = os.path.join(self.tmp_dir, 'hmdb_metabolites.xml')
+        with open(self.hmdb_file, 'w') as f:
+            f.write(HMDB_XML)
+
+    def tearDown(self):
+        os.remove(self.hmdb_file)
+        os.rmdir(self.tmp_dir)
+
+    def test_iterparse_hmdb_records(self):
+        """Test that only top-level metabolite records are streamed"""
+        records = list(iterparse_hmdb(self.hmdb_file))
+        self.assertEqual(len(records), 4)
+        self.assertEqual(records[0][0], ('accession', 'HMDB0000122'))
+        self.assertIn(('synonym', 'Dextrose'), records[0])
+        self.assertNotIn(
+            ('name', 'nested records are not top-level metabolites'),
+            records[0])
+
+    def test_parse_hmdb_synonyms(self):
+        """Test that the HMDB dictionaries are built from the streamed records"""
+        hmdb_dictionary, display_dictionary, mapping_dictionary = \
+            parse_hmdb_synonyms(self.hmdb_file)
+
+        # Records without an alphanumeric name are skipped
+        self.assertEqual(
+            list(hmdb_dictionary.keys()), ['dglucose', 'pyruvicacid', 'nad'])
+        self.assertIn('HMDB0000122', hmdb_dictionary['dglucose'])
+        self.assertIn('dextrose', hmdb_dictionary['dglucose'])
+        self.assertEqual(
+            hmdb_dictionary['dglucose'], sorted(hmdb_dictionary['dglucose']))
+        self.assertEqual(
+            display_dictionary['pyruvicacid'],
+            ['HMDB0000243', 'Pyruvic acid', 'pyruvic acid'])
+        self.assertEqual(mapping_dictionary['dextrose'], 'dglucose')
+        self.assertEqual(mapping_dictionary['hmdb0000243'], 'pyruvicacid')
+
+    def test_parse_hmdb_synonyms_redox(self):
+        """Test that redox pair records keep all of their synonyms"""
+        hmdb_dictionary, display_dictionary, mapping_dictionary = \
+            parse_hmdb_synonyms(self.hmdb_file)
+
+        self.assertIn('nad+', hmdb_dictionary['nad'])
+        self.assertIn('HMDB0000902', hmdb_dictionary['nad'])
+        self.assertIn('nadh', hmdb_dictionary['nad'])
+        self.assertIn('nadide', hmdb_dictionary['nad'])
+        self.assertEqual(
+            display_dictionary['nad'],
+            ['HMDB0000902', 'NAD', 'NAD+', 'NADH', 'Nadide'])
+        self.assertEqual(mapping_dictionary['nadide'], 'nad')
+
+    def test_redox_pair_lookups(self):
+        """Test that redox pair lookups compare against the pair state keys"""
+        self.assertEqual(
+            get_redox_pair_for_metabolite('NAD', ['NADH']), (None, None))
+        self.assertEqual(
+            get_redox_pair_for_metabolite('x', ['Reduced']),
+            ('NAD+/NADH', True))
+        self.assertEqual(
+            validate_redox_mapping({
+                'mapping_dictionary': {'oxidized': 'h1'},
+                'hmdb_dictionary': {'h1': ['reduced']}}),
+            [])
+
+    def test_parse_hmdb_synonyms_threads(self):
+        """Test that worker processes give the same output as a single process"""
+        single = parse_hmdb_synonyms(self.hmdb_file)
+        pooled = parse_hmdb_synonyms(
+            self.hmdb_file,
+            threads=2,
+            batch_size=1)
+        self.assertEqual(pickle.dumps(single), pickle.dumps(pooled))
+
+
+class TestMapperStore(unittest.TestCase):
+    """Test the indexed SQLite metabolite mapper store"""
+
+    def setUp(self):
+        """Write a store from a parsed HMDB-formatted file"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        hmdb_file = os.path.join(self.tmp_dir.name, 'hmdb_metabolites.xml')
+        with open(hmdb_file, 'w') as f:
+            f.write(HMDB_XML)
+        hmdb_dictionary, display_dictionary, mapping_dictionary = \
+            parse_hmdb_synonyms(hmdb_file)
+        self.mapping_db = {
+            'hmdb_dictionary': hmdb_dictionary,
+            'display_dictionary': display_dictionary,
+            'mapping_dictionary': mapping_dictionary}
+        self.store = MapperStore(write_mapper_store(
+            path=os.path.join(self.tmp_dir.name, 'metabolite_mapping.sqlite'),
+            mapping_db=self.mapping_db))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def test_store_lookups(self):
+        """Test that store tables behave like the pickled dictionaries"""
+        for table, dictionary in self.mapping_db.items():
+            self.assertEqual(len(self.store[table]), len(dictionary))
+            self.assertEqual(dict(self.store[table].items()), dictionary)
+            for key, value in dictionary.items():
+                self.assertIn(key, self.store[table])
+                self.assertEqual(self.store[table][key], value)
+
+        self.assertNotIn('not a metabolite', self.store['mapping_dictionary'])
+        self.assertIsNone(self.store['hmdb_dictionary'].get('nadh'))
+        with self.assertRaises(KeyError):
+            self.store['mapping_dictionary']['not a metabolite']
+
+    def test_store_gather_synonyms(self):
+        """Test that gather_synonyms gives the same result with the store"""
+        for init_syns in [['Dextrose'], ['NAD+'], ['L-Pyruvic acid']]:
+            self.assertEqual(
+                gather_synonyms('CHEBI:1', list(init_syns), self.store, {}, True),
+                gather_synonyms('CHEBI:1', list(init_syns), self.mapping_db, {}, True))
+
+    def write_mapper_zip(self, mapping_db):
+        zip_file = os.path.join(
+            self.tmp_dir.name, 'metabolite_mapping.pickle.zip')
+        with zipfile.ZipFile(zip_file, 'w') as zipf:
+            zipf.writestr('metabolite_mapping.pickle', pickle.dumps(mapping_db))
+        return zip_file
+
+    def test_store_out_of_date(self):
+        """Test that a store written from an older mapper is not used"""
+        zip_file = self.write_mapper_zip(self.mapping_db)
+        store_file = write_mapper_store(
+            path=os.path.join(self.tmp_dir.name, 'metabolite_mapping.sqlite'),
+            mapping_db=self.mapping_db,
+            source_file=zip_file)
+        self.assertTrue(is_store_current(store_file, zip_file))
+        mapper = load_metabolite_synonym_dictionary(dir=self.tmp_dir.name)
+        self.assertEqual(type(mapper).__name__, 'MapperStore')
+        mapper.close()
+
+        rebuilt = dict(self.mapping_db)
+        rebuilt['mapping_dictionary'] = {'glucose': 'dglucose'}
+        self.write_mapper_zip(rebuilt)
+        self.assertFalse(is_store_current(store_file, zip_file))
+        mapper = load_metabolite_synonym_dictionary(dir=self.tmp_dir.name)
+        self.assertEqual(mapper, rebuilt)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,415 @@
+"""License Information
+metaboverse-cli
+Back-end CLI Tool for Curating Metabolic Networks for Metaboverse
+https://github.com/Metaboverse/metaboverse-cli/
+alias: metaboverse-cli
+
+MIT License
+
+Copyright (c) Jordan A. Berg, The University of Utah
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+import unittest
+import tempfile
+import json
+import os
+import sys
+import networkx as nx
+import pandas as pd
+from networkx.readwrite import json_graph
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import functions to test
+try:
+    from analyze.model import build_graph, process_reactions, \
+        build_mapping_index, find_mapped_label, extract_values, \
+        color_values, MISSING_COLOR, gather_synonyms, cached_gather_synonyms, \
+        broadcast_values, load_synonym_cache
+    from analyze.synonym_cache import open_synonym_cache, \
+        cached_file_checksum, file_checksum
+except ImportError:
+    # For running tests directly
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from metaboverse_cli.analyze.model import build_graph, process_reactions, \
+        build_mapping_index, find_mapped_label, extract_values, \
+        color_values, MISSING_COLOR, gather_synonyms, cached_gather_synonyms, \
+        broadcast_values, load_synonym_cache
+    from metaboverse_cli.analyze.synonym_cache import open_synonym_cache, \
+        cached_file_checksum, file_checksum
+
+
+def make_test_network():
+    """Two reactions sharing a protein, with a complex and a duplicate name"""
+    network = {
+        'R1': {
+            'id': 'R1', 'name': 'first reaction', 'reversible': 'true',
+            'notes': '', 'compartment': 'c1',
+            'reactants': ['s1', 's2'], 'products': ['s3'],
+            'modifiers': [['s4', 'catalyst']]},
+        'R2': {
+            'id': 'R2', 'name': 'second reaction', 'reversible': 'false',
+            'notes': '', 'compartment': 'c1',
+            'reactants': ['s3'], 'products': ['s1'],
+            'modifiers': [['s4', 'inhibitor']]},
+        'R3': {
+            'id': 'R3', 'name': 'Reaction First', 'reversible': 'false',
+            'notes': '', 'compartment': 'c1',
+            'reactants': ['s2'], 'products': ['s3'],
+            'modifiers': []}
+    }
+    component_database = {
+        's1': {'is': 'CHEBI:1', 'name': 'A', 'compartment': 'c1',
+               'type': 'metabolite_component', 'hasPart': []},
+        's2': {'is': 'P00001', 'name': 'protein', 'compartment': 'c1',
+               'type': 'protein_component', 'hasPart': []},
+        's3': {'is': '', 'name': 'complex', 'compartment': 'c2',
+               'type': 'complex_component', 'hasPart': ['P00002', 'CHEBI:2']},
+        's4': {'is': 'P00002', 'name': 'enzyme', 'compartment': 'c1',
+               'type': 'protein_component', 'hasPart': []}
+    }
+    return dict(
+        network=network,
+        pathway_database={'P1': {'reactions': ['R1', 'R2', 'R3']}},
+        species_reference={},
+        name_reference={},
+        protein_reference={'P00002': 'ENSG2'},
+        chebi_dictionary={},
+        uniprot_reference={'P00001': 'GENE1', 'P00002': 'GENE2'},
+        complexes={},
+        species_id='HSA',
+        gene_reference={'ENSG1': 'GENE1', 'ENSG2': 'GENE2'},
+        compartment_reference={'c1': 'cytosol'},
+        component_database=component_database)
+
+
+class TestBuildGraph(unittest.TestCase):
+    """Test graph construction from a reaction network"""
+
+    def test_build_graph_matches_direct_construction(self):
+        """Test that bulk graph construction matches adding each reaction to a DiGraph"""
+        args = make_test_network()
+        G, network, pathway_database = build_graph(args_dict={}, **make_test_network())
+
+        # Duplicate reaction names are removed
+        self.assertEqual(list(network.keys()), ['R1', 'R2'])
+        self.assertEqual(pathway_database['P1']['reactions'], ['R1', 'R2'])
+
+        direct = nx.DiGraph()
+        key_hash = set()
+        remove_keys = []
+        for reactome_id in list(args['network'].keys()):
+            direct, args['network'], key_hash, remove_keys = process_reactions(
+                graph=direct,
+                reactome_id=reactome_id,
+                network=args['network'],
+                species_reference=args['species_reference'],
+                name_reference=args['name_reference'],
+                protein_reference=args['protein_reference'],
+                chebi_dictionary=args['chebi_dictionary'],
+                uniprot_reference=args['uniprot_reference'],
+                complex_reference=args['complexes'],
+                species_id=args['species_id'],
+                gene_reference=args['gene_reference'],
+                compartment_reference=args['compartment_reference'],
+                component_database=args['component_database'],
+                key_hash=key_hash,
+                remove_keys=remove_keys)
+
+        self.assertEqual(
+            json.dumps(json_graph.node_link_data(G)),
+            json.dumps(json_graph.node_link_data(direct)))
+        self.assertEqual(G.nodes()['s3']['complex'], 'true')
+        self.assertEqual(G.nodes()['s2']['compartment_display'], 'cytosol')
+        self.assertEqual(G.nodes()['s3']['compartment_display'], 'none')
+        self.assertIn(('ENSG1', 's2'), G.edges())
+        self.assertIn(('R1', 's1'), G.edges())
+
+
+class TestMappingIndex(unittest.TestCase):
+    """Test lookups of user data rows by node synonyms"""
+
+    def setUp(self):
+        data = pd.DataFrame(
+            {0: [1.0, 2.0, 3.0, 4.0]},
+            index=['L-Alanine', 'Citric acid', 'citricacid', 'D-lactate'])
+        stats = pd.DataFrame(
+            {0: [0.1, 0.2, 0.3, 0.4]},
+            index=['L-Alanine', 'Citric acid', 'citricacid', 'D-lactate'])
+        self.mapping_index = build_mapping_index(data, stats)
+
+    def test_normalized_match_uses_first_row(self):
+        """Test that normalized synonyms map to the first matching row"""
+        self.assertEqual(
+            find_mapped_label('citric-acid', self.mapping_index),
+            'Citric acid')
+
+    def test_enantiomer_prefixes(self):
+        """Test that D-/L-/N- prefixed rows are only used when ignoring enantiomers"""
+        self.assertEqual(
+            find_mapped_label('Alanine', self.mapping_index),
+            'L-Alanine')
+        self.assertEqual(
+            find_mapped_label('lactate', self.mapping_index),
+            'D-lactate')
+        self.assertEqual(
+            find_mapped_label(
+                'Alanine', self.mapping_index, ignore_enantiomers=False),
+            None)
+
+    def test_positions(self):
+        """Test that row positions match the data and stats tables"""
+        position = self.mapping_index['data_positions']['D-lactate']
+        self.assertEqual(
+            self.mapping_index['data_values'][position].tolist(), [4.0])
+        position = self.mapping_index['stats_positions']['D-lactate']
+        self.assertEqual(
+            self.mapping_index['stats_values'][position].tolist(), [0.4])
+
+
+class TestColorValues(unittest.TestCase):
+    """Test colormap lookups for node values"""
+
+    def test_color_values(self):
+        """Test that values are colored by their colormap position"""
+        values_rgba, values_js = color_values([-5, 0, 5], 5)
+        self.assertEqual(values_rgba, [
+            (0.0, 0.0, 0.3, 1.0),
+            (0.992, 0.992, 1.0, 1.0),
+            (0.5, 0.0, 0.0, 1.0)])
+        self.assertEqual(values_js, [
+            (0, 0, 76, 1.0),
+            (252, 252, 255, 1.0),
+            (127, 0, 0, 1.0)])
+
+    def test_extract_values_missing(self):
+        """Test that missing values in a value matrix use MISSING_COLOR"""
+        rgba, rgba_js = extract_values([[1, None], [float('nan'), -1]], 1)
+        self.assertEqual(rgba.shape, (2, 2, 4))
+        self.assertEqual(tuple(rgba[0, 1]), MISSING_COLOR)
+        self.assertEqual(tuple(rgba[1, 0]), MISSING_COLOR)
+        self.assertEqual(tuple(rgba_js[1, 0]), (255, 255, 255, 1))
+        self.assertEqual(tuple(rgba[1, 1]), (0.0, 0.0, 0.3, 1.0))
+
+
+class TestBroadcastValues(unittest.TestCase):
+    """Test broadcasting of values to proteins and complexes"""
+
+    def make_graph(self, stats=(0.2, 0.3)):
+        G = nx.DiGraph()
+
+        def add(id, type, sub_type, values, stats, complex='false'):
+            G.add_node(
+                id, type=type, sub_type=sub_type, complex=complex,
+                values=values, stats=stats)
+
+        add('R1', 'reaction', 'reaction', [None, None], [None, None])
+        add('G1', 'gene_component', 'gene', [1.0, float('nan')],
+            [stats[0], stats[0]])
+        add('G2', 'gene_component', 'gene', [3.0, 2.0],
+            [stats[1], stats[1]])
+        add('G3', 'gene_component', 'gene', [None, None], [None, None])
+        add('P1', 'complex_component', 'protein_component',
+            [None, None], [None, None])
+        add('C1', 'reactant', 'complex', [None, None], [None, None],
+            complex='true')
+        add('C2', 'reactant', 'complex', [None, None], [None, None],
+            complex='true')
+        G.add_edges_from([
+            ('G1', 'P1'), ('P1', 'G2'), ('G3', 'P1'), ('P1', 'C1'),
+            ('C1', 'R1'), ('C2', 'R1')])
+        return G
+
+    def test_broadcast(self):
+        """Test that proteins take the NaN-aware median of their genes"""
+        G = broadcast_values(
+            args_dict=None,
+            graph=self.make_graph(),
+            categories=['a', 'b'],
+            max_value=5,
+            max_stat=1)
+        self.assertEqual(G.nodes['P1']['values'], [2.0, 2.0])
+        self.assertAlmostEqual(
+            G.nodes['P1']['stats'][0], 2.718281828459045 * (0.06 ** 0.5))
+        self.assertEqual(G.nodes['P1']['inferred'], 'true')
+        self.assertEqual(len(G.nodes['P1']['values_js']), 2)
+        self.assertEqual(G.nodes['C1']['values'], [2.0, 2.0])
+        self.assertEqual(G.nodes['C2']['values'], [None, None])
+        self.assertNotIn('inferred', G.nodes['C2'])
+
+    def test_nested_complexes(self):
+        """Test that a complex sees earlier complexes as already updated"""
+        G = self.make_graph()
+        G.nodes['C1']['type'] = 'complex_component'
+        G.add_edge('C1', 'C2')
+        G = broadcast_values(
+            args_dict=None,
+            graph=G,
+            categories=['a', 'b'],
+            max_value=5,
+            max_stat=1,
+            broadcast_genes=True)
+        self.assertEqual(G.nodes['C2']['values'], [2.0, 2.0])
+
+        G = self.make_graph()
+        G.nodes['C2']['type'] = 'complex_component'
+        G.nodes['C2']['values'] = [5.0, 5.0]
+        G.add_edge('C2', 'C1')
+        G.add_edge('G2', 'C2')
+        G.nodes['G2']['type'] = 'complex_component'
+        G = broadcast_values(
+            args_dict=None,
+            graph=G,
+            categories=['a', 'b'],
+            max_value=5,
+            max_stat=1)
+        # C2 comes after C1, so C1 only sees its original values
+        self.assertEqual(G.nodes['C1']['values'], [3.5, 3.5])
+        self.assertEqual(G.nodes['C2']['values'], [3.0, 2.0])
+
+    def test_array_stats(self):
+        """Test that confidence intervals are not inferred"""
+        G = broadcast_values(
+            args_dict=None,
+            graph=self.make_graph(stats=([0, 1], [1, 2])),
+            categories=['a', 'b'],
+            max_value=5,
+            max_stat=1,
+            broadcast_genes=True,
+            broadcast_metabolites=False,
+            stat_type='array')
+        self.assertEqual(G.nodes['P1']['values'], [2.0, 2.0])
+        self.assertEqual(G.nodes['P1']['stats'], [None, None])
+        self.assertEqual(G.nodes['P1']['inferred'], 'true')
+
+
+class TestSynonymCache(unittest.TestCase):
+    """Test the on-disk synonym cache used by map_attributes"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'TEST.synonyms.sqlite')
+        self.metabolite_mapper = {
+            'mapping_dictionary': {'citrate': 'HMDB0000094'},
+            'hmdb_dictionary': {'HMDB0000094': ['citric acid']}}
+        self.uniprot_mapper = {'CHEBI:16947': 'Citrate'}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def gather(self, cache, init_syns):
+        return cached_gather_synonyms(
+            cache,
+            'CHEBI:16947',
+            init_syns,
+            self.metabolite_mapper,
+            self.uniprot_mapper,
+            True)
+
+    def test_cache_round_trip(self):
+        """Test that cached results match gather_synonyms across runs"""
+        expected_syns = ['Citrate(3-)']
+        expected = gather_synonyms(
+            'CHEBI:16947',
+            expected_syns,
+            self.metabolite_mapper,
+            self.uniprot_mapper,
+            True)
+
+        cache = open_synonym_cache(self.path, 'mapper', ['1.0', '2024-01-01'])
+        first_syns = ['Citrate(3-)']
+        self.assertEqual(self.gather(cache, first_syns), expected)
+        cache.close()
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+        cache = open_synonym_cache(self.path, 'mapper', ['1.0', '2024-01-01'])
+        second_syns = ['Citrate(3-)']
+        self.assertEqual(self.gather(cache, second_syns), expected)
+        self.assertEqual(second_syns, expected_syns)
+        cache.close()
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_cache_version_change(self):
+        """Test that a new mapper checksum drops old entries"""
+        cache = open_synonym_cache(self.path, 'mapper', ['1.0', '2024-01-01'])
+        self.gather(cache, ['Citrate(3-)'])
+        cache.close()
+
+        cache = open_synonym_cache(self.path, 'mapper2', ['1.0', '2024-01-01'])
+        self.assertEqual(len(cache.entries), 0)
+        self.gather(cache, ['Citrate(3-)'])
+        cache.close()
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+    def test_cached_file_checksum(self):
+        """Test that the mapper is only hashed again when its size or
+        modification time changes"""
+        mapper_file = os.path.join(self.directory.name, 'mapper.zip')
+        with open(mapper_file, 'wb') as f:
+            f.write(b'mapper-1')
+        os.utime(mapper_file, ns=(10**18, 10**18))
+        checksum = cached_file_checksum(mapper_file, self.path)
+        self.assertEqual(checksum, file_checksum(mapper_file))
+
+        # Same size and modification time: the stored checksum is reused
+        with open(mapper_file, 'wb') as f:
+            f.write(b'mapper-2')
+        os.utime(mapper_file, ns=(10**18, 10**18))
+        self.assertEqual(cached_file_checksum(mapper_file, self.path), checksum)
+
+        os.utime(mapper_file, ns=(2 * 10**18, 2 * 10**18))
+        self.assertEqual(
+            cached_file_checksum(mapper_file, self.path),
+            file_checksum(mapper_file))
+        self.assertNotEqual(file_checksum(mapper_file), checksum)
+
+        cache = open_synonym_cache(self.path, checksum, ['1.0', '2024-01-01'])
+        self.assertEqual(len(cache.entries), 0)
+        cache.close()
+
+    def test_synonym_cache_mapper(self):
+        """Test that the cache follows the zipped mapper, even when an
+        out of date mapper store is next to it"""
+        mapper_file = os.path.join(
+            self.directory.name, 'metabolite_mapping.pickle.zip')
+        with open(mapper_file, 'wb') as f:
+            f.write(b'mapper-1')
+        with open(os.path.join(
+                self.directory.name, 'metabolite_mapping.sqlite'), 'wb') as f:
+            f.write(b'store')
+        args_dict = {'output': self.directory.name, 'curation': 'TEST.mvdb'}
+
+        cache = load_synonym_cache(args_dict, {}, dir=self.directory.name)
+        self.assertIn(file_checksum(mapper_file), cache.version)
+        self.gather(cache, ['Citrate(3-)'])
+        cache.close()
+
+        with open(mapper_file, 'wb') as f:
+            f.write(b'mapper-22')
+        cache = load_synonym_cache(args_dict, {}, dir=self.directory.name)
+        self.assertIn(file_checksum(mapper_file), cache.version)
+        self.assertEqual(len(cache.entries), 0)
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
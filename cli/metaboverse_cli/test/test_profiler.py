@@ -0,0 +1,132 @@
+"""License Information
+metaboverse-cli
+Back-end CLI Tool for Curating Metabolic Networks for Metaboverse
+https://github.com/Metaboverse/metaboverse-cli/
+alias: metaboverse-cli
+
+MIT License
+
+Copyright (c) Jordan A. Berg, The University of Utah
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+import importlib.util
+import unittest
+import tempfile
+import json
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import functions to test
+try:
+    from profiler import start_profiler, write_profile_report, \
+        profile_stage, get_profiler
+except ImportError:
+    # For running tests directly
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from metaboverse_cli.profiler import start_profiler, \
+        write_profile_report, profile_stage, get_profiler
+
+
+class TestProfiler(unittest.TestCase):
+    """Test per-stage instrumentation and the --profile report"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.report_file = os.path.join(self.directory.name, 'report.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_profile_off(self):
+        """Test that stages are no-ops without --profile"""
+        args_dict = {'profile': None}
+        self.assertEqual(start_profiler(args_dict), None)
+        with profile_stage(args_dict, 'build_graph') as stage:
+            stage.count(nodes=1)
+            self.assertFalse(stage.enabled)
+        write_profile_report(args_dict)
+        self.assertFalse(os.path.exists(self.report_file))
+
+    def test_report(self):
+        """Test that nested stages are recorded in start order with counters"""
+        args_dict = {
+            'cmd': 'curate',
+            'profile': self.report_file,
+            'cprofile': True}
+        start_profiler(args_dict)
+
+        with profile_stage(args_dict, 'build_graph') as stage:
+            with profile_stage(args_dict, 'load_reactions') as inner:
+                data = [list(range(1000)) for x in range(100)]
+                inner.count(reactions=len(data))
+            del data
+            stage.count(nodes=10, edges=20)
+        write_profile_report(args_dict)
+        self.assertEqual(get_profiler(args_dict), None)
+
+        with open(self.report_file) as json_file:
+            report = json.load(json_file)
+        self.assertEqual(report['cmd'], 'curate')
+        self.assertEqual(
+            [(s['name'], s['depth']) for s in report['stages']],
+            [('build_graph', 0), ('load_reactions', 1)])
+
+        outer, inner = report['stages']
+        self.assertEqual(inner['counters'], {'reactions': 100})
+        self.assertEqual(outer['counters'], {'nodes': 10, 'edges': 20})
+        self.assertGreater(inner['memory_peak'], 100 * 1000 * 8)
+        self.assertGreaterEqual(outer['memory_peak'], inner['memory_peak'])
+        self.assertGreaterEqual(report['memory_peak'], outer['memory_peak'])
+        self.assertGreaterEqual(outer['wall_time'], inner['wall_time'])
+        for s in report['stages']:
+            self.assertTrue(os.path.exists(s['cprofile']))
+
+    def test_shared_profilers(self):
+        """Test that a second copy of the module, as loaded by the import
+        fallbacks, finds the running profiler"""
+        spec = importlib.util.spec_from_file_location(
+            'profiler_copy',
+            os.path.join(os.path.dirname(__file__), '..', 'profiler.py'))
+        profiler_copy = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(profiler_copy)
+
+        args_dict = {
+            'cmd': 'curate',
+            'profile': self.report_file,
+            'profile_memory': False}
+        profiler = start_profiler(args_dict)
+        self.assertIs(profiler_copy.get_profiler(args_dict), profiler)
+        with profiler_copy.profile_stage(args_dict, 'build_graph') as stage:
+            stage.count(nodes=1)
+        profiler_copy.write_profile_report(args_dict)
+        self.assertEqual(get_profiler(args_dict), None)
+
+        with open(self.report_file) as json_file:
+            report = json.load(json_file)
+        self.assertEqual(
+            [s['name'] for s in report['stages']], ['build_graph'])
+
+
+if __name__ == '__main__':
+    unittest.main()
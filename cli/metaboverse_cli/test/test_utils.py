@@ -0,0 +1,156 @@
+"""License Information
+metaboverse-cli
+Back-end CLI Tool for Curating Metabolic Networks for Metaboverse
+https://github.com/Metaboverse/metaboverse-cli/
+alias: metaboverse-cli
+
+MIT License
+
+Copyright (c) Jordan A. Berg, The University of Utah
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+
+"""
+import importlib.util
+import contextlib
+import unittest
+import tempfile
+import json
+import io
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import functions to test
+try:
+    from utils import ProgressReporter, progress_feed, flush_progress, \
+        get_progress_reporter
+except ImportError:
+    # For running tests directly
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+    from metaboverse_cli.utils import ProgressReporter, progress_feed, \
+        flush_progress, get_progress_reporter
+
+
+class TestProgressReporter(unittest.TestCase):
+    """Test buffered progress log updates"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.feed_file = os.path.join(self.directory.name, 'progress.json')
+        with open(self.feed_file, 'w') as outfile:
+            json.dump({'graph': 0, 'model': 0}, outfile)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read(self):
+        with open(self.feed_file) as json_file:
+            return json.load(json_file)
+
+    def test_buffered_updates(self):
+        """Test that updates are held until flushed and capped at 100"""
+        reporter = ProgressReporter(self.feed_file, interval=60)
+        for i in range(120):
+            reporter.add('graph', 1)
+        reporter.add('graph', -5)
+        reporter.add('model', 2)
+        self.assertEqual(self.read(), {'graph': 0, 'model': 0})
+
+        reporter.close()
+        self.assertEqual(self.read(), {'graph': 95, 'model': 2})
+        self.assertEqual(
+            [x for x in os.listdir(self.directory.name)], ['progress.json'])
+
+    def test_background_flush(self):
+        """Test that the background thread writes updates"""
+        reporter = ProgressReporter(self.feed_file, interval=0.01)
+        reporter.add('graph', 3)
+        for i in range(200):
+            if self.read()['graph'] == 3:
+                break
+            reporter.stopped.wait(0.01)
+        self.assertEqual(self.read()['graph'], 3)
+        reporter.close()
+
+    def test_flush_error(self):
+        """Test that the background thread keeps running after a failed
+        flush"""
+        with open(self.feed_file, 'w') as outfile:
+            outfile.write('{')
+        reporter = ProgressReporter(self.feed_file, interval=0.01)
+        with contextlib.redirect_stdout(io.StringIO()):
+            reporter.add('graph', 1)
+            while len(reporter.pending) != 0:
+                reporter.stopped.wait(0.01)
+            # Wait for the failing flush to finish before fixing the log
+            with reporter.write_lock:
+                with open(self.feed_file, 'w') as outfile:
+                    json.dump({'graph': 0}, outfile)
+            reporter.add('graph', 3)
+            for i in range(200):
+                if self.read()['graph'] == 3:
+                    break
+                reporter.stopped.wait(0.01)
+        self.assertTrue(reporter.thread.is_alive())
+        self.assertEqual(self.read()['graph'], 3)
+        reporter.close()
+
+    def test_progress_stream(self):
+        """Test that flushes are mirrored as JSON lines"""
+        stream_file = os.path.join(self.directory.name, 'progress.ndjson')
+        args_dict = {
+            'progress_log': self.feed_file,
+            'progress_stream': stream_file}
+        progress_feed(args_dict, 'graph', 2)
+        progress_feed(args_dict, 'graph', 3)
+        flush_progress(args_dict)
+
+        self.assertEqual(self.read()['graph'], 5)
+        with open(stream_file) as stream:
+            events = [json.loads(line) for line in stream]
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['process'], 'graph')
+        self.assertEqual(events[0]['amount'], 5)
+        self.assertEqual(events[0]['value'], 5)
+
+    def test_shared_reporters(self):
+        """Test that a second copy of the module, as loaded by the import
+        fallbacks, uses the same reporter"""
+        spec = importlib.util.spec_from_file_location(
+            'utils_copy',
+            os.path.join(os.path.dirname(__file__), '..', 'utils.py'))
+        utils_copy = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(utils_copy)
+
+        args_dict = {'progress_log': self.feed_file}
+        reporter = get_progress_reporter(args_dict)
+        self.assertIs(utils_copy.get_progress_reporter(args_dict), reporter)
+        utils_copy.progress_feed(args_dict, 'graph', 2)
+        progress_feed(args_dict, 'graph', 3)
+        flush_progress(args_dict)
+        self.assertEqual(self.read()['graph'], 5)
+        utils_copy.close_progress()
+        self.assertFalse(reporter.thread.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
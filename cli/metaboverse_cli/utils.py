@@ -30,9 +30,14 @@ SOFTWARE.
 from __future__ import print_function
 from ftplib import FTP
 from contextlib import closing
+import threading
+import tempfile
+import types
+import atexit
 import pickle
 import json
 import math
+import time
 import sys
 import os
 import zipfile
@@ -306,28 +311,203 @@ def get_session_value(
         return 'unknown'
 
 
+PROGRESS_INTERVAL = 0.5
+
+# This module can be loaded under more than one name (see the import
+# fallbacks above), so reporters are kept in a single per-process registry
+_progress_state = sys.modules.setdefault(
+    '_metaboverse_progress', types.ModuleType('_metaboverse_progress'))
+if not hasattr(_progress_state, 'reporters'):
+    _progress_state.reporters = {}
+    _progress_state.lock = threading.Lock()
+_progress_reporters = _progress_state.reporters
+_progress_lock = _progress_state.lock
+
+
+class ProgressReporter():
+    """Buffer progress_feed() updates in memory and flush them from a
+    background thread
+    - The progress log is updated at most once per interval, written to a
+    temporary file and renamed into place so readers never see a partial
+    file
+    - If a stream is given, each flush also writes one JSON line per
+    updated process
+    """
+
+    def __init__(
+            self,
+            feed_file=None,
+            stream=None,
+            interval=PROGRESS_INTERVAL):
+
+        self.feed_file = feed_file
+        self.interval = interval
+        self.pending = {}
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.stopped = threading.Event()
+
+        self.stream = None
+        self.close_stream = False
+        if stream in ('-', 'stdout'):
+            self.stream = sys.stdout
+        elif stream != None:
+            # Opening a named pipe blocks until a reader attaches
+            self.stream = open(stream, 'a', buffering=1)
+            self.close_stream = True
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def add(
+            self,
+            process,
+            amount):
+        """Queue a progress update
+        """
+
+        with self.lock:
+            self.pending.setdefault(process, []).append(amount)
+
+    def run(self):
+
+        while not self.stopped.wait(self.interval):
+            # Keep flushing if one write fails (e.g. the log was locked or
+            # removed); the updates are lost but later ones still get out
+            try:
+                self.flush()
+            except Exception as e:
+                print('Unable to update progress log: ' + str(e))
+
+    def flush(self):
+        """Apply queued updates to the progress log and stream
+        """
+
+        with self.write_lock:
+            with self.lock:
+                pending, self.pending = self.pending, {}
+            if len(pending) == 0:
+                return
+
+            values = {}
+            if self.feed_file != None and os.path.exists(self.feed_file):
+                with open(self.feed_file) as json_file:
+                    data = json.load(json_file)
+
+                # Capped after each update, as they were applied one by one
+                for process, amounts in pending.items():
+                    value = data.get(process, 0)
+                    for amount in amounts:
+                        value += amount
+                        if value >= 100:
+                            value = 100
+                    data[process] = values[process] = value
+
+                directory = os.path.dirname(os.path.abspath(self.feed_file))
+                handle, temp_file = tempfile.mkstemp(
+                    dir=directory, suffix='.tmp')
+                try:
+                    with os.fdopen(handle, 'w') as outfile:
+                        json.dump(data, outfile)
+                    os.replace(temp_file, self.feed_file)
+                except:
+                    if os.path.exists(temp_file):
+                        os.remove(temp_file)
+                    raise
+
+            if self.stream != None:
+                for process, amounts in pending.items():
+                    self.stream.write(json.dumps({
+                        'process': process,
+                        'amount': sum(amounts),
+                        'value': values.get(process),
+                        'time': round(time.time(), 3)}) + '\n')
+                self.stream.flush()
+
+    def close(self):
+        """Stop the background thread and flush remaining updates
+        """
+
+        self.stopped.set()
+        self.thread.join()
+        self.flush()
+        if self.close_stream == True:
+            self.stream.close()
+
+
+def get_progress_reporter(
+        args_dict):
+    """Get the progress reporter for the progress log and stream in
+    args_dict, or None if neither is set
+    """
+
+    feed_file = args_dict.get('progress_log')
+    if str(feed_file) == 'None':
+        feed_file = None
+    stream = args_dict.get('progress_stream')
+    if str(stream) == 'None':
+        stream = None
+    if feed_file == None and stream == None:
+        return None
+
+    key = (feed_file, stream)
+    with _progress_lock:
+        reporter = _progress_reporters.get(key)
+        # A forked worker does not inherit the parent's flush thread
+        if reporter == None or reporter.pid != os.getpid():
+            reporter = ProgressReporter(
+                feed_file=feed_file,
+                stream=stream)
+            _progress_reporters[key] = reporter
+
+    return reporter
+
+
+def flush_progress(
+        args_dict=None):
+    """Write out buffered progress now, for all reporters or only the one
+    used by args_dict
+    """
+
+    if args_dict != None:
+        reporters = [get_progress_reporter(args_dict)]
+    else:
+        with _progress_lock:
+            reporters = list(_progress_reporters.values())
+
+    for reporter in reporters:
+        if reporter != None and reporter.pid == os.getpid():
+            reporter.flush()
+
+
+@atexit.register
+def close_progress():
+    """Flush and stop all progress reporters
+    """
+
+    with _progress_lock:
+        reporters = list(_progress_reporters.values())
+        _progress_reporters.clear()
+
+    for reporter in reporters:
+        if reporter.pid == os.getpid():
+            reporter.close()
+
+
 def progress_feed(
         args_dict=None,
         process="graph",
         amount=1):
     """JS progress feed
+    - Updates are buffered and written out by a ProgressReporter
     """
 
     if args_dict != None:
-        if 'progress_log' in args_dict \
-                and str(args_dict['progress_log']) != 'None':
-            feed_file = args_dict['progress_log']
-
-            if os.path.exists(feed_file) and process != None:
-
-                with open(feed_file) as json_file:
-                    data = json.load(json_file)
-                    data[process] += amount
-                    if data[process] >= 100:
-                        data[process] = 100
-
-                with open(feed_file, 'w') as outfile:
-                    json.dump(data, outfile)
+        if process != None:
+            reporter = get_progress_reporter(args_dict)
+            if reporter != None:
+                reporter.add(process, amount)
     else:
         print('Could not access local variables during progress_feed() update.')
 